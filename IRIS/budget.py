@@ -0,0 +1,88 @@
+import contextlib
+import contextvars
+import threading
+import time
+from typing import List, Optional
+
+# --- Time budgets ---
+# Every report runs under a CancellationToken whose deadline is the earlier of
+# its own budget and the run's global deadline. The token is cooperative:
+# run_command gives a subprocess only the time that is left and kills it on
+# expiry, and long collector loops check `expired()` between items. A report
+# that ran out of time still renders what it gathered; generate_report_html
+# adds a "truncated after N s" marker naming what was cut short.
+
+current_token: contextvars.ContextVar = contextvars.ContextVar("iris_budget_token", default=None)
+
+
+class CancellationToken:
+    def __init__(self, deadline: Optional[float] = None, budget_s: Optional[float] = None):
+        self.deadline = deadline                # time.monotonic() timestamp, None for unbounded
+        self.budget_s = budget_s
+        self.started = time.monotonic()
+        self.truncated: List[str] = []          # what was cut short, in order
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (0 once expired), or None without a deadline."""
+        if self.cancelled:
+            return 0.0
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def truncate(self, what: str):
+        """Records that `what` was skipped or cut short for lack of time."""
+        with self._lock:
+            if what not in self.truncated:
+                self.truncated.append(what)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def marker(self) -> str:
+        """The truncation notice shown at the top of a report, or "" when nothing was cut short."""
+        if not self.truncated:
+            return ""
+        shown = "; ".join(self.truncated[:10]) + (f"; and {len(self.truncated) - 10} more" if len(self.truncated) > 10 else "")
+        return f"⏱ Truncated after {self.elapsed:.0f} s: {shown}"
+
+
+def active_token() -> Optional[CancellationToken]:
+    return current_token.get()
+
+
+def expired(what: str = "") -> bool:
+    """
+    True when the current report is out of time. With `what`, also records it
+    as truncated, so loops can write `if expired("file scan"): break`.
+    """
+    token = current_token.get()
+    if token is None or not token.expired():
+        return False
+    if what:
+        token.truncate(what)
+    return True
+
+
+@contextlib.contextmanager
+def budget_context(token: CancellationToken):
+    """Makes `token` the current report's token inside the block."""
+    reset = current_token.set(token)
+    try:
+        yield token
+    finally:
+        current_token.reset(reset)
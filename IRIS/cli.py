@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+from dataclasses import asdict
+from typing import List, Optional
+
+from .helpers import MockAppInstance, Helpers
+from .log_pipeline import DEBUG, INFO, WARNING, ConsoleSink, FileSink, LogPipeline
+from .reports.registry import COST_BUDGETS, REPORTS, REPORTS_BY_ID, default_reports
+from .runner import ORDER_REGISTRY, ORDER_VOLATILITY, STATUS_ERROR, STATUS_TIMEOUT, STATUS_TRUNCATED, run_reports
+
+# --- Headless batch CLI ---
+# python -m IRIS [--include ID ...] [--exclude ID ...] [--jobs N] [--output-dir DIR]
+#                [--package ARCHIVE] [--format text|json] [--no-browser] [--deadline SECONDS]
+#                [--budget SECONDS] [--order registry|volatility]
+
+# Exit status, so automation can tell outcomes apart without parsing output.
+EXIT_OK = 0               # every selected report ran (or was skipped as inapplicable)
+EXIT_REPORT_ERRORS = 1    # at least one report raised an error
+EXIT_USAGE = 2            # bad arguments (also argparse's own exit code)
+EXIT_DEADLINE = 3         # the deadline or a report's time budget cut the run short (reports not started, truncated or abandoned)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m IRIS", description="IRIS headless incident response collection.")
+    parser.add_argument("--list", action="store_true", help="list available reports and exit")
+    parser.add_argument("-i", "--include", nargs="+", metavar="ID", help="run only these report ids (default: all default reports)")
+    parser.add_argument("-x", "--exclude", nargs="+", metavar="ID", default=[], help="skip these report ids")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of reports to run in parallel (default: 1)")
+    parser.add_argument("--order", choices=(ORDER_REGISTRY, ORDER_VOLATILITY), default=ORDER_REGISTRY,
+                        help="run order: registry order, or most volatile evidence first (sockets, processes, "
+                             "sessions) and stable inventory last (default: registry)")
+    parser.add_argument("-o", "--output-dir", default="reports", help="directory for generated reports (default: ./reports)")
+    parser.add_argument("--package", metavar="ARCHIVE",
+                        help="stream all output into one compressed archive (.zip, .tar.gz or .tar.xz) instead of OUTPUT_DIR")
+    parser.add_argument("--format", choices=("text", "json"), default="text",
+                        help="format of the run summary printed to stdout (log output goes to stderr)")
+    parser.add_argument("--no-browser", action="store_true", help="do not open generated reports in a browser")
+    parser.add_argument("--deadline", type=float, metavar="SECONDS",
+                        help="stop the whole run after this many seconds: no new reports start, and running ones "
+                             "are cut short and render what they have")
+    parser.add_argument("--budget", type=float, metavar="SECONDS",
+                        help="time budget for each report, 0 for none (default: by cost, "
+                             + ", ".join(f"{cost} {seconds:.0f}s" for cost, seconds in COST_BUDGETS.items()) + ")")
+    parser.add_argument("--hostname", help="suspect computer name shown in reports (default: this host's name)")
+    parser.add_argument("--mock", action="store_true", help="use the synthetic mock backend instead of running commands")
+    parser.add_argument("--record", metavar="ARCHIVE", nargs="?", const="",
+                        help="archive every command's raw output for offline re-analysis "
+                             "(default: raw_capture.zip in OUTPUT_DIR, or raw/ inside the --package)")
+    parser.add_argument("--replay", metavar="ARCHIVE", help="answer commands from a recorded archive instead of running them")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only show warnings and errors on the console")
+    parser.add_argument("-v", "--verbose", action="store_true", help="also show every command run on the console")
+    parser.add_argument("--log-file", help="run log with timestamps, levels and report ids "
+                                           "(default: OUTPUT_DIR/iris_run.log, or beside the --package)")
+    return parser
+
+
+def select_reports(include: Optional[List[str]], exclude: List[str]):
+    """Resolves include/exclude ids against the registry, keeping registry order."""
+    unknown = [rid for rid in (include or []) + exclude if rid not in REPORTS_BY_ID]
+    if unknown:
+        raise ValueError(f"Unknown report id(s): {', '.join(unknown)}. Use --list to see available reports.")
+    selected = [spec for spec in REPORTS if spec.id in include] if include else default_reports()
+    return [spec for spec in selected if spec.id not in exclude]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.list:
+        for spec in REPORTS:
+            flags = ", ".join(filter(None, [spec.cost, "admin" if spec.privileged else "", "" if spec.default else "opt-in"]))
+            print(f"{spec.id:<22} {spec.title:<26} [{'/'.join(spec.platforms)}] ({flags})")
+        return EXIT_OK
+
+    try:
+        specs = select_reports(args.include, args.exclude)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return EXIT_USAGE
+    if args.jobs < 1:
+        print("--jobs must be at least 1", file=sys.stderr)
+        return EXIT_USAGE
+    if args.budget is not None and args.budget < 0:
+        print("--budget must not be negative", file=sys.stderr)
+        return EXIT_USAGE
+    if args.record is not None and args.replay:
+        print("--record and --replay are mutually exclusive", file=sys.stderr)
+        return EXIT_USAGE
+
+    package = None
+    if args.package:
+        from .evidence_package import EvidencePackage, package_format
+        try:
+            package_format(args.package)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return EXIT_USAGE
+        package = EvidencePackage(args.package)
+        default_log = args.package + ".log"
+    else:
+        os.makedirs(args.output_dir, exist_ok=True)
+        default_log = os.path.join(args.output_dir, "iris_run.log")
+    console_level = WARNING if args.quiet else DEBUG if args.verbose else INFO
+    # Progress goes to stderr so stdout carries only the run summary (machine-readable with --format json)
+    log_pipeline = LogPipeline([ConsoleSink(console_level, stream=sys.stderr), FileSink(args.log_file or default_log)])
+    app_instance = MockAppInstance(report_output_directory=args.output_dir, log_pipeline=log_pipeline, package=package)
+    archive = None
+    if args.replay:
+        from .command_archive import CommandArchive
+        archive = CommandArchive(args.replay, mode="replay")
+    elif args.record is not None:
+        from .command_archive import CommandArchive
+        if args.record or package is None:
+            archive = CommandArchive(args.record or os.path.join(args.output_dir, "raw_capture.zip"),
+                                     mode="record", evidence=app_instance.evidence)
+        else:
+            archive = CommandArchive("raw", mode="record", evidence=app_instance.evidence, package=package)
+    helpers = Helpers(use_mock=args.mock, archive=archive)
+    hostname = args.hostname or (archive.manifest.get("hostname") if archive and archive.replaying else None) or socket.gethostname()
+    app_instance.set_hostname(hostname)
+
+    started = time.monotonic()
+    deadline = started + args.deadline if args.deadline is not None else None
+    try:
+        results = run_reports(specs, app_instance, helpers,
+                              browser_preference="None" if args.no_browser else "System Default",
+                              jobs=args.jobs, deadline=deadline, budget_s=args.budget, order=args.order,
+                              on_result=app_instance.record_progress)
+    finally:
+        helpers.close()
+        app_instance.close()
+    elapsed = time.monotonic() - started
+
+    if any(r.status == STATUS_ERROR for r in results):
+        exit_code = EXIT_REPORT_ERRORS
+    elif any(r.status in (STATUS_TIMEOUT, STATUS_TRUNCATED) for r in results):
+        exit_code = EXIT_DEADLINE
+    else:
+        exit_code = EXIT_OK
+
+    summary = {
+        "hostname": hostname,
+        "platform": helpers.platform,
+        "output_dir": os.path.abspath(args.package or args.output_dir),
+        "elapsed_s": round(elapsed, 3),
+        "exit_code": exit_code,
+        "reports": [dict(asdict(r), duration_s=round(r.duration_s, 3)) for r in results],
+    }
+    if args.format == "json":
+        print(json.dumps(summary, indent=2))
+    else:
+        for r in results:
+            print(f"{r.status:<9} {r.id:<22} {r.duration_s:7.2f}s  {r.detail}")
+        print(f"{len(results)} reports in {elapsed:.2f}s -> {summary['output_dir']} (exit {exit_code})")
+    return exit_code
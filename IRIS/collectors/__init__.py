@@ -0,0 +1,6 @@
+# IRIS/collectors/__init__.py
+
+# Parsers that read host state directly (databases, procfs/sysfs, config files)
+# instead of shelling out. Each collector takes host paths from
+# `Helpers.host_path`, so the same code runs live, against the mock backend's
+# synthetic filesystem tree, or against fixture files.
@@ -0,0 +1,270 @@
+import socket
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..budget import expired
+from .sockets import PROC, collect_process_files
+
+# --- Bandwidth sampling (Linux) ---
+# Per-interface and per-process throughput over a short window, read in
+# process instead of from nethogs or tcpdump. Each tick reads three counters:
+# /proc/net/dev for every interface; the kernel's per-socket TCP byte counters
+# (tcp_info bytes_acked/bytes_received, one sock_diag netlink dump, which needs
+# no root); and /proc/<pid>/io of processes holding inet sockets, whose
+# rchar/wchar count read()/write() bytes including file I/O and are the only
+# figure for UDP-only processes. Sockets are attributed to processes with an
+# fd sweep at the start and end of the window, so sockets opened during the
+# window are counted too and the per-tick cost stays at one netlink round trip
+# and a few small file reads. /proc/<pid>/io of another user's process needs
+# root; those processes show socket figures only.
+
+DEFAULT_WINDOW_S = 10.0
+MAX_INTERVAL_S = 1.0
+MIN_TICKS = 5                   # short windows are sampled more often
+
+# sock_diag (linux/sock_diag.h, linux/inet_diag.h)
+NETLINK_SOCK_DIAG = 4
+SOCK_DIAG_BY_FAMILY = 20
+NLM_F_REQUEST, NLM_F_DUMP = 0x1, 0x300
+NLMSG_ERROR, NLMSG_DONE = 2, 3
+INET_DIAG_INFO = 2
+_NLMSG = struct.Struct("=IHHII")
+_DIAG_REQUEST = struct.Struct("=BBBxI48x")      # family, protocol, extensions, states, an empty socket id
+_DIAG_MSG_INODE = 68                            # offset of idiag_inode in struct inet_diag_msg
+_DIAG_MSG_SIZE = 72
+_TCP_INFO_BYTES = struct.Struct("=QQ")          # tcpi_bytes_acked, tcpi_bytes_received
+_TCP_INFO_BYTES_OFFSET = 120
+
+Counters = Tuple[int, int]      # (received, sent) bytes
+
+
+def read_interface_counters(net_dev: str) -> Dict[str, Counters]:
+    """Interface -> (rx_bytes, tx_bytes) from /proc/net/dev."""
+    counters = {}
+    try:
+        with open(net_dev, "r", encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()[2:]
+    except OSError:
+        return counters
+    for line in lines:
+        name, _, values = line.partition(":")
+        fields = values.split()
+        if len(fields) >= 9:
+            counters[name.strip()] = (int(fields[0]), int(fields[8]))
+    return counters
+
+
+def read_io_counters(proc_dir: str, pid: int) -> Optional[Counters]:
+    """(rchar, wchar) from /proc/<pid>/io, or None when unreadable (another user's process) or exited."""
+    try:
+        with open(f"{proc_dir}/{pid}/io", "r") as f:
+            values = dict(line.split(":", 1) for line in f.read().splitlines() if ":" in line)
+        return int(values["rchar"]), int(values["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _parse_diag(data: bytes, counters: Dict[int, Counters]) -> bool:
+    """Adds the sockets in one netlink read to `counters`; True once the dump is done."""
+    offset = 0
+    while offset + _NLMSG.size <= len(data):
+        length, kind, _, _, _ = _NLMSG.unpack_from(data, offset)
+        if length < _NLMSG.size:
+            return True
+        if kind == NLMSG_DONE:
+            return True
+        if kind == NLMSG_ERROR:
+            raise OSError("sock_diag dump failed")
+        body, end = offset + _NLMSG.size, offset + length
+        if end - body >= _DIAG_MSG_SIZE:
+            inode = struct.unpack_from("=I", data, body + _DIAG_MSG_INODE)[0]
+            attr = body + _DIAG_MSG_SIZE
+            while attr + 4 <= end:
+                attr_len, attr_type = struct.unpack_from("=HH", data, attr)
+                if attr_len < 4:
+                    break
+                if attr_type == INET_DIAG_INFO and attr_len - 4 >= _TCP_INFO_BYTES_OFFSET + _TCP_INFO_BYTES.size and inode:
+                    acked, received = _TCP_INFO_BYTES.unpack_from(data, attr + 4 + _TCP_INFO_BYTES_OFFSET)
+                    counters[inode] = (received, acked)
+                attr += (attr_len + 3) & ~3
+        offset += (length + 3) & ~3
+    return False
+
+
+def read_tcp_counters() -> Dict[int, Counters]:
+    """
+    Socket inode -> (bytes received, bytes acked) for every TCP socket in this
+    network namespace. Empty when sock_diag is unavailable (not Linux, or a
+    kernel older than 4.2 whose tcp_info has no byte counters).
+    """
+    counters: Dict[int, Counters] = {}
+    if not hasattr(socket, "AF_NETLINK"):
+        return counters
+    try:
+        with socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_SOCK_DIAG) as sock:
+            for family in (socket.AF_INET, socket.AF_INET6):
+                request = _DIAG_REQUEST.pack(family, socket.IPPROTO_TCP, 1 << (INET_DIAG_INFO - 1), 0xFFFFFFFF)
+                sock.send(_NLMSG.pack(_NLMSG.size + len(request), SOCK_DIAG_BY_FAMILY, NLM_F_REQUEST | NLM_F_DUMP, family, 0)
+                          + request)
+                while not _parse_diag(sock.recv(65536), counters):
+                    pass
+    except OSError:
+        pass
+    return counters
+
+
+@dataclass
+class Series:
+    """Throughput of one interface or process: rates per tick and totals over the window."""
+    kind: str                       # "interface" or "process"
+    name: str
+    pid: Optional[int] = None
+    source: str = ""                # /proc/net/dev, tcp_info or /proc/<pid>/io
+    points: List[Tuple[float, float, float]] = field(default_factory=list)    # (seconds into the window, rx B/s, tx B/s)
+    rx_bytes: int = 0
+    tx_bytes: int = 0
+    io_read: int = 0                # processes: read()/write() bytes over the window, file I/O included
+    io_write: int = 0
+    opened: int = 0                 # processes: inet sockets opened and closed during the window
+    closed: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.rx_bytes + self.tx_bytes
+
+    @property
+    def peak(self) -> float:
+        return max((rx + tx for _, rx, tx in self.points), default=0.0)
+
+
+@dataclass
+class Sample:
+    at: float
+    interfaces: Dict[str, Counters]
+    tcp: Dict[int, Counters]
+    io: Dict[int, Counters]
+
+
+@dataclass
+class BandwidthResult:
+    window_s: float
+    interval_s: float
+    interfaces: List[Series]
+    processes: List[Series]
+    cpu_s: float                    # CPU time the sampling itself used
+    socket_counters: bool           # per-socket TCP byte counters were available
+    io_denied: int                  # processes whose /proc/<pid>/io could not be read
+
+
+def _delta(after: Counters, before: Optional[Counters]) -> Counters:
+    if before is None:
+        return after
+    # Counters that went backwards were reset (interface re-created, socket inode reused)
+    return tuple(a - b if a >= b else a for a, b in zip(after, before))
+
+
+def sample_bandwidth(host_path: Callable[[str], str] = lambda path: path, window_s: float = DEFAULT_WINDOW_S,
+                     live: bool = True) -> BandwidthResult:
+    """
+    Samples throughput for `window_s` seconds (cut short when the report's time
+    budget runs out). Per-socket counters are only read when `live`: sock_diag
+    always describes the running kernel, not a mock tree.
+    """
+    proc_dir = host_path(PROC)
+    interval = min(MAX_INTERVAL_S, window_s / MIN_TICKS) if window_s > 0 else MAX_INTERVAL_S
+    cpu_start = time.thread_time()
+
+    def inet_owners() -> Dict[int, List[int]]:
+        owners = {}
+        for pid, files in collect_process_files(host_path).items():
+            inodes = [s.inode for s in files.sockets if s.protocol != "unix"]
+            if inodes:
+                owners[pid] = inodes
+        return owners
+
+    before = inet_owners()
+    tracked = sorted(before)
+
+    def take(at: float) -> Sample:
+        io = {}
+        for pid in tracked:
+            counters = read_io_counters(proc_dir, pid)
+            if counters is not None:
+                io[pid] = counters
+        return Sample(at, read_interface_counters(f"{proc_dir}/net/dev"), read_tcp_counters() if live else {}, io)
+
+    started = time.monotonic()
+    samples = [take(0.0)]
+    tick = 1
+    while started + tick * interval <= started + window_s + 1e-9:
+        delay = started + tick * interval - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        if expired(f"bandwidth sampling ({samples[-1].at:.0f} of {window_s:.0f} s)"):
+            break
+        samples.append(take(time.monotonic() - started))
+        tick += 1
+    after = inet_owners()
+
+    interfaces: Dict[str, Series] = {}
+    processes: Dict[int, Series] = {}
+    inode_owner = {inode: pid for owners in (before, after) for pid, inodes in owners.items() for inode in inodes}
+    for previous, current in zip(samples, samples[1:]):
+        span = max(current.at - previous.at, 1e-6)
+        for name, counters in current.interfaces.items():
+            rx, tx = _delta(counters, previous.interfaces.get(name))
+            series = interfaces.setdefault(name, Series("interface", name, source="/proc/net/dev"))
+            series.points.append((current.at, rx / span, tx / span))
+            series.rx_bytes += rx
+            series.tx_bytes += tx
+        moved: Dict[int, List[int]] = {}
+        for inode, counters in current.tcp.items():
+            pid = inode_owner.get(inode)
+            if pid is not None:
+                rx, tx = _delta(counters, previous.tcp.get(inode))
+                totals = moved.setdefault(pid, [0, 0])
+                totals[0] += rx
+                totals[1] += tx
+        for pid in set(moved) | set(current.io):
+            series = processes.get(pid)
+            if series is None:
+                series = processes[pid] = Series("process", _process_name(proc_dir, pid), pid)
+            if pid in current.io and pid in previous.io:
+                read, written = _delta(current.io[pid], previous.io[pid])
+                series.io_read += read
+                series.io_write += written
+            else:
+                read = written = 0
+            if current.tcp:
+                rx, tx = moved.get(pid, (0, 0))
+                series.source = "tcp_info"
+            else:
+                rx, tx = read, written
+                series.source = "/proc/<pid>/io"
+            series.points.append((current.at, rx / span, tx / span))
+            series.rx_bytes += rx
+            series.tx_bytes += tx
+    for pid in set(before) | set(after):
+        opened = len(set(after.get(pid, ())) - set(before.get(pid, ())))
+        closed = len(set(before.get(pid, ())) - set(after.get(pid, ())))
+        if opened or closed:
+            series = processes.get(pid)
+            if series is None:
+                series = processes[pid] = Series("process", _process_name(proc_dir, pid), pid)
+            series.opened, series.closed = opened, closed
+
+    readable = set().union(*(sample.io for sample in samples))
+    return BandwidthResult(samples[-1].at, interval, sorted(interfaces.values(), key=lambda s: s.name),
+                           sorted(processes.values(), key=lambda s: (-s.total, -(s.io_read + s.io_write), s.pid)),
+                           time.thread_time() - cpu_start, any(sample.tcp for sample in samples),
+                           len(set(tracked) - readable))
+
+
+def _process_name(proc_dir: str, pid: int) -> str:
+    try:
+        with open(f"{proc_dir}/{pid}/comm", "r", encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
@@ -0,0 +1,167 @@
+import os
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+# --- Browser history collector ---
+# Finds Chromium-family and Firefox profiles under each home directory and
+# streams their visits straight out of SQLite. Databases are opened through
+# read-only `immutable=1` URIs, so a browser holding the file locked does not
+# force a copy; rows arrive in `fetchmany` batches with the time window and
+# the timestamp conversion done inside the query.
+
+CHROMIUM = "chromium"
+FIREFOX = "firefox"
+
+# Per platform: (browser name, engine family, profile root relative to the home directory)
+PROFILE_ROOTS = {
+    "linux": [
+        ("Chrome", CHROMIUM, ".config/google-chrome"),
+        ("Chromium", CHROMIUM, ".config/chromium"),
+        ("Chromium (snap)", CHROMIUM, "snap/chromium/common/chromium"),
+        ("Brave", CHROMIUM, ".config/BraveSoftware/Brave-Browser"),
+        ("Edge", CHROMIUM, ".config/microsoft-edge"),
+        ("Firefox", FIREFOX, ".mozilla/firefox"),
+        ("Firefox (snap)", FIREFOX, "snap/firefox/common/.mozilla/firefox"),
+    ],
+    "darwin": [
+        ("Chrome", CHROMIUM, "Library/Application Support/Google/Chrome"),
+        ("Chromium", CHROMIUM, "Library/Application Support/Chromium"),
+        ("Brave", CHROMIUM, "Library/Application Support/BraveSoftware/Brave-Browser"),
+        ("Edge", CHROMIUM, "Library/Application Support/Microsoft Edge"),
+        ("Firefox", FIREFOX, "Library/Application Support/Firefox/Profiles"),
+    ],
+    "win32": [
+        ("Chrome", CHROMIUM, "AppData/Local/Google/Chrome/User Data"),
+        ("Chromium", CHROMIUM, "AppData/Local/Chromium/User Data"),
+        ("Brave", CHROMIUM, "AppData/Local/BraveSoftware/Brave-Browser/User Data"),
+        ("Edge", CHROMIUM, "AppData/Local/Microsoft/Edge/User Data"),
+        ("Firefox", FIREFOX, "AppData/Roaming/Mozilla/Firefox/Profiles"),
+    ],
+}
+# Directories holding one home per user, plus homes that live elsewhere
+HOME_ROOTS = {"linux": ["/home"], "darwin": ["/Users"], "win32": ["C:/Users"]}
+EXTRA_HOMES = {"linux": [("root", "/root")], "darwin": [("root", "/var/root")], "win32": []}
+HISTORY_FILES = {CHROMIUM: "History", FIREFOX: "places.sqlite"}
+
+# Chromium stores microseconds since 1601-01-01 (WebKit time), Firefox microseconds since 1970 (PRTime).
+WEBKIT_EPOCH_OFFSET_US = 11644473600 * 1000000
+FETCH_BATCH = 5000
+
+_QUERIES = {
+    CHROMIUM: (
+        "SELECT (v.visit_time - {offset}) / 1000000.0, u.url, u.title, v.visit_duration / 1000000.0 "
+        "FROM visits v JOIN urls u ON u.id = v.url "
+        "WHERE v.visit_time >= ? AND v.visit_time < ? ORDER BY v.visit_time"
+    ).format(offset=WEBKIT_EPOCH_OFFSET_US),
+    FIREFOX: (
+        "SELECT h.visit_date / 1000000.0, p.url, p.title, NULL "
+        "FROM moz_historyvisits h JOIN moz_places p ON p.id = h.place_id "
+        "WHERE h.visit_date >= ? AND h.visit_date < ? ORDER BY h.visit_date"
+    ),
+}
+# The window end when none is given: year 9999, safely inside both encodings' int64 range.
+_FAR_FUTURE_S = 253402300799
+
+
+@dataclass
+class BrowserProfile:
+    browser: str
+    family: str
+    user: str
+    profile: str
+    history_path: str
+
+
+class Visit(NamedTuple):
+    timestamp: float        # seconds since the Unix epoch (UTC)
+    url: str
+    title: Optional[str]
+    duration_s: Optional[float]
+
+
+def _platform_key(platform: str) -> str:
+    return "linux" if platform.startswith("linux") else platform
+
+
+def _native_range(family: str, since: Optional[float], until: Optional[float]) -> Tuple[int, int]:
+    """Converts a Unix-seconds window into the database's own timestamp units, so the index is used."""
+    lo = int((since or 0) * 1000000)
+    hi = int((until if until is not None else _FAR_FUTURE_S) * 1000000)
+    if family == CHROMIUM:
+        return lo + WEBKIT_EPOCH_OFFSET_US, hi + WEBKIT_EPOCH_OFFSET_US
+    return lo, hi
+
+
+def _profile_dirs(root: str, family: str) -> Iterator[str]:
+    try:
+        entries = sorted(os.scandir(root), key=lambda e: e.name)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_dir() and os.path.isfile(os.path.join(entry.path, HISTORY_FILES[family])):
+            yield entry.path
+
+
+def home_directories(platform: str, host_path: Callable[[str], str] = lambda path: path) -> List[Tuple[str, str]]:
+    """
+    (user, home path) for every home directory on the host. `host_path` maps host
+    paths to readable ones (see Helpers.host_path).
+    """
+    key = _platform_key(platform)
+    homes = []
+    for root in HOME_ROOTS.get(key, []):
+        try:
+            homes += sorted((entry.name, entry.path) for entry in os.scandir(host_path(root)) if entry.is_dir())
+        except OSError:
+            continue
+    homes += [(user, host_path(home)) for user, home in EXTRA_HOMES.get(key, []) if os.path.isdir(host_path(home))]
+    return homes
+
+
+def discover_profiles(homes: List[Tuple[str, str]], platform: str) -> List[BrowserProfile]:
+    """Finds every browser profile with a history database under the given (user, home) pairs."""
+    profiles = []
+    for user, home in homes:
+        for browser, family, relative in PROFILE_ROOTS.get(_platform_key(platform), []):
+            for profile_dir in _profile_dirs(os.path.join(home, relative), family):
+                profiles.append(BrowserProfile(browser, family, user, os.path.basename(profile_dir),
+                                               os.path.join(profile_dir, HISTORY_FILES[family])))
+    return profiles
+
+
+def open_readonly(path: str) -> sqlite3.Connection:
+    """
+    Opens a SQLite database without writing to it or taking locks. `immutable=1`
+    also skips any -wal file, so visits the browser has not checkpointed yet are
+    not seen; see `has_pending_wal`.
+    """
+    uri = Path(os.path.abspath(path)).as_uri() + "?mode=ro&immutable=1"
+    return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+
+def has_pending_wal(path: str) -> bool:
+    try:
+        return os.path.getsize(path + "-wal") > 0
+    except OSError:
+        return False
+
+
+def iter_visits(profile: BrowserProfile, since: Optional[float] = None, until: Optional[float] = None,
+                batch_size: int = FETCH_BATCH) -> Iterator[Visit]:
+    """
+    Streams a profile's visits in time order, `batch_size` rows at a time, limited
+    to [since, until) in Unix seconds. Memory use is independent of history size.
+    """
+    connection = open_readonly(profile.history_path)
+    try:
+        cursor = connection.execute(_QUERIES[profile.family], _native_range(profile.family, since, until))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield Visit(*row)
+    finally:
+        connection.close()
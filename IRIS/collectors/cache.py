@@ -0,0 +1,63 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, List, Optional, Sequence
+
+# --- Collector result cache ---
+# Parsed results are stored as JSON together with a validity key built from
+# the (path, mtime_ns, size) of every file or directory they were derived from.
+# A repeat run whose sources have not changed loads the JSON instead of parsing.
+# The location is IRIS_CACHE_DIR, defaulting to ~/.cache/iris; set it to a
+# removable drive to avoid writing to the suspect host's disk.
+
+CACHE_ENV = "IRIS_CACHE_DIR"
+CACHE_VERSION = 1
+
+
+def default_cache_dir() -> str:
+    return os.environ.get(CACHE_ENV) or os.path.join(os.path.expanduser("~"), ".cache", "iris")
+
+
+def stat_key(paths: Sequence[str]) -> List[Any]:
+    """Validity key for a set of sources; missing paths are part of the key too."""
+    key = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            key.append([path, st.st_mtime_ns, st.st_size])
+        except OSError:
+            key.append([path, None, None])
+    return key
+
+
+class CollectorCache:
+    """Small persistent cache of JSON-serialisable collector results."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or default_cache_dir()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(name.encode("utf-8")).hexdigest()[:32] + ".json")
+
+    def get(self, name: str, key: Any) -> Optional[Any]:
+        """Returns the cached value for `name` if it was stored with an identical key."""
+        try:
+            with open(self._file(name), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != CACHE_VERSION or entry.get("name") != name or entry.get("key") != key:
+            return None
+        return entry.get("value")
+
+    def put(self, name: str, key: Any, value: Any):
+        """Stores a value atomically; failures (read-only media, full disk) are ignored."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "name": name, "key": key, "value": value}, f, separators=(",", ":"))
+            os.replace(tmp, self._file(name))
+        except OSError:
+            pass
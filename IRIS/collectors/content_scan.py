@@ -0,0 +1,875 @@
+import mmap
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from re import _constants as _sre, _parser as _sre_parse      # Python 3.11+
+except ImportError:
+    import sre_constants as _sre
+    import sre_parse as _sre_parse
+
+# --- Content scanner ---
+# A small YARA-like rule language:
+#
+#   rule python_reverse_shell : script shell {
+#       meta:
+#           description = "Python socket wired to a pty"
+#       strings:
+#           $sock = "socket.socket(" nocase
+#           $pty  = "pty.spawn"
+#           $elf  = { 7F 45 4C 46 ?? 01 [0-4] 00 }
+#           $tcp  = /\/dev\/tcp\/[0-9.]+\/[0-9]+/
+#       condition:
+#           $sock and ($pty or #tcp > 1) and not $elf at 0
+#   }
+#
+# Strings are literals (modifiers nocase, wide, ascii), hex patterns
+# (?? and nibble wildcards, [n] / [n-m] jumps, ( a | b ) alternatives) or
+# /regex/is. Conditions combine $x, #x (count), @x / @x[i] (offsets),
+# `$x at N`, `$x in (A..B)`, `any|all|N of them|($a, $b*)`, filesize,
+# + - and comparisons with and/or/not.
+#
+# Every literal and hex string of every rule is compiled into one regular
+# expression, one branch per first byte with the literals behind it factored
+# into a byte trie, so the C regex engine is the multi-pattern automaton: it
+# skips over bytes no string starts with, stops only where some string
+# matches, and only there does Python look up which strings start at that
+# byte. Regex strings get a finditer pass of their own, run only when a
+# condition asks for them and a literal every match must contain was seen
+# (so `$decode and $blob` never scans for $blob without $decode), and then
+# only around where those literals were found. Files are
+# memory-mapped and searched in fixed-size windows that overlap by the
+# longest match length, so nothing is copied and no match straddling a
+# window boundary is lost.
+
+CHUNK_SIZE = 16 * 1024 * 1024
+MAX_REGEX_MATCH = 4096          # longest match an unbounded regex or hex jump is allowed (the window overlap)
+MAX_OFFSETS = 10000             # offsets kept per string per file; counts keep going
+MAX_FILE_SIZE = 256 * 1024 * 1024
+
+
+class RuleError(ValueError):
+    """Raised with the line number for rule source that does not parse."""
+
+
+@dataclass
+class Pattern:
+    name: str                       # "$sock"; anonymous strings are numbered "$" + index
+    kind: str                       # "text", "hex" or "regex"
+    source: str
+    literals: Optional[List[bytes]] = None      # text strings, one per ascii/wide variant (lower-cased when nocase)
+    nocase: bool = False
+    regex: Optional["re.Pattern"] = None
+    max_length: int = 0
+    first_bytes: Optional[frozenset] = None     # bytes a match can start with; None when any
+    rest: Optional[bytes] = None                # hex strings: the regex for everything after the first byte
+    atoms: Optional[List["Pattern"]] = None     # literals one of which every match contains (separate passes only)
+
+    def match_at(self, data: Any, offset: int, end: int) -> bool:
+        if self.literals is not None:
+            for literal in self.literals:
+                found = data[offset:offset + len(literal)]
+                if (bytes(found).lower() if self.nocase else found) == literal:
+                    return True
+            return False
+        return self.regex.match(data, offset, end) is not None
+
+
+@dataclass
+class Rule:
+    name: str
+    tags: List[str]
+    meta: Dict[str, Any]
+    patterns: List[Pattern]
+    condition: Callable[["_Context"], Any]
+    condition_source: str = ""
+
+
+@dataclass
+class RuleMatch:
+    rule: str
+    tags: List[str]
+    meta: Dict[str, Any]
+    strings: Dict[str, List[int]]       # matched string -> first offsets
+
+
+@dataclass
+class ScanResult:
+    path: str
+    size: int = 0
+    matches: List[RuleMatch] = field(default_factory=list)
+    error: str = ""
+
+
+# --- Rule source parsing ---
+_TOKEN = re.compile(r"""
+    (?P<space>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<string>"(?:[^"\\\n]|\\.)*")
+  | (?P<regex>/(?:[^/\\\n]|\\.)+/[is]*)
+  | (?P<hexstr>\{[0-9A-Fa-f?\s\[\]\-()|~]*\})
+  | (?P<number>0x[0-9A-Fa-f]+|\d+(?:KB|MB)?)
+  | (?P<var>[$#@!][A-Za-z0-9_]*\*?)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<op>\.\.|==|!=|<=|>=|[<>=:{}()\[\],+\-])
+""", re.VERBOSE | re.DOTALL)
+
+
+def _tokenize(text: str) -> List[Tuple[str, str, int]]:
+    tokens, pos, line = [], 0, 1
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if m is None:
+            raise RuleError(f"line {line}: unexpected {text[pos:pos + 20]!r}")
+        kind = m.lastgroup
+        if kind != "space":
+            tokens.append((kind, m.group(), line))
+        line += m.group().count("\n")
+        pos = m.end()
+    return tokens
+
+
+def _unescape(literal: str) -> bytes:
+    body = literal[1:-1]
+    out, i = bytearray(), 0
+    while i < len(body):
+        ch = body[i]
+        if ch == "\\" and i + 1 < len(body):
+            nxt = body[i + 1]
+            if nxt == "x" and i + 3 < len(body):
+                out.append(int(body[i + 2:i + 4], 16))
+                i += 4
+                continue
+            out += {"n": b"\n", "t": b"\t", "r": b"\r", "0": b"\0"}.get(nxt, nxt.encode("utf-8"))
+            i += 2
+            continue
+        out += ch.encode("utf-8")
+        i += 1
+    return bytes(out)
+
+
+def _hex_to_regex(source: str) -> Tuple[bytes, int, Optional[frozenset], bytes]:
+    """
+    A hex string as a bytes regex, its maximum match length, the bytes it can
+    start with (None when any) and the regex for what follows the first byte.
+    """
+    tokens = re.findall(r"\[\s*\d*\s*-?\s*\d*\s*\]|[0-9A-Fa-f?]{2}|[()|]", source[1:-1])
+    if not tokens:
+        raise RuleError(f"empty hex string {source}")
+    parts, length, alternative_lengths, stack = [], 0, [], []
+    first: Optional[set] = None
+    for token in tokens:
+        if token == "(":
+            stack.append((length, alternative_lengths))
+            alternative_lengths = []
+            parts.append(b"(?:")
+        elif token == "|":
+            alternative_lengths.append(length - stack[-1][0])
+            length = stack[-1][0]
+            parts.append(b"|")
+        elif token == ")":
+            alternative_lengths.append(length - stack[-1][0])
+            start, outer = stack.pop()
+            length = start + max(alternative_lengths)
+            alternative_lengths = outer
+            parts.append(b")")
+        elif token.startswith("["):
+            bounds = token[1:-1].replace(" ", "")
+            lo, _, hi = bounds.partition("-")
+            lo_n = int(lo or 0)
+            hi_n = int(hi) if hi else (MAX_REGEX_MATCH if "-" in bounds else lo_n)
+            parts.append(b".{%d,%d}" % (lo_n, hi_n))
+            length += hi_n
+        else:
+            high, low = token[0], token[1]
+            if token == "??":
+                parts.append(b".")
+                candidates = None
+            elif "?" in token:
+                values = [int(f"{h}{l}", 16) for h in ("0123456789ABCDEF" if high == "?" else high)
+                          for l in ("0123456789ABCDEF" if low == "?" else low)]
+                parts.append(b"[" + b"".join(re.escape(bytes([v])) for v in values) + b"]")
+                candidates = set(values)
+            else:
+                value = int(token, 16)
+                parts.append(re.escape(bytes([value])))
+                candidates = {value}
+            if length == 0 and not stack and first is None:
+                first = candidates if candidates is not None else set(range(256))
+            length += 1
+    if stack:
+        raise RuleError(f"unbalanced parentheses in hex string {source}")
+    if tokens[0] == "(" or tokens[0].startswith("[") or first is None or len(first) == 256:
+        return b"".join(parts), length, None, b""
+    return b"".join(parts), length, frozenset(first), b"".join(parts[1:])
+
+
+def _parse_string(name: str, tokens: List[Tuple[str, str, int]], i: int) -> Tuple[Pattern, int]:
+    kind, value, line = tokens[i]
+    i += 1
+    modifiers = []
+    while i < len(tokens) and tokens[i][0] == "word" and tokens[i][1] in ("nocase", "wide", "ascii", "fullword", "private"):
+        modifiers.append(tokens[i][1])
+        i += 1
+    if kind == "string":
+        data = _unescape(value)
+        if not data:
+            raise RuleError(f"line {line}: empty string {name}")
+        variants = []
+        if "ascii" in modifiers or "wide" not in modifiers:
+            variants.append(data)
+        if "wide" in modifiers:
+            variants.append(b"".join(bytes([b, 0]) for b in data))
+        nocase = "nocase" in modifiers
+        literals = [v.lower() for v in variants] if nocase else variants
+        first = {v[0] for v in literals} | ({bytes([v[0]]).upper()[0] for v in literals} if nocase else set())
+        return Pattern(name, "text", value, literals=literals, nocase=nocase, max_length=max(map(len, literals)),
+                       first_bytes=frozenset(first)), i
+    if kind == "hexstr":
+        body, length, first, rest = _hex_to_regex(value)
+        return Pattern(name, "hex", value, regex=re.compile(body, re.DOTALL), max_length=length, first_bytes=first, rest=rest), i
+    if kind == "regex":
+        body, _, flags = value[1:].rpartition("/")
+        try:
+            regex = re.compile(body.encode("latin-1"), (re.IGNORECASE if "i" in flags or "nocase" in modifiers else 0) | (re.DOTALL if "s" in flags else 0))
+        except (re.error, UnicodeEncodeError) as e:
+            raise RuleError(f"line {line}: bad regex for {name}: {e}")
+        return Pattern(name, "regex", value, regex=regex, max_length=MAX_REGEX_MATCH), i
+    raise RuleError(f"line {line}: expected a string, hex string or regex for {name}")
+
+
+# --- Conditions ---
+class _Context:
+    """What a condition sees: per-string counts and offsets, resolved on first use."""
+    __slots__ = ("names", "resolve", "filesize", "_hits")
+
+    def __init__(self, names: Dict[str, "Pattern"], resolve: Callable[["Pattern"], Tuple[int, List[int]]], filesize: int):
+        self.names, self.resolve, self.filesize, self._hits = names, resolve, filesize, {}
+
+    def _get(self, name: str) -> Tuple[int, List[int]]:
+        hits = self._hits.get(name)
+        if hits is None:
+            hits = self._hits[name] = self.resolve(self.names[name])
+        return hits
+
+    def count(self, name: str) -> int:
+        return self._get(name)[0]
+
+    def offsets(self, name: str) -> List[int]:
+        return self._get(name)[1]
+
+    def matched(self) -> Dict[str, List[int]]:
+        """Strings that were evaluated and found (unevaluated ones were never needed)."""
+        return {name: hits[1][:10] for name, hits in self._hits.items() if hits[0]}
+
+
+class _ConditionParser:
+    """Recursive descent over condition tokens, producing a tree of closures."""
+
+    def __init__(self, tokens: List[Tuple[str, str, int]], names: List[str], rule: str):
+        self.tokens, self.i, self.names, self.rule = tokens, 0, names, rule
+
+    def error(self, message: str):
+        line = self.tokens[min(self.i, len(self.tokens) - 1)][2] if self.tokens else 0
+        raise RuleError(f"line {line}: rule {self.rule}: {message}")
+
+    def peek(self, value: Optional[str] = None) -> bool:
+        if self.i >= len(self.tokens):
+            return False
+        return value is None or self.tokens[self.i][1] == value
+
+    def take(self, value: Optional[str] = None) -> Tuple[str, str, int]:
+        if not self.peek(value):
+            self.error(f"expected {value or 'more'}")
+        token = self.tokens[self.i]
+        self.i += 1
+        return token
+
+    def string(self, var: str) -> str:
+        name = "$" + var[1:]
+        if name not in self.names:
+            self.error(f"undefined string {name}")
+        return name
+
+    def strings(self, var: str) -> List[str]:
+        if var.endswith("*"):
+            prefix = "$" + var[1:-1]
+            found = [name for name in self.names if name.startswith(prefix)]
+            if not found:
+                self.error(f"no strings match {var}")
+            return found
+        return [self.string(var)]
+
+    def parse(self) -> Callable[[_Context], Any]:
+        node = self.expr()
+        if self.i != len(self.tokens):
+            self.error(f"unexpected {self.tokens[self.i][1]!r}")
+        return node
+
+    def expr(self):
+        node = self.conjunction()
+        while self.peek("or"):
+            self.take()
+            left, right = node, self.conjunction()
+            node = lambda c, left=left, right=right: bool(left(c)) or bool(right(c))
+        return node
+
+    def conjunction(self):
+        node = self.negation()
+        while self.peek("and"):
+            self.take()
+            left, right = node, self.negation()
+            node = lambda c, left=left, right=right: bool(left(c)) and bool(right(c))
+        return node
+
+    def negation(self):
+        if self.peek("not"):
+            self.take()
+            inner = self.negation()
+            return lambda c: not inner(c)
+        return self.comparison()
+
+    def comparison(self):
+        left = self.arithmetic()
+        if self.peek() and self.tokens[self.i][1] in ("==", "!=", "<", "<=", ">", ">="):
+            op = self.take()[1]
+            right = self.arithmetic()
+            compare = {"==": int.__eq__, "!=": int.__ne__, "<": int.__lt__, "<=": int.__le__, ">": int.__gt__, ">=": int.__ge__}[op]
+            return lambda c: (lambda a, b: a is not None and b is not None and compare(int(a), int(b)))(left(c), right(c))
+        return left
+
+    def arithmetic(self):
+        node = self.primary()
+        while self.peek() and self.tokens[self.i][1] in ("+", "-"):
+            sign = 1 if self.take()[1] == "+" else -1
+            left, right = node, self.primary()
+            node = lambda c, left=left, right=right, sign=sign: (
+                None if left(c) is None or right(c) is None else int(left(c)) + sign * int(right(c)))
+        return node
+
+    def number(self) -> int:
+        kind, value, _ = self.take()
+        if kind != "number":
+            self.error(f"expected a number, got {value!r}")
+        if value.startswith("0x"):
+            return int(value, 16)
+        scale = {"KB": 1024, "MB": 1024 * 1024}.get(value[-2:], 1)
+        return int(value[:-2] if scale > 1 else value) * scale
+
+    def primary(self):
+        if not self.peek():
+            self.error("condition ends early")
+        kind, value, _ = self.tokens[self.i]
+        if value == "(":
+            self.take()
+            node = self.expr()
+            self.take(")")
+            return node
+        if kind == "number":
+            constant = self.number()
+            if self.peek("of"):
+                return self.quantifier(constant)
+            return lambda c: constant
+        if value in ("true", "false"):
+            self.take()
+            return (lambda c: True) if value == "true" else (lambda c: False)
+        if value == "filesize":
+            self.take()
+            return lambda c: c.filesize
+        if value in ("any", "all"):
+            self.take()
+            return self.quantifier(value)
+        if kind == "var":
+            self.take()
+            if value[0] == "#":
+                name = self.string(value)
+                return lambda c: c.count(name)
+            if value[0] == "@":
+                name = self.string(value)
+                index = 1
+                if self.peek("["):
+                    self.take()
+                    index = self.number()
+                    self.take("]")
+                return lambda c: c.offsets(name)[index - 1] if len(c.offsets(name)) >= index else None
+            name = self.string(value)
+            if self.peek("at"):
+                self.take()
+                where = self.arithmetic()
+                return lambda c: where(c) in set(c.offsets(name))
+            if self.peek("in"):
+                self.take()
+                self.take("(")
+                lo = self.arithmetic()
+                self.take("..")
+                hi = self.arithmetic()
+                self.take(")")
+                return lambda c: any(lo(c) <= offset <= hi(c) for offset in c.offsets(name))
+            return lambda c: c.count(name) > 0
+        self.error(f"unexpected {value!r}")
+
+    def quantifier(self, amount):
+        self.take("of")
+        if self.peek("them"):
+            self.take()
+            names = list(self.names)
+        else:
+            self.take("(")
+            names = []
+            while True:
+                kind, value, _ = self.take()
+                if kind != "var" or value[0] != "$":
+                    self.error(f"expected a string in the set, got {value!r}")
+                names += self.strings(value)
+                if self.peek(")"):
+                    break
+                self.take(",")
+            self.take(")")
+        needed = len(names) if amount == "all" else 1 if amount == "any" else amount
+        return lambda c: sum(1 for name in names if c.count(name)) >= needed
+
+
+def _parse_rules(text: str) -> List[Rule]:
+    tokens = _tokenize(text)
+    rules, i, seen = [], 0, set()
+
+    def expect(value: str):
+        nonlocal i
+        if i >= len(tokens) or tokens[i][1] != value:
+            where = tokens[i][2] if i < len(tokens) else "end"
+            raise RuleError(f"line {where}: expected {value!r}")
+        i += 1
+
+    while i < len(tokens):
+        while i < len(tokens) and tokens[i][1] in ("private", "global"):
+            i += 1
+        expect("rule")
+        if i >= len(tokens) or tokens[i][0] != "word":
+            raise RuleError(f"line {tokens[i - 1][2]}: expected a rule name")
+        name, line = tokens[i][1], tokens[i][2]
+        if name in seen:
+            raise RuleError(f"line {line}: duplicate rule {name}")
+        seen.add(name)
+        i += 1
+        tags = []
+        if tokens[i][1] == ":":
+            i += 1
+            while tokens[i][0] == "word":
+                tags.append(tokens[i][1])
+                i += 1
+        expect("{")
+        meta: Dict[str, Any] = {}
+        patterns: List[Pattern] = []
+        condition_tokens: List[Tuple[str, str, int]] = []
+        section = None
+        while i < len(tokens) and tokens[i][1] != "}":
+            if tokens[i][0] == "word" and i + 1 < len(tokens) and tokens[i + 1][1] == ":" and tokens[i][1] in ("meta", "strings", "condition"):
+                section = tokens[i][1]
+                i += 2
+                continue
+            if section == "meta":
+                key = tokens[i][1]
+                expect_eq = tokens[i + 1][1] if i + 1 < len(tokens) else ""
+                if expect_eq != "=" or i + 2 >= len(tokens):
+                    raise RuleError(f"line {tokens[i][2]}: expected key = value in meta")
+                kind, value, _ = tokens[i + 2]
+                meta[key] = (_unescape(value).decode("utf-8", errors="replace") if kind == "string"
+                             else value == "true" if value in ("true", "false") else int(value, 0))
+                i += 3
+            elif section == "strings":
+                kind, var, var_line = tokens[i]
+                if kind != "var" or var[0] != "$" or i + 1 >= len(tokens) or tokens[i + 1][1] != "=":
+                    raise RuleError(f"line {var_line}: expected $name = ... in strings")
+                var = var if var != "$" else f"${len(patterns)}"
+                if any(p.name == var for p in patterns):
+                    raise RuleError(f"line {var_line}: duplicate string {var} in rule {name}")
+                pattern, i = _parse_string(var, tokens, i + 2)
+                patterns.append(pattern)
+            elif section == "condition":
+                condition_tokens.append(tokens[i])
+                i += 1
+            else:
+                raise RuleError(f"line {tokens[i][2]}: expected meta:, strings: or condition:")
+        expect("}")
+        if not condition_tokens:
+            raise RuleError(f"line {line}: rule {name} has no condition")
+        condition = _ConditionParser(condition_tokens, [p.name for p in patterns], name).parse()
+        rules.append(Rule(name, tags, meta, patterns, condition, " ".join(t[1] for t in condition_tokens)))
+    return rules
+
+
+# --- The automaton ---
+def _trie_regex(literals: Iterable[bytes], fold: bool = False) -> bytes:
+    """
+    Alternation of literals factored into a byte trie, so the regex engine
+    branches once per byte. With `fold`, letters (of lower-cased literals) match either case.
+    """
+    trie: Dict[int, Any] = {}
+    for literal in literals:
+        node = trie
+        for byte in literal:
+            node = node.setdefault(byte, {})
+        node[-1] = True
+
+    def render(node: Dict[int, Any]) -> bytes:
+        optional = -1 in node
+        branches = [(b"[%c%c]" % (byte, byte - 32) if fold and 0x61 <= byte <= 0x7a else re.escape(bytes([byte]))) + render(child)
+                    for byte, child in sorted(node.items()) if byte != -1]
+        if not branches:
+            return b""
+        body = branches[0] if len(branches) == 1 else b"(?:" + b"|".join(branches) + b")"
+        return b"(?:" + body + b")?" if optional else body
+    return render(trie)
+
+
+def _required_literals(items: Any) -> Optional[List[bytes]]:
+    """
+    Literals at least one of which every match of a parsed regex contains:
+    the longest run of plain characters in its top-level sequence, or one run
+    per alternative of a required group. None when there is nothing useful.
+    """
+    options: List[List[bytes]] = []
+    run = bytearray()
+    for op, av in list(items) + [(None, None)]:
+        if op is _sre.LITERAL:
+            run.append(av)
+            continue
+        if run:
+            options.append([bytes(run)])
+            run = bytearray()
+        if op is _sre.SUBPATTERN and not (av[1] & re.IGNORECASE):
+            found = _required_literals(av[-1])
+        elif op is _sre.BRANCH:
+            alternatives = [_required_literals(alternative) for alternative in av[1]]
+            found = None if any(a is None for a in alternatives) else [atom for a in alternatives for atom in a]
+        elif op in (_sre.MAX_REPEAT, _sre.MIN_REPEAT) and av[0] >= 1:
+            found = _required_literals(av[2])
+        else:
+            found = None
+        if found:
+            options.append(found)
+    options = [option for option in options if min(map(len, option)) >= 2]
+    return max(options, key=lambda option: min(map(len, option))) if options else None
+
+
+class RuleSet:
+    """
+    Compiled rules. Literal and hex strings (and the required literals of
+    regex strings) share one automaton and per-byte candidate lists; regex
+    strings and hex strings that can start with any byte are searched in
+    their own pass, only when a condition asks for them and one of their
+    required literals was seen.
+    """
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        patterns = [p for rule in rules for p in rule.patterns]
+        self.separate = [p for p in patterns if p.kind == "regex" or p.first_bytes is None]
+        shared = [p for p in patterns if p.kind != "regex" and p.first_bytes is not None]
+        self.overlap = max([p.max_length for p in patterns] + [1])
+        atoms: Dict[Tuple[bytes, bool], Pattern] = {}
+        for pattern in self.separate:
+            nocase = bool(pattern.regex.flags & re.IGNORECASE)
+            parsed = _sre_parse.parse(pattern.regex.pattern, pattern.regex.flags)
+            pattern.max_length = min(parsed.getwidth()[1], MAX_REGEX_MATCH)
+            required = _required_literals(parsed)
+            if required:
+                pattern.atoms = []
+                for literal in required:
+                    literal = literal.lower() if nocase else literal
+                    key = (literal, nocase)
+                    if key not in atoms:
+                        first = {literal[0], bytes(literal[:1]).upper()[0]} if nocase else {literal[0]}
+                        atoms[key] = Pattern(f"atom:{literal!r}", "atom", "", literals=[literal], nocase=nocase,
+                                             max_length=len(literal), first_bytes=frozenset(first))
+                    pattern.atoms.append(atoms[key])
+        shared += atoms.values()
+
+        # One branch per possible first byte, each starting with that literal byte: the regex
+        # engine then scans for the set of first bytes in C before trying anything else
+        exact: Dict[int, set] = {}
+        folded: Dict[int, set] = {}
+        tails: Dict[int, List[bytes]] = {}
+        for p in shared:
+            if p.literals is None:
+                for byte in p.first_bytes:
+                    tails.setdefault(byte, []).append(p.rest)
+                continue
+            for literal in p.literals:
+                for byte in ({literal[0], bytes(literal[:1]).upper()[0]} if p.nocase else {literal[0]}):
+                    (folded if p.nocase else exact).setdefault(byte, set()).add(literal[1:])
+        branches = []
+        for byte in sorted(set(exact) | set(folded) | set(tails)):
+            alternatives = []
+            if byte in exact:
+                alternatives.append(_trie_regex(exact[byte]))
+            if byte in folded:
+                alternatives.append(_trie_regex(folded[byte], fold=True))
+            alternatives += tails.get(byte, [])
+            if any(not alternative for alternative in alternatives):
+                alternatives = []       # a one-byte string: the byte alone is a match
+            body = b"|".join(alternatives)
+            branches.append(re.escape(bytes([byte])) + (b"(?:" + body + b")" if body else b""))
+        self.automaton = re.compile(b"|".join(branches), re.DOTALL) if branches else None
+        self.by_first_byte: List[List[Pattern]] = [[] for _ in range(256)]
+        for pattern in shared:
+            for byte in pattern.first_bytes:
+                self.by_first_byte[byte].append(pattern)
+
+    @classmethod
+    def compile(cls, text: str) -> "RuleSet":
+        return cls(_parse_rules(text))
+
+    @classmethod
+    def from_file(cls, path: str) -> "RuleSet":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.compile(f.read())
+
+    def _windows(self, size: int) -> Iterator[Tuple[int, int, int]]:
+        """(start, limit, end): matches must start in [start, limit) and may run on to end."""
+        for start in range(0, max(size, 1), CHUNK_SIZE):
+            limit = min(start + CHUNK_SIZE, size)
+            yield start, limit, min(limit + self.overlap, size)
+
+    def _shared_hits(self, data: Any, size: int) -> Dict[int, Tuple[int, List[int]]]:
+        hits: Dict[int, Tuple[int, List[int]]] = {}
+        if self.automaton is None:
+            return hits
+        search, candidates = self.automaton.search, self.by_first_byte
+        for start, limit, end in self._windows(size):
+            position = start
+            while position < limit:
+                m = search(data, position, end)
+                if m is None or m.start() >= limit:
+                    break
+                at = m.start()
+                for pattern in candidates[data[at]]:
+                    if pattern.match_at(data, at, end):
+                        count, found = hits.get(id(pattern), (0, []))
+                        if len(found) < MAX_OFFSETS:
+                            found.append(at)
+                        hits[id(pattern)] = (count + 1, found)
+                position = at + 1
+        return hits
+
+    def _separate_hits(self, pattern: Pattern, data: Any, size: int,
+                       shared: Dict[int, Tuple[int, List[int]]]) -> Tuple[int, List[int]]:
+        count, found = 0, []
+        atom_hits = [shared[id(atom)] for atom in pattern.atoms or () if id(atom) in shared]
+        if atom_hits and all(hits == len(offsets) for hits, offsets in atom_hits):
+            # Every match contains one of the atoms, so it lies within max_length of
+            # an atom offset: search only those neighbourhoods, merged where they touch
+            spans: List[List[int]] = []
+            for offset in sorted(offset for _, offsets in atom_hits for offset in offsets):
+                lo, hi = max(0, offset - pattern.max_length), min(size, offset + pattern.max_length)
+                if spans and lo <= spans[-1][1]:
+                    spans[-1][1] = hi
+                else:
+                    spans.append([lo, hi])
+            for lo, hi in spans:
+                for m in pattern.regex.finditer(data, lo, hi):
+                    count += 1
+                    if len(found) < MAX_OFFSETS:
+                        found.append(m.start())
+            return count, found
+        for start, limit, end in self._windows(size):
+            # Non-overlapping, as a regex engine reports them
+            for m in pattern.regex.finditer(data, start, end):
+                if m.start() >= limit:
+                    break
+                count += 1
+                if len(found) < MAX_OFFSETS:
+                    found.append(m.start())
+        return count, found
+
+    def scan_data(self, data: Any, size: Optional[int] = None) -> List[RuleMatch]:
+        """Evaluates every rule over bytes, a memoryview or an mmap."""
+        size = len(data) if size is None else size
+        shared = self._shared_hits(data, size)
+        separate: Dict[int, Tuple[int, List[int]]] = {}
+
+        def resolve(pattern: Pattern) -> Tuple[int, List[int]]:
+            if pattern.kind != "regex" and pattern.first_bytes is not None:
+                return shared.get(id(pattern), (0, []))
+            if pattern.atoms is not None and not any(id(atom) in shared for atom in pattern.atoms):
+                return 0, []
+            if id(pattern) not in separate:
+                separate[id(pattern)] = self._separate_hits(pattern, data, size, shared)
+            return separate[id(pattern)]
+
+        matches = []
+        for rule in self.rules:
+            context = _Context({p.name: p for p in rule.patterns}, resolve, size)
+            try:
+                matched = rule.condition(context)
+            except (TypeError, ValueError, IndexError):
+                matched = False
+            if matched:
+                matches.append(RuleMatch(rule.name, rule.tags, rule.meta, context.matched()))
+        return matches
+
+    def scan_file(self, path: str, max_size: int = MAX_FILE_SIZE) -> ScanResult:
+        """Memory-maps a file (or reads it, for files mmap refuses such as /proc entries) and scans it."""
+        result = ScanResult(path)
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                result.size = size
+                if size > max_size:
+                    result.error = f"larger than {max_size // (1024 * 1024)} MB; skipped"
+                    return result
+                if size == 0:
+                    result.matches = self.scan_data(f.read(max_size))
+                    return result
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    result.matches = self.scan_data(data, size)
+        except (OSError, ValueError) as e:
+            result.error = getattr(e, "strerror", None) or str(e)
+        return result
+
+
+def iter_files(roots: Iterable[str], max_depth: int = 4) -> Iterator[str]:
+    """Regular files under each root (symlinks are not followed), shallowest first."""
+    for root in roots:
+        if os.path.isfile(root):
+            yield root
+            continue
+        pending = [(root, 0)]
+        while pending:
+            directory, depth = pending.pop(0)
+            try:
+                entries = sorted(os.scandir(directory), key=lambda e: e.name)
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        yield entry.path
+                    elif entry.is_dir(follow_symlinks=False) and depth < max_depth:
+                        pending.append((entry.path, depth + 1))
+                except OSError:
+                    continue
+
+
+# --- Built-in rules ---
+DEFAULT_RULES = r"""
+rule pipe_to_shell : script dropper {
+    meta:
+        description = "Downloads a script and pipes it straight into a shell"
+    strings:
+        $fetch = /(curl|wget)\s[^|\n]{0,200}\|\s*(sudo\s+)?(ba|z|da)?sh\b/
+    condition:
+        $fetch
+}
+
+rule reverse_shell : shell backdoor {
+    meta:
+        description = "Interactive shell bound to a network socket"
+    strings:
+        $devtcp = /\/dev\/(tcp|udp)\/[0-9A-Za-z.\-]+\/[0-9]+/
+        $pty = "pty.spawn"
+        $sock = "socket.socket("
+        $dup = "dup2("
+        $nc = /\b(nc|ncat|netcat) [^\n]{0,100}-e (\/bin\/)?(ba)?sh/
+        $bash_i = "bash -i"
+    condition:
+        $devtcp or ($sock and $dup and ($pty or $bash_i)) or $nc
+}
+
+rule encoded_payload : obfuscation {
+    meta:
+        description = "Large base64 blob decoded and executed"
+    strings:
+        $decode = /base64\s+(-d|--decode)|b64decode\(|FromBase64String/ nocase
+        $exec = /\b(exec|eval|bash|sh|IEX)\b/
+        $blob = /[A-Za-z0-9+\/]{400,}={0,2}/
+    condition:
+        $decode and $exec and $blob
+}
+
+rule cryptominer : miner {
+    meta:
+        description = "Cryptocurrency miner pool protocol or known miner strings"
+    strings:
+        $stratum = "stratum+tcp://" nocase
+        $stratum_ssl = "stratum+ssl://" nocase
+        $xmrig = "xmrig" nocase
+        $donate = "donate-level"
+    condition:
+        any of ($stratum*) or ($xmrig and $donate)
+}
+
+rule elf_in_temp_script : dropper {
+    meta:
+        description = "Script that writes and marks an ELF executable runnable"
+    strings:
+        $chmod = /chmod\s+(\+x|[0-7]*[1357][0-7]*)\s/
+        $tmp = /\/(tmp|dev\/shm|var\/tmp)\//
+        $elf = { 7F 45 4C 46 }
+    condition:
+        $chmod and $tmp and not $elf at 0
+}
+
+rule ssh_key_implant : persistence {
+    meta:
+        description = "Appends a public key to authorized_keys"
+    strings:
+        $keys = "authorized_keys"
+        $append = />>\s*[^\n]*authorized_keys/
+        $key = /ssh-(rsa|ed25519) AAAA/
+    condition:
+        $append or ($keys and $key)
+}
+
+rule packed_upx : packer {
+    meta:
+        description = "UPX-packed executable"
+    strings:
+        $elf = { 7F 45 4C 46 }
+        $mz = { 4D 5A }
+        $upx0 = "UPX0"
+        $upx1 = "UPX!"
+    condition:
+        ($elf at 0 or $mz at 0) and any of ($upx*)
+}
+"""
+
+
+RULES_ENV = "IRIS_RULES"
+
+
+def default_ruleset(path: Optional[str] = None) -> RuleSet:
+    """The built-in rules, plus the rules in `path` (IRIS_RULES) when one is given."""
+    text = DEFAULT_RULES
+    path = path or os.environ.get(RULES_ENV)
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            text += "\n" + f.read()
+    return RuleSet.compile(text)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Scans files or directories, e.g. `python -m IRIS.collectors.content_scan --rules extra.rules /tmp /dev/shm`."""
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Scan files with IRIS content rules.")
+    parser.add_argument("--rules", help="additional rule file (built-in rules are always loaded)")
+    parser.add_argument("--only", action="store_true", help="use only the --rules file, not the built-in rules")
+    parser.add_argument("paths", nargs="+")
+    args = parser.parse_args(argv)
+    ruleset = RuleSet.from_file(args.rules) if args.only and args.rules else default_ruleset(args.rules)
+    started, scanned, total = time.perf_counter(), 0, 0
+    for path in iter_files(args.paths):
+        result = ruleset.scan_file(path)
+        scanned, total = scanned + 1, total + result.size
+        for match in result.matches:
+            print(f"{match.rule} {path} {', '.join(f'{name}@{found[0]}' for name, found in match.strings.items())}")
+        if result.error:
+            print(f"error {path}: {result.error}")
+    elapsed = time.perf_counter() - started
+    print(f"{scanned} files, {total / 1e6:.1f} MB in {elapsed:.2f}s ({total / 1e6 / max(elapsed, 1e-9):.0f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import concurrent.futures
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..evidence import hash_file
+from .cache import CollectorCache
+
+# --- Executable hashing ---
+# Hundreds of processes usually run a few dozen distinct binaries. Every
+# process's executable is identified by (device, inode, size, mtime, ctime)
+# with one stat of /proc/<pid>/exe, each distinct file is hashed once in a
+# thread pool, and the digests are kept in a persistent cache so a repeat scan
+# only reads binaries that changed. Hashing reads through /proc/<pid>/exe
+# rather than the path, so a binary that was deleted or replaced on disk
+# after the process started is still the one that is hashed.
+
+PROC = "/proc"
+DELETED_SUFFIX = " (deleted)"
+HASH_CACHE_NAME = "executable-hashes"
+HASH_CACHE_FORMAT = 1
+HASH_CACHE_LIMIT = 20000        # entries kept across runs; beyond that only this run's are kept
+
+Identity = Tuple[int, int, int, int, int]
+
+
+@dataclass
+class Executable:
+    path: str                       # path the process was started from (link target of /proc/<pid>/exe)
+    identity: Identity
+    pids: List[int] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)    # paths that open this exact file, tried in order
+    deleted: bool = False           # unlinked or replaced since the process started
+    sha256: str = ""
+    cached: bool = False
+    error: str = ""
+
+    @property
+    def size(self) -> int:
+        return self.identity[2]
+
+
+def identity_of(st: os.stat_result) -> Identity:
+    # ctime is part of the identity because, unlike mtime, it cannot be set back with touch(1)
+    return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns
+
+
+def _group(executables: Dict[Identity, Executable], st: os.stat_result, pid: int, path: str, source: str) -> None:
+    identity = identity_of(st)
+    executable = executables.get(identity)
+    if executable is None:
+        deleted = path.endswith(DELETED_SUFFIX)
+        executable = executables[identity] = Executable(path[:-len(DELETED_SUFFIX)] if deleted else path, identity, deleted=deleted)
+    executable.pids.append(pid)
+    executable.sources.append(source)
+
+
+def proc_executables(proc_dir: str = PROC, pids: Optional[Iterable[int]] = None) -> Dict[Identity, Executable]:
+    """Distinct executables of running processes from /proc/<pid>/exe (one readlink and one stat per process)."""
+    if pids is None:
+        with os.scandir(proc_dir) as entries:
+            pids = [int(entry.name) for entry in entries if entry.name.isdigit()]
+    executables: Dict[Identity, Executable] = {}
+    for pid in pids:
+        link = f"{proc_dir}/{pid}/exe"
+        try:
+            target = os.readlink(link)
+            st = os.stat(link)
+        except OSError:
+            continue                # kernel threads have no exe; others exited or are not ours to read
+        if not os.path.isabs(target):
+            target = os.path.normpath(os.path.join("/proc", str(pid), target))
+        _group(executables, st, pid, target, link)
+    return executables
+
+
+def path_executables(exe_paths: Dict[int, str]) -> Dict[Identity, Executable]:
+    """The same grouping from pid -> executable path, for platforms without /proc."""
+    executables: Dict[Identity, Executable] = {}
+    for pid, path in exe_paths.items():
+        try:
+            st = os.stat(path)
+        except (OSError, ValueError):
+            continue
+        _group(executables, st, pid, path, path)
+    return executables
+
+
+def _hash_one(executable: Executable) -> None:
+    for source in executable.sources:
+        try:
+            executable.sha256 = hash_file(source)["sha256"]
+            executable.error = ""
+            return
+        except OSError as e:
+            executable.error = e.strerror or str(e)
+
+
+def hash_executables(executables: Dict[Identity, Executable], cache: Optional[CollectorCache] = None,
+                     jobs: Optional[int] = None) -> List[Executable]:
+    """
+    Fills in sha256 for every executable, taking unchanged files from the
+    persistent cache and hashing the rest in parallel (hashlib and file reads
+    release the GIL). Returns the executables, most-used first.
+    """
+    stored: Dict[str, str] = {}
+    if cache is not None:
+        stored = cache.get(HASH_CACHE_NAME, HASH_CACHE_FORMAT) or {}
+    pending = []
+    for executable in executables.values():
+        digest = stored.get(":".join(map(str, executable.identity)))
+        if digest:
+            executable.sha256, executable.cached = digest, True
+        else:
+            pending.append(executable)
+    if pending:
+        workers = max(1, min(jobs or min(8, os.cpu_count() or 4), len(pending)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_hash_one, pending))
+    if cache is not None and any(executable.sha256 for executable in pending):
+        current = {":".join(map(str, e.identity)): e.sha256 for e in executables.values() if e.sha256}
+        if len(stored) + len(current) > HASH_CACHE_LIMIT:
+            stored = {}
+        stored.update(current)
+        cache.put(HASH_CACHE_NAME, HASH_CACHE_FORMAT, stored)
+    return sorted(executables.values(), key=lambda e: (-len(e.pids), e.path))
+
+
+def collect_executable_hashes(host_path: Callable[[str], str] = lambda path: path, pids: Optional[Iterable[int]] = None,
+                              cache: Optional[CollectorCache] = None, jobs: Optional[int] = None) -> List[Executable]:
+    return hash_executables(proc_executables(host_path(PROC), pids), cache, jobs)
@@ -0,0 +1,767 @@
+import bisect
+import ipaddress
+import json
+import re
+import socket
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# --- Firewall rule collector (Linux) ---
+# Parses `iptables-save` / `ip6tables-save` and `nft -j list ruleset` output
+# into chains of structured rules, then indexes every chain by port and
+# address range. Reachability queries ("is tcp/4444 open to 0.0.0.0/0?") and
+# shadowed-rule detection only look at the rules an index lookup returns,
+# instead of walking every rule in order.
+
+Range = Tuple[int, int]             # inclusive integer range (ports, or addresses as integers)
+
+VERDICT_ACCEPT = "accept"
+VERDICT_DROP = "drop"
+VERDICT_REJECT = "reject"
+VERDICT_RETURN = "return"
+VERDICT_JUMP = "jump"
+VERDICT_GOTO = "goto"
+VERDICT_NONE = ""                   # non-terminal (LOG, counter, MARK...): evaluation continues
+TERMINAL_VERDICTS = (VERDICT_ACCEPT, VERDICT_DROP, VERDICT_REJECT)
+
+FAMILY_IPV4 = "ip"
+FAMILY_IPV6 = "ip6"
+FAMILY_INET = "inet"                # nftables tables that apply to both
+
+FULL_PORTS: Range = (0, 65535)
+FULL_ADDRESSES = {4: (0, 2 ** 32 - 1), 6: (0, 2 ** 128 - 1)}
+PORT_PROTOCOLS = ("tcp", "udp", "sctp", "dccp")
+# A rule whose range spans more index segments than this is checked directly instead of being expanded
+WIDE_RANGE_SEGMENTS = 64
+
+
+# --- Ranges ---
+def _network_range(network: Any) -> Range:
+    return int(network.network_address), int(network.broadcast_address)
+
+
+def _parse_network(text: str):
+    return ipaddress.ip_network(text.strip(), strict=False)
+
+
+def _intersect(ranges: List[Range], lo: int, hi: int) -> List[Range]:
+    return [(max(a, lo), min(b, hi)) for a, b in ranges if a <= hi and b >= lo]
+
+
+def _subtract(ranges: List[Range], lo: int, hi: int) -> List[Range]:
+    out = []
+    for a, b in ranges:
+        if b < lo or a > hi:
+            out.append((a, b))
+            continue
+        if a < lo:
+            out.append((a, lo - 1))
+        if b > hi:
+            out.append((hi + 1, b))
+    return out
+
+
+def _complement(ranges: List[Range], full: Range) -> List[Range]:
+    out = [full]
+    for lo, hi in ranges:
+        out = _subtract(out, lo, hi)
+    return out
+
+
+def _normalize(ranges: Iterable[Range]) -> List[Range]:
+    merged: List[Range] = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def _covers(outer: List[Range], inner: List[Range]) -> bool:
+    """True when every range in `inner` lies inside the union of `outer` (both normalized)."""
+    for lo, hi in inner:
+        i = bisect.bisect_right(outer, (lo, float("inf"))) - 1
+        if i < 0 or outer[i][1] < hi:
+            return False
+    return True
+
+
+def format_ranges(ranges: List[Range], version: int) -> str:
+    """Renders address ranges as CIDR blocks, e.g. 10.0.0.0/8, 192.168.1.0/24."""
+    address = ipaddress.IPv4Address if version == 4 else ipaddress.IPv6Address
+
+    def blocks(rs):
+        return [str(n) for lo, hi in rs for n in ipaddress.summarize_address_range(address(lo), address(hi))]
+    parts, prefix = blocks(ranges), ""
+    excluded = blocks(_complement(ranges, FULL_ADDRESSES[version]))
+    if excluded and len(excluded) < len(parts):
+        parts, prefix = excluded, "any except "     # "any except 203.0.113.0/24" reads better than 24 blocks
+    return prefix + ", ".join(parts[:8]) + (f" (+{len(parts) - 8} more)" if len(parts) > 8 else "")
+
+
+# --- Model ---
+@dataclass
+class Rule:
+    family: str
+    table: str
+    chain: str
+    position: int                               # 1-based position within its chain
+    text: str
+    protocol: Optional[str] = None              # None: any protocol
+    protocol_negated: bool = False
+    sources: Optional[List[Range]] = None       # None: any address; otherwise normalized ranges (negation applied)
+    destinations: Optional[List[Range]] = None
+    sports: Optional[List[Range]] = None
+    dports: Optional[List[Range]] = None
+    in_interface: Optional[str] = None
+    in_interface_negated: bool = False
+    states: Optional[Set[str]] = None           # conntrack states the rule matches; None: any
+    verdict: str = VERDICT_NONE
+    target: str = ""                            # jump/goto chain, or the raw target name
+    unsupported: List[str] = field(default_factory=list)   # matches IRIS does not model
+
+    @property
+    def address_version(self) -> Optional[int]:
+        return {FAMILY_IPV4: 4, FAMILY_IPV6: 6}.get(self.family)
+
+    @property
+    def exact(self) -> bool:
+        """True when every match in the rule is modelled, so its match space is known exactly."""
+        return not self.unsupported
+
+    def matches_new_connections(self) -> bool:
+        return self.states is None or "new" in self.states
+
+
+@dataclass
+class Chain:
+    family: str
+    table: str
+    name: str
+    policy: Optional[str] = None                # base chains only
+    hook: Optional[str] = None                  # input, forward, output, ... for base chains
+    priority: int = 0
+    rules: List[Rule] = field(default_factory=list)
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return self.family, self.table, self.name
+
+
+class IntervalIndex:
+    """
+    Maps integer values (ports, addresses) to the ids of rules whose ranges
+    contain them. Boundaries split the value space into elementary segments;
+    each segment holds its rule ids, so a lookup is one bisect. Wildcard rules
+    (no range) and very wide ones are kept in short side lists.
+    """
+
+    def __init__(self):
+        self._pending: List[Tuple[int, List[Range]]] = []
+        self._wildcard: List[int] = []
+        self._wide: List[Tuple[int, List[Range]]] = []
+        self._bounds: List[int] = []
+        self._segments: List[List[int]] = []
+
+    def add(self, rule_id: int, ranges: Optional[List[Range]]):
+        if ranges is None:
+            self._wildcard.append(rule_id)
+        else:
+            self._pending.append((rule_id, ranges))
+
+    def build(self):
+        bounds = set()
+        for _, ranges in self._pending:
+            for lo, hi in ranges:
+                bounds.add(lo)
+                bounds.add(hi + 1)
+        self._bounds = sorted(bounds)
+        self._segments = [[] for _ in self._bounds]
+        for rule_id, ranges in self._pending:
+            for lo, hi in ranges:
+                first = bisect.bisect_left(self._bounds, lo)
+                last = bisect.bisect_left(self._bounds, hi + 1)
+                if last - first > WIDE_RANGE_SEGMENTS:
+                    self._wide.append((rule_id, ranges))
+                    break
+                for segment in range(first, last):
+                    self._segments[segment].append(rule_id)
+        self._pending = []
+        return self
+
+    def lookup(self, value: int) -> List[Sequence[int]]:
+        """The id lists that together hold every rule containing `value`; not copied or merged."""
+        parts: List[Sequence[int]] = [self._wildcard]
+        i = bisect.bisect_right(self._bounds, value) - 1
+        if 0 <= i < len(self._segments):
+            parts.append(self._segments[i])
+        if self._wide:
+            parts.append([rule_id for rule_id, ranges in self._wide if _contains(ranges, value)])
+        return parts
+
+
+def _contains(ranges: Optional[List[Range]], value: int) -> bool:
+    if ranges is None:
+        return True
+    i = bisect.bisect_right(ranges, (value, float("inf"))) - 1
+    return i >= 0 and ranges[i][1] >= value
+
+
+class ChainIndex:
+    """Per-chain lookup of candidate rules by protocol, destination port and source address."""
+
+    def __init__(self, chain: Chain):
+        self.chain = chain
+        self.by_protocol: Dict[Optional[str], List[int]] = {}
+        self.dports = IntervalIndex()
+        self.sources = IntervalIndex()
+        for i, rule in enumerate(chain.rules):
+            self.by_protocol.setdefault(None if rule.protocol_negated else rule.protocol, []).append(i)
+            self.dports.add(i, rule.dports)
+            self.sources.add(i, rule.sources)
+        self.dports.build()
+        self.sources.build()
+
+    def candidates(self, protocol: str, dport: Optional[int] = None, source: Optional[int] = None) -> List[int]:
+        """
+        Rule ids, in chain order, that could match a packet; every other rule
+        certainly does not. Only the most selective index is expanded; its
+        entries are then checked against the other criteria directly.
+        """
+        lookups = [[self.by_protocol.get(None, ()), self.by_protocol.get(protocol, ())]]
+        if dport is not None:
+            lookups.append(self.dports.lookup(dport))
+        if source is not None:
+            lookups.append(self.sources.lookup(source))
+        narrowest = min(lookups, key=lambda parts: sum(len(ids) for ids in parts))
+        matching = []
+        for rule_id in sorted({rule_id for ids in narrowest for rule_id in ids}):
+            rule = self.chain.rules[rule_id]
+            if rule.protocol is not None and (rule.protocol == protocol) == rule.protocol_negated:
+                continue
+            if (dport is None or _contains(rule.dports, dport)) and (source is None or _contains(rule.sources, source)):
+                matching.append(rule_id)
+        return matching
+
+
+@dataclass
+class Ruleset:
+    chains: Dict[Tuple[str, str, str], Chain] = field(default_factory=dict)
+    backends: List[str] = field(default_factory=list)
+    _indexes: Dict[Tuple[str, str, str], ChainIndex] = field(default_factory=dict, repr=False)
+
+    def chain(self, family: str, table: str, name: str) -> Chain:
+        key = (family, table, name)
+        if key not in self.chains:
+            self.chains[key] = Chain(family, table, name)
+        return self.chains[key]
+
+    @property
+    def rules(self) -> List[Rule]:
+        return [rule for chain in self.chains.values() for rule in chain.rules]
+
+    def index(self, chain: Chain) -> ChainIndex:
+        if chain.key not in self._indexes:
+            self._indexes[chain.key] = ChainIndex(chain)
+        return self._indexes[chain.key]
+
+    def input_chains(self, version: int) -> List[Chain]:
+        """Filter base chains on the input hook that see packets of this IP version, in priority order."""
+        families = (FAMILY_IPV4 if version == 4 else FAMILY_IPV6, FAMILY_INET)
+        return sorted((c for c in self.chains.values() if c.hook == "input" and c.family in families), key=lambda c: c.priority)
+
+
+# --- iptables-save ---
+_IPTABLES_HOOKS = {"INPUT": "input", "FORWARD": "forward", "OUTPUT": "output", "PREROUTING": "prerouting", "POSTROUTING": "postrouting"}
+_IPTABLES_VERDICTS = {"ACCEPT": VERDICT_ACCEPT, "DROP": VERDICT_DROP, "REJECT": VERDICT_REJECT, "RETURN": VERDICT_RETURN}
+# Options that only label, count or select TCP flags; they never change which connections a rule admits.
+# Each maps to the number of operands that follow it.
+_IPTABLES_IGNORED = {"-m": 1, "--match": 1, "--comment": 1, "--log-prefix": 1, "--log-level": 1, "--reject-with": 1,
+                     "--syn": 0, "--tcp-flags": 2,      # mask and set, e.g. --tcp-flags SYN,ACK SYN (like --syn)
+                     "-c": 2, "--set-counters": 2,      # packets and bytes
+                     "--to-ports": 1, "--to-destination": 1, "--to-source": 1,
+                     "--set-mark": 1, "--set-xmark": 1,  # value/mask is a single operand
+                     "--log-tcp-sequence": 0, "--log-tcp-options": 0, "--log-ip-options": 0, "--log-uid": 0}
+# iptables-save double-quotes values containing spaces (comments, log prefixes) and escapes embedded quotes
+_QUOTED_TOKEN = re.compile(r'"((?:[^"\\]|\\.)*)"|(\S+)')
+
+
+def _port_ranges(text: str) -> List[Range]:
+    ranges = []
+    for part in text.split(","):
+        lo, _, hi = part.partition(":")
+        ranges.append((int(lo or 0), int(hi or lo or 65535)))
+    return _normalize(ranges)
+
+
+def _cidr_range(text: str) -> Range:
+    """Integer range of an address or CIDR block; dotted-quad IPv4 avoids the (slow) ipaddress objects."""
+    address, _, length = text.partition("/")
+    if address.count(".") == 3 and (not length or length.isdigit()):
+        try:
+            value, bits = int.from_bytes(socket.inet_aton(address), "big"), int(length or 32)
+        except OSError:
+            value, bits = None, 0
+        if value is not None and 0 <= bits <= 32:
+            host_mask = (1 << (32 - bits)) - 1
+            return value & ~host_mask, value | host_mask
+    return _network_range(_parse_network(text))
+
+
+def _address_ranges(text: str, negated: bool, version: int) -> List[Range]:
+    ranges = _normalize(_cidr_range(part) for part in text.split(","))
+    return _complement(ranges, FULL_ADDRESSES[version]) if negated else ranges
+
+
+def parse_iptables_save(text: str, family: str = FAMILY_IPV4, ruleset: Optional[Ruleset] = None) -> Ruleset:
+    """Parses `iptables-save` (family "ip") or `ip6tables-save` (family "ip6") output."""
+    ruleset = ruleset or Ruleset()
+    ruleset.backends.append("iptables" if family == FAMILY_IPV4 else "ip6tables")
+    version = 4 if family == FAMILY_IPV4 else 6
+    table = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or line == "COMMIT":
+            continue
+        if line.startswith("*"):
+            table = line[1:]
+        elif line.startswith(":") and table:
+            name, policy = line[1:].split()[:2]
+            chain = ruleset.chain(family, table, name)
+            if policy != "-":
+                chain.policy = policy.lower()
+                # Only filter-table chains decide what is accepted; nat/mangle/raw hooks are not modelled
+                chain.hook = _IPTABLES_HOOKS.get(name) if table == "filter" else None
+        elif line.startswith("-A ") and table:
+            tokens = line.split() if '"' not in line else [
+                bare or quoted.replace('\\"', '"') for quoted, bare in _QUOTED_TOKEN.findall(line)]
+            chain = ruleset.chain(family, table, tokens[1])
+            chain.rules.append(_iptables_rule(tokens[2:], family, table, chain, line, version, ruleset.chains))
+    return ruleset
+
+
+def _iptables_rule(tokens: List[str], family: str, table: str, chain: Chain, text: str, version: int,
+                   chains: Dict[Tuple[str, str, str], Chain]) -> Rule:
+    rule = Rule(family, table, chain.name, len(chain.rules) + 1, text)
+    negate, i = False, 0
+    while i < len(tokens):
+        option = tokens[i]
+        if option == "!":
+            negate, i = True, i + 1
+            continue
+        value = tokens[i + 1] if i + 1 < len(tokens) else ""
+        consumed = 2
+        if option in ("-p", "--protocol"):
+            rule.protocol, rule.protocol_negated = value.lower(), negate
+            if value.lower() == "all":
+                rule.protocol = None
+        elif option in ("-s", "--source", "--src"):
+            rule.sources = _address_ranges(value, negate, version)
+        elif option in ("-d", "--destination", "--dst"):
+            rule.destinations = _address_ranges(value, negate, version)
+        elif option in ("--dport", "--destination-port", "--dports", "--destination-ports"):
+            rule.dports = _complement(_port_ranges(value), FULL_PORTS) if negate else _port_ranges(value)
+        elif option in ("--sport", "--source-port", "--sports", "--source-ports"):
+            rule.sports = _complement(_port_ranges(value), FULL_PORTS) if negate else _port_ranges(value)
+        elif option in ("-i", "--in-interface"):
+            rule.in_interface, rule.in_interface_negated = value, negate
+        elif option in ("-o", "--out-interface"):
+            rule.unsupported.append(f"-o {value}")
+        elif option in ("--ctstate", "--state"):
+            states = {s.lower() for s in value.split(",")}
+            rule.states = ({"new", "established", "related", "invalid", "untracked"} - states) if negate else states
+        elif option in ("-j", "--jump", "-g", "--goto"):
+            rule.target = value
+            if value in _IPTABLES_VERDICTS:
+                rule.verdict = _IPTABLES_VERDICTS[value]
+            elif (family, table, value) in chains:
+                rule.verdict = VERDICT_GOTO if option in ("-g", "--goto") else VERDICT_JUMP
+            else:
+                rule.verdict = VERDICT_NONE     # target extension (LOG, MARK, ...); evaluation continues
+        elif option in _IPTABLES_IGNORED:
+            consumed = 1 + _IPTABLES_IGNORED[option]
+        else:
+            # Match extensions IRIS does not model (recent, limit, owner, string, set...)
+            consumed = 1
+            arguments = []
+            while i + consumed < len(tokens) and not tokens[i + consumed].startswith("-") and tokens[i + consumed] != "!":
+                arguments.append(tokens[i + consumed])
+                consumed += 1
+            rule.unsupported.append(" ".join(["!"] * negate + [option] + arguments))
+        negate = False
+        i += consumed
+    return rule
+
+
+# --- nftables JSON ---
+_NFT_VERDICTS = {"accept": VERDICT_ACCEPT, "drop": VERDICT_DROP, "reject": VERDICT_REJECT, "return": VERDICT_RETURN}
+_NFT_NON_MATCHING = {"counter", "log", "limit", "mangle", "snat", "dnat", "masquerade", "redirect", "notrack", "xt", "quota"}
+
+
+def _nft_values(right: Any) -> List[Any]:
+    if isinstance(right, dict) and "set" in right:
+        return right["set"]
+    return right if isinstance(right, list) else [right]
+
+
+def _nft_port_ranges(right: Any) -> List[Range]:
+    ranges = []
+    for value in _nft_values(right):
+        if isinstance(value, dict) and "range" in value:
+            ranges.append((int(value["range"][0]), int(value["range"][1])))
+        else:
+            ranges.append((int(value), int(value)))
+    return _normalize(ranges)
+
+
+def _nft_address_ranges(right: Any) -> List[Range]:
+    ranges = []
+    for value in _nft_values(right):
+        if isinstance(value, dict) and "prefix" in value:
+            ranges.append(_network_range(_parse_network(f"{value['prefix']['addr']}/{value['prefix']['len']}")))
+        elif isinstance(value, dict) and "range" in value:
+            ranges.append((int(ipaddress.ip_address(value["range"][0])), int(ipaddress.ip_address(value["range"][1]))))
+        else:
+            ranges.append(_network_range(_parse_network(str(value))))
+    return _normalize(ranges)
+
+
+def parse_nft_json(text: str, ruleset: Optional[Ruleset] = None, skip_tables: Iterable[Tuple[str, str]] = ()) -> Ruleset:
+    """
+    Parses `nft -j list ruleset`. Tables in `skip_tables` ((family, name) pairs)
+    are ignored; used to avoid counting iptables-nft tables twice.
+    """
+    ruleset = ruleset or Ruleset()
+    ruleset.backends.append("nftables")
+    skip = set(skip_tables)
+    for item in json.loads(text).get("nftables", []):
+        if "chain" in item:
+            c = item["chain"]
+            if (c["family"], c["table"]) in skip:
+                continue
+            chain = ruleset.chain(c["family"], c["table"], c["name"])
+            if "hook" in c:
+                chain.policy = c.get("policy", "accept")
+                chain.hook = c["hook"] if c.get("type", "filter") == "filter" else None
+                chain.priority = c.get("prio", 0) if isinstance(c.get("prio", 0), int) else 0
+        elif "rule" in item:
+            r = item["rule"]
+            if (r["family"], r["table"]) in skip:
+                continue
+            chain = ruleset.chain(r["family"], r["table"], r["chain"])
+            chain.rules.append(_nft_rule(r, chain))
+    return ruleset
+
+
+def _nft_value_text(value: Any) -> str:
+    if isinstance(value, dict):
+        if "set" in value:
+            return "{ " + ", ".join(_nft_value_text(v) for v in value["set"]) + " }"
+        if "prefix" in value:
+            return f"{value['prefix']['addr']}/{value['prefix']['len']}"
+        if "range" in value:
+            return "-".join(_nft_value_text(v) for v in value["range"])
+        if "payload" in value:
+            return f"{value['payload'].get('protocol', '')} {value['payload'].get('field', '')}".strip()
+        if "meta" in value:
+            return f"meta {value['meta'].get('key', '')}"
+        if "ct" in value:
+            return f"ct {value['ct'].get('key', '')}"
+        return json.dumps(value)
+    if isinstance(value, list):
+        return "{ " + ", ".join(_nft_value_text(v) for v in value) + " }"
+    return str(value)
+
+
+def nft_rule_text(expressions: List[Dict[str, Any]]) -> str:
+    """Approximates the `nft list ruleset` rendering of a rule's JSON expressions."""
+    parts = []
+    for expr in expressions:
+        (kind, body), = expr.items()
+        if kind == "match":
+            op = "" if body.get("op") in ("==", "in") else body.get("op", "") + " "
+            parts.append(f"{_nft_value_text(body.get('left'))} {op}{_nft_value_text(body.get('right'))}")
+        elif kind in ("jump", "goto"):
+            parts.append(f"{kind} {body['target']}")
+        else:
+            parts.append(kind)
+    return " ".join(parts)
+
+
+def _nft_rule(r: Dict[str, Any], chain: Chain) -> Rule:
+    text = nft_rule_text(r.get("expr", []))
+    rule = Rule(r["family"], r["table"], r["chain"], len(chain.rules) + 1,
+                f"{text} comment \"{r['comment']}\"" if r.get("comment") else text)
+    for expr in r.get("expr", []):
+        (kind, body), = expr.items()
+        if kind in _NFT_VERDICTS:
+            rule.verdict, rule.target = _NFT_VERDICTS[kind], kind
+        elif kind in ("jump", "goto"):
+            rule.verdict, rule.target = (VERDICT_JUMP if kind == "jump" else VERDICT_GOTO), body["target"]
+        elif kind in _NFT_NON_MATCHING:
+            continue
+        elif kind == "match":
+            _nft_match(rule, body)
+        else:
+            rule.unsupported.append(kind)
+    return rule
+
+
+def _nft_match(rule: Rule, match: Dict[str, Any]):
+    op, left, right = match.get("op", "=="), match.get("left", {}), match.get("right")
+    negated = op == "!="
+    if op not in ("==", "!=", "in"):
+        rule.unsupported.append(f"{json.dumps(left)} {op}")
+        return
+    version = 6 if rule.family == FAMILY_IPV6 else 4
+    if isinstance(left, dict) and "payload" in left:
+        protocol, name = left["payload"].get("protocol"), left["payload"].get("field")
+        if protocol in PORT_PROTOCOLS and name in ("dport", "sport"):
+            if not negated:
+                rule.protocol = rule.protocol or protocol
+            ranges = _nft_port_ranges(right)
+            ranges = _complement(ranges, FULL_PORTS) if negated else ranges
+            if name == "dport":
+                rule.dports = ranges
+            else:
+                rule.sports = ranges
+            return
+        if protocol in ("ip", "ip6") and name in ("saddr", "daddr"):
+            if rule.family == FAMILY_INET:
+                rule.family = FAMILY_IPV4 if protocol == "ip" else FAMILY_IPV6
+            version = 4 if protocol == "ip" else 6
+            ranges = _nft_address_ranges(right)
+            ranges = _complement(ranges, FULL_ADDRESSES[version]) if negated else ranges
+            if name == "saddr":
+                rule.sources = ranges
+            else:
+                rule.destinations = ranges
+            return
+        if protocol in ("ip", "ip6") and name in ("protocol", "nexthdr"):
+            rule.protocol, rule.protocol_negated = str(right), negated
+            return
+    elif isinstance(left, dict) and "meta" in left:
+        key = left["meta"].get("key")
+        if key == "l4proto":
+            rule.protocol, rule.protocol_negated = str(right), negated
+            return
+        if key in ("iifname", "iif"):
+            rule.in_interface, rule.in_interface_negated = str(right), negated
+            return
+        if key == "nfproto":
+            rule.family = FAMILY_IPV4 if right == "ipv4" else FAMILY_IPV6
+            return
+    elif isinstance(left, dict) and "ct" in left and left["ct"].get("key") == "state":
+        states = {str(s) for s in _nft_values(right)}
+        rule.states = ({"new", "established", "related", "invalid", "untracked"} - states) if negated else states
+        return
+    rule.unsupported.append(f"{json.dumps(left)} {op} {json.dumps(right)}")
+
+
+# --- Reachability ---
+@dataclass
+class Reachability:
+    protocol: str
+    port: int
+    version: int
+    accepted: List[Range] = field(default_factory=list)         # certainly accepted source ranges
+    possible: List[Range] = field(default_factory=list)         # accepted by a rule with unmodelled matches
+    decided_by: List[Rule] = field(default_factory=list)        # rules that accepted traffic
+    conditional: bool = False                                   # depends on the arrival interface
+
+    @property
+    def reachable(self) -> bool:
+        return bool(self.accepted)
+
+
+def _rule_applies(rule: Rule, protocol: str, port: int) -> bool:
+    """Checks the parts of a candidate rule the indexes do not cover."""
+    if rule.dports is not None and protocol not in PORT_PROTOCOLS:
+        return False
+    if rule.in_interface == "lo" and not rule.in_interface_negated:
+        return False        # loopback-only rules never see traffic from other hosts
+    return rule.matches_new_connections()
+
+
+def _evaluate_chain(ruleset: Ruleset, chain: Chain, protocol: str, port: int, pending: List[Range],
+                    result: Reachability, depth: int = 0) -> Tuple[List[Range], List[Range], List[Range]]:
+    """
+    Pushes the `pending` source ranges through a chain. Returns (accepted,
+    dropped, returned) ranges; returned ranges fall through to the caller.
+    """
+    accepted: List[Range] = []
+    dropped: List[Range] = []
+    index = ruleset.index(chain)
+    for rule_id in index.candidates(protocol, port if protocol in PORT_PROTOCOLS else None):
+        if not pending:
+            break
+        rule = chain.rules[rule_id]
+        if rule.address_version not in (None, result.version) or not _rule_applies(rule, protocol, port):
+            continue
+        matched = pending if rule.sources is None else [r for lo, hi in rule.sources for r in _intersect(pending, lo, hi)]
+        if not matched:
+            continue
+        if rule.in_interface and not (rule.in_interface == "lo" and rule.in_interface_negated):
+            result.conditional = True
+        if not rule.exact or rule.sports is not None or rule.destinations is not None:
+            # Only part of the traffic may match; the rest continues down the chain
+            if rule.verdict == VERDICT_ACCEPT:
+                result.possible = _normalize(result.possible + matched)
+                result.decided_by.append(rule)
+            continue
+        if rule.verdict in (VERDICT_JUMP, VERDICT_GOTO) and depth < 16:
+            target = ruleset.chains.get((chain.family, chain.table, rule.target))
+            if target is None:
+                continue
+            sub_accepted, sub_dropped, returned = _evaluate_chain(ruleset, target, protocol, port, matched, result, depth + 1)
+            accepted += sub_accepted
+            dropped += sub_dropped
+            decided = sub_accepted + sub_dropped + ([] if rule.verdict == VERDICT_JUMP else returned)
+        elif rule.verdict == VERDICT_RETURN:
+            return _normalize(accepted), _normalize(dropped), pending
+        elif rule.verdict in TERMINAL_VERDICTS:
+            if rule.verdict == VERDICT_ACCEPT:
+                accepted += matched
+                result.decided_by.append(rule)
+            else:
+                dropped += matched
+            decided = matched
+        else:
+            continue
+        for lo, hi in decided:
+            pending = _subtract(pending, lo, hi)
+    if chain.policy is None:            # user chain: whatever is left returns to the caller
+        return _normalize(accepted), _normalize(dropped), pending
+    if chain.policy == VERDICT_ACCEPT:
+        accepted += pending
+    else:
+        dropped += pending
+    return _normalize(accepted), _normalize(dropped), []
+
+
+def reachability(ruleset: Ruleset, protocol: str, port: int, source: str = "0.0.0.0/0") -> Reachability:
+    """
+    Which parts of `source` can open a new `protocol`/`port` connection to this
+    host, given every input filter chain for that IP version. A packet must be
+    accepted by each base chain in turn; with no chains, everything is reachable.
+    """
+    network = _parse_network(source)
+    version = network.version
+    result = Reachability(protocol, port, version)
+    pending = [_network_range(network)]
+    for chain in ruleset.input_chains(version):
+        accepted, _, _ = _evaluate_chain(ruleset, chain, protocol, port, pending, result)
+        pending = accepted
+    result.accepted = _normalize(pending)
+    result.possible = [r for r in result.possible if not _covers(result.accepted, [r])]
+    return result
+
+
+# --- Shadowed rules ---
+@dataclass
+class ShadowedRule:
+    rule: Rule
+    by: Rule
+    redundant: bool     # same verdict as the covering rule (harmless) rather than contradicting it
+
+
+def _covers_field(outer: Optional[List[Range]], inner: Optional[List[Range]]) -> bool:
+    if outer is None:
+        return True
+    return inner is not None and _covers(outer, inner)
+
+
+def _rule_covers(earlier: Rule, later: Rule) -> bool:
+    """True when every packet `later` can match is already matched by `earlier`."""
+    if not earlier.exact or earlier.address_version not in (None, later.address_version):
+        return False
+    if earlier.protocol is not None and (earlier.protocol_negated or later.protocol_negated or earlier.protocol != later.protocol):
+        return False
+    if earlier.in_interface is not None and (earlier.in_interface != later.in_interface
+                                             or earlier.in_interface_negated != later.in_interface_negated):
+        return False
+    if earlier.states is not None and (later.states is None or not later.states <= earlier.states):
+        return False
+    return all(_covers_field(getattr(earlier, name), getattr(later, name))
+               for name in ("sources", "destinations", "sports", "dports"))
+
+
+def shadowed_rules(ruleset: Ruleset) -> List[ShadowedRule]:
+    """
+    Rules that can never match because a single earlier terminal rule in the same
+    chain matches everything they do. Candidates come from the indexes: a
+    covering rule must contain the later rule's first port and first address.
+    """
+    found = []
+    for chain in ruleset.chains.values():
+        index = ruleset.index(chain)
+        for position, rule in enumerate(chain.rules):
+            if position == 0:
+                continue
+            # "" selects only rules that match every protocol, the only ones that can cover a protocol-less rule
+            protocol = "" if rule.protocol is None or rule.protocol_negated else rule.protocol
+            ids = index.candidates(protocol, rule.dports[0][0] if rule.dports else None,
+                                   rule.sources[0][0] if rule.sources else None)
+            for earlier_id in (i for i in ids if i < position):
+                earlier = chain.rules[earlier_id]
+                if earlier.verdict in TERMINAL_VERDICTS and _rule_covers(earlier, rule):
+                    found.append(ShadowedRule(rule, earlier, redundant=earlier.verdict == rule.verdict))
+                    break
+    return found
+
+
+# --- Collection ---
+def collect_ruleset(iptables_save: str = "", ip6tables_save: str = "", nft_json: str = "") -> Ruleset:
+    """Builds one ruleset from whichever outputs are available; iptables-nft tables are not counted twice."""
+    ruleset = Ruleset()
+    if iptables_save.strip():
+        parse_iptables_save(iptables_save, FAMILY_IPV4, ruleset)
+    if ip6tables_save.strip():
+        parse_iptables_save(ip6tables_save, FAMILY_IPV6, ruleset)
+    if nft_json.strip():
+        seen = {(family, table) for family, table, _ in ruleset.chains}
+        try:
+            parse_nft_json(nft_json, ruleset, skip_tables=seen)
+        except ValueError:
+            pass    # not JSON (an old nft without -j support)
+    return ruleset
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Queries captured rulesets, e.g.
+    `python -m IRIS.collectors.firewall --iptables gw.rules --query tcp/4444 --from 0.0.0.0/0 --shadowed`.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Reachability and shadowed-rule analysis of captured firewall rules.")
+    parser.add_argument("--iptables", help="iptables-save output")
+    parser.add_argument("--ip6tables", help="ip6tables-save output")
+    parser.add_argument("--nft", help="nft -j list ruleset output")
+    parser.add_argument("--query", action="append", default=[], metavar="PROTO/PORT", help="e.g. tcp/4444 (repeatable)")
+    parser.add_argument("--from", dest="source", default="0.0.0.0/0", help="source network (default: 0.0.0.0/0)")
+    parser.add_argument("--shadowed", action="store_true", help="list rules that can never match")
+    args = parser.parse_args(argv)
+
+    def read(path):
+        if not path:
+            return ""
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    ruleset = collect_ruleset(read(args.iptables), read(args.ip6tables), read(args.nft))
+    print(f"{len(ruleset.chains)} chains, {len(ruleset.rules)} rules ({', '.join(ruleset.backends) or 'no input'})")
+    for query in args.query:
+        protocol, _, port = query.partition("/")
+        r = reachability(ruleset, protocol.lower(), int(port or 0), args.source)
+        verdict = f"reachable from {format_ranges(r.accepted, r.version)}" if r.reachable else "not reachable"
+        if r.possible:
+            verdict += f"; possibly from {format_ranges(r.possible, r.version)}"
+        print(f"{query} from {args.source}: {verdict}{' (interface-dependent)' if r.conditional else ''}")
+    if args.shadowed:
+        for s in shadowed_rules(ruleset):
+            print(f"{'redundant' if s.redundant else 'SHADOWED '} {s.rule.chain}#{s.rule.position}: {s.rule.text}\n"
+                  f"          by {s.by.chain}#{s.by.position}: {s.by.text}")
+
+
+if __name__ == "__main__":
+    main()
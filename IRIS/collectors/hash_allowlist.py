@@ -0,0 +1,259 @@
+import csv
+import heapq
+import itertools
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Union
+
+# --- Known-good hash allowlist ---
+# SHA-256 digests (NSRL-style sets run to tens of millions) compiled into one
+# file that is memory-mapped and searched in place, so a lookup touches a few
+# pages instead of loading the set:
+#   header   "IRISHAL1", digest count (Q), Bloom filter bits (Q), Bloom probes (I), reserved (I)
+#   fanout   256 x Q: number of digests whose first byte is <= i (as in git pack indexes)
+#   bloom    Bloom filter bits (absent when 0), rejecting most unknown digests with k bit tests
+#   digests  count x 32 bytes, sorted and unique
+# The allowlist in use is named by IRIS_HASH_ALLOWLIST.
+
+ALLOWLIST_ENV = "IRIS_HASH_ALLOWLIST"
+DIGEST_SIZE = 32
+BITS_PER_DIGEST = 10            # ~1% Bloom false positives; each one costs a bisect, never a wrong answer
+SORT_CHUNK = 1 << 20            # digests sorted in memory per run while building
+_MAGIC = b"IRISHAL1"
+_HEADER = struct.Struct("<8sQQII")
+_FANOUT = struct.Struct("<256Q")
+_HEX_DIGEST = re.compile(r"(?<![0-9A-Fa-f])[0-9A-Fa-f]{64}(?![0-9A-Fa-f])")
+_SHA256_COLUMNS = ("sha256", "sha-256", "sha_256")
+
+
+def _probes(digest: bytes, bits: int, count: int) -> Iterator[int]:
+    # The digest is already uniformly distributed; two 64-bit words of it drive double hashing
+    h1, h2 = struct.unpack_from("<QQ", digest, 0)
+    h2 |= 1
+    for i in range(count):
+        yield (h1 + i * h2) % bits
+
+
+def _to_digest(value: Union[str, bytes]) -> Optional[bytes]:
+    if isinstance(value, bytes):
+        return value if len(value) == DIGEST_SIZE else None
+    try:
+        digest = bytes.fromhex(value.strip())
+    except ValueError:
+        return None
+    return digest if len(digest) == DIGEST_SIZE else None
+
+
+class HashAllowlist:
+    """Membership tests against a compiled allowlist; the file is mapped, never read into memory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self._bloom_bits, self._bloom_probes, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a compiled hash allowlist")
+        self._fanout = (0,) + _FANOUT.unpack_from(self._map, _HEADER.size)
+        self._bloom = _HEADER.size + _FANOUT.size
+        self._digests = self._bloom + (self._bloom_bits + 7) // 8
+        if len(self._map) != self._digests + self.count * DIGEST_SIZE:
+            self._map.close()
+            raise ValueError(f"{path} is truncated or corrupt")
+
+    def __contains__(self, value: Union[str, bytes]) -> bool:
+        digest = _to_digest(value)
+        if digest is None:
+            return False
+        data = self._map
+        if self._bloom_bits:
+            for bit in _probes(digest, self._bloom_bits, self._bloom_probes):
+                if not data[self._bloom + (bit >> 3)] & (1 << (bit & 7)):
+                    return False
+        lo, hi = self._fanout[digest[0]], self._fanout[digest[0] + 1]
+        base = self._digests
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = base + mid * DIGEST_SIZE
+            candidate = data[offset:offset + DIGEST_SIZE]
+            if candidate < digest:
+                lo = mid + 1
+            elif candidate > digest:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self) -> "HashAllowlist":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_allowlist(path: Optional[str] = None) -> Optional["HashAllowlist"]:
+    """The allowlist named by IRIS_HASH_ALLOWLIST (or `path`), or None when none is configured or it cannot be read."""
+    path = path or os.environ.get(ALLOWLIST_ENV)
+    if not path:
+        return None
+    try:
+        return HashAllowlist(path)
+    except (OSError, ValueError):
+        return None
+
+
+# --- Building ---
+def iter_source_digests(stream: Iterable[str]) -> Iterator[bytes]:
+    """
+    SHA-256 digests from a text or CSV source. CSV files with a header naming a
+    SHA-256 column (NSRL exports, EDR dumps) use that column; anything else
+    (sha256sum output, one digest per line) yields every 64-hex-digit token.
+    """
+    lines = iter(stream)
+    first = next(lines, "").lstrip("\ufeff")
+    header = [column.strip().lower() for column in next(csv.reader([first]), [])]
+    column = next((i for i, name in enumerate(header) if name in _SHA256_COLUMNS), None)
+    if column is not None:
+        for row in csv.reader(lines):
+            if len(row) > column:
+                digest = _to_digest(row[column])
+                if digest:
+                    yield digest
+        return
+    for line in itertools.chain([first], lines):
+        for token in _HEX_DIGEST.findall(line):
+            yield bytes.fromhex(token)
+
+
+def _read_run(f: BinaryIO) -> Iterator[bytes]:
+    while True:
+        block = f.read(DIGEST_SIZE * 4096)
+        if not block:
+            return
+        for offset in range(0, len(block), DIGEST_SIZE):
+            yield block[offset:offset + DIGEST_SIZE]
+
+
+def build_allowlist(digests: Iterable[bytes], output: str, bits_per_digest: int = BITS_PER_DIGEST) -> int:
+    """
+    Compiles digests into an allowlist file with an external merge sort:
+    sorted runs of SORT_CHUNK digests are spilled to temporary files and merged,
+    so memory stays bounded however large the source set is. Returns the number
+    of unique digests written.
+    """
+    directory = os.path.dirname(os.path.abspath(output))
+    runs: List[BinaryIO] = []
+    total = 0
+    try:
+        chunk: List[bytes] = []
+        for digest in digests:
+            chunk.append(digest)
+            if len(chunk) >= SORT_CHUNK:
+                runs.append(_spill(chunk, directory))
+                total += len(chunk)
+                chunk = []
+        if chunk or not runs:
+            runs.append(_spill(chunk, directory))
+            total += len(chunk)
+
+        # Sized for the pre-deduplication count, an upper bound on what is written
+        bloom_bits = max(64, total * bits_per_digest) if bits_per_digest else 0
+        probes = max(1, round(bits_per_digest * math.log(2))) if bits_per_digest else 0
+        bloom = bytearray((bloom_bits + 7) // 8)
+        fanout = [0] * 256
+        count = 0
+        fd, body_path = tempfile.mkstemp(dir=directory, suffix=".digests")
+        try:
+            with os.fdopen(fd, "wb", buffering=1 << 20) as body:
+                previous = None
+                for digest in heapq.merge(*(_read_run(run) for run in runs)):
+                    if digest == previous:
+                        continue
+                    previous = digest
+                    body.write(digest)
+                    fanout[digest[0]] += 1
+                    for bit in (_probes(digest, bloom_bits, probes) if bloom_bits else ()):
+                        bloom[bit >> 3] |= 1 << (bit & 7)
+                    count += 1
+            for i in range(1, 256):
+                fanout[i] += fanout[i - 1]
+
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as out, open(body_path, "rb") as body:
+                out.write(_HEADER.pack(_MAGIC, count, bloom_bits, probes, 0))
+                out.write(_FANOUT.pack(*fanout))
+                out.write(bloom)
+                while True:
+                    block = body.read(1 << 20)
+                    if not block:
+                        break
+                    out.write(block)
+            os.replace(tmp, output)
+        finally:
+            os.unlink(body_path)
+    finally:
+        for run in runs:
+            run.close()
+    return count
+
+
+def _spill(chunk: List[bytes], directory: str) -> BinaryIO:
+    chunk.sort()
+    run = tempfile.TemporaryFile(dir=directory)
+    run.write(b"".join(chunk))
+    run.seek(0)
+    return run
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Builds or queries an allowlist, e.g.
+    `python -m IRIS.collectors.hash_allowlist build known_good.bin NSRLFile.csv extra.sha256`
+    `python -m IRIS.collectors.hash_allowlist query known_good.bin /usr/bin/ssh`.
+    """
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(description="Compile or query a memory-mapped SHA-256 allowlist.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="compile text/CSV digest lists into an allowlist file")
+    build.add_argument("output")
+    build.add_argument("sources", nargs="+", help="text or CSV files ('-' for stdin)")
+    build.add_argument("--bloom-bits", type=int, default=BITS_PER_DIGEST,
+                       help=f"Bloom filter bits per digest, 0 for none (default: {BITS_PER_DIGEST})")
+    query = commands.add_parser("query", help="check digests or files against an allowlist")
+    query.add_argument("allowlist")
+    query.add_argument("items", nargs="+", help="SHA-256 hex digests or file paths")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        def digests():
+            for source in args.sources:
+                if source == "-":
+                    yield from iter_source_digests(sys.stdin)
+                    continue
+                with open(source, "r", encoding="utf-8", errors="replace", newline="") as f:
+                    yield from iter_source_digests(f)
+        count = build_allowlist(digests(), args.output, args.bloom_bits)
+        print(f"{count} unique digests -> {args.output} ({os.path.getsize(args.output)} bytes)")
+        return
+
+    from ..evidence import hash_file
+    with HashAllowlist(args.allowlist) as allowlist:
+        for item in args.items:
+            digest = item if _to_digest(item) else hash_file(item)["sha256"]
+            print(f"{'known-good' if digest in allowlist else 'unknown   '} {digest} {item if item != digest else ''}".rstrip())
+
+
+if __name__ == "__main__":
+    main()
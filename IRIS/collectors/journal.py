@@ -0,0 +1,305 @@
+import datetime
+import json
+import os
+import re
+import shlex
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..budget import active_token, expired
+from .cache import CollectorCache
+
+# --- systemd journal logon events ---
+# Hosts without /var/log/auth.log keep their authentication messages only in
+# the journal. `journalctl -o json` is streamed one entry per line, filtered
+# by journalctl itself to the programs below and, where supported (systemd
+# 236+), trimmed to the fields the parser reads with --output-fields; each line
+# is decoded and classified as it arrives, so memory does not grow with the
+# journal. The cursor of the last entry read is saved in the collector cache
+# (IRIS_CACHE_DIR), keyed by machine ID, and the next run resumes after it with
+# --after-cursor. IRIS_JOURNALCTL names a program to run instead of journalctl,
+# such as a script that prints recorded journal JSON. With --record, the
+# streamed output is spooled to a temporary file and stored in the command
+# archive once journalctl finishes, so a replay parses the same entries.
+
+JOURNALCTL_ENV = "IRIS_JOURNALCTL"
+RESET_ENV = "IRIS_JOURNAL_RESET"        # any value: ignore the saved cursor and read the whole journal
+PROGRAMS = ("sshd", "sshd-session", "sudo", "useradd", "su", "systemd-logind")
+FIELDS = ("__CURSOR", "__REALTIME_TIMESTAMP", "_SOURCE_REALTIME_TIMESTAMP", "SYSLOG_IDENTIFIER", "_COMM", "_PID", "MESSAGE")
+CHECK_EVERY = 5000              # entries between time budget checks
+
+_SSH_ACCEPTED = re.compile(r"^Accepted (?P<method>\S+) for (?P<user>\S+) from (?P<source>\S+) port (?P<port>\d+)")
+_SSH_FAILED = re.compile(r"^Failed (?P<method>\S+) for (?P<invalid>invalid user )?(?P<user>\S*) from (?P<source>\S+) port (?P<port>\d+)")
+_SSH_INVALID = re.compile(r"^Invalid user (?P<user>\S*) from (?P<source>\S+)")
+_USER_CREATED = re.compile(r"^new user: name=(?P<user>[^,]+), UID=(?P<uid>\d+), GID=(?P<gid>\d+), home=(?P<home>[^,]*), shell=(?P<shell>\S*)")
+_GROUP_CREATED = re.compile(r"^new group: name=(?P<group>[^,]+), GID=(?P<gid>\d+)")
+_SU = re.compile(r"^(?P<failed>FAILED SU )?\(to (?P<target>\S+)\) (?P<user>\S+) on (?P<tty>\S+)")
+_SESSION_NEW = re.compile(r"^New session (?P<session>\S+) of user (?P<user>\S+?)\.?$")
+_SESSION_REMOVED = re.compile(r"^Removed session (?P<session>\S+?)\.?$")
+
+
+class JournalError(Exception):
+    pass
+
+
+@dataclass
+class LogonEvent:
+    timestamp: float                # Unix seconds
+    program: str
+    kind: str                       # e.g. "ssh login", "sudo", "user created", "session opened"
+    user: str = ""                  # the account acting (or created, or logging in)
+    source: str = ""                # remote address or terminal
+    detail: str = ""
+    pid: str = ""
+    message: str = ""
+
+
+@dataclass
+class JournalStats:
+    entries: int = 0                # journal entries read
+    malformed: int = 0              # lines that were not a JSON object
+    cursor: Optional[str] = None    # cursor of the last entry read
+    after_cursor: Optional[str] = None
+    fields_supported: bool = True   # journalctl accepted --output-fields
+    discarded_cursor: Optional[str] = None     # a saved cursor journalctl rejected; the whole journal was read instead
+    truncated: bool = False
+    sessions: Dict[str, str] = field(default_factory=dict)     # logind session ID -> user, to name closed sessions
+
+
+def journal_command(after_cursor: Optional[str] = None, output_fields: bool = True, program: Optional[str] = None) -> List[str]:
+    argv = [program or os.environ.get(JOURNALCTL_ENV) or "journalctl", "-o", "json", "--no-pager"]
+    if output_fields:
+        argv.append("--output-fields=" + ",".join(name for name in FIELDS if not name.startswith("__")))
+    if after_cursor:
+        argv.append(f"--after-cursor={after_cursor}")
+    return argv + [f"SYSLOG_IDENTIFIER={name}" for name in PROGRAMS]
+
+
+def stream_lines(argv: List[str]) -> Iterator[str]:
+    """
+    Yields a command's stdout line by line as it is produced. The process is
+    killed when the report's time budget runs out or the caller stops reading;
+    a non-zero exit without output raises JournalError with its stderr.
+    """
+    try:
+        process = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                   encoding="utf-8", errors="replace", start_new_session=os.name == "posix")
+    except OSError as e:
+        raise JournalError(f"could not run {argv[0]}: {e.strerror or e}") from e
+    token = active_token()
+
+    def out_of_time():
+        token.truncate(f"{os.path.basename(argv[0])} stopped at the time budget")
+        process.kill()
+
+    remaining = token.remaining() if token is not None else None
+    timer = threading.Timer(remaining, out_of_time) if remaining is not None else None
+    if timer is not None:
+        timer.daemon = True
+        timer.start()
+    stderr: List[str] = []
+    reader = threading.Thread(target=lambda: stderr.append(process.stderr.read()), daemon=True)
+    reader.start()
+    produced = False
+    try:
+        for line in process.stdout:
+            produced = True
+            yield line
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        reader.join()
+        if timer is not None:
+            timer.cancel()
+    if process.returncode not in (0, -9) and not produced:
+        raise JournalError("".join(stderr).strip() or f"{argv[0]} exited with status {process.returncode}")
+
+
+def _command_line(argv: List[str]) -> str:
+    return " ".join(shlex.quote(arg) for arg in argv)
+
+
+def journal_lines(stats: JournalStats, run: Optional[Callable[[str], str]] = None, program: Optional[str] = None,
+                  record: Optional[Callable[[str, IO[bytes], datetime.datetime, float], None]] = None) -> Iterator[str]:
+    """
+    Journal JSON lines after `stats.after_cursor`. `run` runs a command and
+    returns its whole output (mock and replay runs); without it journalctl is
+    streamed, and `record`, if given, is called with the command line, a file
+    holding the output streamed, and the start time and duration once the
+    stream ends. journalctl older than systemd 236 rejects --output-fields and
+    is run again without it; a cursor journalctl rejects (the journal was
+    vacuumed, or another disk image has the same machine ID) is dropped and the
+    whole journal read instead.
+    """
+    output_fields = stats.fields_supported
+    while True:
+        argv = journal_command(stats.after_cursor, output_fields, program)
+        if run is not None:
+            yield from run(_command_line(argv)).splitlines()
+            return
+        spool = tempfile.TemporaryFile() if record is not None else None
+        started, start_time, failed = datetime.datetime.now(), time.perf_counter(), False
+        try:
+            for line in stream_lines(argv):
+                if spool is not None:
+                    spool.write(line.encode("utf-8", errors="surrogateescape"))
+                yield line
+            return
+        except JournalError as e:
+            failed = True
+            if output_fields and "output-fields" in str(e):
+                output_fields = stats.fields_supported = False
+            elif stats.after_cursor:
+                stats.discarded_cursor, stats.after_cursor = stats.after_cursor, None
+            else:
+                raise
+        finally:
+            # Also when the reader stopped early (the time budget): the archive holds what was parsed
+            if spool is not None:
+                with spool:
+                    if not failed:
+                        record(_command_line(argv), spool, started, time.perf_counter() - start_time)
+
+
+def recorded_program(commands: Iterable[str], stats: JournalStats) -> Optional[str]:
+    """
+    The program of the last journalctl run in a command archive's commands,
+    setting `stats` so journal_command() rebuilds that command line exactly
+    for replay; None if the archive holds no journal read.
+    """
+    filters = [f"SYSLOG_IDENTIFIER={name}" for name in PROGRAMS]
+    for command in reversed(list(commands)):
+        if " -o json --no-pager" not in command:
+            continue
+        try:
+            argv = shlex.split(command)
+        except ValueError:
+            continue
+        if argv[1:4] != ["-o", "json", "--no-pager"] or argv[-len(filters):] != filters:
+            continue
+        stats.fields_supported = any(arg.startswith("--output-fields=") for arg in argv)
+        stats.after_cursor = next((arg.split("=", 1)[1] for arg in argv if arg.startswith("--after-cursor=")), None)
+        return argv[0]
+    return None
+
+
+def _message(value) -> str:
+    # Messages that are not valid UTF-8 are exported as arrays of byte values
+    if isinstance(value, list):
+        return bytes(b for b in value if isinstance(b, int) and 0 <= b < 256).decode("utf-8", "replace")
+    return value if isinstance(value, str) else ""
+
+
+def _sudo(message: str) -> Optional[Tuple[str, str, str, str]]:
+    user, separator, rest = message.strip().partition(" : ")
+    if not separator or "TTY=" not in rest:
+        return None
+    head, _, command = rest.partition(" ; COMMAND=")
+    values, reasons = {}, []
+    for part in head.split(" ; "):
+        key, equals, value = part.partition("=")
+        if equals and key.isupper():
+            values[key] = value
+        else:
+            reasons.append(part)
+    detail = f"as {values.get('USER', '?')}: {command}" + (f" ({'; '.join(reasons)})" if reasons else "")
+    return ("sudo denied" if reasons else "sudo"), user, values.get("TTY", ""), detail
+
+
+def classify(program: str, message: str, sessions: Optional[Dict[str, str]] = None) -> Optional[Tuple[str, str, str, str]]:
+    """(kind, user, source, detail) for a logon-related message, or None for anything else."""
+    if program in ("sshd", "sshd-session"):
+        match = _SSH_ACCEPTED.match(message)
+        if match:
+            return "ssh login", match["user"], match["source"], f"{match['method']} (port {match['port']})"
+        match = _SSH_FAILED.match(message)
+        if match:
+            return ("ssh failed login", match["user"], match["source"],
+                    f"{match['method']}{' (invalid user)' if match['invalid'] else ''} (port {match['port']})")
+        match = _SSH_INVALID.match(message)
+        if match:
+            return "ssh invalid user", match["user"], match["source"], ""
+    elif program == "sudo":
+        return _sudo(message)
+    elif program == "useradd":
+        match = _USER_CREATED.match(message)
+        if match:
+            return "user created", match["user"], "", f"UID {match['uid']}, GID {match['gid']}, home {match['home']}, shell {match['shell']}"
+        match = _GROUP_CREATED.match(message)
+        if match:
+            return "group created", match["group"], "", f"GID {match['gid']}"
+    elif program == "su":
+        match = _SU.match(message)
+        if match:
+            return ("su failed" if match["failed"] else "su"), match["user"], match["tty"], f"to {match['target']}"
+    elif program == "systemd-logind":
+        match = _SESSION_NEW.match(message)
+        if match:
+            if sessions is not None:
+                sessions[match["session"]] = match["user"]
+            return "session opened", match["user"], "", f"session {match['session']}"
+        match = _SESSION_REMOVED.match(message)
+        if match:
+            user = sessions.pop(match["session"], "") if sessions is not None else ""
+            return "session closed", user, "", f"session {match['session']}"
+    return None
+
+
+def parse_entries(lines: Iterable[str], stats: JournalStats) -> Iterator[LogonEvent]:
+    """Logon events from journal JSON lines; `stats` tracks the entries read and the last cursor."""
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            if line.strip():
+                stats.malformed += 1
+            continue
+        if not isinstance(entry, dict):
+            stats.malformed += 1
+            continue
+        stats.entries += 1
+        stats.cursor = entry.get("__CURSOR") or stats.cursor
+        if stats.entries % CHECK_EVERY == 0 and expired("journal read"):
+            stats.truncated = True
+            return
+        program = entry.get("SYSLOG_IDENTIFIER") or entry.get("_COMM") or ""
+        message = _message(entry.get("MESSAGE"))
+        found = classify(program, message, stats.sessions)
+        if found is None:
+            continue
+        try:
+            timestamp = int(entry.get("_SOURCE_REALTIME_TIMESTAMP") or entry.get("__REALTIME_TIMESTAMP")) / 1e6
+        except (TypeError, ValueError):
+            continue
+        kind, user, source, detail = found
+        yield LogonEvent(timestamp, program, kind, user, source, detail, str(entry.get("_PID", "")), message)
+
+
+# --- Cursor checkpoints ---
+def _checkpoint_name(machine_id: str) -> str:
+    return f"journal-cursor:{machine_id or 'unknown'}"
+
+
+def load_cursor(cache: CollectorCache, machine_id: str) -> Optional[str]:
+    """The cursor saved by the previous run on this machine (for the same program filter), or None."""
+    if os.environ.get(RESET_ENV):
+        return None
+    return cache.get(_checkpoint_name(machine_id), list(PROGRAMS))
+
+
+def save_cursor(cache: CollectorCache, machine_id: str, cursor: str):
+    cache.put(_checkpoint_name(machine_id), list(PROGRAMS), cursor)
+
+
+def read_machine_id(host_path: Callable[[str], Optional[str]] = lambda path: path) -> str:
+    path = host_path("/etc/machine-id")
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except (OSError, TypeError):
+        return ""
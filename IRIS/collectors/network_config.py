@@ -0,0 +1,321 @@
+import ipaddress
+import os
+import socket
+import struct
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+# --- Network configuration collector (Linux) ---
+# Reads interfaces, addresses, routes, neighbours and resolver settings from
+# sysfs, procfs and /etc without running `ip` or `ifconfig`. Every source is a
+# small text file, so a host with hundreds of veth interfaces costs a few
+# hundred short reads rather than a fork per query.
+
+SYS_CLASS_NET = "/sys/class/net"
+PROC_ROUTE = "/proc/net/route"
+PROC_IPV6_ROUTE = "/proc/net/ipv6_route"
+PROC_IF_INET6 = "/proc/net/if_inet6"
+PROC_FIB_TRIE = "/proc/net/fib_trie"
+PROC_ARP = "/proc/net/arp"
+RESOLV_CONF = "/etc/resolv.conf"
+RESOLVED_UPSTREAM = "/run/systemd/resolve/resolv.conf"    # systemd-resolved's real servers behind 127.0.0.53
+HOSTS = "/etc/hosts"
+NSSWITCH = "/etc/nsswitch.conf"
+
+# net_device flags (include/uapi/linux/if.h) worth reporting
+IFF_FLAGS = [(0x1, "UP"), (0x2, "BROADCAST"), (0x8, "LOOPBACK"), (0x10, "POINTOPOINT"), (0x40, "RUNNING"),
+             (0x100, "PROMISC"), (0x200, "ALLMULTI"), (0x1000, "MULTICAST")]
+IFF_PROMISC = 0x100
+ARPHRD_LOOPBACK = 772
+RTF_UP, RTF_GATEWAY = 0x1, 0x2
+ARP_FLAG_COMPLETE, ARP_FLAG_PERMANENT = 0x2, 0x4
+STATISTICS = ("rx_bytes", "tx_bytes", "rx_packets", "tx_packets", "rx_errors", "tx_errors", "rx_dropped", "tx_dropped")
+
+
+@dataclass
+class Interface:
+    name: str
+    index: Optional[int] = None
+    mac: str = ""
+    mtu: Optional[int] = None
+    operstate: str = ""
+    flags: int = 0
+    kind: str = ""                  # loopback, physical or virtual
+    driver: str = ""
+    master: str = ""                # bridge or bond this interface is enslaved to
+    ipv4: List[str] = field(default_factory=list)      # CIDR notation
+    ipv6: List[str] = field(default_factory=list)
+    statistics: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def flag_names(self) -> List[str]:
+        return [name for bit, name in IFF_FLAGS if self.flags & bit]
+
+    @property
+    def promiscuous(self) -> bool:
+        return bool(self.flags & IFF_PROMISC)
+
+
+@dataclass
+class Route:
+    family: int                     # 4 or 6
+    destination: str                # CIDR
+    gateway: str
+    interface: str
+    metric: int = 0
+    flags: int = 0
+
+    @property
+    def default(self) -> bool:
+        return self.destination in ("0.0.0.0/0", "::/0")
+
+
+@dataclass
+class Neighbour:
+    address: str
+    mac: str
+    interface: str
+    state: str                      # complete, incomplete or permanent
+
+
+@dataclass
+class HostsEntry:
+    address: str
+    names: List[str]
+
+
+@dataclass
+class ResolverConfig:
+    nameservers: List[str] = field(default_factory=list)
+    search: List[str] = field(default_factory=list)
+    options: List[str] = field(default_factory=list)
+    upstream: List[str] = field(default_factory=list)    # systemd-resolved upstream servers, when stubbed
+    nsswitch_hosts: str = ""
+    hosts: List[HostsEntry] = field(default_factory=list)
+
+
+@dataclass
+class NetworkConfig:
+    interfaces: List[Interface] = field(default_factory=list)
+    routes: List[Route] = field(default_factory=list)
+    neighbours: List[Neighbour] = field(default_factory=list)
+    resolver: ResolverConfig = field(default_factory=ResolverConfig)
+    errors: List[str] = field(default_factory=list)    # sources that could not be read
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _read_int(path: str, base: int = 10) -> Optional[int]:
+    text = _read(path)
+    try:
+        return int(text.strip(), base) if text else None
+    except ValueError:
+        return None
+
+
+# --- Interfaces ---
+def read_interfaces(sys_class_net: str) -> List[Interface]:
+    """One entry per /sys/class/net/<name>, from the attribute files the kernel exports there."""
+    interfaces = []
+    with os.scandir(sys_class_net) as entries:
+        names = sorted(entry.name for entry in entries)
+    for name in names:
+        base = os.path.join(sys_class_net, name)
+        if not os.path.isdir(base):
+            continue        # bonding_masters and other plain files
+        iface = Interface(name, index=_read_int(os.path.join(base, "ifindex")),
+                          mac=(_read(os.path.join(base, "address")) or "").strip(),
+                          mtu=_read_int(os.path.join(base, "mtu")),
+                          operstate=(_read(os.path.join(base, "operstate")) or "").strip(),
+                          flags=_read_int(os.path.join(base, "flags"), 16) or 0)
+        if _read_int(os.path.join(base, "type")) == ARPHRD_LOOPBACK:
+            iface.kind = "loopback"
+        else:
+            # Physical devices have a `device` link to their bus device; veth, bridges, tunnels do not
+            iface.kind = "physical" if os.path.exists(os.path.join(base, "device")) else "virtual"
+        driver = os.path.join(base, "device", "driver")
+        if os.path.islink(driver):
+            iface.driver = os.path.basename(os.readlink(driver))
+        master = os.path.join(base, "master")
+        if os.path.islink(master):
+            iface.master = os.path.basename(os.readlink(master))
+        for counter in STATISTICS:
+            value = _read_int(os.path.join(base, "statistics", counter))
+            if value is not None:
+                iface.statistics[counter] = value
+        interfaces.append(iface)
+    return interfaces
+
+
+def _hex_ipv4(value: str) -> str:
+    """/proc/net/route stores addresses as host-endian (little-endian on x86/ARM) hex."""
+    return socket.inet_ntoa(struct.pack("<I", int(value, 16)))
+
+
+def _hex_ipv6(value: str) -> str:
+    return str(ipaddress.IPv6Address(bytes.fromhex(value)))
+
+
+def parse_fib_trie(text: str) -> Tuple[List[str], List[ipaddress.IPv4Network]]:
+    """
+    Local IPv4 addresses ("/32 host LOCAL" leaves) and on-link networks
+    ("/N link UNICAST" leaves) from /proc/net/fib_trie.
+    """
+    addresses, networks = [], []
+    current = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("|--"):
+            current = stripped[3:].strip()
+        elif stripped.startswith("/") and current:
+            length, _, rest = stripped[1:].partition(" ")
+            kind = rest.split()
+            if kind[-1:] == ["LOCAL"] and kind[:1] == ["host"] and length == "32":
+                addresses.append(current)
+            elif kind[-1:] == ["UNICAST"] and kind[:1] == ["link"] and length.isdigit():
+                networks.append(ipaddress.IPv4Network(f"{current}/{length}", strict=False))
+    return list(dict.fromkeys(addresses)), list(dict.fromkeys(networks))
+
+
+def parse_route(text: str) -> List[Route]:
+    routes = []
+    for line in text.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < 8:
+            continue
+        iface, destination, gateway, flags, metric, mask = fields[0], fields[1], fields[2], int(fields[3], 16), int(fields[6]), fields[7]
+        prefix = bin(int(mask, 16)).count("1")
+        routes.append(Route(4, f"{_hex_ipv4(destination)}/{prefix}", _hex_ipv4(gateway) if flags & RTF_GATEWAY else "",
+                            iface, metric, flags))
+    return routes
+
+
+def parse_ipv6_route(text: str) -> List[Route]:
+    routes = []
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) < 10:
+            continue
+        iface = fields[9]
+        if iface == "lo" and fields[1] != "00":
+            continue        # local/anycast entries the kernel keeps on lo for every address
+        gateway = _hex_ipv6(fields[4])
+        routes.append(Route(6, f"{_hex_ipv6(fields[0])}/{int(fields[1], 16)}", "" if gateway == "::" else gateway,
+                            iface, int(fields[5], 16), int(fields[8], 16)))
+    return routes
+
+
+def parse_if_inet6(text: str) -> Dict[str, List[str]]:
+    """Interface name -> IPv6 addresses in CIDR notation, from /proc/net/if_inet6."""
+    addresses: Dict[str, List[str]] = {}
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) >= 6:
+            addresses.setdefault(fields[5], []).append(f"{_hex_ipv6(fields[0])}/{int(fields[2], 16)}")
+    return addresses
+
+
+def parse_arp(text: str) -> List[Neighbour]:
+    neighbours = []
+    for line in text.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < 6:
+            continue
+        flags = int(fields[2], 16)
+        state = "permanent" if flags & ARP_FLAG_PERMANENT else "complete" if flags & ARP_FLAG_COMPLETE else "incomplete"
+        neighbours.append(Neighbour(fields[0], fields[3], fields[5], state))
+    return neighbours
+
+
+def assign_ipv4(interfaces: List[Interface], routes: List[Route], addresses: List[str],
+                networks: List[ipaddress.IPv4Network]):
+    """
+    Attaches each local IPv4 address to its interface. The prefix comes from the
+    narrowest on-link network containing it and the interface from the link
+    route for that network; loopback addresses belong to the loopback device.
+    """
+    by_name = {iface.name: iface for iface in interfaces}
+    link_routes = {r.destination: r.interface for r in routes if r.family == 4 and not r.gateway}
+    loopback = next((iface for iface in interfaces if iface.kind == "loopback"), None)
+    for text in addresses:
+        address = ipaddress.IPv4Address(text)
+        containing = sorted((n for n in networks if address in n), key=lambda n: n.prefixlen, reverse=True)
+        if address.is_loopback:
+            if loopback is not None:
+                loopback.ipv4.append(f"{address}/8")
+            continue
+        for network in containing:
+            owner = by_name.get(link_routes.get(str(network), ""))
+            if owner is not None:
+                owner.ipv4.append(f"{address}/{network.prefixlen}")
+                break
+
+
+# --- Resolver ---
+def parse_resolv_conf(text: str) -> ResolverConfig:
+    config = ResolverConfig()
+    for line in text.splitlines():
+        fields = line.split("#", 1)[0].split(";", 1)[0].split()
+        if len(fields) < 2:
+            continue
+        if fields[0] == "nameserver":
+            config.nameservers.append(fields[1])
+        elif fields[0] in ("search", "domain"):
+            config.search += fields[1:]
+        elif fields[0] == "options":
+            config.options += fields[1:]
+    return config
+
+
+def parse_hosts(text: str) -> List[HostsEntry]:
+    entries = []
+    for line in text.splitlines():
+        fields = line.split("#", 1)[0].split()
+        if len(fields) >= 2:
+            entries.append(HostsEntry(fields[0], fields[1:]))
+    return entries
+
+
+def parse_nsswitch_hosts(text: str) -> str:
+    for line in text.splitlines():
+        key, _, value = line.split("#", 1)[0].partition(":")
+        if key.strip() == "hosts":
+            return " ".join(value.split())
+    return ""
+
+
+# --- Collection ---
+def collect_network_config(host_path: Callable[[str], str] = lambda path: path) -> NetworkConfig:
+    """Reads every source; a missing or unreadable one is listed in `errors` and the rest still returned."""
+    config = NetworkConfig()
+
+    def read(path: str) -> str:
+        text = _read(host_path(path))
+        if text is None:
+            config.errors.append(path)
+        return text or ""
+
+    try:
+        config.interfaces = read_interfaces(host_path(SYS_CLASS_NET))
+    except OSError:
+        config.errors.append(SYS_CLASS_NET)
+    config.routes = parse_route(read(PROC_ROUTE)) + parse_ipv6_route(read(PROC_IPV6_ROUTE))
+    assign_ipv4(config.interfaces, config.routes, *parse_fib_trie(read(PROC_FIB_TRIE)))
+    ipv6 = parse_if_inet6(read(PROC_IF_INET6))
+    for iface in config.interfaces:
+        iface.ipv6 = ipv6.get(iface.name, [])
+    config.neighbours = parse_arp(read(PROC_ARP))
+
+    config.resolver = parse_resolv_conf(read(RESOLV_CONF))
+    if any(server.startswith("127.0.0.53") for server in config.resolver.nameservers):
+        upstream = _read(host_path(RESOLVED_UPSTREAM))
+        config.resolver.upstream = parse_resolv_conf(upstream).nameservers if upstream else []
+    config.resolver.hosts = parse_hosts(read(HOSTS))
+    config.resolver.nsswitch_hosts = parse_nsswitch_hosts(read(NSSWITCH))
+    return config
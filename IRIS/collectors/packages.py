@@ -0,0 +1,276 @@
+import concurrent.futures
+import glob
+import os
+import sqlite3
+import struct
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .browser_history import open_readonly
+from .cache import CollectorCache, stat_key
+
+# --- Installed package collector (Linux) ---
+# Reads package databases directly: dpkg's status file, the rpm sqlite
+# database, snap and flatpak install trees and Python site-packages. Sources are
+# parsed concurrently and each result is cached against the mtimes of the files
+# it came from.
+
+MANAGER_DPKG = "dpkg"
+MANAGER_RPM = "rpm"
+MANAGER_SNAP = "snap"
+MANAGER_FLATPAK = "flatpak"
+MANAGER_PIP = "pip"
+
+DPKG_STATUS = "/var/lib/dpkg/status"
+DPKG_INFO = "/var/lib/dpkg/info"
+RPM_SQLITE = "/var/lib/rpm/rpmdb.sqlite"
+SNAP_ROOT = "/snap"
+SNAP_BLOBS = "/var/lib/snapd/snaps"
+FLATPAK_ROOTS = ["/var/lib/flatpak/app"]
+SITE_PACKAGES_GLOBS = ["/usr/lib/python3*/site-packages", "/usr/lib/python3*/dist-packages",
+                       "/usr/local/lib/python3*/site-packages", "/usr/local/lib/python3*/dist-packages"]
+_DPKG_FIELDS = {"Package", "Status", "Version", "Architecture", "Installed-Size"}
+
+
+@dataclass
+class Package:
+    manager: str
+    name: str
+    version: str
+    arch: str = ""
+    status: str = "installed"
+    installed_at: Optional[float] = None    # Unix seconds; from file mtimes where the database has no install time
+    size_kb: Optional[int] = None
+    location: str = ""
+
+
+# --- dpkg ---
+def iter_dpkg_stanzas(lines: Iterator[str]) -> Iterator[Dict[str, str]]:
+    """
+    Streams RFC822-style stanzas from a dpkg status file, keeping only the fields
+    IRIS reports. Continuation lines (long descriptions, conffiles) are skipped.
+    """
+    stanza: Dict[str, str] = {}
+    for line in lines:
+        if line == "\n" or line == "":
+            if stanza:
+                yield stanza
+                stanza = {}
+            continue
+        if line[0] in " \t":
+            continue
+        field, _, value = line.partition(":")
+        if field in _DPKG_FIELDS:
+            stanza[field] = value.strip()
+    if stanza:
+        yield stanza
+
+
+def _list_mtimes(info_dir: str) -> Dict[str, float]:
+    """One directory scan for every info/<pkg>[:arch].list mtime, instead of a stat per package."""
+    mtimes = {}
+    try:
+        with os.scandir(info_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".list"):
+                    mtimes[entry.name[:-5]] = entry.stat().st_mtime
+    except OSError:
+        pass
+    return mtimes
+
+
+def parse_dpkg(status_path: str, info_dir: str) -> List[Package]:
+    mtimes = _list_mtimes(info_dir)
+    packages = []
+    with open(status_path, "r", encoding="utf-8", errors="replace") as f:
+        for stanza in iter_dpkg_stanzas(f):
+            status = stanza.get("Status", "")
+            if not status.endswith(" installed"):
+                continue
+            name, arch = stanza.get("Package", ""), stanza.get("Architecture", "")
+            size = stanza.get("Installed-Size", "")
+            packages.append(Package(MANAGER_DPKG, name, stanza.get("Version", ""), arch, status.split()[-1],
+                                    mtimes.get(f"{name}:{arch}", mtimes.get(name)),
+                                    int(size) if size.isdigit() else None))
+    return packages
+
+
+# --- rpm ---
+# An rpm header blob is: entry count, data length (both big-endian int32), then
+# 16-byte index entries (tag, type, offset, count) followed by the data store.
+RPMTAG_NAME, RPMTAG_VERSION, RPMTAG_RELEASE, RPMTAG_EPOCH = 1000, 1001, 1002, 1003
+RPMTAG_INSTALLTIME, RPMTAG_SIZE, RPMTAG_ARCH = 1008, 1009, 1022
+RPM_INT32, RPM_STRING, RPM_STRING_ARRAY, RPM_I18NSTRING = 4, 6, 8, 9
+_RPM_WANTED = {RPMTAG_NAME, RPMTAG_VERSION, RPMTAG_RELEASE, RPMTAG_EPOCH, RPMTAG_INSTALLTIME, RPMTAG_SIZE, RPMTAG_ARCH}
+_RPM_INTRO = struct.Struct(">ii")
+_RPM_ENTRY = struct.Struct(">iiii")
+
+
+def parse_rpm_header(blob: bytes) -> Dict[int, object]:
+    """Decodes the tags IRIS needs from one rpm header blob, without copying the data store."""
+    view = memoryview(blob)
+    count, data_length = _RPM_INTRO.unpack_from(view, 0)
+    store = _RPM_INTRO.size + count * _RPM_ENTRY.size
+    if count < 0 or store + data_length > len(view):
+        raise ValueError("truncated rpm header")
+    tags: Dict[int, object] = {}
+    for i in range(count):
+        tag, kind, offset, n = _RPM_ENTRY.unpack_from(view, _RPM_INTRO.size + i * _RPM_ENTRY.size)
+        if tag not in _RPM_WANTED:
+            continue
+        start = store + offset
+        if kind == RPM_INT32:
+            tags[tag] = struct.unpack_from(">i", view, start)[0]
+        elif kind in (RPM_STRING, RPM_I18NSTRING, RPM_STRING_ARRAY):
+            end = blob.index(b"\0", start)
+            tags[tag] = bytes(view[start:end]).decode("utf-8", errors="replace")
+    return tags
+
+
+def parse_rpm_sqlite(path: str) -> List[Package]:
+    packages = []
+    connection = open_readonly(path)
+    try:
+        cursor = connection.execute("SELECT blob FROM Packages")
+        while True:
+            rows = cursor.fetchmany(500)
+            if not rows:
+                break
+            for (blob,) in rows:
+                try:
+                    tags = parse_rpm_header(blob)
+                except (ValueError, struct.error):
+                    continue
+                if tags.get(RPMTAG_NAME) == "gpg-pubkey":
+                    continue
+                version = f"{tags.get(RPMTAG_VERSION, '')}-{tags.get(RPMTAG_RELEASE, '')}"
+                if tags.get(RPMTAG_EPOCH):
+                    version = f"{tags[RPMTAG_EPOCH]}:{version}"
+                size = tags.get(RPMTAG_SIZE)
+                packages.append(Package(MANAGER_RPM, str(tags.get(RPMTAG_NAME, "")), version, str(tags.get(RPMTAG_ARCH, "")),
+                                        installed_at=tags.get(RPMTAG_INSTALLTIME),
+                                        size_kb=size // 1024 if isinstance(size, int) else None))
+    finally:
+        connection.close()
+    return packages
+
+
+# --- snap / flatpak / pip ---
+def _yaml_field(path: str, field: str) -> str:
+    """Top-level scalar from a simple YAML file, without a YAML dependency."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return line.split(":", 1)[1].strip().strip("'\"")
+    except OSError:
+        pass
+    return ""
+
+
+def parse_snaps(snap_root: str, blobs_dir: str) -> List[Package]:
+    packages = []
+    for name in sorted(os.listdir(snap_root)):
+        current = os.path.join(snap_root, name, "current")
+        if name == "bin" or not os.path.exists(current):
+            continue
+        revision = os.path.basename(os.path.realpath(current))
+        meta = os.path.join(current, "meta", "snap.yaml")
+        blob = os.path.join(blobs_dir, f"{name}_{revision}.snap")
+        installed = os.path.getmtime(blob) if os.path.exists(blob) else os.path.getmtime(current)
+        packages.append(Package(MANAGER_SNAP, name, f"{_yaml_field(meta, 'version')} (rev {revision})",
+                                installed_at=installed, location=os.path.join(SNAP_ROOT, name)))
+    return packages
+
+
+def parse_flatpaks(app_roots: List[str]) -> List[Package]:
+    packages = []
+    for root in app_roots:
+        for app_id in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+            # app/<id>/current -> <arch>/<branch>; <arch>/<branch>/active -> deployment
+            current = os.path.join(root, app_id, "current")
+            if not os.path.exists(current):
+                continue
+            arch, branch = os.path.relpath(os.path.realpath(current), os.path.realpath(os.path.join(root, app_id))).split(os.sep)[:2]
+            active = os.path.join(current, "active")
+            packages.append(Package(MANAGER_FLATPAK, app_id, branch, arch,
+                                    installed_at=os.path.getmtime(active) if os.path.exists(active) else None))
+    return packages
+
+
+def parse_site_packages(site_dirs: List[Tuple[str, str]]) -> List[Package]:
+    """
+    Distributions from *.dist-info / *.egg-info directory names in each
+    (readable path, host path) site directory; install time from their mtime.
+    """
+    packages = []
+    for site, host_site in site_dirs:
+        try:
+            entries = list(os.scandir(site))
+        except OSError:
+            continue
+        for entry in entries:
+            for suffix in (".dist-info", ".egg-info"):
+                if entry.name.endswith(suffix):
+                    name, _, version = entry.name[:-len(suffix)].partition("-")
+                    packages.append(Package(MANAGER_PIP, name, version.split("-")[0],
+                                            installed_at=entry.stat().st_mtime, location=host_site))
+    return sorted(packages, key=lambda p: p.name.lower())
+
+
+# --- Collection ---
+@dataclass
+class SourceResult:
+    manager: str
+    packages: List[Package]
+    cached: bool = False
+    error: str = ""
+
+
+def _sources(host_path: Callable[[str], str]) -> List[Tuple[str, List[str], Callable[[], List[Package]]]]:
+    """(manager, validity-key paths, parser) for each package source present on the host."""
+    sources = []
+    status, info = host_path(DPKG_STATUS), host_path(DPKG_INFO)
+    if os.path.isfile(status):
+        sources.append((MANAGER_DPKG, [status, info], lambda: parse_dpkg(status, info)))
+    rpmdb = host_path(RPM_SQLITE)
+    if os.path.isfile(rpmdb):
+        sources.append((MANAGER_RPM, [rpmdb], lambda: parse_rpm_sqlite(rpmdb)))
+    snap_root, snap_blobs = host_path(SNAP_ROOT), host_path(SNAP_BLOBS)
+    if os.path.isdir(snap_root):
+        sources.append((MANAGER_SNAP, [snap_root, snap_blobs], lambda: parse_snaps(snap_root, snap_blobs)))
+    flatpak_roots = [host_path(root) for root in FLATPAK_ROOTS if os.path.isdir(host_path(root))]
+    if flatpak_roots:
+        sources.append((MANAGER_FLATPAK, flatpak_roots, lambda: parse_flatpaks(flatpak_roots)))
+    host_root = host_path("/")
+    site_dirs = sorted((path, "/" + os.path.relpath(path, host_root).replace(os.sep, "/"))
+                       for pattern in SITE_PACKAGES_GLOBS for path in glob.glob(host_path(pattern)))
+    if site_dirs:
+        sources.append((MANAGER_PIP, [path for path, _ in site_dirs], lambda: parse_site_packages(site_dirs)))
+    return sources
+
+
+def collect_packages(host_path: Callable[[str], str] = lambda path: path, cache: Optional[CollectorCache] = None,
+                     jobs: int = 4) -> List[SourceResult]:
+    """
+    Parses every package source on the host concurrently. With a cache, a source
+    whose files and directories are unchanged is loaded from the previous run.
+    """
+    def collect(manager: str, key_paths: List[str], parse: Callable[[], List[Package]]) -> SourceResult:
+        key = stat_key(key_paths)
+        name = f"packages:{manager}:{key_paths[0]}"
+        if cache is not None:
+            cached = cache.get(name, key)
+            if cached is not None:
+                return SourceResult(manager, [Package(**p) for p in cached], cached=True)
+        try:
+            packages = parse()
+        except (OSError, sqlite3.DatabaseError, ValueError) as e:
+            return SourceResult(manager, [], error=str(e))
+        if cache is not None:
+            cache.put(name, key, [asdict(p) for p in packages])
+        return SourceResult(manager, packages)
+
+    sources = _sources(host_path)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(jobs, len(sources) or 1))) as executor:
+        return list(executor.map(lambda source: collect(*source), sources))
@@ -0,0 +1,301 @@
+import ipaddress
+import struct
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from ..budget import expired
+
+# --- Packet captures ---
+# A streaming reader for pcap and pcapng files and a 5-tuple flow table built
+# from them in one pass. The file is read into one reusable buffer and every
+# header is decoded with struct.unpack_from over a memoryview of it, so a
+# packet is never copied: the reader yields a view into the buffer that is
+# only valid until the next packet is read. The flow table copies out only
+# the addresses it keys on, so memory grows with the number of flows, not
+# with the size of the capture.
+
+READ_CHUNK = 4 << 20            # bytes per read; grown for a block larger than this
+MAX_RECORD = 64 << 20           # a larger record length means a corrupt file
+
+PCAP_MAGIC = {0xA1B2C3D4: 1e-6, 0xA1B23C4D: 1e-9}     # in the file's byte order: microsecond or nanosecond timestamps
+PCAPNG_SECTION = 0x0A0D0D0A
+PCAPNG_BYTE_ORDER = 0x1A2B3C4D
+PCAPNG_INTERFACE, PCAPNG_SIMPLE_PACKET, PCAPNG_ENHANCED_PACKET = 1, 3, 6
+PCAPNG_OPTION_TSRESOL = 9
+
+# Link-layer header types (tcpdump.org/linktypes.html)
+LINKTYPE_NULL, LINKTYPE_ETHERNET, LINKTYPE_LOOP = 0, 1, 108
+LINKTYPE_RAW = (101, 12, 14)
+LINKTYPE_LINUX_SLL, LINKTYPE_LINUX_SLL2 = 113, 276
+ETHERTYPE_IPV4, ETHERTYPE_IPV6 = 0x0800, 0x86DD
+ETHERTYPE_VLAN = (0x8100, 0x88A8, 0x9100)
+IPV6_EXTENSIONS = (0, 43, 60)   # hop-by-hop, routing and destination options; 44 (fragment) is handled apart
+BSD_AF_INET6 = (24, 28, 30)     # AF_INET6 differs across BSDs and macOS
+
+PROTOCOLS = {1: "ICMP", 6: "TCP", 17: "UDP", 58: "ICMPv6", 132: "SCTP"}
+TCP_FLAGS = ((0x01, "FIN"), (0x02, "SYN"), (0x04, "RST"), (0x08, "PSH"), (0x10, "ACK"), (0x20, "URG"), (0x40, "ECE"), (0x80, "CWR"))
+
+_U16 = struct.Struct(">H")
+_PORTS = struct.Struct(">HH")
+_TCP = struct.Struct(">HH9xB")                   # ports and flags
+_IPV4 = struct.Struct(">B5xHxB2x4s4s")           # version/IHL, fragment offset, protocol, addresses
+_IPV6 = struct.Struct(">6xBx16s16s")             # next header, addresses
+
+Packet = Tuple[float, int, memoryview, int]     # (timestamp, link type, captured bytes, length on the wire)
+
+
+class CaptureError(ValueError):
+    pass
+
+
+class _Buffer:
+    """A reusable read buffer over a file; `need(n)` makes n bytes available at `pos`."""
+
+    def __init__(self, f: BinaryIO, size: int = READ_CHUNK):
+        self.f = f
+        self.data = bytearray(size)
+        self.view = memoryview(self.data)
+        self.pos = self.end = 0
+
+    def need(self, n: int) -> bool:
+        if self.end - self.pos >= n:
+            return True
+        rest = self.end - self.pos
+        if n > len(self.data):
+            # A fresh buffer rather than a resize: views of the old one may still be held
+            data = bytearray(max(n, 2 * len(self.data)))
+            data[:rest] = self.view[self.pos:self.end]
+            self.data, self.view = data, memoryview(data)
+            self.pos, self.end = 0, rest
+        elif self.pos + n > len(self.data):
+            self.view[:rest] = self.view[self.pos:self.end]
+            self.pos, self.end = 0, rest
+        while self.end - self.pos < n:
+            got = self.f.readinto(self.view[self.end:])
+            if not got:
+                return False
+            self.end += got
+        return True
+
+
+def _pcap_packets(buf: _Buffer, endian: str, resolution: float) -> Iterator[Packet]:
+    header = struct.Struct(endian + "IIII")
+    if not buf.need(24):
+        raise CaptureError("truncated pcap header")
+    linktype = struct.unpack_from(endian + "I", buf.view, buf.pos + 20)[0] & 0x0FFFFFFF
+    buf.pos += 24
+    while buf.need(16):
+        seconds, fraction, captured, length = header.unpack_from(buf.view, buf.pos)
+        if captured > MAX_RECORD:
+            raise CaptureError(f"record of {captured} bytes at offset {buf.pos}")
+        if not buf.need(16 + captured):
+            return                                      # cut off mid-packet (capture still being written)
+        start = buf.pos + 16
+        buf.pos = start + captured
+        yield seconds + fraction * resolution, linktype, buf.view[start:buf.pos], length
+
+
+def _tsresol(view: memoryview, start: int, end: int, endian: str) -> float:
+    while start + 4 <= end:
+        code, length = struct.unpack_from(endian + "HH", view, start)
+        if code == 0:
+            break
+        if code == PCAPNG_OPTION_TSRESOL and length >= 1:
+            value = view[start + 4]
+            return 2.0 ** -(value & 0x7F) if value & 0x80 else 10.0 ** -value
+        start += 4 + ((length + 3) & ~3)
+    return 1e-6
+
+
+def _pcapng_packets(buf: _Buffer) -> Iterator[Packet]:
+    endian = "<"
+    interfaces: List[Tuple[int, float]] = []
+    while buf.need(12):
+        kind = struct.unpack_from(endian + "I", buf.view, buf.pos)[0]
+        if kind == PCAPNG_SECTION:
+            # Each section declares its own byte order and numbers its interfaces afresh
+            endian = "<" if struct.unpack_from("<I", buf.view, buf.pos + 8)[0] == PCAPNG_BYTE_ORDER else ">"
+            interfaces = []
+        length = struct.unpack_from(endian + "I", buf.view, buf.pos + 4)[0]
+        if length < 12 or length > MAX_RECORD or length % 4:
+            raise CaptureError(f"block of {length} bytes at offset {buf.pos}")
+        if not buf.need(length):
+            return
+        start, end = buf.pos + 8, buf.pos + length - 4
+        buf.pos += length
+        if kind == PCAPNG_INTERFACE:
+            linktype = struct.unpack_from(endian + "H", buf.view, start)[0]
+            interfaces.append((linktype, _tsresol(buf.view, start + 8, end, endian)))
+        elif kind == PCAPNG_ENHANCED_PACKET:
+            interface, high, low, captured, wire = struct.unpack_from(endian + "IIIII", buf.view, start)
+            if interface < len(interfaces) and start + 20 + captured <= end:
+                linktype, resolution = interfaces[interface]
+                yield ((high << 32) | low) * resolution, linktype, buf.view[start + 20:start + 20 + captured], wire
+        elif kind == PCAPNG_SIMPLE_PACKET and interfaces:
+            wire = struct.unpack_from(endian + "I", buf.view, start)[0]
+            yield 0.0, interfaces[0][0], buf.view[start + 4:start + 4 + min(wire, end - start - 4)], wire
+
+
+def iter_packets(f: BinaryIO) -> Iterator[Packet]:
+    """
+    (timestamp, link type, data, wire length) for every packet of a pcap or
+    pcapng stream. `data` is a view into a reused buffer: use it before
+    asking for the next packet, and copy what must outlive it.
+    """
+    buf = _Buffer(f)
+    if not buf.need(4):
+        return
+    if struct.unpack_from("<I", buf.view, 0)[0] == PCAPNG_SECTION:
+        yield from _pcapng_packets(buf)
+        return
+    for endian in ("<", ">"):
+        magic = struct.unpack_from(endian + "I", buf.view, 0)[0]
+        if magic in PCAP_MAGIC:
+            yield from _pcap_packets(buf, endian, PCAP_MAGIC[magic])
+            return
+    raise CaptureError("not a pcap or pcapng file")
+
+
+# --- Decoding ---
+def _network_layer(linktype: int, data: memoryview) -> Tuple[int, int]:
+    """(ethertype, offset of the network header), or (0, 0) for what is not IP."""
+    if linktype == LINKTYPE_ETHERNET:
+        if len(data) < 14:
+            return 0, 0
+        ethertype, offset = _U16.unpack_from(data, 12)[0], 14
+        while ethertype in ETHERTYPE_VLAN and len(data) >= offset + 4:
+            ethertype, offset = _U16.unpack_from(data, offset + 2)[0], offset + 4
+        return ethertype, offset
+    if linktype in LINKTYPE_RAW:
+        version = data[0] >> 4 if len(data) else 0
+        return (ETHERTYPE_IPV4 if version == 4 else ETHERTYPE_IPV6 if version == 6 else 0), 0
+    if linktype == LINKTYPE_LINUX_SLL:
+        return (_U16.unpack_from(data, 14)[0], 16) if len(data) >= 16 else (0, 0)
+    if linktype == LINKTYPE_LINUX_SLL2:
+        return (_U16.unpack_from(data, 0)[0], 20) if len(data) >= 20 else (0, 0)
+    if linktype in (LINKTYPE_NULL, LINKTYPE_LOOP) and len(data) >= 4:
+        # NULL stores the address family in the capturing host's byte order, LOOP in network order
+        family = struct.unpack_from(">I" if linktype == LINKTYPE_LOOP else "<I", data, 0)[0]
+        if family > 0xFFFF:
+            family = struct.unpack_from(">I", data, 0)[0]
+        return (ETHERTYPE_IPV4 if family == 2 else ETHERTYPE_IPV6 if family in BSD_AF_INET6 else 0), 4
+    return 0, 0
+
+
+@dataclass
+class Flow:
+    protocol: int
+    src: bytes                      # the endpoint that sent the first packet seen
+    sport: int
+    dst: bytes
+    dport: int
+    first: float
+    last: float
+    packets: int = 0                # src -> dst
+    bytes: int = 0
+    packets_back: int = 0           # dst -> src
+    bytes_back: int = 0
+    flags: int = 0                  # TCP flags seen in either direction
+
+    @property
+    def total_bytes(self) -> int:
+        return self.bytes + self.bytes_back
+
+    @property
+    def total_packets(self) -> int:
+        return self.packets + self.packets_back
+
+    @property
+    def flag_names(self) -> str:
+        return ",".join(name for bit, name in TCP_FLAGS if self.flags & bit)
+
+
+def format_address(raw: bytes) -> str:
+    return str(ipaddress.ip_address(raw))
+
+
+@dataclass
+class FlowTable:
+    """Bidirectional 5-tuple flows of one or more captures."""
+    flows: Dict[Tuple[int, bytes, int, bytes, int], Flow] = field(default_factory=dict)
+    packets: int = 0
+    bytes: int = 0
+    non_ip: int = 0                 # packets of other protocols or link types this reader does not decode
+    first: Optional[float] = None
+    last: Optional[float] = None
+
+    def add(self, timestamp: float, linktype: int, data: memoryview, length: int):
+        self.packets += 1
+        self.bytes += length
+        if self.last is None:
+            self.first = self.last = timestamp
+        elif timestamp > self.last:
+            self.last = timestamp
+        elif timestamp < self.first:
+            self.first = timestamp
+        ethertype, offset = _network_layer(linktype, data)
+        size = len(data)
+        if ethertype == ETHERTYPE_IPV4 and size >= offset + 20:
+            version, fragment, protocol, src, dst = _IPV4.unpack_from(data, offset)
+            # Later fragments carry no ports
+            transport = offset + (version & 0x0F) * 4 if not fragment & 0x1FFF else -1
+        elif ethertype == ETHERTYPE_IPV6 and size >= offset + 40:
+            protocol, src, dst = _IPV6.unpack_from(data, offset)
+            transport = offset + 40
+            while protocol in IPV6_EXTENSIONS and size >= transport + 8:
+                protocol, transport = data[transport], transport + (data[transport + 1] + 1) * 8
+            if protocol == 44 and size >= transport + 8:
+                later = _U16.unpack_from(data, transport + 2)[0] & 0xFFF8
+                protocol, transport = data[transport], transport + 8 if not later else -1
+        else:
+            self.non_ip += 1
+            return
+        sport = dport = flags = 0
+        if transport >= 0 and protocol in (6, 17, 132) and size >= transport + 4:
+            if protocol == 6 and size >= transport + 14:
+                sport, dport, flags = _TCP.unpack_from(data, transport)
+            else:
+                sport, dport = _PORTS.unpack_from(data, transport)
+        # Both directions of a connection share one flow, keyed by its first packet's direction
+        flow = self.flows.get((protocol, src, sport, dst, dport))
+        if flow is not None:
+            flow.packets += 1
+            flow.bytes += length
+        else:
+            flow = self.flows.get((protocol, dst, dport, src, sport))
+            if flow is not None:
+                flow.packets_back += 1
+                flow.bytes_back += length
+            else:
+                flow = self.flows[(protocol, src, sport, dst, dport)] = Flow(protocol, src, sport, dst, dport, timestamp, timestamp,
+                                                                             packets=1, bytes=length)
+        flow.flags |= flags
+        if timestamp > flow.last:
+            flow.last = timestamp
+        elif timestamp < flow.first:
+            flow.first = timestamp
+
+    def read(self, f: BinaryIO) -> int:
+        """Adds every packet of a capture stream; returns how many were read (stops early when out of time)."""
+        count = 0
+        for timestamp, linktype, data, length in iter_packets(f):
+            self.add(timestamp, linktype, data, length)
+            count += 1
+            if not count % 100000 and expired("capture parsing"):
+                break
+        return count
+
+    def top_flows(self, limit: int) -> List[Flow]:
+        return sorted(self.flows.values(), key=lambda flow: -flow.total_bytes)[:limit]
+
+    def top_talkers(self, limit: int) -> List[Tuple[bytes, int, int, int]]:
+        """(address, bytes sent, bytes received, flows) for the hosts that moved the most bytes."""
+        talkers: Dict[bytes, List[int]] = {}
+        for flow in self.flows.values():
+            for address, sent, received in ((flow.src, flow.bytes, flow.bytes_back), (flow.dst, flow.bytes_back, flow.bytes)):
+                totals = talkers.setdefault(address, [0, 0, 0])
+                totals[0] += sent
+                totals[1] += received
+                totals[2] += 1
+        ranked = sorted(talkers.items(), key=lambda item: -(item[1][0] + item[1][1]))[:limit]
+        return [(address, sent, received, flows) for address, (sent, received, flows) in ranked]
@@ -0,0 +1,131 @@
+import json
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..evidence import KIND_REPORT
+
+# --- Bounded process details ---
+# A process's environment, open files and connections are what make a
+# per-process scan expensive to hold: on a build server thousands of processes
+# share the same long PATH, the same library paths and the same user names.
+# Each field is capped (IRIS_PROCESS_DETAIL_CAPS, e.g. "env=32,files=64"),
+# repeated strings are interned so every process shares one copy, and the
+# capped details are spilled in chunks to script files beside the report. The
+# report keeps only a chunk name per process and loads a chunk when one of its
+# rows is expanded (a <script src> load, which browsers allow for file:// pages
+# where fetch() is blocked).
+
+CAPS_ENV = "IRIS_PROCESS_DETAIL_CAPS"
+CHUNK_PROCESSES = 64            # processes per detail chunk
+CALLBACK = "irisProcessDetails"  # the function every chunk calls with {pid: details}
+
+
+@dataclass(frozen=True)
+class DetailCaps:
+    env: int = 64               # environment variables per process
+    files: int = 128            # open file paths per process
+    connections: int = 128      # connections per process
+    value: int = 512            # characters per value (env values, paths, the cwd)
+
+    @classmethod
+    def from_env(cls, spec: Optional[str] = None) -> "DetailCaps":
+        """Caps from "env=32,files=64,..." (default: IRIS_PROCESS_DETAIL_CAPS); unknown or malformed keys are ignored."""
+        spec = os.environ.get(CAPS_ENV, "") if spec is None else spec
+        values: Dict[str, int] = {}
+        for item in spec.split(","):
+            key, _, number = item.partition("=")
+            key = key.strip()
+            if key in cls.__dataclass_fields__ and number.strip().isdigit():
+                values[key] = int(number)
+        return cls(**values)
+
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit] + f"… [{len(text) - limit} more characters]"
+
+
+def _interned(values: Iterable[Any], limit: int, length: int) -> List[str]:
+    kept = []
+    for value in values:
+        if len(kept) >= limit:
+            break
+        kept.append(sys.intern(_clip(str(value), length)))
+    return kept
+
+
+def cap_details(environ: Optional[Dict[str, str]], open_files: Iterable[Any], connections: Iterable[Any],
+                cwd: str, caps: DetailCaps) -> Dict[str, Any]:
+    """
+    The capped, interned detail record for one process. Lists record how many
+    entries were dropped under "omitted", so the report can say so.
+    """
+    environ = environ or {}
+    open_files, connections = list(open_files), list(connections)
+    env = {}
+    for key in sorted(environ)[:caps.env]:
+        env[sys.intern(_clip(key, caps.value))] = sys.intern(_clip(str(environ[key]), caps.value))
+    omitted = {name: dropped for name, dropped in (("env", len(environ) - len(env)),
+                                                   ("files", len(open_files) - caps.files),
+                                                   ("connections", len(connections) - caps.connections)) if dropped > 0}
+    return {"cwd": sys.intern(_clip(cwd or "", caps.value)),
+            "open_files": _interned(open_files, caps.files, caps.value),
+            "connections": _interned(connections, caps.connections, caps.value),
+            "environ": env,
+            "omitted": omitted}
+
+
+class DetailSpill:
+    """
+    Thread-safe writer of detail chunks into `directory`: at most
+    CHUNK_PROCESSES processes' details are held before they go to disk (through
+    the evidence manifest when there is one, so they are hashed and packaged
+    with the report).
+    """
+
+    def __init__(self, directory: str, evidence: Any = None, log: Any = None):
+        self.directory = directory
+        self.evidence = evidence
+        self.log = log
+        self.chunks: List[str] = []             # names written, relative to the report directory
+        self.failed = 0
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _name(self, index: int) -> str:
+        return f"{os.path.basename(self.directory)}/details_{index:04d}.js"
+
+    def add(self, pid: int, details: Dict[str, Any]) -> str:
+        """Queues one process's details and returns the chunk they will be in."""
+        with self._lock:
+            self._pending[str(pid)] = details
+            name = self._name(len(self.chunks))
+            if len(self._pending) >= CHUNK_PROCESSES:
+                self._flush()
+            return name
+
+    def _flush(self):
+        if not self._pending:
+            return
+        name = self._name(len(self.chunks))
+        payload = f"{CALLBACK}({json.dumps(self._pending, separators=(',', ':'))});\n"
+        self.chunks.append(name)
+        self._pending = {}
+        path = os.path.join(os.path.dirname(self.directory), name)
+        try:
+            if self.evidence is not None:
+                self.evidence.write_artifact(path, payload, KIND_REPORT)
+            else:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(payload)
+        except OSError as e:
+            self.failed += 1
+            if self.log is not None:
+                self.log(f"Could not write process details to {path}: {e}")
+
+    def close(self):
+        with self._lock:
+            self._flush()
@@ -0,0 +1,209 @@
+import concurrent.futures
+import os
+import socket
+import sys
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# --- Socket ownership (Linux) ---
+# Attributing sockets to processes one process at a time (psutil's
+# connections() and open_files()) re-reads every /proc/net table and walks the
+# fd directory per process: O(processes x sockets). Here the tables are parsed
+# once into inode -> socket, every /proc/<pid>/fd directory is swept once (in
+# parallel; readlink releases the GIL), and each process's sockets and files
+# come from joining the two. /proc/net shows the reader's network namespace;
+# inodes it does not know are looked up in /proc/<pid>/net of one process per
+# other namespace (containers) seen during the sweep.
+
+PROC = "/proc"
+INET_TABLES = ("tcp", "tcp6", "udp", "udp6")
+SWEEP_CHUNK = 64                # pids per sweep task
+MAX_FILES_PER_PROCESS = 256     # open files kept per process (sockets are always kept)
+
+TCP_STATES = {1: "ESTABLISHED", 2: "SYN_SENT", 3: "SYN_RECV", 4: "FIN_WAIT1", 5: "FIN_WAIT2", 6: "TIME_WAIT", 7: "CLOSE",
+              8: "CLOSE_WAIT", 9: "LAST_ACK", 10: "LISTEN", 11: "CLOSING", 12: "NEW_SYN_RECV"}
+UDP_STATES = {1: "ESTABLISHED", 7: "UNCONN"}
+UNIX_STATES = {1: "UNCONNECTED", 2: "CONNECTING", 3: "CONNECTED", 4: "DISCONNECTING"}
+UNIX_TYPES = {1: "stream", 2: "dgram", 5: "seqpacket"}
+_UNIX_LISTENING = 1 << 16       # __SO_ACCEPTCON in the Flags column
+
+Endpoint = Tuple[str, int]
+
+
+@dataclass
+class Socket:
+    inode: int
+    protocol: str                   # tcp, tcp6, udp, udp6 or unix
+    state: str
+    local: Optional[Endpoint] = None
+    remote: Optional[Endpoint] = None
+    uid: int = -1
+    path: str = ""                  # unix sockets: bound path ("@name" for the abstract namespace)
+    kind: str = ""                  # unix sockets: stream, dgram or seqpacket
+
+    @property
+    def connected(self) -> bool:
+        return self.remote is not None and self.remote[1] != 0
+
+    @property
+    def listening(self) -> bool:
+        return self.state in ("LISTEN", "LISTENING")
+
+
+@dataclass
+class ProcessFiles:
+    pid: int
+    sockets: List[Socket] = field(default_factory=list)
+    files: List[str] = field(default_factory=list)      # link targets that are paths (regular files, devices, deleted files)
+    fd_count: int = 0
+    unresolved: List[int] = field(default_factory=list)  # socket inodes in no table (other namespaces, closed meanwhile)
+    denied: bool = False
+
+
+def format_endpoint(endpoint: Optional[Endpoint]) -> str:
+    if endpoint is None:
+        return ""
+    host, port = endpoint
+    return f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+
+
+# --- /proc/net tables ---
+def _address(text: str) -> Endpoint:
+    # Hex address in the kernel's byte order, one 32-bit word at a time, then a big-endian hex port
+    host, port = text.split(":")
+    raw = bytes.fromhex(host)
+    if sys.byteorder == "little":
+        raw = b"".join(raw[i:i + 4][::-1] for i in range(0, len(raw), 4))
+    if len(raw) == 16:
+        address = socket.inet_ntop(socket.AF_INET6, raw)
+        if address.startswith("::ffff:") and "." in address:
+            address = address[7:]                   # v4-mapped
+        return address, int(port, 16)
+    return socket.inet_ntop(socket.AF_INET, raw), int(port, 16)
+
+
+def parse_inet_table(text: str, protocol: str) -> Iterator[Socket]:
+    """Sockets from /proc/net/{tcp,tcp6,udp,udp6}."""
+    states = UDP_STATES if protocol.startswith("udp") else TCP_STATES
+    for line in text.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < 10:
+            continue
+        try:
+            state = int(fields[3], 16)
+            yield Socket(int(fields[9]), protocol, states.get(state, f"0x{state:02X}"), _address(fields[1]),
+                         _address(fields[2]), int(fields[7]))
+        except (ValueError, OSError):
+            continue
+
+
+def parse_unix_table(text: str) -> Iterator[Socket]:
+    """Sockets from /proc/net/unix (Num RefCount Protocol Flags Type St Inode [Path])."""
+    for line in text.splitlines()[1:]:
+        fields = line.split(None, 7)
+        if len(fields) < 7:
+            continue
+        try:
+            flags, kind, state, inode = int(fields[3], 16), int(fields[4], 16), int(fields[5], 16), int(fields[6])
+        except ValueError:
+            continue
+        yield Socket(inode, "unix", "LISTENING" if flags & _UNIX_LISTENING else UNIX_STATES.get(state, str(state)),
+                     path=fields[7].strip() if len(fields) > 7 else "", kind=UNIX_TYPES.get(kind, str(kind)))
+
+
+def read_socket_table(net_dir: str) -> Dict[int, Socket]:
+    """inode -> socket for every table in a /proc/net directory (missing tables, e.g. without IPv6, are skipped)."""
+    table: Dict[int, Socket] = {}
+    for name in INET_TABLES + ("unix",):
+        try:
+            with open(f"{net_dir}/{name}", "r", encoding="utf-8", errors="replace") as f:
+                text = f.read()
+        except OSError:
+            continue
+        for sock in (parse_unix_table(text) if name == "unix" else parse_inet_table(text, name)):
+            if sock.inode:                          # 0: TIME_WAIT and other sockets no process holds
+                table[sock.inode] = sock
+    return table
+
+
+# --- fd sweep ---
+def _sweep(proc_dir: str, pids: List[int]) -> List[Tuple[int, List[int], List[str], int, bool, str]]:
+    swept = []
+    for pid in pids:
+        fd_dir = f"{proc_dir}/{pid}/fd"
+        try:
+            fds = os.listdir(fd_dir)
+        except PermissionError:
+            swept.append((pid, [], [], 0, True, ""))
+            continue
+        except OSError:
+            continue                                # exited
+        inodes, files, denied = [], [], 0
+        for fd in fds:
+            try:
+                target = os.readlink(f"{fd_dir}/{fd}")
+            except PermissionError:
+                denied += 1                         # listable but not readable (ptrace access checks)
+                continue
+            except OSError:
+                continue                            # closed meanwhile
+            if target.startswith("socket:["):
+                inodes.append(int(target[8:-1]))
+            elif target.startswith("/") and len(files) < MAX_FILES_PER_PROCESS:
+                files.append(target)
+        try:
+            namespace = os.readlink(f"{proc_dir}/{pid}/ns/net")
+        except OSError:
+            namespace = ""
+        swept.append((pid, inodes, files, len(fds), bool(fds) and denied == len(fds), namespace))
+    return swept
+
+
+def sweep_fds(proc_dir: str = PROC, pids: Optional[Iterable[int]] = None,
+              jobs: Optional[int] = None) -> Tuple[Dict[int, ProcessFiles], Dict[str, int]]:
+    """
+    Every process's socket inodes and file paths from one pass over
+    /proc/<pid>/fd, plus one pid per network namespace seen.
+    """
+    if pids is None:
+        with os.scandir(proc_dir) as entries:
+            pids = [int(entry.name) for entry in entries if entry.name.isdigit()]
+    pids = list(pids)
+    chunks = [pids[i:i + SWEEP_CHUNK] for i in range(0, len(pids), SWEEP_CHUNK)]
+    processes: Dict[int, ProcessFiles] = {}
+    namespaces: Dict[str, int] = {}
+    workers = max(1, min(jobs or min(8, os.cpu_count() or 4), len(chunks)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for swept in executor.map(lambda chunk: _sweep(proc_dir, chunk), chunks):
+            for pid, inodes, files, fd_count, denied, namespace in swept:
+                process = processes[pid] = ProcessFiles(pid, files=files, fd_count=fd_count, denied=denied)
+                process.unresolved = inodes         # resolved by the join
+                if namespace:
+                    namespaces.setdefault(namespace, pid)
+    return processes, namespaces
+
+
+def collect_process_files(host_path: Callable[[str], str] = lambda path: path, pids: Optional[Iterable[int]] = None,
+                          jobs: Optional[int] = None) -> Dict[int, ProcessFiles]:
+    """pid -> sockets and open files for every (or the given) process, joined on socket inode."""
+    proc_dir = host_path(PROC)
+    processes, namespaces = sweep_fds(proc_dir, pids, jobs)
+    table = read_socket_table(f"{proc_dir}/net")
+    wanted = {inode for process in processes.values() for inode in process.unresolved}
+    if wanted - table.keys():
+        try:
+            own = os.readlink(f"{proc_dir}/self/ns/net")
+        except OSError:
+            own = ""
+        for namespace, pid in namespaces.items():
+            if namespace != own:
+                table.update(read_socket_table(f"{proc_dir}/{pid}/net"))
+    for process in processes.values():
+        inodes, process.unresolved = process.unresolved, []
+        for inode in inodes:
+            sock = table.get(inode)
+            if sock is None:
+                process.unresolved.append(inode)
+            else:
+                process.sockets.append(sock)
+    return processes
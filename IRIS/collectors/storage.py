@@ -0,0 +1,224 @@
+import os
+import plistlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..helpers import DiskInfo
+
+# --- Storage collector ---
+# Enumerates disks, partitions and mounted volumes in a fixed number of steps,
+# however many disks there are. On macOS that is one `diskutil list -plist`,
+# one `system_profiler` call for every NVMe/SATA serial number (indexed by
+# product name and BSD name), and `os.statvfs` per mounted volume in place of
+# `df`. On Linux everything comes from /proc/mounts, /proc/partitions and
+# /sys/block without running a command.
+
+PROC_MOUNTS = "/proc/mounts"
+PROC_PARTITIONS = "/proc/partitions"
+SYS_BLOCK = "/sys/block"
+PROFILER_STORAGE = "system_profiler -xml SPNVMeDataType SPSerialATADataType"
+DF_ALL = "df -kP"
+SECTOR_SIZE = 512               # /sys/block/*/size is always in 512-byte sectors
+# Kernel pseudo filesystems: mounted everywhere, not storage
+PSEUDO_FILESYSTEMS = {"proc", "sysfs", "devtmpfs", "devpts", "cgroup", "cgroup2", "securityfs", "pstore", "bpf",
+                      "debugfs", "tracefs", "configfs", "fusectl", "mqueue", "hugetlbfs", "autofs", "binfmt_misc",
+                      "efivarfs", "rpc_pipefs", "nsfs", "ramfs", "selinuxfs"}
+# Block devices that never hold evidence of their own
+SKIPPED_DEVICE_PREFIXES = ("ram", "zram")
+
+Usage = Tuple[int, int, int]    # (total, used, available) bytes
+
+
+def format_size(value: Optional[int]) -> str:
+    if value is None:
+        return "N/A"
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}" if unit != "B" else f"{value} B"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+# --- Volume usage ---
+def statvfs_usage(mount_point: str) -> Optional[Usage]:
+    """Usage of a mounted filesystem straight from statvfs(2), as `df` computes it."""
+    try:
+        st = os.statvfs(mount_point)
+    except OSError:
+        return None
+    return st.f_blocks * st.f_frsize, (st.f_blocks - st.f_bfree) * st.f_frsize, st.f_bavail * st.f_frsize
+
+
+def parse_df(text: str) -> Dict[str, Usage]:
+    """Mount point -> usage from one `df -kP` listing; used where statvfs cannot see the host (mock, replay)."""
+    usage = {}
+    for line in text.splitlines()[1:]:
+        fields = line.split(None, 5)
+        if len(fields) == 6 and fields[1].isdigit():
+            usage[fields[5].strip()] = (int(fields[1]) * 1024, int(fields[2]) * 1024, int(fields[3]) * 1024)
+    return usage
+
+
+def _with_usage(info: DiskInfo, usage: Callable[[str], Optional[Usage]]) -> DiskInfo:
+    if info.mount_point and info.mount_point != "N/A":
+        measured = usage(info.mount_point)
+        if measured is not None:
+            info.used, info.available = format_size(measured[1]), format_size(measured[2])
+    return info
+
+
+# --- macOS ---
+def index_profiler_storage(xml_text: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Every NVMe/SATA device from one system_profiler XML document, keyed by
+    product (`_name`), model (`device_model`) and BSD name, so each disk from
+    diskutil is a dictionary lookup instead of another profiler run.
+    """
+    index: Dict[str, Dict[str, Any]] = {}
+    try:
+        documents = plistlib.loads(xml_text.encode("utf-8"))
+    except (plistlib.InvalidFileException, ValueError):
+        return index
+    pending = list(documents) if isinstance(documents, list) else [documents]
+    while pending:
+        item = pending.pop()
+        if not isinstance(item, dict):
+            continue
+        pending.extend(item.get("_items", []))
+        if "device_serial" in item or "bsd_name" in item:
+            for key in (item.get("_name"), item.get("device_model"), item.get("bsd_name")):
+                if key:
+                    index[str(key).strip()] = item
+    return index
+
+
+def macos_disks(diskutil_plist: str, profiler_index: Dict[str, Dict[str, Any]],
+                usage: Callable[[str], Optional[Usage]]) -> List[DiskInfo]:
+    disks = []
+    plist = plistlib.loads(diskutil_plist.encode("utf-8"))
+    for disk in plist.get("AllDisksAndPartitions", []):
+        if not isinstance(disk, dict):
+            continue
+        identifier = disk.get("DeviceIdentifier", "N/A")
+        product = disk.get("Product")
+        device = profiler_index.get(product or "") or profiler_index.get(identifier) or {}
+        disks.append(DiskInfo(name=identifier, type="Physical Disk", size_gb=round(disk.get("Size", 0) / 1024 ** 3, 2),
+                              used="N/A", available="N/A", filesystem="N/A", mount_point=disk.get("MountPoint", "N/A"),
+                              serial=str(device.get("device_serial", "N/A")).strip(), volume_name="N/A",
+                              device_identifier=identifier, model=product or device.get("device_model")))
+        for partition in disk.get("Partitions", []) + disk.get("APFSVolumes", []):
+            if not isinstance(partition, dict):
+                continue
+            disks.append(_with_usage(DiskInfo(
+                name=partition.get("VolumeName", partition.get("DeviceIdentifier", "N/A")), type="Partition",
+                size_gb=round(partition.get("Size", 0) / 1024 ** 3, 2), used="N/A", available="N/A",
+                filesystem=partition.get("FilesystemType", "N/A"), mount_point=partition.get("MountPoint", "N/A"),
+                serial="N/A", volume_name=partition.get("VolumeName"), device_identifier=partition.get("DeviceIdentifier")), usage))
+    return disks
+
+
+# --- Linux ---
+def _unescape_mount(field: str) -> str:
+    """/proc/mounts escapes space, tab, newline and backslash as octal (\\040 ...)."""
+    if "\\" not in field:
+        return field
+    return field.encode("latin-1").decode("unicode_escape")
+
+
+def parse_mounts(text: str) -> List[Tuple[str, str, str, str]]:
+    """(device, mount point, filesystem, options) for every non-pseudo mount in /proc/mounts."""
+    mounts = []
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) >= 4 and fields[2] not in PSEUDO_FILESYSTEMS:
+            mounts.append((_unescape_mount(fields[0]), _unescape_mount(fields[1]), fields[2], fields[3]))
+    return mounts
+
+
+def parse_partitions(text: str) -> Dict[str, int]:
+    """Block device name -> size in bytes, from /proc/partitions (sizes there are 1 KiB blocks)."""
+    sizes = {}
+    for line in text.splitlines()[2:]:
+        fields = line.split()
+        if len(fields) == 4 and fields[2].isdigit():
+            sizes[fields[3]] = int(fields[2]) * 1024
+    return sizes
+
+
+def _attribute(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def read_block_devices(sys_block: str, sizes: Dict[str, int]) -> List[Dict[str, Any]]:
+    """
+    Whole disks from /sys/block and their partitions (subdirectories holding a
+    `partition` file), with model, serial, removable, read-only and rotational.
+    """
+    devices = []
+    for name in sorted(os.listdir(sys_block)):
+        base = os.path.join(sys_block, name)
+        size = sizes.get(name)
+        if size is None:
+            sectors = _attribute(os.path.join(base, "size"))
+            size = int(sectors) * SECTOR_SIZE if sectors.isdigit() else 0
+        if name.startswith(SKIPPED_DEVICE_PREFIXES) or (name.startswith("loop") and not size):
+            continue
+        vendor = _attribute(os.path.join(base, "device", "vendor"))
+        model = _attribute(os.path.join(base, "device", "model"))
+        disk = {"name": name, "size": size, "model": " ".join(part for part in (vendor, model) if part),
+                "serial": _attribute(os.path.join(base, "device", "serial")) or _attribute(os.path.join(base, "serial")),
+                "removable": _attribute(os.path.join(base, "removable")) == "1",
+                "read_only": _attribute(os.path.join(base, "ro")) == "1",
+                "rotational": _attribute(os.path.join(base, "queue", "rotational")) == "1",
+                "partitions": []}
+        for child in sorted(os.listdir(base)):
+            if os.path.isfile(os.path.join(base, child, "partition")):
+                sectors = _attribute(os.path.join(base, child, "size"))
+                disk["partitions"].append((child, sizes.get(child, int(sectors) * SECTOR_SIZE if sectors.isdigit() else 0)))
+        devices.append(disk)
+    return devices
+
+
+def linux_disks(host_path: Callable[[str], str], usage: Callable[[str], Optional[Usage]]) -> List[DiskInfo]:
+    """Disks, partitions and other mounted filesystems (tmpfs, overlay, network shares) of a Linux host."""
+    def read(path: str) -> str:
+        return _attribute(host_path(path))
+
+    mounts = parse_mounts(read(PROC_MOUNTS))
+    by_device: Dict[str, List[Tuple[str, str, str, str]]] = {}
+    for mount in mounts:
+        by_device.setdefault(os.path.basename(mount[0]) if mount[0].startswith("/dev/") else mount[0], []).append(mount)
+    sizes = parse_partitions(read(PROC_PARTITIONS))
+    try:
+        devices = read_block_devices(host_path(SYS_BLOCK), sizes)
+    except OSError:
+        devices = []
+
+    disks, seen = [], set()
+
+    def volume(name: str, size: int, kind: str, serial: str = "N/A", model: Optional[str] = None,
+               removable: Optional[bool] = None):
+        # One row per mount of the device (bind mounts repeat it), or one unmounted row
+        for device, mount_point, fstype, options in by_device.get(name, []) or [(name, "N/A", "N/A", "")]:
+            seen.add(mount_point)
+            disks.append(_with_usage(DiskInfo(name=name, type=kind, size_gb=round(size / 1024 ** 3, 2), used="N/A",
+                                              available="N/A", filesystem=fstype, mount_point=mount_point, serial=serial,
+                                              volume_name=None, device_identifier=f"/dev/{name}", model=model,
+                                              removable=removable), usage))
+
+    for disk in devices:
+        kind = "Removable Disk" if disk["removable"] else "Loop Device" if disk["name"].startswith("loop") else "Physical Disk"
+        volume(disk["name"], disk["size"], kind, disk["serial"] or "N/A", disk["model"] or None, disk["removable"])
+        for name, size in disk["partitions"]:
+            volume(name, size, "Partition", removable=disk["removable"])
+    for device, mount_point, fstype, options in mounts:
+        if mount_point not in seen:
+            seen.add(mount_point)       # over-mounted paths appear once per layer in /proc/mounts
+            total, used, available = usage(mount_point) or (0, None, None)
+            disks.append(DiskInfo(name=device, type="Mounted Filesystem", size_gb=round(total / 1024 ** 3, 2),
+                                  used=format_size(used), available=format_size(available), filesystem=fstype,
+                                  mount_point=mount_point, serial="N/A"))
+    return disks
@@ -0,0 +1,187 @@
+import datetime
+import gzip
+import heapq
+import itertools
+import os
+import pickle
+import re
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Callable, IO, Iterable, Iterator, List, NamedTuple, Optional
+
+# --- Super-timeline ---
+# Every source yields its events in time order and one heap-based k-way merge
+# (heapq.merge) interleaves them, so the merged timeline is produced one event
+# at a time and never sorted as a whole. Sources that are already in time
+# order (log files, browser history queries) are merged as they are read; the
+# others (file and process start times) are sorted in runs of RUN_SIZE events,
+# runs beyond the first are spilled to temporary files, and the runs become
+# further inputs of the same merge. Memory is bounded by the run size and the
+# number of sources, not by the number of events.
+
+RUN_SIZE = 100000               # events sorted in memory per run
+SPILL_BLOCK = 2000              # events pickled together in a spilled run
+SYSLOG_MONTHS = {name: number for number, name in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1)}
+_SYSLOG_LINE = re.compile(r"^(?P<month>[A-Z][a-z]{2}) +(?P<day>\d{1,2}) (?P<clock>\d\d:\d\d:\d\d) (?P<host>\S+) (?P<message>.*)$")
+_ISO_LINE = re.compile(r"^(?P<stamp>\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?(?:Z|[+-]\d\d:?\d\d)?) (?P<host>\S+) (?P<message>.*)$")
+
+
+class Event(NamedTuple):
+    timestamp: float                # Unix seconds
+    source: str                     # the source that produced it, e.g. "auth.log" or "processes"
+    kind: str                       # what happened, e.g. "process started" or "file modified"
+    description: str
+    detail: str = ""
+
+
+@dataclass
+class TimelineSource:
+    name: str
+    events: Callable[[], Iterable[Event]]
+    presorted: bool = False         # events are already yielded in time order
+    count: int = 0                  # events read, filled in while merging
+    first: Optional[float] = None
+    last: Optional[float] = None
+
+
+@dataclass
+class MergeStats:
+    sources: List[TimelineSource] = field(default_factory=list)
+    events: int = 0
+    spilled_runs: int = 0
+    out_of_order: int = 0           # events a presorted source yielded earlier than its previous one
+
+
+# --- Sorting and merging ---
+def _read_run(f: IO[bytes]) -> Iterator[Event]:
+    f.seek(0)
+    try:
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                return
+            yield from (Event(*event) for event in block)
+    finally:
+        f.close()
+
+
+def sorted_runs(events: Iterable[Event], stats: Optional[MergeStats] = None, run_size: int = RUN_SIZE,
+                spill_dir: Optional[str] = None) -> List[Iterator[Event]]:
+    """
+    Time-sorted iterators that together hold every event: one in memory when
+    there are at most `run_size` events, otherwise one per spilled run.
+    """
+    events = iter(events)
+    runs: List[Iterator[Event]] = []
+    while True:
+        run = sorted(itertools.islice(events, run_size), key=lambda event: event.timestamp)
+        if len(run) < run_size:
+            runs.append(iter(run))                  # the last (or only) run stays in memory
+            return runs
+        f = tempfile.TemporaryFile(dir=spill_dir)
+        for start in range(0, run_size, SPILL_BLOCK):
+            pickle.dump([tuple(event) for event in run[start:start + SPILL_BLOCK]], f, pickle.HIGHEST_PROTOCOL)
+        runs.append(_read_run(f))
+        if stats is not None:
+            stats.spilled_runs += 1
+
+
+def _counted(source: TimelineSource, events: Iterable[Event], stats: MergeStats) -> Iterator[Event]:
+    for event in events:
+        source.count += 1
+        if source.last is not None and source.presorted and event.timestamp < source.last:
+            stats.out_of_order += 1
+        source.first = event.timestamp if source.first is None else min(source.first, event.timestamp)
+        source.last = event.timestamp if source.last is None else max(source.last, event.timestamp)
+        yield event
+
+
+def merge_timeline(sources: List[TimelineSource], stats: Optional[MergeStats] = None, run_size: int = RUN_SIZE,
+                   spill_dir: Optional[str] = None) -> Iterator[Event]:
+    """One time-ordered stream of every source's events (ties keep source order)."""
+    stats = stats if stats is not None else MergeStats()
+    stats.sources = sources
+    streams: List[Iterator[Event]] = []
+    for source in sources:
+        events = _counted(source, source.events(), stats)
+        streams += [events] if source.presorted else sorted_runs(events, stats, run_size, spill_dir)
+    for event in heapq.merge(*streams, key=lambda event: event.timestamp):
+        stats.events += 1
+        yield event
+
+
+# --- Sources ---
+def _open_log(path: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def syslog_events(path: str, source: str) -> Iterator[Event]:
+    """
+    Events from a syslog-format file (auth.log, secure). Traditional timestamps
+    have no year: it is taken from the file's mtime, and a month later than the
+    mtime's belongs to the year before. Times are read as local time.
+    """
+    try:
+        modified = datetime.datetime.fromtimestamp(os.stat(path).st_mtime)
+        f = _open_log(path)
+    except OSError:
+        return
+    with f:
+        for line in f:
+            line = line.rstrip("\n")
+            match = _SYSLOG_LINE.match(line)
+            try:
+                if match:
+                    month = SYSLOG_MONTHS.get(match["month"])
+                    if month is None:
+                        continue
+                    year = modified.year - 1 if month > modified.month else modified.year
+                    hour, minute, second = map(int, match["clock"].split(":"))
+                    timestamp = time.mktime((year, month, int(match["day"]), hour, minute, second, 0, 0, -1))
+                else:
+                    match = _ISO_LINE.match(line)
+                    if not match:
+                        continue
+                    timestamp = datetime.datetime.fromisoformat(match["stamp"].replace("Z", "+00:00")).timestamp()
+            except (ValueError, OverflowError):
+                continue
+            program, _, message = match["message"].partition(": ")
+            yield Event(timestamp, source, re.sub(r"\[\d+\]$", "", program), message or program, match["message"])
+
+
+def process_events(proc_dir: str) -> Iterator[Event]:
+    """Start times of running processes from /proc/<pid>/stat and the boot time in /proc/stat."""
+    try:
+        with open(f"{proc_dir}/stat", "r") as f:
+            boot = next(int(line.split()[1]) for line in f if line.startswith("btime "))
+        ticks = os.sysconf("SC_CLK_TCK")
+        entries = [entry.name for entry in os.scandir(proc_dir) if entry.name.isdigit()]
+    except (OSError, StopIteration, ValueError):
+        return
+    for pid in entries:
+        try:
+            with open(f"{proc_dir}/{pid}/stat", "r", encoding="utf-8", errors="replace") as f:
+                stat = f.read()
+            with open(f"{proc_dir}/{pid}/cmdline", "rb") as f:
+                cmdline = f.read().replace(b"\0", b" ").decode("utf-8", "replace").strip()
+        except OSError:
+            continue                                # exited
+        # comm is in parentheses and may itself contain spaces and parentheses
+        comm, fields = stat[stat.find("(") + 1:stat.rfind(")")], stat[stat.rfind(")") + 2:].split()
+        if len(fields) > 19:
+            yield Event(boot + int(fields[19]) / ticks, "processes", "process started", f"{comm} (pid {pid})", cmdline)
+
+
+def file_events(paths: Iterable[str], source: str, kind: str, shown: Callable[[str], str] = lambda path: path) -> Iterator[Event]:
+    """Modification times of files; `shown` maps a readable path back to the path on the host."""
+    for path in paths:
+        try:
+            st = os.lstat(path)
+        except OSError:
+            continue
+        yield Event(st.st_mtime, source, kind, shown(path), f"{st.st_size} bytes, mode {st.st_mode & 0o7777:04o}, uid {st.st_uid}")
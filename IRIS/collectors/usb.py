@@ -0,0 +1,271 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from .cache import default_cache_dir
+
+# --- USB device collector (Linux) ---
+# Walks /sys/bus/usb/devices once, reading each device's descriptor
+# attributes and its interfaces' classes and drivers. Vendor and product
+# names come from usb.ids, compiled once into a sorted binary table that is
+# memory-mapped and binary-searched, so naming a device never parses the
+# 20k-line text file again.
+
+SYS_USB_DEVICES = "/sys/bus/usb/devices"
+USB_IDS_PATHS = ["/usr/share/hwdata/usb.ids", "/usr/share/misc/usb.ids", "/usr/share/usb.ids", "/var/lib/usbutils/usb.ids"]
+
+# Interface classes worth calling out (USB-IF class codes)
+USB_CLASSES = {0x01: "Audio", 0x02: "Communications", 0x03: "HID", 0x06: "Image", 0x07: "Printer", 0x08: "Mass Storage",
+               0x09: "Hub", 0x0a: "CDC Data", 0x0b: "Smart Card", 0x0e: "Video", 0x10: "Audio/Video", 0xe0: "Wireless",
+               0xef: "Miscellaneous", 0xfe: "Application Specific", 0xff: "Vendor Specific"}
+CLASS_HID, CLASS_MASS_STORAGE, CLASS_VIDEO, CLASS_WIRELESS = 0x03, 0x08, 0x0e, 0xe0
+
+
+@dataclass
+class UsbDevice:
+    path: str                       # sysfs name, e.g. "1-1.4" (bus 1, root port 1, hub port 4)
+    bus: int
+    device: int
+    vendor_id: str                  # four lower-case hex digits
+    product_id: str
+    manufacturer: str = ""          # string descriptors as reported by the device itself
+    product: str = ""
+    serial: str = ""
+    vendor_name: str = ""           # names from usb.ids
+    product_name: str = ""
+    speed_mbps: str = ""
+    device_class: int = 0
+    interface_classes: List[int] = field(default_factory=list)
+    drivers: List[str] = field(default_factory=list)
+    removable: str = ""             # removable, fixed or unknown (from the hub port)
+    connected_at: Optional[float] = None    # sysfs directory creation time; approximately when it was enumerated
+
+    @property
+    def classes(self) -> List[str]:
+        codes = self.interface_classes or [self.device_class]
+        return list(dict.fromkeys(USB_CLASSES.get(code, f"0x{code:02x}") for code in codes if code))
+
+    @property
+    def is_hub(self) -> bool:
+        return self.device_class == 0x09
+
+    @property
+    def display_name(self) -> str:
+        return self.product or self.product_name or f"{self.vendor_id}:{self.product_id}"
+
+
+# --- usb.ids lookup table ---
+# File layout (little-endian):
+#   header   "IRISUSB1", vendor count (I), product count (I)
+#   vendors  count x (vendor id H, pad H, name offset I), sorted by vendor id
+#   products count x (vendor << 16 | product I, name offset I), sorted by key
+#   names    uint16 length-prefixed UTF-8 strings
+_MAGIC = b"IRISUSB1"
+_HEADER = struct.Struct("<8sII")
+_VENDOR = struct.Struct("<HHI")
+_PRODUCT = struct.Struct("<II")
+_LENGTH = struct.Struct("<H")
+
+
+def parse_usb_ids(text: str) -> Tuple[Dict[int, str], Dict[int, str]]:
+    """Vendor id -> name and (vendor << 16 | product) -> name from usb.ids; class and other sections are skipped."""
+    vendors: Dict[int, str] = {}
+    products: Dict[int, str] = {}
+    vendor = None
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("\t\t"):
+            continue                            # interface names
+        if line.startswith("\t"):
+            if vendor is not None and line[5:7] == "  ":
+                try:
+                    products[vendor << 16 | int(line[1:5], 16)] = line[7:].strip()
+                except ValueError:
+                    pass
+            continue
+        if line[4:6] != "  ":
+            vendor = None                       # "C 00  ..." device classes and later sections
+            if line.startswith("C "):
+                break
+            continue
+        try:
+            vendor = int(line[:4], 16)
+        except ValueError:
+            vendor = None
+            continue
+        vendors[vendor] = line[6:].strip()
+    return vendors, products
+
+
+def compile_usb_ids(text: str) -> bytes:
+    vendors, products = parse_usb_ids(text)
+    names = bytearray()
+    offsets: Dict[str, int] = {}
+
+    def intern(name: str) -> int:
+        if name not in offsets:
+            encoded = name.encode("utf-8")[:0xffff]
+            offsets[name] = len(names)
+            names.extend(_LENGTH.pack(len(encoded)) + encoded)
+        return offsets[name]
+    vendor_table = b"".join(_VENDOR.pack(vid, 0, intern(name)) for vid, name in sorted(vendors.items()))
+    product_table = b"".join(_PRODUCT.pack(key, intern(name)) for key, name in sorted(products.items()))
+    return _HEADER.pack(_MAGIC, len(vendors), len(products)) + vendor_table + product_table + bytes(names)
+
+
+class UsbIds:
+    """Binary-search lookups over a compiled usb.ids table held in an mmap (or bytes)."""
+
+    def __init__(self, data: Union[bytes, mmap.mmap]):
+        magic, self._vendor_count, self._product_count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError("not a compiled usb.ids table")
+        self._data = data
+        self._vendors = _HEADER.size
+        self._products = self._vendors + self._vendor_count * _VENDOR.size
+        self._names = self._products + self._product_count * _PRODUCT.size
+
+    def _search(self, base: int, count: int, record: struct.Struct, key: int) -> Optional[int]:
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            fields = record.unpack_from(self._data, base + mid * record.size)
+            if fields[0] < key:
+                lo = mid + 1
+            elif fields[0] > key:
+                hi = mid
+            else:
+                return fields[-1]
+        return None
+
+    def _name(self, offset: Optional[int]) -> str:
+        if offset is None:
+            return ""
+        start = self._names + offset
+        (length,) = _LENGTH.unpack_from(self._data, start)
+        return bytes(self._data[start + _LENGTH.size:start + _LENGTH.size + length]).decode("utf-8", errors="replace")
+
+    def vendor(self, vendor_id: int) -> str:
+        return self._name(self._search(self._vendors, self._vendor_count, _VENDOR, vendor_id))
+
+    def product(self, vendor_id: int, product_id: int) -> str:
+        return self._name(self._search(self._products, self._product_count, _PRODUCT, vendor_id << 16 | product_id))
+
+
+def load_usb_ids(source: str, cache_dir: Optional[str] = None) -> Optional[UsbIds]:
+    """
+    Returns a lookup for a usb.ids file, compiling it into the cache directory
+    the first time and memory-mapping the compiled table afterwards. The table
+    is keyed by the source's digest (hashing it is a few milliseconds; parsing
+    it is tens), so copies of the same file share one table. Falls back to an
+    in-memory table when the cache directory is not writable.
+    """
+    try:
+        with open(source, "rb") as f:
+            raw = f.read()
+    except OSError:
+        return None
+    compiled = os.path.join(cache_dir or default_cache_dir(), f"usb-ids-{hashlib.sha256(raw).hexdigest()[:24]}.bin")
+    if not os.path.exists(compiled):
+        table = compile_usb_ids(raw.decode("utf-8", errors="replace"))
+        try:
+            os.makedirs(os.path.dirname(compiled), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(compiled), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(table)
+            os.replace(tmp, compiled)
+        except OSError:
+            return UsbIds(table)
+    with open(compiled, "rb") as f:
+        return UsbIds(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+# --- sysfs walk ---
+def _attribute(name: str, dir_fd: int) -> str:
+    # Raw reads relative to the device directory: sysfs attributes are tiny, and
+    # path resolution plus a text-mode file object cost more than the read itself
+    try:
+        fd = os.open(name, os.O_RDONLY, dir_fd=dir_fd)
+    except OSError:
+        return ""
+    try:
+        return os.read(fd, 4096).decode("utf-8", errors="replace").strip()
+    except OSError:
+        return ""
+    finally:
+        os.close(fd)
+
+
+def _hex(text: str) -> int:
+    try:
+        return int(text, 16)
+    except ValueError:
+        return 0
+
+
+def read_usb_devices(devices_dir: str, ids: Optional[UsbIds] = None) -> List[UsbDevice]:
+    """
+    Every USB device under /sys/bus/usb/devices. Interface entries ("1-1.4:1.0")
+    are folded into their device; root hubs ("usb1") are included as hubs.
+    """
+    with os.scandir(devices_dir) as entries:
+        names = sorted(entry.name for entry in entries)
+    interfaces: Dict[str, List[str]] = {}
+    for name in names:
+        if ":" in name:
+            interfaces.setdefault(name.split(":", 1)[0], []).append(name)
+    devices = []
+    for name in names:
+        if ":" in name:
+            continue
+        base = f"{devices_dir}/{name}"
+        try:
+            dir_fd = os.open(base, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        except OSError:
+            continue
+        try:
+            vendor_id = _attribute("idVendor", dir_fd)
+            if not vendor_id:
+                continue
+            device = UsbDevice(name, int(_attribute("busnum", dir_fd) or 0), int(_attribute("devnum", dir_fd) or 0),
+                               vendor_id.lower(), _attribute("idProduct", dir_fd).lower(),
+                               manufacturer=_attribute("manufacturer", dir_fd), product=_attribute("product", dir_fd),
+                               serial=_attribute("serial", dir_fd), speed_mbps=_attribute("speed", dir_fd),
+                               device_class=_hex(_attribute("bDeviceClass", dir_fd)),
+                               removable=_attribute("removable", dir_fd), connected_at=os.fstat(dir_fd).st_mtime)
+        finally:
+            os.close(dir_fd)
+        for interface in interfaces.get(name, []):
+            interface_dir = f"{devices_dir}/{interface}"
+            try:
+                dir_fd = os.open(interface_dir, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+            except OSError:
+                continue
+            try:
+                device.interface_classes.append(_hex(_attribute("bInterfaceClass", dir_fd)))
+                device.drivers.append(os.path.basename(os.readlink("driver", dir_fd=dir_fd)))
+            except OSError:
+                pass                            # unbound interface
+            finally:
+                os.close(dir_fd)
+        device.drivers = list(dict.fromkeys(device.drivers))
+        if ids is not None:
+            device.vendor_name = ids.vendor(_hex(device.vendor_id))
+            device.product_name = ids.product(_hex(device.vendor_id), _hex(device.product_id))
+        devices.append(device)
+    return devices
+
+
+def collect_usb_devices(host_path: Callable[[str], str] = lambda path: path,
+                        cache_dir: Optional[str] = None) -> Tuple[List[UsbDevice], str]:
+    """Devices plus the usb.ids file used for naming ("" when none was found, on the host or locally)."""
+    source = next((host_path(path) for path in USB_IDS_PATHS if os.path.isfile(host_path(path))), "")
+    if not source:
+        source = next((path for path in USB_IDS_PATHS if os.path.isfile(path)), "")
+    ids = load_usb_ids(source, cache_dir) if source else None
+    return read_usb_devices(host_path(SYS_USB_DEVICES), ids), source
@@ -0,0 +1,245 @@
+import datetime
+import hashlib
+import json
+import os
+import socket
+import sys
+import threading
+import zipfile
+from dataclasses import dataclass, asdict
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from .evidence import CHUNK_SIZE, EvidenceManifest, HashingWriter, KIND_RAW_CAPTURE
+
+# --- Archive layout ---
+# A single deflate-compressed zip:
+#   manifest.json        host, platform and timing metadata for the run
+#   index.jsonl          one CommandRecord per executed command, in execution order
+#   blobs/<sha256>       stdout/stderr payloads, stored once per unique content
+MANIFEST_NAME = "manifest.json"
+INDEX_NAME = "index.jsonl"
+BLOB_PREFIX = "blobs/"
+ARCHIVE_VERSION = 1
+
+
+@dataclass
+class CommandRecord:
+    command: str
+    check_shell: bool
+    returncode: int
+    started: str
+    duration_s: float
+    stdout_sha256: str
+    stderr_sha256: str
+
+
+def _command_key(command: Any) -> str:
+    return " ".join(command) if isinstance(command, list) else str(command)
+
+
+class CommandArchive:
+    """
+    Content-addressed record/replay store for raw command output.
+
+    In "record" mode every command run through `Helpers.run_command` is appended
+    with its exit code, start time, duration, stdout and stderr. In "replay" mode
+    the archive answers the same commands, in the same order, so every report can
+    be regenerated offline with newer parsers.
+    """
+
+    def __init__(self, path: str, mode: str = "record", evidence: Optional[EvidenceManifest] = None,
+                 package: Optional["EvidencePackage"] = None):
+        """
+        With a `package` (record mode only), `path` is a directory inside the
+        evidence package and blobs, index and manifest are streamed into it as
+        members instead of into a separate zip.
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown archive mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._records: List[CommandRecord] = []
+        self._blobs: set = set()
+        self.evidence = evidence
+        self.package = package
+        self._prefix = ""
+        if mode == "record":
+            if package is not None:
+                self._zip = package   # members go straight into the package; _zip only marks the archive open
+            else:
+                # The archive is hashed as it is written; the non-seekable writer makes zipfile stream entries
+                self._writer = HashingWriter(open(path, "wb"))
+                self._zip = zipfile.ZipFile(self._writer, "w", compression=zipfile.ZIP_DEFLATED)
+            self.manifest = {
+                "version": ARCHIVE_VERSION,
+                "hostname": socket.gethostname(),
+                "platform": sys.platform,
+                "started": datetime.datetime.now().isoformat(),
+            }
+        else:
+            self._zip = zipfile.ZipFile(path, "r")
+            self._prefix = self._find_prefix(self._zip.namelist())
+            self.manifest = json.loads(self._zip.read(self._prefix + MANIFEST_NAME))
+            self._replay_queue: Dict[str, List[CommandRecord]] = {}
+            for line in self._zip.read(self._prefix + INDEX_NAME).decode("utf-8").splitlines():
+                if line.strip():
+                    record = CommandRecord(**json.loads(line))
+                    self._records.append(record)
+                    self._replay_queue.setdefault(record.command, []).append(record)
+
+    @staticmethod
+    def _find_prefix(names: List[str]) -> str:
+        """Locates the archive root: the zip itself, or a directory of a zip evidence package."""
+        if INDEX_NAME in names:
+            return ""
+        for name in sorted(names, key=len):
+            if name.endswith("/" + INDEX_NAME):
+                return name[:-len(INDEX_NAME)]
+        raise ValueError(f"No {INDEX_NAME} found: not a command archive")
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @property
+    def platform(self) -> str:
+        return self.manifest.get("platform", sys.platform)
+
+    @property
+    def records(self) -> List[CommandRecord]:
+        return list(self._records)
+
+    # --- Recording ---
+    def _put_blob(self, data: str) -> str:
+        payload = data.encode("utf-8", errors="surrogateescape")
+        digest = hashlib.sha256(payload).hexdigest()
+        if digest not in self._blobs:
+            self._put(BLOB_PREFIX + digest, payload)
+            self._blobs.add(digest)
+        return digest
+
+    def _put(self, name: str, payload: bytes):
+        if self.package is not None:
+            self.package.add_bytes(f"{self.path}/{name}", payload)
+        else:
+            self._zip.writestr(name, payload)
+
+    def _put_blob_file(self, fileobj: BinaryIO) -> str:
+        """Stores a blob read from a file in CHUNK_SIZE pieces: hashed in one pass, copied in a second."""
+        hasher, size = hashlib.sha256(), 0
+        for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+            size += len(chunk)
+        digest = hasher.hexdigest()
+        if digest not in self._blobs:
+            fileobj.seek(0)
+            if self.package is not None:
+                self.package.add_stream(f"{self.path}/{BLOB_PREFIX}{digest}", fileobj, size)
+            else:
+                with self._zip.open(BLOB_PREFIX + digest, "w", force_zip64=size >= zipfile.ZIP64_LIMIT) as member:
+                    for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+                        member.write(chunk)
+            self._blobs.add(digest)
+        return digest
+
+    def record_stream(self, command: Any, check_shell: bool, returncode: int, stdout: BinaryIO, stderr: str,
+                      started: datetime.datetime, duration_s: float):
+        """Like record(), for output that was streamed: `stdout` is a file holding it, read from its start."""
+        with self._lock:
+            stdout.seek(0)
+            self._records.append(CommandRecord(
+                command=_command_key(command),
+                check_shell=check_shell,
+                returncode=returncode,
+                started=started.isoformat(),
+                duration_s=round(duration_s, 6),
+                stdout_sha256=self._put_blob_file(stdout),
+                stderr_sha256=self._put_blob(stderr or ""),
+            ))
+
+    def record(self, command: Any, check_shell: bool, returncode: int, stdout: str, stderr: str,
+               started: datetime.datetime, duration_s: float):
+        """Stores one command execution. Identical outputs share a single blob."""
+        with self._lock:
+            self._records.append(CommandRecord(
+                command=_command_key(command),
+                check_shell=check_shell,
+                returncode=returncode,
+                started=started.isoformat(),
+                duration_s=round(duration_s, 6),
+                stdout_sha256=self._put_blob(stdout or ""),
+                stderr_sha256=self._put_blob(stderr or ""),
+            ))
+
+    # --- Replay ---
+    def _get_blob(self, digest: str) -> str:
+        return self._zip.read(self._prefix + BLOB_PREFIX + digest).decode("utf-8", errors="surrogateescape")
+
+    def replay(self, command: Any) -> Optional[Dict[str, Any]]:
+        """
+        Returns {"returncode", "stdout", "stderr"} for the next recorded run of a
+        command, or None if the command was never recorded. Repeated commands are
+        answered in recorded order; once exhausted, the last run is reused.
+        """
+        with self._lock:
+            queue = self._replay_queue.get(_command_key(command))
+            if not queue:
+                return None
+            record = queue.pop(0) if len(queue) > 1 else queue[0]
+            return {
+                "returncode": record.returncode,
+                "stdout": self._get_blob(record.stdout_sha256),
+                "stderr": self._get_blob(record.stderr_sha256),
+            }
+
+    def close(self):
+        with self._lock:
+            if self._zip is None:
+                return
+            if self.mode == "record":
+                self.manifest["finished"] = datetime.datetime.now().isoformat()
+                self.manifest["commands"] = len(self._records)
+                self.manifest["unique_blobs"] = len(self._blobs)
+                index = "".join(json.dumps(asdict(r)) + "\n" for r in self._records).encode("utf-8")
+                manifest = json.dumps(self.manifest, indent=2).encode("utf-8")
+                if self.package is not None:
+                    # Blobs are content-addressed by their SHA-256, so hashing the index covers them too
+                    for name, payload in ((INDEX_NAME, index), (MANIFEST_NAME, manifest)):
+                        if self.evidence is not None:
+                            self.evidence.write_artifact(os.path.join(self.evidence.output_dir, self.path, name),
+                                                         payload, KIND_RAW_CAPTURE)
+                        else:
+                            self._put(name, payload)
+                    self._zip = None
+                    return
+                self._zip.writestr(INDEX_NAME, index)
+                self._zip.writestr(MANIFEST_NAME, manifest)
+            self._zip.close()
+            self._zip = None
+            if self.mode == "record":
+                self._writer.close()
+                if self.evidence is not None:
+                    self.evidence.add(self.path, KIND_RAW_CAPTURE, self._writer.sha256, self._writer.size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Lists the commands held in an archive, e.g. `python -m IRIS.command_archive host1.zip`."""
+    import argparse
+    parser = argparse.ArgumentParser(description="List the commands recorded in an IRIS command archive.")
+    parser.add_argument("archive")
+    args = parser.parse_args(argv)
+    with CommandArchive(args.archive, mode="replay") as archive:
+        print(json.dumps(archive.manifest, indent=2))
+        for r in archive.records:
+            print(f"{r.started}  rc={r.returncode:<3} {r.duration_s:>9.3f}s  {r.command}")
+
+
+if __name__ == "__main__":
+    main()
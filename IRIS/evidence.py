@@ -0,0 +1,317 @@
+import concurrent.futures
+import datetime
+import hashlib
+import io
+import json
+import os
+import socket
+import threading
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from .log_pipeline import current_report
+
+# --- Evidence hashing & chain of custody ---
+# Every artifact IRIS writes or collects is hashed as it is written (SHA-256
+# over memoryview chunks, never a second read) and recorded in a manifest
+# that is emitted at the end of the run. Until then, a progress journal
+# records each report as it finishes, with the hashes of what it wrote, so an
+# interrupted run still documents the evidence it produced.
+
+CHUNK_SIZE = 1024 * 1024
+MANIFEST_NAME = "evidence_manifest.json"
+MANIFEST_FORMAT = "iris-evidence-manifest/1"
+PROGRESS_NAME = "collection_progress.jsonl"
+COLLECTOR = "IRIS Incident Response Toolkit v3.2"
+
+KIND_REPORT = "report"
+KIND_RAW_CAPTURE = "raw_capture"
+KIND_COLLECTED_FILE = "collected_file"
+KIND_LOG = "log"
+
+
+def _utc_now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="milliseconds")
+
+
+class HashingWriter(io.RawIOBase):
+    """
+    Write-only, non-seekable file wrapper that updates SHA-256 and size as bytes
+    pass through. Being non-seekable also makes zipfile stream entries with data
+    descriptors instead of seeking back, so archives can be hashed while written.
+    """
+
+    def __init__(self, fp):
+        self._fp = fp
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def tell(self) -> int:
+        return self.size
+
+    def write(self, data) -> int:
+        view = memoryview(data).cast("B")
+        for offset in range(0, len(view), CHUNK_SIZE):
+            chunk = view[offset:offset + CHUNK_SIZE]
+            self._hash.update(chunk)
+            self._fp.write(chunk)
+        self.size += len(view)
+        return len(view)
+
+    def flush(self):
+        self._fp.flush()
+
+    def close(self):
+        if not self.closed:
+            super().close()
+            self._fp.close()
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+
+class HashingReader(io.RawIOBase):
+    """
+    Read-only wrapper that hashes bytes as they are consumed, for writers that
+    pull from a file object (e.g. tarfile.addfile). Reads stop after `limit` bytes.
+    """
+
+    def __init__(self, fp, limit: Optional[int] = None):
+        self._fp = fp
+        self._hash = hashlib.sha256()
+        self._limit = limit
+        self.size = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        if self._limit is not None:
+            view = view[:max(0, self._limit - self.size)]
+        if not len(view):
+            return 0
+        n = self._fp.readinto(view) or 0
+        self._hash.update(view[:n])
+        self.size += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            super().close()
+            self._fp.close()
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+
+def hash_file(path: str) -> Dict[str, Any]:
+    """Hashes an existing file with readinto() over a reused buffer. Returns {"sha256", "size"}."""
+    digest = hashlib.sha256()
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    size = 0
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+            size += n
+    return {"sha256": digest.hexdigest(), "size": size}
+
+
+def copy_and_hash(src: str, dst: str) -> Dict[str, Any]:
+    """Copies src to dst in one read pass, hashing the bytes on the way through."""
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    with open(src, "rb", buffering=0) as fin, HashingWriter(open(dst, "wb")) as fout:
+        while True:
+            n = fin.readinto(buffer)
+            if not n:
+                break
+            fout.write(view[:n])
+        return {"sha256": fout.sha256, "size": fout.size}
+
+
+@dataclass
+class EvidenceEntry:
+    path: str
+    kind: str
+    sha256: str
+    size: int
+    written_at: str
+    report: Optional[str] = None
+    source: Optional[str] = None
+
+
+class EvidenceManifest:
+    """
+    Thread-safe chain-of-custody record for one run's output directory. With a
+    `package` (see evidence_package.EvidencePackage), artifacts are streamed into
+    that archive under their output-directory-relative names instead of to disk.
+    """
+
+    def __init__(self, output_dir: str, hostname: Optional[str] = None, package: Any = None):
+        self.output_dir = output_dir
+        self.hostname = hostname or socket.gethostname()
+        self.package = package
+        self.run_started = _utc_now()
+        self._entries: Dict[str, EvidenceEntry] = {}
+        self._lock = threading.Lock()
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.output_dir).replace(os.sep, "/")
+
+    def add(self, path: str, kind: str, sha256: str, size: int, source: Optional[str] = None,
+            report: Optional[str] = None) -> EvidenceEntry:
+        entry = EvidenceEntry(path=self._relative(path), kind=kind, sha256=sha256, size=size,
+                              written_at=_utc_now(), report=report or current_report.get(), source=source)
+        with self._lock:
+            self._entries[entry.path] = entry
+        return entry
+
+    @property
+    def entries(self) -> List[EvidenceEntry]:
+        with self._lock:
+            return sorted(self._entries.values(), key=lambda e: e.path)
+
+    # --- Producing artifacts ---
+    def write_artifact(self, path: str, data: Union[str, bytes], kind: str = KIND_REPORT) -> EvidenceEntry:
+        """Writes data to path, hashing it as it is written, and records it."""
+        payload = data.encode("utf-8") if isinstance(data, str) else data
+        if self.package is not None:
+            result = self.package.add_bytes(self._relative(path), payload)
+            return self.add(path, kind, result["sha256"], result["size"])
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with HashingWriter(open(path, "wb")) as writer:
+            writer.write(payload)
+        return self.add(path, kind, writer.sha256, writer.size)
+
+    def open_artifact(self, path: str) -> HashingWriter:
+        """Opens a hashing writer for incremental output; pass it to close_artifact() when done."""
+        if self.package is not None:
+            writer = self.package.open_member(self._relative(path))
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            writer = HashingWriter(open(path, "wb"))
+        writer.name = path
+        return writer
+
+    def close_artifact(self, writer: HashingWriter, kind: str, source: Optional[str] = None) -> EvidenceEntry:
+        writer.close()
+        return self.add(writer.name, kind, writer.sha256, writer.size, source=source)
+
+    def store_file(self, src: str, dst: str, kind: str, source: Optional[str] = None) -> EvidenceEntry:
+        """Copies src to dst inside the output directory (or package), hashing during the copy."""
+        if self.package is not None:
+            with open(src, "rb", buffering=0) as f:
+                result = self.package.add_stream(self._relative(dst), f, os.fstat(f.fileno()).st_size)
+        else:
+            result = copy_and_hash(src, dst)
+        return self.add(dst, kind, result["sha256"], result["size"], source=source)
+
+    def collect_file(self, src: str, dest_subdir: str = "collected", shown: Optional[str] = None) -> EvidenceEntry:
+        """
+        Copies a file from the suspect host into the output directory (or package).
+        `shown` is its path on the suspect host when src is read from elsewhere
+        (a mounted image or the mock tree); it names the copy and its source.
+        """
+        host = shown or os.path.abspath(src)
+        dst = os.path.join(self.output_dir, dest_subdir, host.lstrip("/\\").replace(":", ""))
+        return self.store_file(src, dst, KIND_COLLECTED_FILE, source=host)
+
+    def collect_files(self, sources: Iterable[str], dest_subdir: str = "collected", jobs: int = 4,
+                      shown: Optional[Callable[[str], str]] = None) -> List[EvidenceEntry]:
+        """
+        Copies and hashes many files in parallel. hashlib and file I/O release
+        the GIL on large buffers, so threads scale across cores. Files that can
+        no longer be read (deleted, permission denied) are skipped.
+        """
+        report = current_report.get()
+        def collect(src):
+            try:
+                entry = self.collect_file(src, dest_subdir, shown(src) if shown else None)
+            except OSError:
+                return None
+            entry.report = entry.report or report
+            return entry
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+            return [entry for entry in executor.map(collect, sources) if entry is not None]
+
+    # --- Manifest ---
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": MANIFEST_FORMAT,
+            "collector": COLLECTOR,
+            "hostname": self.hostname,
+            "run_started": self.run_started,
+            "run_finished": _utc_now(),
+            "hash_algorithm": "sha256",
+            "artifacts": [asdict(e) for e in self.entries],
+        }
+
+    def write_manifest(self, path: Optional[str] = None) -> str:
+        """
+        Writes the manifest as canonical JSON (sorted keys, fixed separators) so
+        its bytes are stable for detached signing, plus a sha256sum-style
+        `<manifest>.sha256` file. Returns the manifest path.
+        """
+        path = path or os.path.join(self.output_dir, MANIFEST_NAME)
+        payload = json.dumps(self.to_dict(), sort_keys=True, indent=2, separators=(",", ": ")).encode("utf-8") + b"\n"
+        checksum = f"{hashlib.sha256(payload).hexdigest()}  {os.path.basename(path)}\n".encode("utf-8")
+        if self.package is not None:
+            # Package members are write-once, so the manifest goes in exactly once, at the end of the run
+            self.package.add_bytes(self._relative(path), payload)
+            self.package.add_bytes(self._relative(path) + ".sha256", checksum)
+            return path
+        with open(path, "wb") as f:
+            f.write(payload)
+        with open(path + ".sha256", "wb") as f:
+            f.write(checksum)
+        return path
+
+
+class ProgressJournal:
+    """
+    Append-only JSON lines, one per finished report, each fsync'd before the
+    next report's result is recorded. Lists the artifacts the report wrote
+    with their hashes, so it stands in for the manifest if the run never ends.
+    """
+
+    def __init__(self, path: str, manifest: EvidenceManifest):
+        self.path = path
+        self.manifest = manifest
+        self._file = None
+        self._lock = threading.Lock()
+
+    def record(self, report: str, status: str, duration_s: float, detail: str = ""):
+        artifacts = [{"path": e.path, "kind": e.kind, "sha256": e.sha256, "size": e.size}
+                     for e in self.manifest.entries if e.report == report]
+        line = json.dumps({"report": report, "status": status, "duration_s": round(duration_s, 3), "detail": detail,
+                           "finished_at": _utc_now(), "artifacts": artifacts}, sort_keys=True) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "wb")     # one journal per run
+            self._file.write(line.encode("utf-8"))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> bool:
+        """Closes the journal; False when nothing was ever recorded (and no file was written)."""
+        with self._lock:
+            if self._file is None:
+                return False
+            self._file.close()
+            self._file = None
+            return True
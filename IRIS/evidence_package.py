@@ -0,0 +1,411 @@
+import gzip
+import io
+import lzma
+import os
+import struct
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+import zlib
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from .evidence import CHUNK_SIZE, HashingReader, HashingWriter
+
+# --- Streaming evidence package ---
+# Writes reports, raw captures and collected files straight into one compressed
+# archive as they are produced, instead of a loose output directory that is
+# zipped afterwards. Members are streamed in CHUNK_SIZE pieces, so memory stays
+# bounded regardless of artifact size, and the file is flushed to disk after
+# every member:
+#   .zip              deflate; local headers carry final sizes, so salvage()
+#                     recovers every completed member if the run dies before close
+#   .tar.gz / .tgz    gzip is sync-flushed after each member; a truncated file
+#                     still reads member by member up to the crash
+#   .tar.xz / .txz    smallest output, but the lzma module cannot flush mid-stream,
+#                     so an interrupted .tar.xz is not recoverable
+
+FORMAT_ZIP = "zip"
+FORMAT_TAR_GZ = "tar.gz"
+FORMAT_TAR_XZ = "tar.xz"
+_SUFFIXES = {
+    ".zip": FORMAT_ZIP,
+    ".tar.gz": FORMAT_TAR_GZ,
+    ".tgz": FORMAT_TAR_GZ,
+    ".tar.xz": FORMAT_TAR_XZ,
+    ".txz": FORMAT_TAR_XZ,
+}
+# Incremental members (unknown size up front) of a zip package stream straight
+# into the archive, one at a time. Members written while one is streaming, and
+# every incremental tar member (tar headers need the size up front), are
+# buffered in memory up to SPOOL_SIZE, then spilled to a temporary file beside
+# the package and copied in once the archive is free. A spilled member briefly
+# takes twice its size on the package's disk; nothing is written to the host's
+# temporary directory. The package is only locked while a member is copied in,
+# so a long streaming member never blocks other reports, nor its own writes.
+SPOOL_SIZE = 8 * CHUNK_SIZE
+
+
+def package_format(path: str) -> str:
+    """Infers the package format from the file name, e.g. host1.tar.gz -> "tar.gz"."""
+    lower = path.lower()
+    for suffix, fmt in _SUFFIXES.items():
+        if lower.endswith(suffix):
+            return fmt
+    raise ValueError(f"Unsupported evidence package type: {path} (use .zip, .tar.gz or .tar.xz)")
+
+
+def _member_name(name: str) -> str:
+    return name.replace(os.sep, "/").lstrip("/")
+
+
+class _StreamedZipMember(io.RawIOBase):
+    """Writes an incremental zip member straight into the archive; other members queue until it is closed."""
+
+    def __init__(self, package: "EvidencePackage", handle: BinaryIO):
+        self._package = package
+        self._handle = handle
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        return self._handle.write(data)
+
+    def close(self):
+        if not self.closed:
+            super().close()
+            self._package._finish_streamed(self._handle)
+
+
+class _SpooledMemberWriter(io.RawIOBase):
+    """Buffers an incremental member (spilling to disk past SPOOL_SIZE) and adds it to the package on close."""
+
+    def __init__(self, package: "EvidencePackage", name: str):
+        self._package = package
+        self._name = name
+        self._spool = package.spool()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        return self._spool.write(data)
+
+    def close(self):
+        if not self.closed:
+            super().close()
+            try:
+                size = self._spool.tell()
+                self._spool.seek(0)
+                self._package._add_reserved(self._name, self._spool, size)
+            finally:
+                self._spool.close()
+
+
+class EvidencePackage:
+    """
+    A single compressed archive that artifacts are streamed into. Thread-safe:
+    members are written one at a time, in the order they are completed (a
+    streaming zip member in the order it was opened).
+    """
+
+    def __init__(self, path: str, fmt: Optional[str] = None):
+        self.path = path
+        self.format = fmt or package_format(path)
+        self._lock = threading.Lock()
+        self._names: set = set()
+        self._streaming = None      # the zip member being streamed in, if any
+        self._pending: List[Tuple[str, BinaryIO, int]] = []    # spooled members waiting for it
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._fp = open(path, "wb")
+        self._compressor = None
+        if self.format == FORMAT_ZIP:
+            self._archive = zipfile.ZipFile(self._fp, "w", compression=zipfile.ZIP_DEFLATED)
+        elif self.format == FORMAT_TAR_GZ:
+            self._compressor = gzip.GzipFile(fileobj=self._fp, mode="wb")
+            self._archive = tarfile.open(fileobj=self._compressor, mode="w", format=tarfile.PAX_FORMAT)
+        elif self.format == FORMAT_TAR_XZ:
+            self._compressor = lzma.LZMAFile(self._fp, mode="wb")
+            self._archive = tarfile.open(fileobj=self._compressor, mode="w", format=tarfile.PAX_FORMAT)
+        else:
+            raise ValueError(f"Unknown evidence package format: {fmt}")
+
+    @property
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._names)
+
+    # --- Locking & flushing ---
+    def _reserve(self, name: str) -> str:
+        """Claims a member name, so duplicates fail when they are opened rather than when they are written."""
+        name = _member_name(name)
+        with self._lock:
+            if self._archive is None:
+                raise ValueError("Evidence package is closed")
+            if name in self._names:
+                raise ValueError(f"Duplicate evidence package member: {name}")
+            self._names.add(name)
+        return name
+
+    def _sync(self):
+        """Pushes everything written so far to disk so an interrupted run leaves a readable package."""
+        if self.format == FORMAT_TAR_GZ:
+            self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        self._fp.flush()
+        try:
+            os.fsync(self._fp.fileno())
+        except OSError:
+            pass
+
+    def _add_tar_member(self, name: str, fileobj: BinaryIO, size: int):
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        self._archive.addfile(info, fileobj)
+        self._sync()
+
+    def _write_member(self, name: str, fileobj: BinaryIO, size: int):
+        if self.format == FORMAT_ZIP:
+            with self._archive.open(name, "w", force_zip64=size >= zipfile.ZIP64_LIMIT) as member:
+                while True:
+                    chunk = fileobj.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    member.write(chunk)
+            self._sync()
+        else:
+            self._add_tar_member(name, fileobj, size)
+
+    def _drain(self):
+        """Copies in the members spooled while a zip member was streaming. Called with the lock held."""
+        while self._pending:
+            name, spool, size = self._pending.pop(0)
+            with spool:
+                self._write_member(name, spool, size)
+
+    def _add_reserved(self, name: str, fileobj: BinaryIO, size: int):
+        """
+        Copies `size` bytes into the member `name`, already reserved, holding
+        the lock only for the copy. While a zip member is streaming, the bytes
+        are spooled and queued behind it instead.
+        """
+        with self._lock:
+            if self._archive is None:
+                raise ValueError("Evidence package is closed")
+            if self._streaming is None:
+                self._write_member(name, fileobj, size)
+                return
+        spool = self.spool()
+        try:
+            while True:
+                chunk = fileobj.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                spool.write(chunk)
+            spool.seek(0)
+            with self._lock:
+                if self._archive is None:
+                    raise ValueError("Evidence package is closed")
+                if self._streaming is not None:
+                    self._pending.append((name, spool, size))
+                    spool = None
+                else:
+                    self._write_member(name, spool, size)
+        finally:
+            if spool is not None:
+                spool.close()
+
+    def _finish_streamed(self, handle: BinaryIO):
+        with self._lock:
+            if self._streaming is not handle:
+                return      # already finished by close()
+            handle.close()
+            self._streaming = None
+            self._sync()
+            self._drain()
+
+    def spool(self) -> BinaryIO:
+        """A temporary file for a member's bytes, kept in memory up to SPOOL_SIZE and beside the package past it."""
+        return tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE, dir=os.path.dirname(os.path.abspath(self.path)),
+                                             prefix=os.path.basename(self.path) + ".")
+
+    # --- Writing members ---
+    def add_stream(self, name: str, fileobj: BinaryIO, size: int) -> Dict[str, Any]:
+        """
+        Streams exactly `size` bytes from fileobj into a new member, hashing them
+        as they are read. Returns {"sha256", "size"} of the stored bytes.
+        """
+        reader = HashingReader(fileobj, limit=size)
+        name = self._reserve(name)
+        self._add_reserved(name, reader, size)
+        if reader.size != size:
+            raise IOError(f"{name}: expected {size} bytes, read {reader.size} (file changed during collection?)")
+        return {"sha256": reader.sha256, "size": reader.size}
+
+    def add_bytes(self, name: str, data: bytes) -> Dict[str, Any]:
+        return self.add_stream(name, io.BytesIO(data), len(data))
+
+    def open_member(self, name: str) -> HashingWriter:
+        """
+        Opens a member for incremental writes of unknown length. A zip member
+        streams straight into the archive unless another one already is; other
+        members are spooled and added when the returned writer is closed. A
+        spooled member that is never closed is left out of the package; a
+        streaming one keeps what was written when the package is closed.
+        """
+        name = self._reserve(name)
+        writer = None
+        if self.format == FORMAT_ZIP:
+            with self._lock:
+                if self._streaming is None:
+                    self._streaming = self._archive.open(name, "w", force_zip64=True)
+                    writer = HashingWriter(_StreamedZipMember(self, self._streaming))
+        if writer is None:
+            writer = HashingWriter(_SpooledMemberWriter(self, name))
+        writer.name = name
+        return writer
+
+    def close(self):
+        with self._lock:
+            if self._archive is None:
+                return
+            if self._streaming is not None:
+                self._streaming.close()
+                self._streaming = None
+            self._drain()
+            self._archive.close()
+            self._archive = None
+            if self._compressor is not None:
+                self._compressor.close()
+            self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- Recovery ---
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_NEXT_RECORD_SIGNATURES = (_LOCAL_HEADER_SIGNATURE, b"PK\x01\x02")
+_ZIP64_EXTRA_ID = 0x0001
+
+
+def _iter_zip_local_members(fp: BinaryIO):
+    """
+    Yields (name, method, crc, compressed_size) for each complete member by
+    walking local headers, leaving fp at the start of the member's data. Stops
+    at the central directory, at a truncated member, or at anything unexpected.
+    """
+    fp.seek(0, os.SEEK_END)
+    end = fp.tell()
+    fp.seek(0)
+    while True:
+        header = fp.read(_LOCAL_HEADER.size)
+        if len(header) < _LOCAL_HEADER.size:
+            return
+        (signature, _version, flags, method, _time, _date, crc,
+         compressed_size, _size, name_len, extra_len) = _LOCAL_HEADER.unpack(header)
+        if signature != _LOCAL_HEADER_SIGNATURE or flags & 0x08:
+            return
+        name = fp.read(name_len).decode("utf-8" if flags & 0x800 else "cp437")
+        extra = fp.read(extra_len)
+        if compressed_size == 0xFFFFFFFF:
+            offset = 0
+            while offset + 4 <= len(extra):
+                header_id, data_len = struct.unpack_from("<HH", extra, offset)
+                if header_id == _ZIP64_EXTRA_ID:
+                    _size, compressed_size = struct.unpack_from("<QQ", extra, offset + 4)
+                    break
+                offset += 4 + data_len
+        start = fp.tell()
+        # A member interrupted mid-write still has placeholder sizes in its local
+        # header; it is complete only if the next record (or the file end) follows it.
+        fp.seek(start + compressed_size)
+        following = fp.read(4)
+        if start + compressed_size > end or (following and following not in _NEXT_RECORD_SIGNATURES):
+            return
+        fp.seek(start)
+        yield name, method, crc, compressed_size
+        fp.seek(start + compressed_size)
+
+
+def _salvage_zip(path: str, dest: "EvidencePackage") -> List[str]:
+    recovered = []
+    with open(path, "rb") as fp:
+        for name, method, crc, compressed_size in _iter_zip_local_members(fp):
+            if method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                break
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS) if method == zipfile.ZIP_DEFLATED else None
+            remaining, running_crc = compressed_size, 0
+            # Checked before it is added: a damaged member must not reach the recovered package
+            with dest.spool() as spool:
+                try:
+                    while remaining:
+                        chunk = fp.read(min(CHUNK_SIZE, remaining))
+                        if not chunk:
+                            break
+                        remaining -= len(chunk)
+                        data = decompressor.decompress(chunk) if decompressor else chunk
+                        running_crc = zlib.crc32(data, running_crc)
+                        spool.write(data)
+                    if decompressor:
+                        tail = decompressor.flush()
+                        running_crc = zlib.crc32(tail, running_crc)
+                        spool.write(tail)
+                except zlib.error:
+                    break
+                if remaining or running_crc != crc:
+                    break   # truncated or damaged mid-member; everything before it is intact
+                size = spool.tell()
+                spool.seek(0)
+                dest.add_stream(name, spool, size)
+            recovered.append(name)
+    return recovered
+
+
+def _salvage_tar(path: str, dest: "EvidencePackage") -> List[str]:
+    recovered = []
+    try:
+        with tarfile.open(path, "r|*") as archive:
+            for info in archive:
+                if not info.isfile():
+                    continue
+                dest.add_stream(info.name, archive.extractfile(info), info.size)
+                recovered.append(info.name)
+    except (tarfile.TarError, EOFError, OSError, zlib.error, lzma.LZMAError):
+        pass    # truncated: keep what was read before the damage
+    return recovered
+
+
+def salvage(path: str, dest_path: str) -> List[str]:
+    """
+    Copies every complete member of an interrupted package into a new, valid
+    package at dest_path. Returns the recovered member names.
+    """
+    with EvidencePackage(dest_path) as dest:
+        if package_format(path) == FORMAT_ZIP:
+            return _salvage_zip(path, dest)
+        return _salvage_tar(path, dest)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Rebuilds an interrupted package, e.g. `python -m IRIS.evidence_package host1.zip host1-recovered.zip`."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Recover the complete members of an interrupted IRIS evidence package.")
+    parser.add_argument("package")
+    parser.add_argument("output")
+    args = parser.parse_args(argv)
+    recovered = salvage(args.package, args.output)
+    for name in recovered:
+        print(name)
+    print(f"{len(recovered)} members recovered -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
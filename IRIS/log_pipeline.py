@@ -0,0 +1,251 @@
+import atexit
+import contextlib
+import contextvars
+import datetime
+import hashlib
+import queue
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+# --- Levels ---
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+# Report currently running in this thread/context, attached to every record.
+current_report: contextvars.ContextVar = contextvars.ContextVar("iris_current_report", default=None)
+
+
+@contextlib.contextmanager
+def report_context(report_id: str):
+    """Tags log records emitted inside the block with `report_id`."""
+    token = current_report.set(report_id)
+    try:
+        yield
+    finally:
+        current_report.reset(token)
+
+
+def infer_level(message: str) -> int:
+    """Best-effort level for legacy log_output calls that do not pass one."""
+    head = message.lstrip()[:16].lower()
+    if head.startswith(("error", "❌", "an unexpected error")):
+        return ERROR
+    if head.startswith(("warning", "⚠️", "command not found")):
+        return WARNING
+    if head.startswith(("[mock] running", "[live] running", "[replay] running", "stdout:", "stderr:")):
+        return DEBUG
+    return INFO
+
+
+@dataclass
+class LogRecord:
+    created: float
+    level: int
+    report: Optional[str]
+    message: str
+
+
+# --- Sinks ---
+class LogSink:
+    """Receives batches of records at or above `level`; `rate_limited` sinks get repeated INFO/DEBUG lines thinned."""
+    rate_limited = False
+
+    def __init__(self, level: int = INFO):
+        self.level = level
+
+    def format(self, record: LogRecord) -> str:
+        return record.message
+
+    def write_batch(self, lines: List[str]):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ConsoleSink(LogSink):
+    rate_limited = True
+
+    def __init__(self, level: int = INFO, stream=None):
+        super().__init__(level)
+        self.stream = stream
+
+    def write_batch(self, lines: List[str]):
+        stream = self.stream or sys.stdout
+        stream.write("\n".join(lines) + "\n")
+        stream.flush()
+
+
+class FileSink(LogSink):
+    """
+    Run log with timestamps, levels and report context; everything from DEBUG up
+    by default. The log is hashed as it is written so it can join the evidence manifest.
+    """
+    def __init__(self, path: str, level: int = DEBUG):
+        super().__init__(level)
+        self.path = path
+        self._file = open(path, "wb")
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def format(self, record: LogRecord) -> str:
+        stamp = datetime.datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        return f"{stamp} {LEVEL_NAMES.get(record.level, record.level):<7} [{record.report or '-'}] {record.message}"
+
+    def write_batch(self, lines: List[str]):
+        payload = ("\n".join(lines) + "\n").encode("utf-8", errors="replace")
+        self._hash.update(payload)
+        self.size += len(payload)
+        self._file.write(payload)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+
+class CallbackSink(LogSink):
+    """Hands each batch to a callback as one string (e.g. a GUI queue drained on the UI thread)."""
+    def __init__(self, callback: Callable[[str], None], level: int = INFO):
+        super().__init__(level)
+        self.callback = callback
+
+    def write_batch(self, lines: List[str]):
+        self.callback("\n".join(lines))
+
+
+# --- Pipeline ---
+_DIGITS = re.compile(r"\d+")
+MAX_REPEAT_KEYS = 10000         # distinct message templates tracked; later ones are never suppressed
+_FLUSH = object()
+_STOP = object()
+
+
+class LogPipeline:
+    """
+    Producers (any thread) put records on an unbounded SimpleQueue and return
+    immediately. A single background thread drains the queue in batches every
+    `flush_interval` seconds, applies rate limiting and writes each batch to
+    every sink in one call.
+
+    Rate limiting: INFO and DEBUG messages that differ only in numbers (PIDs,
+    ports, counts) share a key per report and level; after `repeat_limit`
+    occurrences further ones are dropped from rate-limited sinks (the console)
+    and summarized there when the pipeline closes. Warnings, errors and every
+    record sent to the run log are never dropped.
+    """
+
+    def __init__(self, sinks: Optional[List[LogSink]] = None, flush_interval: float = 0.1,
+                 batch_size: int = 1000, repeat_limit: int = 5):
+        self.sinks = sinks if sinks is not None else [ConsoleSink()]
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.repeat_limit = repeat_limit
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._repeats: Dict[Tuple[Optional[str], int, str], int] = {}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="iris-log-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add_sink(self, sink: LogSink):
+        self.sinks.append(sink)
+
+    def log(self, message: str, level: Optional[int] = None, report: Optional[str] = None):
+        if self._closed:
+            return
+        self._queue.put(LogRecord(time.time(), level if level is not None else infer_level(message),
+                                  report if report is not None else current_report.get(), message))
+
+    def flush(self, timeout: float = 5.0):
+        """Blocks until everything logged before this call has reached the sinks."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        done.wait(timeout)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5.0)
+        for sink in self.sinks:
+            sink.close()
+
+    # --- Flusher thread ---
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch, waiters, stop = [], [], False
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, tuple) and item and item[0] is _FLUSH:
+                    waiters.append(item[1])
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._emit(batch, self._rate_limit(batch))
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                self._emit([], self._suppression_summary())
+                return
+            if len(batch) < self.batch_size:
+                # Caught up: let the next burst accumulate so it is written as one batch.
+                time.sleep(self.flush_interval)
+
+    def _rate_limit(self, batch: List[LogRecord]) -> List[LogRecord]:
+        kept = []
+        for record in batch:
+            if record.level >= WARNING:
+                kept.append(record)
+                continue
+            key = (record.report, record.level, _DIGITS.sub("#", record.message))
+            count = self._repeats.get(key)
+            if count is None and len(self._repeats) >= MAX_REPEAT_KEYS:
+                kept.append(record)
+                continue
+            count = (count or 0) + 1
+            self._repeats[key] = count
+            if count <= self.repeat_limit:
+                kept.append(record)
+        return kept
+
+    def _suppression_summary(self) -> List[LogRecord]:
+        summary = []
+        for (report, level, template), count in self._repeats.items():
+            if count > self.repeat_limit:
+                summary.append(LogRecord(time.time(), level, report,
+                                         f"(suppressed {count - self.repeat_limit} more messages like: {template})"))
+        return summary
+
+    def _emit(self, records: List[LogRecord], limited: List[LogRecord]):
+        """Writes `records` to every sink, or `limited` (rate-limited, with summaries) to rate-limited ones."""
+        for sink in self.sinks:
+            lines = [sink.format(r) for r in (limited if sink.rate_limited else records) if r.level >= sink.level]
+            if lines:
+                try:
+                    sink.write_batch(lines)
+                except Exception as e:
+                    sys.stderr.write(f"[IRIS log] sink {type(sink).__name__} failed: {e}\n")
@@ -1,5 +1,4 @@
 import os
-import sys
 
 # --- IMPORTANT: How to Run This Script ---
 # This script is designed to be run as a Python module from the directory
@@ -15,79 +14,53 @@ import sys
 # This method correctly sets up Python's module search path for packages
 # and enables imports to work.
 # Do NOT run this script directly from within the IRIS directory using its filename.
-
-# --- DEBUGGING: Print sys.path and current module name ---
-print(f"--- Debug Info (from {__file__}) ---")
-print(f"__name__: {__name__}")
-print(f"sys.path: {sys.path}")
-print("------------------------------------")
-# --- END DEBUGGING ---
+#
+# For headless/batch collection (report selection, --jobs, --no-browser,
+# --deadline, JSON summary and exit codes) use `python -m IRIS --help` instead.
 
 # Import necessary components using absolute imports from the IRIS package.
-# This explicitly references the modules within the 'IRIS' package.
+# Report modules are listed in the registry and imported only when they run,
+# so startup does not pay for psutil, plistlib and friends up front.
 from IRIS.helpers import MockAppInstance, Helpers
+from IRIS.reports.registry import default_reports
+from IRIS.runner import ORDER_VOLATILITY, run_reports
 
-# Group 1: Core System & Hardware
-from IRIS.reports.system_info.system_hardware_info import generate_system_hardware_report
-from IRIS.reports.system_info.usb_camera_bluetooth_report import generate_usb_camera_bluetooth_report
-
-# Group 2: User & Security
-from IRIS.reports.user_security.local_accounts_report import generate_local_accounts_report
-from IRIS.reports.user_security.logon_report import generate_logon_report
-from IRIS.reports.user_security.antivirus_status_report import generate_antivirus_status_report
-from IRIS.reports.user_security.web_history_report import generate_web_history_report
-
-# Group 3: Network & Connectivity
-from IRIS.reports.network.tcp_connections_report import generate_tcp_connections_report
-from IRIS.reports.network.network_config_report import generate_network_config_report
-from IRIS.reports.network.firewall_rules_report import generate_firewall_rules_report
-
-# Group 4: Running State & Software
-from IRIS.reports.process_software.running_processes_report import generate_running_processes_report
-from IRIS.reports.process_software.installed_software_report import generate_installed_software_report
-
-# Group 5: Persistence & Malicious Activity
-from IRIS.reports.persistence_malware.scheduled_tasks_report import generate_scheduled_tasks_report
-from IRIS.reports.persistence_malware.startup_items_report import generate_startup_items_report
-from IRIS.reports.persistence_malware.script_check_report import generate_script_check_report
-from IRIS.reports.persistence_malware.process_persistence_report import generate_process_persistence_report
 
-
-def run_all_diagnostics():
-    """Initializes the application and runs all diagnostic reports."""
+def run_all_diagnostics(record_path: str = None, replay_path: str = None):
+    """
+    Initializes the application and runs all diagnostic reports.
+    With record_path, every command's raw output is archived for offline re-analysis;
+    with replay_path, commands are answered from a previously recorded archive.
+    """
     app_instance = MockAppInstance()
-    helpers = Helpers()
+    archive = None
+    if replay_path or record_path:
+        from IRIS.command_archive import CommandArchive
+    if replay_path:
+        archive = CommandArchive(replay_path, mode="replay")
+        app_instance.set_hostname(archive.manifest.get("hostname", app_instance.suspect_computer_name))
+    elif record_path:
+        archive = CommandArchive(record_path, mode="record", evidence=app_instance.evidence)
+    # Recording captures real evidence, so it always runs live; replay never reaches a backend.
+    helpers = Helpers(use_mock=archive is None, archive=archive)
 
     app_instance.log_output("--- Starting Comprehensive Diagnostics Report ---")
 
-    # Group 1: Core System & Hardware
-    generate_system_hardware_report(app_instance, helpers)
-    generate_usb_camera_bluetooth_report(app_instance, helpers)
-
-    # Group 2: User & Security
-    generate_local_accounts_report(app_instance, helpers)
-    generate_logon_report(app_instance, helpers)
-    generate_antivirus_status_report(app_instance, helpers)
-    generate_web_history_report(app_instance, helpers)
-
-    # Group 3: Network & Connectivity
-    generate_tcp_connections_report(app_instance, helpers)
-    generate_network_config_report(app_instance, helpers)
-    generate_firewall_rules_report(app_instance, helpers)
-
-    # Group 4: Running State & Software
-    generate_running_processes_report(app_instance, helpers)
-    generate_installed_software_report(app_instance, helpers)
-
-    # Group 5: Persistence & Malicious Activity
-    generate_scheduled_tasks_report(app_instance, helpers)
-    generate_startup_items_report(app_instance, helpers)
-    generate_script_check_report(app_instance, helpers)
-    generate_process_persistence_report(app_instance, helpers)
+    # Most volatile evidence first; each report is journaled as it finishes in case the run is cut short
+    run_reports(default_reports(), app_instance, helpers, order=ORDER_VOLATILITY, on_result=app_instance.record_progress)
 
+    helpers.close()
     app_instance.log_output("\n--- All Diagnostic Reports Completed ---")
     app_instance.log_output(f"Reports saved to: {os.path.abspath(app_instance.report_output_directory)}")
+    if record_path and not replay_path:
+        app_instance.log_output(f"Raw command outputs archived to: {os.path.abspath(record_path)}")
+    app_instance.close()
 
 if __name__ == "__main__":
-    run_all_diagnostics()
+    import argparse
+    parser = argparse.ArgumentParser(description="Run all IRIS diagnostic reports.")
+    parser.add_argument("--record", metavar="ARCHIVE", help="run live and archive every command's raw output")
+    parser.add_argument("--replay", metavar="ARCHIVE", help="regenerate reports offline from a recorded archive")
+    args = parser.parse_args()
+    run_all_diagnostics(record_path=args.record, replay_path=args.replay)
 
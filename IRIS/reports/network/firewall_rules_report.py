@@ -1,21 +1,115 @@
-from typing import Any # ADDED: Import typing hints
+import html
+from typing import Any, List, Tuple
 
 # Import necessary components from helpers.py using relative path
 from ...helpers import MockAppInstance, Helpers
+from ...collectors.firewall import collect_ruleset, format_ranges, reachability, shadowed_rules
+from ...log_pipeline import WARNING
+
+# Ports checked for exposure even when nothing is listening on them now
+COMMON_PORTS = [("tcp", 22), ("tcp", 23), ("tcp", 80), ("tcp", 443), ("tcp", 445), ("tcp", 3389), ("tcp", 4444),
+                ("tcp", 5900), ("tcp", 3306), ("tcp", 5432), ("tcp", 6379), ("udp", 53), ("udp", 161)]
+MAX_CHAIN_ROWS = 2000
+
+
+def _listening_ports(ss_output: str) -> List[Tuple[str, int, str]]:
+    """(protocol, port, process) for every listening socket in `ss -tulpn` output."""
+    listeners = []
+    for line in ss_output.splitlines():
+        tokens = line.split()
+        states = [i for i, token in enumerate(tokens) if token in ("LISTEN", "UNCONN")]
+        if not states or len(tokens) < states[0] + 4:
+            continue
+        protocol = tokens[0] if tokens[0] in ("tcp", "udp") else "tcp"
+        port = tokens[states[0] + 3].rsplit(":", 1)[-1]
+        process = tokens[-1].split('"')[1] if tokens[-1].count('"') >= 2 else ""
+        if port.isdigit():
+            listeners.append((protocol, int(port), process))
+    return sorted(set(listeners))
+
 
 def generate_firewall_rules_report(app_instance: Any, helpers: Any, browser_preference: str = "System Default"):
-    """Generates a placeholder report for firewall rules."""
-    app_instance.log_output("\n--- Generating Firewall Rules Report (Placeholder) ---")
-    
+    """Parses the host firewall and reports which ports are reachable from anywhere, and dead rules."""
+    app_instance.log_output("\n--- Generating Firewall Rules Report ---")
+
     html_body = "<h2>Firewall Rules</h2>"
-    html_body += "<p>Firewall rules reporting is not yet implemented. This would involve querying OS-specific firewall configurations (e.g., `pfctl` on macOS, `netsh advfirewall` on Windows).</p>"
+    if not helpers.platform.startswith("linux"):
+        html_body += "<p>Firewall analysis currently covers Linux iptables and nftables rulesets. On macOS inspect `pfctl -sr`, on Windows `netsh advfirewall firewall show rule name=all`.</p>"
+        helpers.generate_report_html(app_instance, app_instance.suspect_computer_name, "Firewall_Rules_Report.html",
+                                     "Firewall Rules Report", html_body, browser_preference=browser_preference)
+        return
+
+    outputs = {command: helpers.run_command(f"sudo {command}", check_shell=True, app_instance=app_instance)
+               for command in ("iptables-save", "ip6tables-save", "nft -j list ruleset")}
+    ruleset = collect_ruleset(outputs["iptables-save"], outputs["ip6tables-save"], outputs["nft -j list ruleset"])
+    rules = ruleset.rules
+    app_instance.log_output(f"Parsed {len(rules)} firewall rules in {len(ruleset.chains)} chains.")
+
+    if not ruleset.chains:
+        html_body += "<p>No firewall rules could be read (no iptables or nftables ruleset, or insufficient privileges). With no input filter, every listening port is reachable.</p>"
+    else:
+        html_body += f"<p>{len(rules)} rules in {len(ruleset.chains)} chains, read from {', '.join(ruleset.backends)}.</p>"
+        html_body += "<h3>Input Chains</h3><table><tr><th>Family</th><th>Table</th><th>Chain</th><th>Default Policy</th><th>Rules</th></tr>"
+        for chain in ruleset.chains.values():
+            if chain.hook == "input":
+                html_body += (f"<tr><td>{chain.family}</td><td>{html.escape(chain.table)}</td><td>{html.escape(chain.name)}</td>"
+                              f"<td>{'⚠️ ' if chain.policy == 'accept' else ''}{chain.policy.upper()}</td><td>{len(chain.rules)}</td></tr>")
+        html_body += "</table>"
+
+    # --- Exposure: common ports plus whatever is listening right now ---
+    listeners = _listening_ports(helpers.run_command("ss -tulpn", check_shell=True, app_instance=app_instance))
+    processes = {(protocol, port): process for protocol, port, process in listeners}
+    html_body += "<h3>Exposure to Any Source (0.0.0.0/0)</h3>"
+    html_body += "<table><tr><th>Port</th><th>Listening</th><th>New Connections From</th><th>Possibly Also From</th><th>Allowed By</th></tr>"
+    for protocol, port in sorted(set(COMMON_PORTS) | set(processes)):
+        result = reachability(ruleset, protocol, port)
+        listening = (protocol, port) in processes
+        if not (result.reachable or result.possible or listening):
+            continue
+        exposed = sum(hi - lo + 1 for lo, hi in result.accepted) >= 2 ** 31
+        flag = "🚨 " if exposed and listening else ""
+        allowed = "; ".join(html.escape(f"{r.chain}#{r.position}: {r.text}") for r in result.decided_by[:3]) or "default policy"
+        html_body += (f"<tr><td>{flag}{protocol}/{port}</td><td>{html.escape(processes.get((protocol, port), '')) or ('yes' if listening else 'no')}</td>"
+                      f"<td>{format_ranges(result.accepted, result.version) if result.reachable else 'blocked'}"
+                      f"{' (interface-dependent)' if result.conditional else ''}</td>"
+                      f"<td>{format_ranges(result.possible, result.version) if result.possible else ''}</td><td>{allowed}</td></tr>")
+    html_body += "</table><p>🚨 marks ports that are listening and reachable from at least half of the IPv4 address space. \"Possibly\" means the deciding rule uses matches IRIS does not model (rate limits, recent lists, ipsets...).</p>"
+
+    # --- Dead rules ---
+    if ruleset.chains:
+        shadowed = shadowed_rules(ruleset)
+        html_body += "<h3>Shadowed and Redundant Rules</h3>"
+        if shadowed:
+            html_body += "<table><tr><th>Rule</th><th>Never Matches Because Of</th><th>Kind</th></tr>"
+            for s in shadowed:
+                kind = "redundant (same verdict)" if s.redundant else "⚠️ shadowed (opposite verdict is never applied)"
+                html_body += (f"<tr><td>{html.escape(f'{s.rule.chain}#{s.rule.position}: {s.rule.text}')}</td>"
+                              f"<td>{html.escape(f'{s.by.chain}#{s.by.position}: {s.by.text}')}</td><td>{kind}</td></tr>")
+            html_body += "</table>"
+        else:
+            html_body += "<p>No rule is fully covered by an earlier rule in its chain.</p>"
+        if any(rule.unsupported for rule in rules):
+            app_instance.log_output(f"{sum(1 for rule in rules if rule.unsupported)} firewall rule(s) use matches that are not modelled; "
+                                    "their verdicts are reported as possible rather than certain.", level=WARNING)
+
+        html_body += "<h3>Rules</h3>"
+        shown = 0
+        for chain in ruleset.chains.values():
+            if not chain.rules or shown >= MAX_CHAIN_ROWS:
+                continue
+            html_body += f"<h4>{chain.family} {html.escape(chain.table)} {html.escape(chain.name)}</h4><table><tr><th>#</th><th>Rule</th></tr>"
+            for rule in chain.rules[:MAX_CHAIN_ROWS - shown]:
+                html_body += f"<tr><td>{rule.position}</td><td>{html.escape(rule.text)}</td></tr>"
+            shown += min(len(chain.rules), MAX_CHAIN_ROWS - shown)
+            html_body += "</table>"
+        if shown < len(rules):
+            html_body += f"<p>Showing the first {shown} of {len(rules)} rules.</p>"
 
     helpers.generate_report_html(
-        app_instance, 
-        app_instance.suspect_computer_name, 
-        "Firewall_Rules_Report.html", 
-        "Firewall Rules Report", 
+        app_instance,
+        app_instance.suspect_computer_name,
+        "Firewall_Rules_Report.html",
+        "Firewall Rules Report",
         html_body,
         browser_preference=browser_preference
     )
-
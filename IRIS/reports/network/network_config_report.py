@@ -1,7 +1,83 @@
-import sys
+import collections
+import html
 from typing import Any
 
 from ...helpers import MockAppInstance, Helpers
+from ...collectors.network_config import collect_network_config
+from ...log_pipeline import WARNING
+
+# Hostnames whose /etc/hosts entries are expected to point somewhere local
+LOCAL_NAMES = {"localhost", "localhost.localdomain", "ip6-localhost", "ip6-loopback", "ip6-allnodes", "ip6-allrouters",
+               "ip6-localnet", "ip6-mcastprefix"}
+
+
+def _format_bytes(value: Any) -> str:
+    if not isinstance(value, int):
+        return "N/A"
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value} {unit}"
+        value //= 1024
+    return f"{value} TB"
+
+
+def _linux_network_html(app_instance: Any, helpers: Any) -> str:
+    config = collect_network_config(helpers.host_path)
+    for source in config.errors:
+        app_instance.log_output(f"Warning: could not read {source}", level=WARNING)
+    app_instance.log_output(f"Read {len(config.interfaces)} interfaces and {len(config.routes)} routes.")
+
+    html_body = "<h3>Interfaces</h3>"
+    promiscuous = [iface.name for iface in config.interfaces if iface.promiscuous]
+    if promiscuous:
+        html_body += f"<p>⚠️ In promiscuous mode (capturing all traffic on the segment): {html.escape(', '.join(promiscuous))}</p>"
+    html_body += ("<table><tr><th>Interface</th><th>Kind</th><th>MAC</th><th>MTU</th><th>State</th><th>Flags</th>"
+                  "<th>IPv4</th><th>IPv6</th><th>RX</th><th>TX</th></tr>")
+    enslaved = collections.Counter()
+    for iface in config.interfaces:
+        if iface.master and not iface.promiscuous:
+            enslaved[iface.master] += 1     # veth/bond members are summarised per bridge below
+            continue
+        kind = iface.kind + (f" ({iface.driver})" if iface.driver else "")
+        html_body += (f"<tr><td>{html.escape(iface.name)}</td><td>{html.escape(kind)}</td><td>{html.escape(iface.mac)}</td>"
+                      f"<td>{iface.mtu or ''}</td><td>{html.escape(iface.operstate)}</td><td>{' '.join(iface.flag_names)}</td>"
+                      f"<td>{'<br>'.join(iface.ipv4)}</td><td>{'<br>'.join(iface.ipv6)}</td>"
+                      f"<td>{_format_bytes(iface.statistics.get('rx_bytes'))}</td><td>{_format_bytes(iface.statistics.get('tx_bytes'))}</td></tr>")
+    html_body += "</table>"
+    for master, count in sorted(enslaved.items()):
+        html_body += f"<p>{count} further interface(s) attached to {html.escape(master)}.</p>"
+
+    html_body += "<h3>Routes</h3><table><tr><th>Destination</th><th>Gateway</th><th>Interface</th><th>Metric</th></tr>"
+    for route in config.routes:
+        html_body += (f"<tr><td>{'default' if route.default else route.destination}</td><td>{route.gateway or 'on-link'}</td>"
+                      f"<td>{html.escape(route.interface)}</td><td>{route.metric}</td></tr>")
+    html_body += "</table>"
+
+    html_body += "<h3>Neighbours (ARP)</h3><table><tr><th>Address</th><th>MAC</th><th>Interface</th><th>State</th></tr>"
+    for neighbour in config.neighbours:
+        html_body += (f"<tr><td>{neighbour.address}</td><td>{html.escape(neighbour.mac)}</td>"
+                      f"<td>{html.escape(neighbour.interface)}</td><td>{neighbour.state}</td></tr>")
+    html_body += "</table>"
+
+    resolver = config.resolver
+    html_body += "<h3>DNS</h3><table><tr><th>Setting</th><th>Value</th></tr>"
+    html_body += f"<tr><td>Nameservers (resolv.conf)</td><td>{html.escape(', '.join(resolver.nameservers)) or 'none'}</td></tr>"
+    if resolver.upstream:
+        html_body += f"<tr><td>Upstream (systemd-resolved)</td><td>{html.escape(', '.join(resolver.upstream))}</td></tr>"
+    html_body += f"<tr><td>Search domains</td><td>{html.escape(' '.join(resolver.search))}</td></tr>"
+    html_body += f"<tr><td>Options</td><td>{html.escape(' '.join(resolver.options))}</td></tr>"
+    html_body += f"<tr><td>hosts lookup order (nsswitch)</td><td>{html.escape(resolver.nsswitch_hosts)}</td></tr></table>"
+
+    html_body += "<h3>/etc/hosts</h3><table><tr><th>Address</th><th>Names</th></tr>"
+    for entry in resolver.hosts:
+        # Entries that pin public names to fixed addresses can redirect updates or hide C2 lookups
+        local = entry.address.startswith("127.") or entry.address in ("::1", "ff02::1", "ff02::2")
+        pinned = not local and not set(entry.names) <= LOCAL_NAMES | {app_instance.suspect_computer_name}
+        html_body += (f"<tr><td>{'⚠️ ' if pinned else ''}{html.escape(entry.address)}</td>"
+                      f"<td>{html.escape(' '.join(entry.names))}</td></tr>")
+    html_body += "</table>"
+    return html_body
+
 
 def generate_network_config_report(app_instance: Any, helpers: Any, browser_preference: str = "System Default"):
     """Gathers and reports detailed network configuration for the host OS."""
@@ -9,7 +85,7 @@ def generate_network_config_report(app_instance: Any, helpers: Any, browser_pref
     
     html_body = "<h2>Network Configuration</h2>"
 
-    if sys.platform == "darwin":
+    if helpers.platform == "darwin":
         html_body += "<h3>Network Interfaces (ifconfig)</h3>"
         ifconfig_output = helpers.run_command("ifconfig -a", check_shell=True, app_instance=app_instance)
         if ifconfig_output:
@@ -24,7 +100,7 @@ def generate_network_config_report(app_instance: Any, helpers: Any, browser_pref
         else:
             html_body += "<p>Could not retrieve DNS information.</p>"
 
-    elif sys.platform == "win32":
+    elif helpers.platform == "win32":
         html_body += "<h3>Network Configuration (ipconfig /all)</h3>"
         ipconfig_output = helpers.run_command("ipconfig /all", check_shell=True, app_instance=app_instance)
         if ipconfig_output:
@@ -32,6 +108,12 @@ def generate_network_config_report(app_instance: Any, helpers: Any, browser_pref
         else:
             html_body += "<p>Could not retrieve network interface information.</p>"
             
+    elif helpers.platform.startswith("linux"):
+        if helpers.host_path("/") is None:
+            html_body += "<p>Linux network configuration is read from sysfs and procfs and is not part of a command archive replay.</p>"
+        else:
+            html_body += _linux_network_html(app_instance, helpers)
+
     else:
         html_body += "<p>Network configuration reporting is not implemented for this OS.</p>"
 
@@ -1,47 +1,248 @@
-import sys
-from typing import Any
+import concurrent.futures
+import contextvars
+import csv
+import datetime
+import glob
+import html
+import io
+import os
+import shlex
+from typing import Any, List, Optional, Tuple
 
 # Import necessary components from helpers.py using relative path
+from ...budget import active_token
 from ...helpers import MockAppInstance, Helpers
+from ...collectors.bandwidth import DEFAULT_WINDOW_S, sample_bandwidth
+from ...collectors.pcap import PROTOCOLS, CaptureError, FlowTable, format_address
+from ...collectors.storage import format_size
+from ...evidence import KIND_RAW_CAPTURE, KIND_REPORT, hash_file
+from ...log_pipeline import WARNING
+
+WINDOW_ENV = "IRIS_TRAFFIC_WINDOW"     # sampling window in seconds
+PCAP_ENV = "IRIS_PCAP"                 # captures to analyse (os.pathsep-separated paths or globs)
+CAPTURE_ENV = "IRIS_PCAP_CAPTURE"      # set to 1 to capture with tcpdump during the window (needs root)
+CAPTURE_NAME = "Network_Traffic_Capture.pcap"
+RENDER_MARGIN_S = 3.0                  # budget kept back for the final fd sweep and rendering
+TOP_PROCESSES = 50
+TOP_TALKERS = 20
+TOP_FLOWS = 25
+
+
+def _window(app_instance: Any) -> float:
+    try:
+        window = float(os.environ.get(WINDOW_ENV) or DEFAULT_WINDOW_S)
+    except ValueError:
+        app_instance.log_output(f"Ignoring {WINDOW_ENV}={os.environ[WINDOW_ENV]!r}: not a number of seconds.")
+        window = DEFAULT_WINDOW_S
+    token = active_token()
+    remaining = token.remaining() if token is not None else None
+    if remaining is not None and remaining - RENDER_MARGIN_S < window:
+        window = max(1.0, remaining - RENDER_MARGIN_S)
+        app_instance.log_output(f"Sampling window shortened to {window:.0f} s to fit the report's time budget.")
+    return max(1.0, window)
+
+
+def _rate(value: float) -> str:
+    return format_size(int(value)) + "/s"
+
+
+def _write_series(app_instance: Any, result) -> str:
+    """Every tick of every series as CSV beside the report; returns the file name."""
+    name = "Network_Traffic_Samples.csv"
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(["seconds", "kind", "name", "pid", "source", "rx_bytes_per_s", "tx_bytes_per_s"])
+    for series in result.interfaces + result.processes:
+        for at, rx, tx in series.points:
+            writer.writerow([f"{at:.2f}", series.kind, series.name, series.pid if series.pid is not None else "",
+                             series.source, f"{rx:.0f}", f"{tx:.0f}"])
+    path = os.path.join(app_instance.report_output_directory, name)
+    evidence = getattr(app_instance, "evidence", None)
+    if evidence is not None:
+        evidence.write_artifact(path, text.getvalue(), KIND_REPORT)
+    else:
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(text.getvalue())
+    return name
+
+
+def _fmt_time(timestamp: Optional[float]) -> str:
+    if timestamp is None:
+        return "N/A"
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+def _endpoint(address: bytes, port: int) -> str:
+    host = format_address(address)
+    if not port:
+        return host
+    return f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+
+
+def _capture(app_instance: Any, helpers: Any, window: float) -> Tuple[Optional[str], Optional[concurrent.futures.Future]]:
+    """Starts tcpdump on every interface for the sampling window; returns where it writes and its future."""
+    package = getattr(app_instance, "package", None)
+    # Beside the package while capturing (an archive cannot be appended to in place), then stored into it
+    path = package.path + "." + CAPTURE_NAME if package is not None else os.path.join(app_instance.report_output_directory, CAPTURE_NAME)
+    command = f"timeout -s INT {max(1, int(window))} tcpdump -i any -n -U -w {shlex.quote(path)}"
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(contextvars.copy_context().run, helpers.run_command, command, True, app_instance)
+    executor.shutdown(wait=False)
+    return path, future
+
+
+def _store_capture(app_instance: Any, path: str) -> Optional[str]:
+    """Records the capture as evidence; returns the path to read it from, or None when nothing was captured."""
+    if not os.path.exists(path):
+        app_instance.log_output("tcpdump wrote no capture (is it installed, and is IRIS running as root?)", level=WARNING)
+        return None
+    evidence = getattr(app_instance, "evidence", None)
+    if evidence is None:
+        return path
+    if getattr(app_instance, "package", None) is not None:
+        evidence.store_file(path, os.path.join(app_instance.report_output_directory, CAPTURE_NAME), KIND_RAW_CAPTURE, source="tcpdump")
+    else:
+        evidence.add(path, KIND_RAW_CAPTURE, source="tcpdump", **hash_file(path))
+    return path
+
+
+def _supplied_captures(app_instance: Any) -> List[str]:
+    paths = []
+    for pattern in filter(None, os.environ.get(PCAP_ENV, "").split(os.pathsep)):
+        matches = sorted(glob.glob(os.path.expanduser(pattern)))
+        if not matches:
+            app_instance.log_output(f"{PCAP_ENV}: no capture matches {pattern}", level=WARNING)
+        paths += matches
+    return paths
+
+
+def _flows_html(app_instance: Any, captures: List[Tuple[str, str]]) -> str:
+    """Flow tables for (label, path) captures, each parsed in one pass; every flow goes to a CSV beside the report."""
+    html_body = "<h3>Packet Captures</h3>"
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(["capture", "protocol", "source", "source_port", "destination", "destination_port", "first_seen_utc",
+                     "last_seen_utc", "packets_out", "bytes_out", "packets_back", "bytes_back", "tcp_flags"])
+    for label, path in captures:
+        table = FlowTable()
+        try:
+            with open(path, "rb") as f:
+                table.read(f)
+        except (OSError, CaptureError) as e:
+            app_instance.log_output(f"Could not read capture {path}: {e}", level=WARNING)
+            html_body += f"<h4>{html.escape(label)}</h4><p>Could not be read: {html.escape(str(e))}</p>"
+            continue
+        duration = (table.last - table.first) if table.packets else 0.0
+        html_body += (f"<h4>{html.escape(label)}</h4><p>{table.packets} packets ({format_size(table.bytes)}) in "
+                      f"{len(table.flows)} flows from {_fmt_time(table.first)} to {_fmt_time(table.last)} UTC "
+                      f"({duration:.1f} s); {table.non_ip} packets were not IP.</p>")
+        if not table.flows:
+            continue
+        html_body += ("<h4>Top Talkers</h4><table><tr><th>Host</th><th>Sent</th><th>Received</th><th>Flows</th></tr>"
+                      + "".join(f"<tr><td>{format_address(address)}</td><td>{format_size(sent)}</td><td>{format_size(received)}</td>"
+                                f"<td>{flows}</td></tr>" for address, sent, received, flows in table.top_talkers(TOP_TALKERS))
+                      + "</table>")
+        html_body += ("<h4>Largest Flows</h4><table><tr><th>Protocol</th><th>From</th><th>To</th><th>Packets</th><th>Bytes</th>"
+                      "<th>First Seen (UTC)</th><th>Duration</th><th>TCP Flags</th></tr>")
+        for flow in table.top_flows(TOP_FLOWS):
+            html_body += (f"<tr><td>{PROTOCOLS.get(flow.protocol, flow.protocol)}</td><td>{_endpoint(flow.src, flow.sport)}</td>"
+                          f"<td>{_endpoint(flow.dst, flow.dport)}</td><td>{flow.packets} / {flow.packets_back}</td>"
+                          f"<td>{format_size(flow.bytes)} / {format_size(flow.bytes_back)}</td><td>{_fmt_time(flow.first)}</td>"
+                          f"<td>{flow.last - flow.first:.1f} s</td><td>{flow.flag_names}</td></tr>")
+        html_body += "</table><p>Packets and bytes are given as sent by the first endpoint / sent back to it.</p>"
+        for flow in table.flows.values():
+            writer.writerow([label, PROTOCOLS.get(flow.protocol, flow.protocol), format_address(flow.src), flow.sport,
+                             format_address(flow.dst), flow.dport, _fmt_time(flow.first), _fmt_time(flow.last),
+                             flow.packets, flow.bytes, flow.packets_back, flow.bytes_back, flow.flag_names])
+    name = "Network_Traffic_Flows.csv"
+    path = os.path.join(app_instance.report_output_directory, name)
+    evidence = getattr(app_instance, "evidence", None)
+    if evidence is not None:
+        evidence.write_artifact(path, text.getvalue(), KIND_REPORT)
+    else:
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(text.getvalue())
+    return html_body + f"<p>Every flow is in <a href=\"{name}\">{name}</a>.</p>"
+
 
 def generate_network_traffic_report(app_instance: Any, helpers: Any, browser_preference: str = "System Default"):
     """
-    Captures a snapshot of network traffic using nethogs or tcpdump.
-    Note: This requires running the main script with sudo on Linux.
+    Samples per-interface and per-process throughput in process from
+    /proc/net/dev, per-socket TCP byte counters and /proc/<pid>/io.
+    Runs without root; with root every process's I/O counters are readable.
+    Captures named in IRIS_PCAP, and one taken during the window when
+    IRIS_PCAP_CAPTURE is set, are summarised as flow tables.
     """
     app_instance.log_output("\n--- Generating Network Traffic Analysis Report ---")
-    
-    html_body = "<h2>Network Traffic Analysis (Snapshot)</h2>"
-    html_body += "<p><strong>Disclaimer:</strong> This report provides a brief snapshot of network activity. For deep traffic inspection, continuous monitoring with tools like Suricata, Zeek, or Wireshark is recommended. Running these commands may require administrator (sudo) privileges.</p>"
-
-    if sys.platform.startswith("linux"):
-        app_instance.log_output("Attempting to capture traffic with nethogs...")
-        # nethogs shows per-process bandwidth. -t for trace mode, -c for count.
-        nethogs_output = helpers.run_command("sudo nethogs -t -c 5", check_shell=True, app_instance=app_instance)
-
-        if nethogs_output and "nethogs: command not found" not in nethogs_output:
-            html_body += "<h3>Nethogs Bandwidth Snapshot</h3>"
-            html_body += "<p>The following shows the top network-consuming processes over a short period.</p>"
-            html_body += f"<pre>{nethogs_output}</pre>"
-        else:
-            app_instance.log_output("Nethogs not found or failed. Falling back to tcpdump...")
-            html_body += "<h3>TCPDump Packet Snapshot</h3>"
-            html_body += "<p>Nethogs was not available. The following is a small sample of network packets captured with tcpdump.</p>"
-            # tcpdump -c captures a specific count of packets. -n prevents DNS resolution.
-            tcpdump_output = helpers.run_command("sudo tcpdump -c 20 -n", check_shell=True, app_instance=app_instance)
-            if tcpdump_output:
-                html_body += f"<pre>{tcpdump_output}</pre>"
-            else:
-                html_body += "<p>Could not capture traffic with tcpdump. Ensure it is installed and the script has sufficient permissions.</p>"
 
+    html_body = "<h2>Network Traffic Analysis (Sampled)</h2>"
+    html_body += "<p><strong>Disclaimer:</strong> This report measures throughput over a short window. For deep traffic inspection, continuous monitoring with tools like Suricata, Zeek, or Wireshark is recommended.</p>"
+
+    captures: List[Tuple[str, str]] = []
+    if not helpers.platform.startswith("linux"):
+        html_body += "<p>Network traffic sampling is currently implemented for Linux systems only.</p>"
+    elif helpers.host_path("/") is None:
+        html_body += "<p>Traffic is sampled from live kernel counters and is not part of a command archive replay.</p>"
     else:
-        html_body += "<p>Network traffic snapshot is currently implemented for Linux systems only.</p>"
+        window = _window(app_instance)
+        capture_path, capture = _capture(app_instance, helpers, window) if os.environ.get(CAPTURE_ENV) == "1" else (None, None)
+        app_instance.log_output(f"Sampling network throughput for {window:.0f} s...")
+        result = sample_bandwidth(helpers.host_path, window, live=not helpers.use_mock)
+        if capture is not None:
+            capture.result()
+            capture_path = _store_capture(app_instance, capture_path)
+            if capture_path:
+                captures.append((f"Captured during the window ({CAPTURE_NAME})", capture_path))
+        samples_file = _write_series(app_instance, result)
+        html_body += (f"<p>Sampled every {result.interval_s:.1f} s for {result.window_s:.1f} s; sampling used "
+                      f"{result.cpu_s * 1000:.0f} ms of CPU. Every sample is in <a href=\"{samples_file}\">{samples_file}</a>.</p>")
+
+        html_body += "<h3>Interfaces</h3>"
+        if result.interfaces:
+            html_body += "<table><tr><th>Interface</th><th>Received</th><th>Sent</th><th>Average</th><th>Peak</th></tr>"
+            for series in sorted(result.interfaces, key=lambda s: -s.total):
+                html_body += (f"<tr><td>{html.escape(series.name)}</td><td>{format_size(series.rx_bytes)}</td>"
+                              f"<td>{format_size(series.tx_bytes)}</td><td>{_rate(series.total / max(result.window_s, 1e-6))}</td>"
+                              f"<td>{_rate(series.peak)}</td></tr>")
+            html_body += "</table>"
+        else:
+            html_body += "<p>/proc/net/dev could not be read.</p>"
+
+        html_body += "<h3>Processes with Network Sockets</h3>"
+        if result.socket_counters:
+            html_body += ("<p>Received and Sent are TCP payload bytes from the kernel's per-socket counters; "
+                          "UDP traffic is not counted there.</p>")
+        else:
+            html_body += ("<p>Per-socket TCP counters were not available, so Received and Sent are each process's "
+                          "read()/write() bytes from /proc/&lt;pid&gt;/io, which include file I/O.</p>")
+        if result.processes:
+            html_body += ("<table><tr><th>PID</th><th>Process</th><th>Received</th><th>Sent</th><th>Peak</th>"
+                          "<th>I/O Read</th><th>I/O Written</th><th>Sockets Opened / Closed</th></tr>")
+            for series in result.processes[:TOP_PROCESSES]:
+                html_body += (f"<tr><td>{series.pid}</td><td>{html.escape(series.name)}</td><td>{format_size(series.rx_bytes)}</td>"
+                              f"<td>{format_size(series.tx_bytes)}</td><td>{_rate(series.peak)}</td>"
+                              f"<td>{format_size(series.io_read)}</td><td>{format_size(series.io_write)}</td>"
+                              f"<td>{series.opened} / {series.closed}</td></tr>")
+            html_body += "</table>"
+            if len(result.processes) > TOP_PROCESSES:
+                html_body += f"<p>{len(result.processes) - TOP_PROCESSES} more processes are in {samples_file}.</p>"
+        else:
+            html_body += "<p>No process held an inet socket during the window.</p>"
+        if result.io_denied:
+            html_body += (f"<p>/proc/&lt;pid&gt;/io of {result.io_denied} process(es) owned by other users could not be read; "
+                          "run as root to include their I/O figures.</p>")
+
+    captures += [(path, path) for path in _supplied_captures(app_instance)]
+    if captures:
+        html_body += _flows_html(app_instance, captures)
+    html_body += (f"<p>Set {PCAP_ENV} to pcap or pcapng files to analyse them here, or {CAPTURE_ENV}=1 to capture "
+                  "with tcpdump during the sampling window (needs root).</p>") if not captures else ""
 
     helpers.generate_report_html(
-        app_instance, 
-        app_instance.suspect_computer_name, 
-        "Network_Traffic_Report.html", 
-        "Network Traffic Report", 
+        app_instance,
+        app_instance.suspect_computer_name,
+        "Network_Traffic_Report.html",
+        "Network Traffic Report",
         html_body,
         browser_preference=browser_preference
-    )
\ No newline at end of file
+    )
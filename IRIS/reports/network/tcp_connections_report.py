@@ -1,8 +1,59 @@
-import sys
+import html
 from typing import Any
 
 # Import necessary components from helpers.py using relative path
 from ...helpers import MockAppInstance, Helpers
+from ...collectors.sockets import PROC, collect_process_files, format_endpoint
+
+def _process_name(proc_dir: str, pid: int) -> str:
+    """argv[0] when it is bracketed like a kernel thread's name, otherwise the kernel's comm."""
+    try:
+        with open(f"{proc_dir}/{pid}/cmdline", "rb") as f:
+            argv0 = f.read(256).split(b"\0", 1)[0].decode("utf-8", errors="replace")
+        if argv0.startswith("["):
+            return argv0
+    except OSError:
+        pass
+    try:
+        with open(f"{proc_dir}/{pid}/comm", "r", encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+def _linux_socket_owners_html(app_instance: Any, helpers: Any) -> str:
+    """Internet sockets with their owning processes, from one /proc/net parse and one /proc/*/fd sweep."""
+    html_body = "<h3>Sockets by Process (/proc)</h3>"
+    proc_dir = helpers.host_path(PROC)
+    if proc_dir is None:
+        return html_body + "<p>Socket ownership is read from /proc and is not part of a command archive replay.</p>"
+    try:
+        processes = collect_process_files(helpers.host_path)
+    except OSError as e:
+        app_instance.log_output(f"Could not sweep /proc: {e}")
+        return html_body + "<p>Could not read /proc.</p>"
+    rows = []
+    for pid, process in sorted(processes.items()):
+        for sock in process.sockets:
+            if sock.protocol != "unix":
+                rows.append((sock, pid))
+    if not rows:
+        return html_body + "<p>No internet sockets could be attributed to a process.</p>"
+    names = {pid: _process_name(proc_dir, pid) for pid in {pid for _, pid in rows}}
+    html_body += "<table><tr><th>Protocol</th><th>State</th><th>Local Address</th><th>Remote Address</th><th>PID</th><th>Process</th></tr>"
+    for sock, pid in sorted(rows, key=lambda row: (row[0].protocol, row[0].state, row[0].local or ("", 0))):
+        # Kernel threads never hold sockets; a bracketed name on one is a userspace process in disguise
+        flag = "⚠️ " if names[pid].startswith("[") else ""
+        html_body += (f"<tr><td>{sock.protocol}</td><td>{sock.state}</td><td>{html.escape(format_endpoint(sock.local))}</td>"
+                      f"<td>{html.escape(format_endpoint(sock.remote) if sock.connected else '')}</td><td>{pid}</td>"
+                      f"<td>{flag}{html.escape(names[pid])}</td></tr>")
+    html_body += "</table>"
+    unix = sum(1 for process in processes.values() for sock in process.sockets if sock.protocol == "unix")
+    denied = sum(1 for process in processes.values() if process.denied)
+    html_body += (f"<p>{len(rows)} internet and {unix} unix sockets held by {len(processes)} processes. "
+                  f"⚠️ marks sockets held by a process named like a kernel thread.")
+    if denied:
+        html_body += f" The descriptors of {denied} processes could not be read; run as root to attribute their sockets."
+    return html_body + "</p>"
 
 def generate_tcp_connections_report(app_instance: Any, helpers: Any, browser_preference: str = "System Default"):
     """
@@ -14,19 +65,19 @@ def generate_tcp_connections_report(app_instance: Any, helpers: Any, browser_pre
     html_body = "<h2>Active Network Connections & Listening Ports</h2>"
     
     command_to_run = ""
-    if sys.platform.startswith("linux"):
+    if helpers.platform.startswith("linux"):
         # 'ss' is the modern replacement for 'netstat' on Linux
         # -t: tcp, -u: udp, -l: listening, -p: process, -n: numeric
         command_to_run = "ss -tulpn"
         html_body += f"<h3>Linux Connections (via '{command_to_run}')</h3>"
 
-    elif sys.platform == "darwin":
+    elif helpers.platform == "darwin":
         # 'lsof' is powerful on macOS for showing connections and processes
         # -i: list internet files, -P: numeric ports, -n: numeric hosts
         command_to_run = "lsof -i -P -n | grep -E 'LISTEN|ESTABLISHED'"
         html_body += f"<h3>macOS Connections (via 'lsof')</h3>"
 
-    elif sys.platform == "win32":
+    elif helpers.platform == "win32":
         # 'netstat' is the standard on Windows
         # -a: all, -n: numeric, -o: show owning process ID
         command_to_run = "netstat -ano"
@@ -39,6 +90,8 @@ def generate_tcp_connections_report(app_instance: Any, helpers: Any, browser_pre
             html_body += f"<pre>{connections_output}</pre>"
         else:
             html_body += "<p>Could not retrieve network connection information.</p>"
+        if helpers.platform.startswith("linux"):
+            html_body += _linux_socket_owners_html(app_instance, helpers)
     else:
         html_body += "<p>Network connection reporting is not supported on this operating system.</p>"
 
@@ -1,12 +1,22 @@
 import psutil
 import concurrent.futures
+import contextvars
+import html
 import re
+import sys
 from datetime import datetime
 from typing import List, Optional, Dict, Any, Tuple # ADDED: Import typing hints
 import os # ADDED: Import os module
 
 # Import necessary components from helpers.py using relative path
+from ...budget import expired
 from ...helpers import MockAppInstance, Helpers
+from ...collectors.cache import CollectorCache
+from ...collectors.executables import PROC, hash_executables, path_executables, proc_executables
+from ...collectors.hash_allowlist import ALLOWLIST_ENV, open_allowlist
+from ...collectors.process_details import CALLBACK, CAPS_ENV, DetailCaps, DetailSpill, cap_details
+from ...collectors.sockets import ProcessFiles, collect_process_files, format_endpoint
+from ...log_pipeline import WARNING, ERROR
 
 # --- Configurable whitelist of safe patterns ---
 # This list should be comprehensive and regularly updated for real-world use.
@@ -99,6 +109,9 @@ WHITELIST_PATTERNS = [
     # Add more known safe paths or command patterns here
 ]
 
+WHITELISTED_REASON = "Whitelisted known safe process"
+DETAILS_DIR = "Process_Persistence_Details"   # beside the report; holds the spilled per-process details
+
 def is_whitelisted(cmdline: List[str], exe_path: str) -> bool:
     """
     Returns True if cmdline or exe_path matches any whitelist pattern.
@@ -128,33 +141,45 @@ def is_suspicious_command(cmdline: List[str]) -> Tuple[bool, str]:
             return True, reason
     return False, ''
 
-def scan_process(pid: int, app_instance: Any) -> Optional[Dict[str, Any]]:
+def scan_process(pid: int, app_instance: Any, files: Optional[ProcessFiles] = None,
+                 caps: Optional[DetailCaps] = None, spill: Optional[DetailSpill] = None) -> Optional[Dict[str, Any]]:
     """
     Scans a single process for relevant information and suspicious indicators.
+    `files` is the process's entry from the /proc fd sweep, when there is one;
+    without it, open files and connections are asked of psutil per process.
+    The cwd, environment, open files and connections are capped by `caps`;
+    with a `spill` they are written out and info['details'] names their chunk.
     """
+    if expired("per-process scan"):
+        return None
     try:
         proc = psutil.Process(pid)
         info = {}
         info['pid'] = pid
         info['ppid'] = proc.ppid()
-        info['user'] = proc.username()
-        info['name'] = proc.name()
+        info['user'] = sys.intern(proc.username())
+        info['name'] = sys.intern(proc.name())
         info['cmdline'] = proc.cmdline()
-        info['exe'] = proc.exe()
+        info['exe'] = sys.intern(proc.exe())
         info['cpu_percent'] = proc.cpu_percent(interval=0.1)
         info['memory_percent'] = proc.memory_percent()
         info['create_time'] = proc.create_time()
         
         # Deep info
-        try:
-            info['open_files'] = [f.path for f in proc.open_files()]
-        except psutil.AccessDenied:
-            info['open_files'] = ["Access Denied"]
-        
-        try:
-            info['connections'] = [c.raddr for c in proc.connections(kind='inet') if c.raddr]
-        except psutil.AccessDenied:
-            info['connections'] = ["Access Denied"]
+        if files is not None:
+            info['open_files'] = ["Access Denied"] if files.denied else files.files
+            info['connections'] = ["Access Denied"] if files.denied else \
+                [format_endpoint(s.remote) for s in files.sockets if s.protocol != "unix" and s.connected]
+        else:
+            try:
+                info['open_files'] = [f.path for f in proc.open_files()]
+            except psutil.AccessDenied:
+                info['open_files'] = ["Access Denied"]
+
+            try:
+                info['connections'] = [c.raddr for c in proc.connections(kind='inet') if c.raddr]
+            except psutil.AccessDenied:
+                info['connections'] = ["Access Denied"]
 
         try:
             info['cwd'] = proc.cwd()
@@ -166,10 +191,17 @@ def scan_process(pid: int, app_instance: Any) -> Optional[Dict[str, Any]]:
         except Exception: # Catch all for environment, as it can fail
             info['environ'] = {"Error": "Access Denied or cannot retrieve"}
 
+        details = cap_details(info.pop('environ'), info.pop('open_files'), info.pop('connections'),
+                              info.pop('cwd'), caps or DetailCaps.from_env())
+        if spill is not None:
+            info['details'] = spill.add(pid, details)
+        else:
+            info.update(details)
+
         # Check whitelist first
         if is_whitelisted(info['cmdline'], info['exe']):
             info['suspicious'] = False
-            info['reason'] = "Whitelisted known safe process"
+            info['reason'] = WHITELISTED_REASON
         else:
             suspicious, reason = is_suspicious_command(info['cmdline'])
             info['suspicious'] = suspicious
@@ -178,15 +210,82 @@ def scan_process(pid: int, app_instance: Any) -> Optional[Dict[str, Any]]:
         return info
 
     except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
-        app_instance.log_output(f"Warning: Could not scan process {pid} due to {type(e).__name__}: {e}")
+        app_instance.log_output(f"Warning: Could not scan process {pid} due to {type(e).__name__}", level=WARNING)
         return None
     except Exception as e:
-        app_instance.log_output(f"Error scanning process {pid}: {e}")
+        app_instance.log_output(f"Error scanning process {pid}: {e}", level=ERROR)
         return None
 
-def _generate_persistence_html_content(procs_info: List[Dict[str, Any]]) -> str:
+def _attach_executable_hashes(procs_info: List[Dict[str, Any]], app_instance: Any, helpers: Any) -> str:
+    """
+    Hashes each distinct executable once (through /proc/<pid>/exe where there is
+    one) and records the digest on every process running it. When a known-good
+    hash allowlist is configured, a listed digest clears a process and a path
+    match in WHITELIST_PATTERNS alone no longer does. Returns a summary line.
+    """
+    proc_dir = helpers.host_path(PROC)
+    if proc_dir is None:
+        return "Executables are hashed through /proc and are not part of a command archive replay."
+    if os.path.isdir(proc_dir):
+        executables = proc_executables(proc_dir, [p['pid'] for p in procs_info])
+    else:
+        executables = path_executables({p['pid']: p['exe'] for p in procs_info if p.get('exe')})
+    # Only live runs are cached: the mock tree is rebuilt every run
+    hashed = hash_executables(executables, None if helpers.use_mock else CollectorCache())
+    by_pid = {pid: executable for executable in hashed for pid in executable.pids}
+    allowlist = open_allowlist()
+    for proc in procs_info:
+        executable = by_pid.get(proc['pid'])
+        if executable is None:
+            continue
+        proc['sha256'] = executable.sha256
+        proc['exe_deleted'] = executable.deleted
+        if allowlist is not None and executable.sha256:
+            proc['known_good'] = executable.sha256 in allowlist
+            if proc['known_good']:
+                proc['suspicious'] = False
+                proc['reason'] = "Executable hash is in the known-good allowlist"
+                continue
+            if proc['reason'] == WHITELISTED_REASON:
+                suspicious, reason = is_suspicious_command(proc['cmdline'])
+                proc['suspicious'] = suspicious
+                proc['reason'] = (reason if suspicious else "No suspicious keywords detected") + \
+                    " (path is whitelisted but the executable hash is not in the allowlist)"
+        if executable.deleted:
+            reason = "Executable was deleted or replaced on disk after the process started"
+            proc['reason'] = f"{proc['reason']}; {reason}" if proc['suspicious'] else reason
+            proc['suspicious'] = True
+    cached = sum(1 for executable in hashed if executable.cached)
+    failed = sum(1 for executable in hashed if not executable.sha256)
+    if failed:
+        app_instance.log_output(f"Could not hash {failed} executable(s) (exited processes or insufficient privileges).", level=WARNING)
+    summary = (f"{len(procs_info)} processes run {len(hashed)} distinct executables "
+               f"({len(hashed) - cached - failed} hashed now, {cached} unchanged since a previous scan).")
+    if allowlist is None:
+        return summary + f" Set {ALLOWLIST_ENV} to a compiled allowlist to check them against known-good hashes."
+    known = sum(1 for executable in hashed if executable.sha256 and executable.sha256 in allowlist)
+    summary += f" {known} are in the known-good allowlist ({len(allowlist)} hashes)."
+    allowlist.close()
+    return summary
+
+def _inline_details_html(proc: Dict[str, Any]) -> str:
+    """The cwd, open files, connections and environment of a process scanned without a spill."""
+    omitted = proc.get('omitted', {})
+
+    def more(key: str) -> str:
+        return f" ({omitted[key]} more not kept)" if omitted.get(key) else ""
+
+    environ = ', '.join(f"{k}={v}" for k, v in proc['environ'].items())
+    return (f"<strong>Current Working Directory:</strong> {html.escape(proc['cwd'])}<br>"
+            f"<strong>Open Files:</strong> {html.escape(', '.join(proc['open_files'])) or 'None'}{more('files')}<br>"
+            f"<strong>Network Connections:</strong> {html.escape(', '.join(proc['connections'])) or 'None'}{more('connections')}<br>"
+            f"<strong>Environment Variables (Partial):</strong>{more('env')} "
+            f"<pre style=\"white-space: pre-wrap; word-break: break-all;\">{html.escape(environ) or 'None'}</pre>")
+
+def _generate_persistence_html_content(procs_info: List[Dict[str, Any]], hash_summary: str = "", details_note: str = "") -> str:
     """
     Generates the HTML table rows and summary for the persistence report.
+    Details spilled to chunk files are loaded by the page when a row is expanded.
     """
     suspicious_count = sum(1 for p in procs_info if p and p['suspicious'])
     clean_count = sum(1 for p in procs_info if p and not p['suspicious'])
@@ -205,7 +304,11 @@ def _generate_persistence_html_content(procs_info: List[Dict[str, Any]]) -> str:
         
         # Short cmdline for summary, full in details (with ellipsis)
         cmdline_short = (cmdline_display[:100] + "..." if len(cmdline_display) > 100 else cmdline_display)
-
+        if 'details' in proc:
+            details = (f'<div class="process-details" data-pid="{proc["pid"]}" '
+                       f'data-chunk="{html.escape(proc["details"])}"></div>')
+        else:
+            details = _inline_details_html(proc)
 
         rows += f"""
         <tr class="{'suspicious' if proc['suspicious'] else 'clean'}">
@@ -223,11 +326,9 @@ def _generate_persistence_html_content(procs_info: List[Dict[str, Any]]) -> str:
             <td colspan="9">
                 <strong>Reason Flagged:</strong> {reason}<br>
                 <strong>Parent PID:</strong> {proc['ppid']}<br>
-                <strong>Executable Path:</strong> {proc['exe']}<br>
-                <strong>Current Working Directory:</strong> {proc['cwd']}<br>
-                <strong>Open Files:</strong> {', '.join(f.replace('<', '&lt;').replace('>', '&gt;') for f in proc['open_files']) if proc['open_files'] else 'None'}<br>
-                <strong>Network Connections:</strong> {', '.join(str(c).replace('<', '&lt;').replace('>', '&gt;') for c in proc['connections']) if proc['connections'] else 'None'}<br>
-                <strong>Environment Variables (Partial):</strong> <pre style="white-space: pre-wrap; word-break: break-all;">{', '.join(f"{k}={v}".replace('<', '&lt;').replace('>', '&gt;') for k,v in proc['environ'].items()) if proc['environ'] else 'None'}</pre><br>
+                <strong>Executable Path:</strong> {proc['exe']}{' <strong>(deleted from disk)</strong>' if proc.get('exe_deleted') else ''}<br>
+                <strong>Executable SHA-256:</strong> {proc.get('sha256') or 'N/A'}<br>
+                {details}
             </td>
         </tr>
         """
@@ -236,6 +337,8 @@ def _generate_persistence_html_content(procs_info: List[Dict[str, Any]]) -> str:
     <h2>Process Persistence & Suspicious Activity</h2>
     <div id="summary">
         Suspicious: {suspicious_count} | Clean: {clean_count}
+        <p>{hash_summary}</p>
+        <p>{details_note}</p>
         <label id="filterSuspicious"><input type="checkbox" id="showSuspiciousOnly" onchange="filterSuspicious()"> Show only suspicious</label>
     </div>
     <table id="procTable">
@@ -266,7 +369,69 @@ def _generate_persistence_html_content(procs_info: List[Dict[str, Any]]) -> str:
             }} else {{
                 detailsRow.style.display = 'table-row';
                 btn.textContent = '▼';
+                var box = detailsRow.querySelector('.process-details');
+                if (box) loadDetails(box);
+            }}
+        }}
+
+        // Spilled details: each chunk file calls {CALLBACK}({{pid: details, ...}}) when loaded
+        var detailCache = {{}};
+        var chunkWaiters = {{}};
+        function {CALLBACK}(chunk) {{
+            for (var pid in chunk) detailCache[pid] = chunk[pid];
+        }}
+
+        function loadDetails(box) {{
+            var pid = box.dataset.pid, src = box.dataset.chunk;
+            if (box.dataset.loaded) return;
+            if (pid in detailCache) {{
+                renderDetails(box, detailCache[pid]);
+                return;
+            }}
+            box.textContent = 'Loading details…';
+            if (!chunkWaiters[src]) {{
+                chunkWaiters[src] = [];
+                var script = document.createElement('script');
+                script.src = src;
+                script.onload = function() {{
+                    chunkWaiters[src].forEach(function(b) {{ renderDetails(b, detailCache[b.dataset.pid]); }});
+                    delete chunkWaiters[src];
+                }};
+                script.onerror = function() {{
+                    chunkWaiters[src].forEach(function(b) {{ b.textContent = 'Details file ' + src + ' could not be loaded.'; }});
+                    delete chunkWaiters[src];
+                }};
+                document.head.appendChild(script);
+            }}
+            chunkWaiters[src].push(box);
+        }}
+
+        function renderDetails(box, d) {{
+            box.textContent = '';
+            if (!d) {{
+                box.textContent = 'No details were recorded for this process.';
+                return;
+            }}
+            box.dataset.loaded = '1';
+            var omitted = d.omitted || {{}};
+            function line(label, text, key) {{
+                var div = document.createElement('div');
+                var strong = document.createElement('strong');
+                strong.textContent = label + ': ';
+                div.appendChild(strong);
+                div.appendChild(document.createTextNode((text || 'None') + (omitted[key] ? ' (' + omitted[key] + ' more not kept)' : '')));
+                box.appendChild(div);
+                return div;
             }}
+            line('Current Working Directory', d.cwd);
+            line('Open Files', d.open_files.join(', '), 'files');
+            line('Network Connections', d.connections.join(', '), 'connections');
+            line('Environment Variables (Partial)', ' ', 'env');
+            var pre = document.createElement('pre');
+            pre.style.whiteSpace = 'pre-wrap';
+            pre.style.wordBreak = 'break-all';
+            pre.textContent = Object.keys(d.environ).map(function(k) {{ return k + '=' + d.environ[k]; }}).join(', ') || 'None';
+            box.appendChild(pre);
         }}
 
         function sortTable(n) {{
@@ -334,14 +499,38 @@ def generate_process_persistence_report(app_instance: Any, helpers: Any, browser
     app_instance.log_output("\n--- Generating Process Persistence Report ---")
     
     pids = psutil.pids()
+    caps = DetailCaps.from_env()
+    # Details go to Process_Persistence_Details/ in chunks as processes are scanned
+    spill = DetailSpill(os.path.join(app_instance.report_output_directory, DETAILS_DIR),
+                        getattr(app_instance, "evidence", None),
+                        log=lambda message: app_instance.log_output(message, level=WARNING))
+    # On Linux, sockets and open files of every process come from one sweep of /proc
+    files_by_pid: Dict[int, ProcessFiles] = {}
+    proc_dir = helpers.host_path(PROC)
+    if proc_dir is not None and os.path.isdir(proc_dir):
+        try:
+            files_by_pid = collect_process_files(helpers.host_path, pids=pids)
+        except OSError as e:
+            app_instance.log_output(f"Could not sweep {PROC}/*/fd: {e}", level=WARNING)
     # Use a ThreadPoolExecutor for concurrent scanning of processes
     with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as executor:
         # Pass app_instance to scan_process for logging within threads
-        futures = [executor.submit(scan_process, pid, app_instance) for pid in pids]
+        # Each task gets a copy of this context so the workers see the report's time budget
+        futures = [executor.submit(contextvars.copy_context().run, scan_process, pid, app_instance,
+                                   files_by_pid.get(pid), caps, spill)
+                   for pid in pids]
         # Collect results, filtering out None values (e.g., due to NoSuchProcess)
         results = [f.result() for f in concurrent.futures.as_completed(futures) if f.result()]
 
-    html_body = _generate_persistence_html_content(results)
+    spill.close()
+
+    hash_summary = _attach_executable_hashes(results, app_instance, helpers)
+    details_note = (f"Working directory, environment, open files and connections are kept up to {caps.env} variables, "
+                    f"{caps.files} files, {caps.connections} connections and {caps.value} characters per value "
+                    f"(set {CAPS_ENV} to change), and are loaded from {DETAILS_DIR}/ when a row is expanded.")
+    if spill.failed:
+        details_note += f" {spill.failed} detail file(s) could not be written; those rows have no details."
+    html_body = _generate_persistence_html_content(results, hash_summary, details_note)
 
     helpers.generate_report_html(
         app_instance, 
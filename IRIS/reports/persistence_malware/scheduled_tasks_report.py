@@ -1,10 +1,10 @@
-import sys
 import os
 import datetime
 from typing import Any # ADDED: Import typing hints
 
 # Import necessary components from helpers.py using relative path
 from ...helpers import MockAppInstance, Helpers
+from ...log_pipeline import DEBUG
 
 def generate_scheduled_tasks_report(app_instance: Any, helpers: Any, browser_preference: str = "System Default"):
     """
@@ -14,7 +14,7 @@ def generate_scheduled_tasks_report(app_instance: Any, helpers: Any, browser_pre
     
     html_body = "<h2>Scheduled Tasks Report</h2>"
 
-    if sys.platform == "darwin":
+    if helpers.platform == "darwin":
         # --- LaunchDaemons (System-wide, often requires sudo) ---
         html_body += "<h3>macOS LaunchDaemons (System-wide Tasks)</h3>"
         app_instance.log_output("Gathering LaunchDaemons from /Library/LaunchDaemons/ and /System/Library/LaunchDaemons/...")
@@ -22,16 +22,16 @@ def generate_scheduled_tasks_report(app_instance: Any, helpers: Any, browser_pre
         
         daemon_data = []
         for path_dir in daemon_paths:
-            app_instance.log_output(f"Checking LaunchDaemon directory: {path_dir}")
+            app_instance.log_output(f"Checking LaunchDaemon directory: {path_dir}", level=DEBUG)
             if os.path.exists(path_dir):
-                app_instance.log_output(f"Directory exists: {path_dir}")
+                app_instance.log_output(f"Directory exists: {path_dir}", level=DEBUG)
                 list_output = helpers.run_command(f"sudo ls {path_dir}", check_shell=True, app_instance=app_instance) 
                 if list_output:
                     app_instance.log_output(f"Successfully listed files in {path_dir}. Processing {len(list_output.strip().splitlines())} files.")
                     for filename in list_output.strip().splitlines(): 
                         if filename.endswith(".plist"):
                             plist_file_path = os.path.join(path_dir, filename)
-                            app_instance.log_output(f"  Attempting to read plist: {plist_file_path}")
+                            app_instance.log_output(f"  Attempting to read plist: {plist_file_path}", level=DEBUG)
                             data = helpers.read_plist_file(plist_file_path, app_instance=app_instance)
                             if data:
                                 program_arg = "N/A"
@@ -49,11 +49,11 @@ def generate_scheduled_tasks_report(app_instance: Any, helpers: Any, browser_pre
                                     "StartCalendarInterval": data.get("StartCalendarInterval", "N/A"),
                                     "KeepAlive": data.get("KeepAlive", False)
                                 })
-                                app_instance.log_output(f"  ✅ Successfully processed {plist_file_path}.")
+                                app_instance.log_output(f"  ✅ Successfully processed {plist_file_path}.", level=DEBUG)
                             else:
                                 app_instance.log_output(f"  ❌ Could not read content of {plist_file_path} (Permission denied or invalid format).")
                         else:
-                            app_instance.log_output(f"  Skipping non-plist file: {filename}")
+                            app_instance.log_output(f"  Skipping non-plist file: {filename}", level=DEBUG)
                 else:
                     app_instance.log_output(f"❌ Could not list LaunchDaemons in {path_dir} (Command failed or permission denied for `sudo ls`).")
             else:
@@ -75,9 +75,9 @@ def generate_scheduled_tasks_report(app_instance: Any, helpers: Any, browser_pre
         
         agent_data = []
         for path_dir in agent_paths:
-            app_instance.log_output(f"Checking LaunchAgent directory: {path_dir}")
+            app_instance.log_output(f"Checking LaunchAgent directory: {path_dir}", level=DEBUG)
             if os.path.exists(path_dir):
-                app_instance.log_output(f"Directory exists: {path_dir}")
+                app_instance.log_output(f"Directory exists: {path_dir}", level=DEBUG)
                 command_to_list = f"sudo ls {path_dir}" if path_dir == "/Library/LaunchAgents/" else f"ls {path_dir}"
                 list_output = helpers.run_command(command_to_list, check_shell=True, app_instance=app_instance) 
                 if list_output:
@@ -85,7 +85,7 @@ def generate_scheduled_tasks_report(app_instance: Any, helpers: Any, browser_pre
                     for filename in list_output.strip().splitlines():
                         if filename.endswith(".plist"):
                             plist_file_path = os.path.join(path_dir, filename)
-                            app_instance.log_output(f"  Attempting to read plist: {plist_file_path}")
+                            app_instance.log_output(f"  Attempting to read plist: {plist_file_path}", level=DEBUG)
                             data = helpers.read_plist_file(plist_file_path, app_instance=app_instance)
                             if data:
                                 program_arg = "N/A"
@@ -103,11 +103,11 @@ def generate_scheduled_tasks_report(app_instance: Any, helpers: Any, browser_pre
                                     "StartCalendarInterval": data.get("StartCalendarInterval", "N/A"),
                                     "KeepAlive": data.get("KeepAlive", False)
                                 })
-                                app_instance.log_output(f"  ✅ Successfully processed {plist_file_path}.")
+                                app_instance.log_output(f"  ✅ Successfully processed {plist_file_path}.", level=DEBUG)
                             else:
                                 app_instance.log_output(f"  ❌ Could not read content of {plist_file_path} (Permission denied or invalid format).")
                         else:
-                            app_instance.log_output(f"  Skipping non-plist file: {filename}")
+                            app_instance.log_output(f"  Skipping non-plist file: {filename}", level=DEBUG)
                 else:
                     app_instance.log_output(f"❌ Could not list LaunchAgents in {path_dir} (Command failed or permission denied for `{command_to_list}`).")
             else:
@@ -137,9 +137,9 @@ def generate_scheduled_tasks_report(app_instance: Any, helpers: Any, browser_pre
         cron_system_paths = ["/etc/crontab", "/etc/cron.d/", "/etc/cron.daily/", "/etc/cron.hourly/", "/etc/cron.monthly/", "/etc/cron.weekly/"]
         found_system_cron_info = False
         for cpath in cron_system_paths:
-            app_instance.log_output(f"Checking system cron directory/file: {cpath}")
+            app_instance.log_output(f"Checking system cron directory/file: {cpath}", level=DEBUG)
             if os.path.exists(cpath):
-                app_instance.log_output(f"Directory exists: {cpath}")
+                app_instance.log_output(f"Directory exists: {cpath}", level=DEBUG)
                 if os.path.isdir(cpath):
                     scripts_in_dir = helpers.run_command(f"sudo ls -l {cpath}", check_shell=True, app_instance=app_instance) 
                     if scripts_in_dir:
@@ -1,7 +1,79 @@
-import sys
-from typing import Any
+import glob
+import html
+import os
+from typing import Any, Dict, Tuple
 
+from ...budget import expired
 from ...helpers import MockAppInstance, Helpers
+from ...collectors.content_scan import RuleError, default_ruleset, iter_files
+
+PAYLOAD_DIRS = ["/tmp", "/var/tmp", "/dev/shm", "/root/Downloads", "/home/*/Downloads", "/Users/*/Downloads"]
+MAX_SCANNED_FILES = 5000
+MAX_COLLECTED_FILES = 100       # files that matched a content rule, copied into the evidence
+MAX_COLLECTED_SIZE = 64 * 1024 * 1024
+
+def _content_scan_html(app_instance: Any, helpers: Any) -> Tuple[str, bool]:
+    """Rule matches for files in payload directories, scanned with the built-in rules (plus IRIS_RULES)."""
+    html_body = "<h3>Content Scan</h3>"
+    if helpers.host_path("/") is None:
+        return html_body + "<p>File contents are not part of a command archive replay.</p>", False
+    try:
+        ruleset = default_ruleset()
+    except (OSError, RuleError) as e:
+        app_instance.log_output(f"Could not load content rules: {e}")
+        return html_body + f"<p>Content rules could not be loaded: {html.escape(str(e))}</p>", False
+
+    rows, scanned, total = "", 0, 0
+    matched: Dict[str, str] = {}        # readable path -> path on the suspect host
+    for pattern in PAYLOAD_DIRS:
+        for directory in sorted(glob.glob(helpers.host_path(pattern))):
+            # Shown as the path on the suspect host, not where it was read from
+            shown_root = pattern.split("*")[0] + directory[len(helpers.host_path(pattern.split("*")[0])):]
+            for path in iter_files([directory]):
+                if scanned >= MAX_SCANNED_FILES or expired("content scan of the payload directories"):
+                    break
+                result = ruleset.scan_file(path)
+                scanned, total = scanned + 1, total + result.size
+                if result.matches:
+                    matched[path] = shown_root + path[len(directory):]
+                for match in result.matches:
+                    strings = ", ".join(f"{name} @ {', '.join(map(str, found[:3]))}" for name, found in match.strings.items())
+                    rows += (f"<tr><td>{html.escape(shown_root + path[len(directory):])}</td><td>{html.escape(match.rule)}</td>"
+                             f"<td>{html.escape(match.meta.get('description', ''))}</td><td>{html.escape(strings)}</td></tr>")
+    if scanned >= MAX_SCANNED_FILES:
+        app_instance.log_output(f"Content scan stopped after {MAX_SCANNED_FILES} files.")
+    if rows:
+        html_body += ("<table><tr><th>File</th><th>Rule</th><th>Description</th><th>Matched Strings (offsets)</th></tr>"
+                      + rows + "</table>")
+    else:
+        html_body += "<p>No files in the payload directories matched a content rule.</p>"
+    html_body += f"<p>{scanned} files ({total / 1e6:.1f} MB) scanned in {', '.join(PAYLOAD_DIRS)}.</p>"
+    if matched:
+        html_body += _collect_matches(app_instance, matched)
+    return html_body, bool(rows)
+
+
+def _collect_matches(app_instance: Any, matched: Dict[str, str]) -> str:
+    """Copies the files that matched a rule into collected/, hashed in parallel, before they can be deleted."""
+    evidence = getattr(app_instance, "evidence", None)
+    if evidence is None:
+        return ""
+    paths = []
+    for path in matched:
+        try:
+            if os.path.getsize(path) <= MAX_COLLECTED_SIZE:
+                paths.append(path)
+        except OSError:
+            continue
+    entries = evidence.collect_files(paths[:MAX_COLLECTED_FILES], shown=matched.get)
+    skipped = len(matched) - len(entries)
+    app_instance.log_output(f"Collected {len(entries)} file(s) that matched a content rule.")
+    html_body = (f"<p>{len(entries)} matching file(s) were copied to <code>collected/</code>; "
+                 "their SHA-256 hashes are in the evidence manifest.</p>")
+    if skipped:
+        html_body += (f"<p>{skipped} matching file(s) were not copied (over {MAX_COLLECTED_SIZE // (1024 * 1024)} MB, "
+                      f"past the first {MAX_COLLECTED_FILES}, or no longer readable).</p>")
+    return html_body
 
 def generate_script_check_report(app_instance: Any, helpers: Any, browser_preference: str = "System Default"):
     """Looks for evidence of suspicious scripts and payloads."""
@@ -10,7 +82,7 @@ def generate_script_check_report(app_instance: Any, helpers: Any, browser_prefer
     html_body = "<h2>Potentially Malicious Scripts & Payloads</h2>"
     found_suspicious_activity = False
 
-    if sys.platform.startswith("linux") or sys.platform == "darwin":
+    if helpers.platform.startswith("linux") or helpers.platform == "darwin":
         # Check Shell History
         html_body += "<h3>Shell History Analysis</h3>"
         history_files = ["~/.bash_history", "~/.zsh_history"]
@@ -47,6 +119,10 @@ def generate_script_check_report(app_instance: Any, helpers: Any, browser_prefer
             found_suspicious_activity = True
         else:
             html_body += "<p>No files matching common payload extensions found in /tmp or ~/Downloads.</p>"
+
+        scan_html, scan_hits = _content_scan_html(app_instance, helpers)
+        html_body += scan_html
+        found_suspicious_activity = found_suspicious_activity or scan_hits
             
     else:
         html_body += "<p>Suspicious script checks are currently implemented for Linux/macOS.</p>"
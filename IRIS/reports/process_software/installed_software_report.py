@@ -1,15 +1,65 @@
-import sys
+import datetime
+import html
+import time
 from typing import Any # ADDED: Import typing hints
 
 # Import necessary components from helpers.py using relative path
 from ...helpers import MockAppInstance, Helpers
+from ...collectors.cache import CollectorCache
+from ...collectors.packages import collect_packages
+
+RECENT_INSTALL_DAYS = 7
+
+
+def _fmt_time(timestamp) -> str:
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S") if timestamp else "N/A"
+
+
+def _package_rows(packages) -> str:
+    return "".join(f"<tr><td>{p.manager}</td><td>{html.escape(p.name)}</td><td>{html.escape(p.version)}</td><td>{p.arch}</td>"
+                   f"<td>{_fmt_time(p.installed_at)}</td><td>{p.size_kb if p.size_kb is not None else ''}</td>"
+                   f"<td>{html.escape(p.location)}</td></tr>" for p in packages)
+
+
+def _linux_packages_html(app_instance: Any, helpers: Any) -> str:
+    """dpkg/rpm/snap/flatpak/pip inventory read straight from the package databases."""
+    if helpers.host_path("/") is None:
+        return "<p>Package databases are read from the host's files and are not part of a command archive replay.</p>"
+    app_instance.log_output("Reading package databases (dpkg, rpm, snap, flatpak, pip)...")
+    start = time.perf_counter()
+    # Only live runs are cached: the mock tree is rebuilt in a new temporary root every run
+    results = collect_packages(helpers.host_path, cache=None if helpers.use_mock else CollectorCache())
+    app_instance.log_output(f"Package databases read in {time.perf_counter() - start:.3f}s: " +
+                            ", ".join(f"{r.manager} {len(r.packages)}{' (cached)' if r.cached else ''}" for r in results))
+    header = "<tr><th>Manager</th><th>Name</th><th>Version</th><th>Arch</th><th>Installed / Updated</th><th>Size (KB)</th><th>Location</th></tr>"
+    if not results:
+        return "<p>No dpkg, rpm, snap, flatpak or Python package databases were found.</p>"
+
+    body = "<h3>Package Sources</h3><table><tr><th>Manager</th><th>Packages</th><th>Notes</th></tr>"
+    for r in results:
+        body += f"<tr><td>{r.manager}</td><td>{len(r.packages)}</td><td>{html.escape(r.error) or ('from cache' if r.cached else '')}</td></tr>"
+    body += "</table>"
+
+    packages = [p for r in results for p in r.packages]
+    cutoff = time.time() - RECENT_INSTALL_DAYS * 86400
+    recent = sorted((p for p in packages if p.installed_at and p.installed_at >= cutoff), key=lambda p: -p.installed_at)
+    body += f"<h3>Installed or Updated in the Last {RECENT_INSTALL_DAYS} Days</h3>"
+    if recent:
+        body += f"<table>{header}{_package_rows(recent)}</table>"
+    else:
+        body += "<p>No packages were installed or updated recently.</p>"
+    body += f"<h3>All Packages ({len(packages)})</h3>"
+    body += f"<table>{header}{_package_rows(sorted(packages, key=lambda p: (p.manager, p.name)))}</table>"
+    body += ("<p>dpkg install times are the mtimes of /var/lib/dpkg/info/*.list, which dpkg rewrites on install and upgrade; "
+             "snap, flatpak and pip times come from their install directories.</p>")
+    return body
 
 def generate_installed_software_report(app_instance: Any, helpers: Any, browser_preference: str = "System Default"):
     """Gathers and reports installed software."""
     app_instance.log_output("\n--- Generating Installed Software Report ---")
     
     html_body = "<h2>Installed Software</h2>"
-    if sys.platform == "win32":
+    if helpers.platform == "win32":
         html_body += "<h3>Windows Installed Programs (via WMIC)</h3><pre>"
         software_output = helpers.run_command("wmic product get Name,Version /format:list", app_instance=app_instance)
         if software_output:
@@ -17,7 +67,7 @@ def generate_installed_software_report(app_instance: Any, helpers: Any, browser_
         else:
             html_body += "Could not retrieve installed software information."
         html_body += "</pre>"
-    elif sys.platform == "darwin":
+    elif helpers.platform == "darwin":
         html_body += "<h3>macOS Installed Applications (Common Locations)</h3>"
         html_body += "<p>This is a basic listing of applications found in common directories. A comprehensive list would require parsing receipts or other package management data.</p>"
         html_body += "<h4>/Applications/</h4><pre>"
@@ -34,6 +84,8 @@ def generate_installed_software_report(app_instance: Any, helpers: Any, browser_
         else:
             html_body += "Could not list applications in ~/Applications/."
         html_body += "</pre>"
+    elif helpers.platform.startswith("linux"):
+        html_body += _linux_packages_html(app_instance, helpers)
     else:
         html_body += "<p>Installed software reporting for this OS is not yet fully implemented.</p>"
 
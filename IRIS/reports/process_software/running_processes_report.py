@@ -1,8 +1,22 @@
-import sys
-from typing import Any
+import html
+from typing import Any, List
 
 # Import necessary components from helpers.py using relative path
+from ...budget import expired
 from ...helpers import MockAppInstance, Helpers
+from ...collectors.cache import CollectorCache
+from ...collectors.content_scan import RuleError, default_ruleset
+from ...collectors.executables import collect_executable_hashes
+from ...collectors.hash_allowlist import open_allowlist
+from ...log_pipeline import WARNING
+
+def _rule_matches(ruleset: Any, sources: List[str]) -> List[str]:
+    """Names of the content rules an executable matches, read through the first of its sources that opens."""
+    for source in sources:
+        result = ruleset.scan_file(source)
+        if not result.error:
+            return [match.rule for match in result.matches]
+    return []
 
 def generate_running_processes_report(app_instance: Any, helpers: Any, browser_preference: str = "System Default"):
     """Gathers and reports running processes, with a special focus on Python processes."""
@@ -12,32 +26,79 @@ def generate_running_processes_report(app_instance: Any, helpers: Any, browser_p
     
     # --- Section 1: Full Process List ---
     html_body += "<h3>Full Process List</h3>"
-    if sys.platform == "win32":
+    if helpers.platform == "win32":
         processes_output = helpers.run_command(r"powershell.exe -Command \"Get-Process | Format-Table -AutoSize\"", app_instance=app_instance)
         if processes_output:
             html_body += f"<pre>{processes_output}</pre>"
         else:
             html_body += "<p>Could not retrieve Windows processes.</p>"
     
-    elif sys.platform.startswith("linux") or sys.platform == "darwin":
+    elif helpers.platform.startswith("linux") or helpers.platform == "darwin":
         processes_output = helpers.run_command("ps aux", check_shell=True, app_instance=app_instance)
         if processes_output:
             html_body += f"<pre>{processes_output}</pre>"
         else:
             html_body += "<p>Could not retrieve system processes.</p>"
 
-    # --- Section 2: Python Process Analysis ---
+    # --- Section 2: Executable Hashes (Linux, through /proc/<pid>/exe) ---
+    if helpers.platform.startswith("linux"):
+        html_body += "<h3>Executable Hashes</h3>"
+        if helpers.host_path("/proc") is None:
+            html_body += "<p>Executables are hashed through /proc and are not part of a command archive replay.</p>"
+        else:
+            try:
+                executables = collect_executable_hashes(helpers.host_path, cache=None if helpers.use_mock else CollectorCache())
+            except OSError as e:
+                app_instance.log_output(f"Could not read /proc: {e}", level=WARNING)
+                executables = []
+            if executables:
+                processes = sum(len(executable.pids) for executable in executables)
+                cached = sum(1 for executable in executables if executable.cached)
+                html_body += (f"<p>{processes} processes run {len(executables)} distinct executables; "
+                              f"{cached} digests were reused from a previous scan of unchanged files.</p>")
+                allowlist = open_allowlist()
+                try:
+                    ruleset = default_ruleset()
+                except (OSError, RuleError) as e:
+                    app_instance.log_output(f"Could not load content rules: {e}", level=WARNING)
+                    ruleset = None
+                html_body += "<table><tr><th>SHA-256</th><th>Executable</th><th>Size</th><th>Processes</th><th>PIDs</th>"
+                html_body += "<th>Rule Matches</th>" if ruleset is not None else ""
+                html_body += "<th>Known Good</th></tr>" if allowlist is not None else "</tr>"
+                for executable in executables:
+                    known_good = allowlist is not None and bool(executable.sha256) and executable.sha256 in allowlist
+                    # Known-good binaries are not worth reading a second time
+                    scan = ruleset is not None and not known_good and not expired("rule scan of executables")
+                    rules = _rule_matches(ruleset, executable.sources) if scan else []
+                    flag = "⚠️ " if executable.deleted or rules else ""
+                    note = " (deleted or replaced on disk)" if executable.deleted else ""
+                    pids = ", ".join(map(str, executable.pids[:10])) + (" ..." if len(executable.pids) > 10 else "")
+                    html_body += (f"<tr><td><code>{executable.sha256 or html.escape(executable.error) or 'N/A'}</code></td>"
+                                  f"<td>{flag}{html.escape(executable.path)}{note}</td><td>{executable.size}</td>"
+                                  f"<td>{len(executable.pids)}</td><td>{pids}</td>")
+                    if ruleset is not None:
+                        html_body += f"<td>{html.escape(', '.join(rules))}</td>"
+                    if allowlist is not None:
+                        html_body += f"<td>{'✅' if known_good else 'unknown'}</td>"
+                    html_body += "</tr>"
+                html_body += "</table>"
+                if allowlist is not None:
+                    allowlist.close()
+            else:
+                html_body += "<p>No process executables could be read (insufficient privileges?).</p>"
+
+    # --- Section 3: Python Process Analysis ---
     html_body += "<h3>Python Process Analysis</h3>"
     html_body += "<p>The following processes were launched using a Python interpreter. Review these for unauthorized or suspicious scripts, as Python is a common tool for backdoors and utilities.</p>"
     
     found_python = False
-    if sys.platform == "win32":
+    if helpers.platform == "win32":
         python_procs = helpers.run_command(r"powershell.exe -Command \"Get-Process | Where-Object { $_.ProcessName -like '*python*' } | Select-Object ProcessName, Id, Path\"", app_instance=app_instance)
         if python_procs and "Get-Process" not in python_procs:
             html_body += f"<pre>{python_procs}</pre>"
             found_python = True
 
-    elif sys.platform.startswith("linux") or sys.platform == "darwin":
+    elif helpers.platform.startswith("linux") or helpers.platform == "darwin":
         # The '[]' trick in grep prevents the grep process itself from appearing in the output
         python_procs = helpers.run_command("ps aux | grep '[p]ython'", check_shell=True, app_instance=app_instance)
         if python_procs:
@@ -0,0 +1,150 @@
+import importlib
+import importlib.util
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+# --- Report registry ---
+# The single declarative list of reports. It holds only names and metadata:
+# report modules (and their heavy dependencies, such as psutil and plistlib)
+# are imported the first time a report is run. The CLI runner and the GUI are
+# both generated from this table, and the metadata lets the runner skip
+# inapplicable reports before anything is forked.
+
+ALL_PLATFORMS = ("linux", "darwin", "win32")
+
+# Cost classes, cheapest first. Used for ordering and parallel scheduling.
+COST_CHEAP = "cheap"          # a handful of quick commands or file reads
+COST_MODERATE = "moderate"    # several commands, or one slow profiler call
+COST_EXPENSIVE = "expensive"  # per-process/per-device scans or timed captures
+COST_ORDER = {COST_CHEAP: 0, COST_MODERATE: 1, COST_EXPENSIVE: 2}
+# Volatility classes, most volatile first (after RFC 3227's order of volatility).
+# Order-of-volatility runs collect what disappears soonest first.
+VOLATILITY_NETWORK = "network"      # connections, traffic, routes and neighbours
+VOLATILITY_PROCESS = "process"      # the process table and what processes hold
+VOLATILITY_SESSION = "session"      # logged-in users and attached removable devices
+VOLATILITY_TEMP = "temp"            # temporary files and download directories
+VOLATILITY_DISK = "disk"            # user data that changes with use (browser history)
+VOLATILITY_CONFIG = "config"        # accounts, autostart entries, firewall and security settings
+VOLATILITY_HARDWARE = "hardware"    # installed software and hardware inventory
+VOLATILITY_ORDER = {VOLATILITY_NETWORK: 0, VOLATILITY_PROCESS: 1, VOLATILITY_SESSION: 2, VOLATILITY_TEMP: 3,
+                    VOLATILITY_DISK: 4, VOLATILITY_CONFIG: 5, VOLATILITY_HARDWARE: 6}
+# Default time budget per cost class, in seconds; a report past its budget renders what it has gathered
+COST_BUDGETS = {COST_CHEAP: 30.0, COST_MODERATE: 60.0, COST_EXPENSIVE: 120.0}
+
+
+@dataclass(frozen=True)
+class ReportSpec:
+    id: str
+    title: str
+    group: str
+    module: str
+    function: str
+    platforms: Tuple[str, ...] = ALL_PLATFORMS
+    cost: str = COST_CHEAP
+    privileged: bool = False                # complete results need root/admin (e.g. `sudo` commands)
+    depends_on: Tuple[str, ...] = ()        # Python modules that must be importable
+    data_sources: Tuple[str, ...] = ()      # commands and files the report reads
+    default: bool = True                    # included when running "all reports"
+    budget_s: Optional[float] = None        # time budget in seconds (default: by cost class)
+    volatility: str = VOLATILITY_CONFIG     # how soon the evidence it collects changes or disappears
+
+    @property
+    def time_budget(self) -> float:
+        return self.budget_s if self.budget_s is not None else COST_BUDGETS.get(self.cost, COST_BUDGETS[COST_MODERATE])
+
+    def load(self) -> Callable:
+        """Imports the report module on first use and returns its generate_* function."""
+        module = importlib.import_module(f"IRIS.reports.{self.group}.{self.module}")
+        return getattr(module, self.function)
+
+    def supports_platform(self, platform: str) -> bool:
+        return any(platform.startswith(p) for p in self.platforms)
+
+    def missing_dependencies(self) -> List[str]:
+        return [name for name in self.depends_on if importlib.util.find_spec(name) is None]
+
+    def skip_reason(self, platform: str) -> Optional[str]:
+        """Returns why the report cannot run on this host, or None if it is applicable."""
+        if not self.supports_platform(platform):
+            return f"not supported on {platform} (supports: {', '.join(self.platforms)})"
+        missing = self.missing_dependencies()
+        if missing:
+            return f"missing Python module(s): {', '.join(missing)}"
+        return None
+
+
+REPORTS: List[ReportSpec] = [
+    # Group 1: Core System & Hardware
+    ReportSpec("system_info", "System Information", "system_info", "system_hardware_info", "generate_system_hardware_report",
+               cost=COST_MODERATE, volatility=VOLATILITY_HARDWARE,
+               data_sources=("system_profiler", "sysctl", "vm_stat", "diskutil", "df", "systeminfo", "wmic")),
+    ReportSpec("usb_camera_bluetooth", "USB, Camera & Bluetooth", "system_info", "usb_camera_bluetooth_report", "generate_usb_camera_bluetooth_report",
+               platforms=("darwin", "linux"), cost=COST_MODERATE, volatility=VOLATILITY_SESSION,
+               data_sources=("system_profiler", "/sys/bus/usb/devices", "usb.ids")),
+
+    # Group 2: User & Security
+    ReportSpec("local_accounts", "Local Accounts", "user_security", "local_accounts_report", "generate_local_accounts_report",
+               data_sources=("/etc/passwd", "dscl", "wmic", "net localgroup")),
+    ReportSpec("logon", "Logon Report", "user_security", "logon_report", "generate_logon_report",
+               platforms=("linux",), privileged=True, volatility=VOLATILITY_SESSION,
+               data_sources=("journalctl", "/var/log/auth.log", "IRIS_JOURNALCTL", "IRIS_JOURNAL_RESET")),
+    ReportSpec("antivirus_status", "Antivirus Status", "user_security", "antivirus_status_report", "generate_antivirus_status_report"),
+    ReportSpec("web_history", "Web History", "user_security", "web_history_report", "generate_web_history_report",
+               volatility=VOLATILITY_DISK,
+               data_sources=("History", "places.sqlite")),
+
+    # Group 3: Network & Connectivity
+    ReportSpec("tcp_connections", "TCP Connections", "network", "tcp_connections_report", "generate_tcp_connections_report",
+               volatility=VOLATILITY_NETWORK,
+               data_sources=("ss", "lsof", "netstat", "/proc/net", "/proc/<pid>/fd")),
+    ReportSpec("network_config", "Network Configuration", "network", "network_config_report", "generate_network_config_report",
+               volatility=VOLATILITY_NETWORK,
+               data_sources=("ifconfig", "scutil", "ipconfig", "/sys/class/net", "/proc/net/route", "/etc/resolv.conf")),
+    ReportSpec("firewall_rules", "Firewall Rules", "network", "firewall_rules_report", "generate_firewall_rules_report",
+               privileged=True, data_sources=("iptables-save", "ip6tables-save", "nft", "ss")),
+    ReportSpec("network_traffic", "Network Traffic", "network", "network_traffic_report", "generate_network_traffic_report",
+               platforms=("linux",), cost=COST_EXPENSIVE, default=False,
+               budget_s=30.0,   # the sampling window is shortened to fit
+               volatility=VOLATILITY_NETWORK,
+               data_sources=("/proc/net/dev", "/proc/<pid>/io", "/proc/<pid>/fd", "sock_diag", "IRIS_TRAFFIC_WINDOW",
+                             "IRIS_PCAP", "tcpdump")),
+
+    # Group 4: Running State & Software
+    ReportSpec("running_processes", "Running Processes", "process_software", "running_processes_report", "generate_running_processes_report",
+               cost=COST_MODERATE, volatility=VOLATILITY_PROCESS, data_sources=("ps", "powershell", "/proc/<pid>/exe")),
+    ReportSpec("installed_software", "Installed Software", "process_software", "installed_software_report", "generate_installed_software_report",
+               cost=COST_MODERATE, volatility=VOLATILITY_HARDWARE,
+               data_sources=("/Applications", "wmic", "/var/lib/dpkg", "/var/lib/rpm", "/snap", "flatpak", "site-packages")),
+
+    # Group 5: Persistence & Malicious Activity
+    ReportSpec("scheduled_tasks", "Scheduled Tasks", "persistence_malware", "scheduled_tasks_report", "generate_scheduled_tasks_report",
+               platforms=("darwin",), cost=COST_MODERATE, privileged=True,
+               data_sources=("LaunchDaemons", "LaunchAgents", "crontab", "/etc/cron*")),
+    ReportSpec("startup_items", "Startup Items", "persistence_malware", "startup_items_report", "generate_startup_items_report"),
+    ReportSpec("script_check", "Script Check", "persistence_malware", "script_check_report", "generate_script_check_report",
+               platforms=("linux", "darwin"), volatility=VOLATILITY_TEMP,
+               data_sources=("~/.bash_history", "~/.zsh_history", "/tmp", "/var/tmp", "/dev/shm", "~/Downloads", "IRIS_RULES")),
+    ReportSpec("process_persistence", "Process Persistence", "persistence_malware", "process_persistence_report", "generate_process_persistence_report",
+               cost=COST_EXPENSIVE, privileged=True, depends_on=("psutil",), volatility=VOLATILITY_PROCESS,
+               data_sources=("psutil", "/proc/<pid>/exe")),
+
+    # Group 6: Timeline
+    ReportSpec("timeline", "Super-Timeline", "timeline", "timeline_report", "generate_timeline_report",
+               platforms=("linux", "darwin"), cost=COST_EXPENSIVE, volatility=VOLATILITY_DISK,
+               data_sources=("/var/log/auth.log", "/var/log/secure", "/proc/<pid>/stat", "/tmp", "~/Downloads",
+                             "/etc/cron*", "/etc/systemd/system", "LaunchDaemons", "LaunchAgents", "History", "places.sqlite",
+                             "/sys/bus/usb/devices")),
+]
+
+REPORTS_BY_ID: Dict[str, ReportSpec] = {spec.id: spec for spec in REPORTS}
+
+
+def get_report(report_id: str) -> ReportSpec:
+    try:
+        return REPORTS_BY_ID[report_id]
+    except KeyError:
+        raise KeyError(f"Unknown report id: {report_id}") from None
+
+
+def default_reports() -> List[ReportSpec]:
+    return [spec for spec in REPORTS if spec.default]
@@ -1,7 +1,6 @@
 import sys
 import subprocess
 import plistlib
-import requests
 import os
 import datetime
 import re
@@ -18,6 +17,7 @@ VENDOR_ID_MAP = {
 
 # --- Helper Functions for Vendor Lookup ---
 def download_oui_file():
+    import requests  # deferred: only needed when the OUI file is refreshed
     print(f"   ℹ️ Downloading fresh OUI file from IEEE...")
     try:
         response = requests.get(OUI_URL, timeout=15)
@@ -56,6 +56,7 @@ def get_vendor_from_local_fallback(mac_address):
     return parse_local_oui_file(mac_address) or "Vendor not found in local file"
 
 def get_mac_vendor(mac_address):
+    import requests  # deferred: only needed for online vendor lookups
     try:
         response = requests.get(f"https://api.macvendors.com/{mac_address}", timeout=3)
         if response.status_code == 200:
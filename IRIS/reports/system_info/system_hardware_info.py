@@ -1,11 +1,12 @@
 import platform
-import sys
 import re
 import plistlib
 from typing import List, Optional, Dict, Any, Union
 
 # Import necessary components from helpers.py using relative path
 from ...helpers import MockAppInstance, Helpers, DiskInfo
+from ...collectors.storage import (DF_ALL, PROFILER_STORAGE, index_profiler_storage, linux_disks, macos_disks, parse_df,
+                                   statvfs_usage)
 
 def generate_system_hardware_report(app_instance: Any, helpers: Any, browser_preference: str = "System Default"):
     """Gathers and reports general system, hardware, memory, and storage information."""
@@ -20,7 +21,7 @@ def generate_system_hardware_report(app_instance: Any, helpers: Any, browser_pre
     html_body += f"<tr><td>Machine Architecture</td><td>{platform.machine()}</td></tr>"
     html_body += f"<tr><td>Processor (Generic)</td><td>{platform.processor()}</td></tr>"
     
-    if sys.platform == "win32":
+    if helpers.platform == "win32":
         app_instance.log_output("Gathering detailed Windows system information...")
         output_os = helpers.run_command('systeminfo | findstr /B /C:"OS Name" /C:"OS Version" /C:"System Manufacturer" /C:"System Model" /C:"Processor(s)" /C:"Total Physical Memory"', app_instance=app_instance)
         if output_os:
@@ -29,7 +30,7 @@ def generate_system_hardware_report(app_instance: Any, helpers: Any, browser_pre
                     attr, val = line.split(":", 1)
                     html_body += f"<tr><td>{attr.strip()}</td><td>{val.strip()}</td></tr>"
     
-    elif sys.platform == "darwin":
+    elif helpers.platform == "darwin":
         app_instance.log_output("Gathering detailed macOS system information using `system_profiler`...")
 
         try:
@@ -56,7 +57,7 @@ def generate_system_hardware_report(app_instance: Any, helpers: Any, browser_pre
 
     # --- Memory Information ---
     html_body += "<h2>Memory (RAM) Information</h2><table><tr><th>Metric</th><th>Value</th></tr>"
-    if sys.platform == "darwin":
+    if helpers.platform == "darwin":
         try:
             total_mem_kb_str = helpers.run_command("sysctl -n hw.memsize", check_shell=True, app_instance=app_instance)
             if total_mem_kb_str:
@@ -130,7 +131,7 @@ def generate_system_hardware_report(app_instance: Any, helpers: Any, browser_pre
         except Exception as e:
             app_instance.log_output(f"Error gathering macOS Memory details: {e}")
             html_body += f"<tr><td colspan='2'>Error gathering detailed macOS Memory info.</td></tr>"
-    elif sys.platform == "win32":
+    elif helpers.platform == "win32":
         try:
             wmic_mem_output = helpers.run_command("wmic ComputerSystem get TotalPhysicalMemory", app_instance=app_instance)
             if wmic_mem_output:
@@ -157,96 +158,40 @@ def generate_system_hardware_report(app_instance: Any, helpers: Any, browser_pre
 
     # --- Storage Information ---
     html_body += "<h2>Storage Information</h2><table><tr><th>Drive/Volume</th><th>Size</th><th>Used</th><th>Available</th><th>Filesystem</th><th>Mount Point</th><th>Serial (if available)</th></tr>"
-    if sys.platform == "darwin":
+    if helpers.platform == "darwin" or helpers.platform.startswith("linux"):
         parsed_disks = []
         try:
-            disk_info_plist_str = helpers.run_command("diskutil list -plist", check_shell=True, app_instance=app_instance)
-            if disk_info_plist_str:
-                try:
-                    if isinstance(disk_info_plist_str, bytes):
-                        disk_info_plist_str = disk_info_plist_str.decode('utf-8', errors='replace')
-
-                    disk_plist = plistlib.loads(disk_info_plist_str.encode('utf-8'))
-                    all_disks_and_partitions = disk_plist.get('AllDisksAndPartitions', [])
-                    
-                    for disk_entry in all_disks_and_partitions:
-                        if not isinstance(disk_entry, dict):
-                            app_instance.log_output(f"Warning: Skipping non-dictionary disk entry: {type(disk_entry)} - {disk_entry}")
-                            continue
-
-                        disk_name = disk_entry.get('DeviceIdentifier', 'N/A')
-                        disk_size_bytes = disk_entry.get('Size', 0)
-                        disk_size_gb = round(disk_size_bytes / (1024**3), 2)
-                        disk_serial = "N/A"
-
-                        if disk_entry.get('Product'):
-                            serial_output = helpers.run_command(f"system_profiler SPNVMeDataType SPSerialATADataType | grep \"{disk_entry['Product']}\" -B 5 | grep \"Serial Number:\"", check_shell=True, app_instance=app_instance)
-                            if serial_output:
-                                serial_match = re.search(r'Serial Number: (.+)', serial_output)
-                                if serial_match:
-                                    disk_serial = serial_match.group(1).strip()
-                            else:
-                                app_instance.log_output(f"Could not get serial for {disk_name} via system_profiler.")
-                        
-                        parsed_disks.append(DiskInfo(
-                            name=disk_name,
-                            type="Physical Disk",
-                            size_gb=disk_size_gb,
-                            used="N/A", available="N/A",
-                            filesystem="N/A", mount_point="N/A",
-                            serial=disk_serial,
-                            volume_name="N/A", device_identifier=disk_name
-                        ))
-
-                        if 'Partitions' in disk_entry and isinstance(disk_entry['Partitions'], list):
-                            for partition in disk_entry['Partitions']:
-                                if not isinstance(partition, dict):
-                                    app_instance.log_output(f"Warning: Skipping non-dictionary partition: {type(partition)} - {partition}")
-                                    continue
-                                
-                                part_name = partition.get('VolumeName', partition.get('DeviceIdentifier', 'N/A'))
-                                part_size_bytes = partition.get('Size', 0)
-                                part_size_gb = round(part_size_bytes / (1024**3), 2)
-                                part_fs = partition.get('FilesystemType', 'N/A')
-                                part_mount_point = partition.get('MountPoint', 'N/A')
-
-                                used = "N/A"
-                                avail = "N/A"
-                                if part_mount_point and part_mount_point != "N/A":
-                                    df_output = helpers.run_command(f"df -h '{part_mount_point}'", check_shell=True, app_instance=app_instance)
-                                    if df_output and len(df_output.splitlines()) > 1:
-                                        df_parts = df_output.splitlines()[1].split()
-                                        if len(df_parts) > 3:
-                                            used = df_parts[2]
-                                            avail = df_parts[3]
-
-                                parsed_disks.append(DiskInfo(
-                                    name=part_name,
-                                    type="Partition",
-                                    size_gb=part_size_gb,
-                                    used=used, available=avail,
-                                    filesystem=part_fs, mount_point=part_mount_point,
-                                    serial="N/A",
-                                    volume_name=partition.get('VolumeName'), device_identifier=partition.get('DeviceIdentifier')
-                                ))
+            # Live runs measure volumes with statvfs; mock and replay runs use one recorded `df` listing instead
+            if not helpers.use_mock and helpers.host_path("/") is not None:
+                usage = statvfs_usage
+            else:
+                usage = parse_df(helpers.run_command(DF_ALL, check_shell=True, app_instance=app_instance)).get
 
-                except plistlib.InvalidFileException:
-                    app_instance.log_output(f"Error: diskutil list -plist output not valid. Raw output snippet: {disk_info_plist_str[:500]}...")
-                    html_body += f"<tr><td colspan='7'>Error parsing diskutil output. Raw data snippet: <pre>{disk_info_plist_str[:500]}</pre></td></tr>"
-                except Exception as e:
-                    app_instance.log_output(f"Unexpected error parsing diskutil list: {e}")
-                    html_body += f"<tr><td colspan='7'>Unexpected error parsing diskutil list.</td></tr>"
+            if helpers.platform == "darwin":
+                disk_info_plist_str = helpers.run_command("diskutil list -plist", check_shell=True, app_instance=app_instance)
+                if disk_info_plist_str:
+                    profiler_index = index_profiler_storage(helpers.run_command(PROFILER_STORAGE, check_shell=True, app_instance=app_instance))
+                    try:
+                        parsed_disks = macos_disks(disk_info_plist_str, profiler_index, usage)
+                    except (plistlib.InvalidFileException, ValueError):
+                        app_instance.log_output(f"Error: diskutil list -plist output not valid. Raw output snippet: {disk_info_plist_str[:500]}...")
+                        html_body += f"<tr><td colspan='7'>Error parsing diskutil output. Raw data snippet: <pre>{disk_info_plist_str[:500]}</pre></td></tr>"
+            elif helpers.host_path("/") is None:
+                html_body += "<tr><td colspan='7'>Linux storage is read from /proc and /sys and is not part of a command archive replay.</td></tr>"
+            else:
+                parsed_disks = linux_disks(helpers.host_path, usage)
 
             if parsed_disks:
                 for d in parsed_disks:
-                    html_body += f"<tr><td>{d.name} ({d.type})</td><td>{d.size_gb} GB</td><td>{d.used}</td><td>{d.available}</td><td>{d.filesystem}</td><td>{d.mount_point}</td><td>{d.serial}</td></tr>"
+                    label = f"{d.name} ({d.type})" + (f"<br><small>{d.model}</small>" if d.model else "")
+                    html_body += f"<tr><td>{label}</td><td>{d.size_gb} GB</td><td>{d.used}</td><td>{d.available}</td><td>{d.filesystem}</td><td>{d.mount_point}</td><td>{d.serial}</td></tr>"
             else:
-                html_body += "<p>No storage devices found or processed.</p>"
+                html_body += "<tr><td colspan='7'>No storage devices found or processed.</td></tr>"
 
         except Exception as e:
-            app_instance.log_output(f"Error gathering macOS Storage details: {e}")
-            html_body += f"<tr><td colspan='7'>Error gathering detailed macOS Storage info.</td></tr>"
-    elif sys.platform == "win32":
+            app_instance.log_output(f"Error gathering storage details: {e}")
+            html_body += f"<tr><td colspan='7'>Error gathering detailed storage info.</td></tr>"
+    elif helpers.platform == "win32":
         try:
             wmic_disk_output = helpers.run_command("wmic diskdrive get Caption,SerialNumber,Size /format:list", app_instance=app_instance)
             if wmic_disk_output:
@@ -1,7 +1,12 @@
-import sys
+import datetime
+import html
 import plistlib
+import time
 from typing import List, Dict, Any
 from ...helpers import MockAppInstance, Helpers
+from ...collectors.usb import CLASS_HID, CLASS_MASS_STORAGE, CLASS_VIDEO, CLASS_WIRELESS, collect_usb_devices
+
+RECENT_SECONDS = 24 * 3600
 
 def _find_devices_with_key(items: List[Dict], key: str, results: List[Dict]):
     for item in items:
@@ -47,13 +52,77 @@ document.querySelectorAll("table").forEach(table => {
 </script>
 """
 
+def _linux_usb_html(app_instance: Any, helpers: Any) -> str:
+    """USB devices, cameras and Bluetooth adapters from /sys/bus/usb/devices, named through usb.ids."""
+    if helpers.host_path("/") is None:
+        return "<p>Linux USB devices are read from sysfs and are not part of a command archive replay.</p>"
+    try:
+        devices, source = collect_usb_devices(helpers.host_path)
+    except OSError as e:
+        app_instance.log_output(f"Could not read /sys/bus/usb/devices: {e}")
+        return "<p>No USB devices found.</p>"
+    if not source:
+        app_instance.log_output("No usb.ids database found; showing the names devices report about themselves.")
+    now = time.time()
+
+    def when(device) -> str:
+        if device.connected_at is None:
+            return ""
+        stamp = datetime.datetime.fromtimestamp(device.connected_at).strftime("%Y-%m-%d %H:%M:%S")
+        return f"🆕 {stamp}" if now - device.connected_at < RECENT_SECONDS else stamp
+
+    html_body = "<h3>USB Devices</h3>"
+    peripherals = [device for device in devices if not device.is_hub]
+    if peripherals:
+        html_body += "<table><tr><th>Port</th><th>Name</th><th>Manufacturer</th><th>Vendor:Product</th><th>Serial #</th><th>Speed (Mbit/s)</th><th>Classes</th><th>Driver</th><th>Enumerated</th></tr>"
+        for device in peripherals:
+            flag = "⚠️ " if {CLASS_HID, CLASS_MASS_STORAGE} <= set(device.interface_classes) else ""
+            names = " / ".join(name for name in (device.product, device.product_name) if name) or "N/A"
+            vendor = " / ".join(name for name in dict.fromkeys((device.manufacturer, device.vendor_name)) if name) or "N/A"
+            html_body += (f"<tr><td>{device.path}</td><td>{flag}{html.escape(names)}</td><td>{html.escape(vendor)}</td>"
+                          f"<td>{device.vendor_id}:{device.product_id}</td><td>{html.escape(device.serial)}</td>"
+                          f"<td>{device.speed_mbps}</td><td>{', '.join(device.classes)}</td>"
+                          f"<td>{html.escape(', '.join(device.drivers))}</td><td>{when(device)}</td></tr>")
+        html_body += "</table>"
+        html_body += (f"<p>{len(devices) - len(peripherals)} hubs not shown. ⚠️ marks devices presenting both a keyboard/HID "
+                      "and mass storage, typical of keystroke-injection tools; 🆕 marks devices enumerated in the last 24 hours "
+                      "(sysfs creation time, reset at boot).</p>")
+    else:
+        html_body += "<p>No USB devices found.</p>"
+
+    html_body += "<h3>Camera Devices</h3>"
+    cameras = [device for device in peripherals if CLASS_VIDEO in device.interface_classes]
+    if cameras:
+        html_body += "<table><tr><th>Name</th><th>Vendor:Product</th><th>Port</th><th>Driver</th></tr>"
+        for device in cameras:
+            html_body += (f"<tr><td>{html.escape(device.display_name)}</td><td>{device.vendor_id}:{device.product_id}</td>"
+                          f"<td>{device.path}</td><td>{html.escape(', '.join(device.drivers))}</td></tr>")
+        html_body += "</table>"
+    else:
+        html_body += "<p>No USB camera devices found.</p>"
+
+    html_body += "<h3>Bluetooth Adapters</h3>"
+    adapters = [device for device in peripherals if CLASS_WIRELESS in device.interface_classes or device.device_class == CLASS_WIRELESS]
+    if adapters:
+        html_body += "<table><tr><th>Name</th><th>Vendor</th><th>Vendor:Product</th><th>Port</th><th>Driver</th></tr>"
+        for device in adapters:
+            html_body += (f"<tr><td>{html.escape(device.product_name or device.display_name)}</td>"
+                          f"<td>{html.escape(device.vendor_name or device.manufacturer)}</td><td>{device.vendor_id}:{device.product_id}</td>"
+                          f"<td>{device.path}</td><td>{html.escape(', '.join(device.drivers))}</td></tr>")
+        html_body += "</table>"
+    else:
+        html_body += "<p>No USB Bluetooth adapters found.</p>"
+    return html_body
+
 def generate_usb_camera_bluetooth_report(app_instance: Any, helpers: Any, browser_preference: str = "System Default"):
     app_instance.log_output("\n--- Generating USB, Camera & Bluetooth Devices Report ---")
 
     html_body = "<h2>Connected Peripheral Devices</h2>"
 
-    if sys.platform != "darwin":
-        html_body += "<p>This report only supports macOS.</p>"
+    if helpers.platform.startswith("linux"):
+        html_body += _linux_usb_html(app_instance, helpers)
+    elif helpers.platform != "darwin":
+        html_body += "<p>This report supports macOS and Linux.</p>"
     else:
         # --- USB Devices ---
         html_body += "<h3>USB Devices</h3>"
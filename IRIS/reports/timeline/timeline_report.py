@@ -0,0 +1,205 @@
+import csv
+import datetime
+import glob
+import html
+import io
+import json
+import os
+import sqlite3
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from ...budget import expired
+from ...helpers import MockAppInstance, Helpers
+from ...collectors.browser_history import discover_profiles, home_directories, iter_visits
+from ...collectors.content_scan import iter_files
+from ...collectors.timeline import Event, MergeStats, TimelineSource, file_events, merge_timeline, process_events, syslog_events
+from ...collectors.usb import collect_usb_devices
+from ...evidence import KIND_REPORT
+from ...log_pipeline import WARNING
+from ..persistence_malware.script_check_report import PAYLOAD_DIRS
+
+AUTH_LOGS = ["/var/log/auth.log*", "/var/log/secure*"]
+PERSISTENCE_PATHS = {
+    "linux": ["/etc/crontab", "/etc/cron.d", "/etc/cron.hourly", "/etc/cron.daily", "/etc/cron.weekly", "/etc/cron.monthly",
+              "/var/spool/cron", "/etc/systemd/system", "/etc/rc.local", "/etc/init.d", "/home/*/.config/autostart",
+              "/home/*/.config/systemd/user"],
+    "darwin": ["/Library/LaunchDaemons", "/Library/LaunchAgents", "/Users/*/Library/LaunchAgents", "/usr/lib/cron/tabs",
+               "/etc/periodic"],
+}
+PAGE_EVENTS = 1000              # events per HTML page
+CHECK_EVERY = 10000             # events between time budget checks
+PAGES_DIR = "Timeline_Pages"
+COLUMNS = ["time_utc", "timestamp", "source", "kind", "description", "detail"]
+PAGE_STYLE = ("body{font-family:sans-serif;font-size:13px}table{border-collapse:collapse;width:100%}"
+              "td,th{border:1px solid #ccc;padding:3px 6px;text-align:left;vertical-align:top}th{background:#eee}")
+
+
+def _fmt_time(timestamp: Optional[float]) -> str:
+    if timestamp is None:
+        return "N/A"
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _host_files(patterns: List[str], helpers: Any) -> Iterator[str]:
+    for pattern in patterns:
+        yield from sorted(glob.glob(helpers.host_path(pattern)))
+
+
+def _visit_events(profile: Any, source: str, app_instance: Any) -> Iterator[Event]:
+    try:
+        for visit in iter_visits(profile):
+            yield Event(visit.timestamp, source, "page visited", visit.url, visit.title or "")
+    except sqlite3.DatabaseError as e:
+        app_instance.log_output(f"Warning: could not read {profile.history_path}: {e}", level=WARNING)
+
+
+def _usb_events(helpers: Any, app_instance: Any) -> Iterator[Event]:
+    try:
+        devices, _ = collect_usb_devices(helpers.host_path)
+    except OSError as e:
+        app_instance.log_output(f"Could not read USB devices: {e}")
+        return
+    for device in devices:
+        if device.connected_at is not None:
+            name = device.product_name or device.product or f"{device.vendor_id}:{device.product_id}"
+            yield Event(device.connected_at, "usb", "USB device enumerated", name,
+                        f"{device.vendor_id}:{device.product_id} serial {device.serial or 'N/A'} at {device.path}")
+
+
+def _sources(app_instance: Any, helpers: Any) -> List[TimelineSource]:
+    """Every event source on this host. Logs and browser histories are read in time order; the rest are sorted in runs."""
+    root = helpers.host_path("/")
+    shown: Callable[[str], str] = lambda path: "/" + os.path.relpath(path, root).replace(os.sep, "/")
+    sources = []
+    for path in _host_files(AUTH_LOGS, helpers):
+        if os.path.isfile(path):
+            sources.append(TimelineSource(os.path.basename(path), lambda path=path: syslog_events(path, os.path.basename(path)),
+                                          presorted=True))
+    if helpers.platform.startswith("linux"):
+        sources.append(TimelineSource("processes", lambda: process_events(helpers.host_path("/proc"))))
+        sources.append(TimelineSource("usb", lambda: _usb_events(helpers, app_instance)))
+    sources.append(TimelineSource("payload directories", lambda: file_events(
+        iter_files(_host_files(PAYLOAD_DIRS, helpers)), "payload directories", "file modified", shown)))
+    persistence = PERSISTENCE_PATHS.get("darwin" if helpers.platform == "darwin" else "linux", [])
+    sources.append(TimelineSource("persistence", lambda: file_events(
+        iter_files(_host_files(persistence, helpers)), "persistence", "autostart entry modified", shown)))
+    for profile in discover_profiles(home_directories(helpers.platform, helpers.host_path), helpers.platform):
+        name = f"{profile.browser} ({profile.user}/{profile.profile})"
+        sources.append(TimelineSource(name, lambda profile=profile, name=name: _visit_events(profile, name, app_instance),
+                                      presorted=True))
+    return sources
+
+
+def _write_page(app_instance: Any, index: int, events: List[Event], more: bool) -> str:
+    name = f"{PAGES_DIR}/page_{index:05d}.html"
+    links = [f'<a href="../Timeline_Report.html">Index</a>']
+    if index > 1:
+        links.insert(0, f'<a href="page_{index - 1:05d}.html">&larr; Previous</a>')
+    if more:
+        links.append(f'<a href="page_{index + 1:05d}.html">Next &rarr;</a>')
+    nav = "<p>" + " | ".join(links) + "</p>"
+    rows = "".join(f"<tr><td>{_fmt_time(e.timestamp)}</td><td>{html.escape(e.source)}</td><td>{html.escape(e.kind)}</td>"
+                   f"<td>{html.escape(e.description)}</td><td>{html.escape(e.detail)}</td></tr>" for e in events)
+    page = (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Timeline page {index}</title><style>{PAGE_STYLE}</style>"
+            f"</head><body><h2>Timeline page {index}</h2>{nav}<table><tr><th>Time (UTC)</th><th>Source</th><th>Kind</th>"
+            f"<th>Description</th><th>Detail</th></tr>{rows}</table>{nav}</body></html>")
+    path = os.path.join(app_instance.report_output_directory, name)
+    evidence = getattr(app_instance, "evidence", None)
+    if evidence is not None:
+        evidence.write_artifact(path, page, KIND_REPORT)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(page)
+    return name
+
+
+def _export(app_instance: Any, sources: List[TimelineSource], stats: MergeStats) -> Tuple[List[Tuple[str, List[Event]]], bool]:
+    """
+    Streams the merged timeline into Timeline.csv, Timeline.jsonl and the HTML
+    pages. Returns each page's name with its first and last event, and whether
+    the time budget cut the merge short.
+    """
+    evidence = getattr(app_instance, "evidence", None)
+    paths = {name: os.path.join(app_instance.report_output_directory, name) for name in ("Timeline.csv", "Timeline.jsonl")}
+    if evidence is not None:
+        raw = {name: evidence.open_artifact(path) for name, path in paths.items()}
+    else:
+        raw = {name: open(path, "wb") for name, path in paths.items()}
+    csv_file, jsonl_file = (io.TextIOWrapper(raw[name], encoding="utf-8", newline="") for name in ("Timeline.csv", "Timeline.jsonl"))
+    pages, page, truncated = [], [], False
+    try:
+        writer = csv.writer(csv_file)
+        writer.writerow(COLUMNS)
+        for count, event in enumerate(merge_timeline(sources, stats), 1):
+            if len(page) == PAGE_EVENTS:
+                pages.append((_write_page(app_instance, len(pages) + 1, page, True), [page[0], page[-1]]))
+                page = []
+            page.append(event)
+            row = [_fmt_time(event.timestamp), f"{event.timestamp:.6f}", event.source, event.kind, event.description, event.detail]
+            writer.writerow(row)
+            jsonl_file.write(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False) + "\n")
+            if count % CHECK_EVERY == 0 and expired("timeline merge"):
+                truncated = True
+                break
+    finally:
+        for text in (csv_file, jsonl_file):
+            text.flush()
+            text.detach()
+        for name in paths:
+            if evidence is not None:
+                evidence.close_artifact(raw[name], KIND_REPORT)
+            else:
+                raw[name].close()
+    if page:
+        pages.append((_write_page(app_instance, len(pages) + 1, page, False), [page[0], page[-1]]))
+    return pages, truncated
+
+
+def generate_timeline_report(app_instance: Any, helpers: Any, browser_preference: str = "System Default"):
+    """Merges log, process, file, browser and USB events into one time-ordered super-timeline."""
+    app_instance.log_output("\n--- Generating Super-Timeline Report ---")
+
+    html_body = "<h2>Super-Timeline</h2>"
+    if helpers.host_path("/") is None:
+        html_body += "<p>The timeline is built from the host's files and is not part of a command archive replay.</p>"
+        helpers.generate_report_html(app_instance, app_instance.suspect_computer_name, "Timeline_Report.html",
+                                     "Super-Timeline Report", html_body, browser_preference=browser_preference)
+        return
+
+    sources = _sources(app_instance, helpers)
+    stats = MergeStats()
+    pages, truncated = _export(app_instance, sources, stats)
+    app_instance.log_output(f"Timeline: {stats.events} events from {len(sources)} source(s) in {len(pages)} page(s).")
+
+    html_body += (f"<p>{stats.events} events from {len(sources)} sources, merged in time order. "
+                  "Every event is listed in Timeline.csv and Timeline.jsonl.</p>")
+    if truncated:
+        html_body += "<p>⚠️ The time budget ran out while merging; the timeline ends at the last event listed.</p>"
+    if stats.spilled_runs:
+        html_body += f"<p>{stats.spilled_runs} sorted runs were spilled to temporary files during the merge.</p>"
+    if stats.out_of_order:
+        html_body += (f"<p>⚠️ {stats.out_of_order} log events were earlier than the line before them (clock changes or "
+                      "interleaved writers); they appear where the log has them.</p>")
+
+    html_body += "<h3>Sources</h3><table><tr><th>Source</th><th>Events</th><th>First (UTC)</th><th>Last (UTC)</th></tr>"
+    html_body += "".join(f"<tr><td>{html.escape(s.name)}</td><td>{s.count}</td><td>{_fmt_time(s.first)}</td>"
+                         f"<td>{_fmt_time(s.last)}</td></tr>" for s in sources) + "</table>"
+
+    html_body += "<h3>Pages</h3>"
+    if pages:
+        html_body += "<table><tr><th>Page</th><th>From (UTC)</th><th>To (UTC)</th></tr>"
+        html_body += "".join(f'<tr><td><a href="{html.escape(name)}">{index}</a></td><td>{_fmt_time(first.timestamp)}</td>'
+                             f"<td>{_fmt_time(last.timestamp)}</td></tr>"
+                             for index, (name, (first, last)) in enumerate(pages, 1)) + "</table>"
+    else:
+        html_body += "<p>No events were found.</p>"
+
+    helpers.generate_report_html(
+        app_instance,
+        app_instance.suspect_computer_name,
+        "Timeline_Report.html",
+        "Super-Timeline Report",
+        html_body,
+        browser_preference=browser_preference
+    )
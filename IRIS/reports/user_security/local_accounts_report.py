@@ -1,4 +1,3 @@
-import sys
 from typing import Any
 
 # Import necessary components from helpers.py using relative path
@@ -10,7 +9,7 @@ def generate_local_accounts_report(app_instance: Any, helpers: Any, browser_pref
     
     html_body = "<h2>Local User Accounts</h2>"
 
-    if sys.platform == "win32":
+    if helpers.platform == "win32":
         app_instance.log_output("Gathering Windows local accounts via WMIC...")
         wmic_output = helpers.run_command("wmic useraccount get Name,SID,Status,Disabled /format:list", app_instance=app_instance)
         users = []
@@ -43,7 +42,7 @@ def generate_local_accounts_report(app_instance: Any, helpers: Any, browser_pref
             html_body += f"<tr><td>{name}</td><td>{user.get('SID', 'N/A')}</td><td>{user.get('Status', 'N/A')}</td><td>{user.get('Disabled', 'N/A')}</td><td>{is_admin}</td></tr>"
         html_body += "</table>"
     
-    elif sys.platform.startswith("linux"):
+    elif helpers.platform.startswith("linux"):
         app_instance.log_output("Gathering Linux local accounts from /etc/passwd...")
         passwd_output = helpers.run_command("awk -F: '{print $1, $3, $6, $7}' /etc/passwd", check_shell=True, app_instance=app_instance)
         
@@ -62,7 +61,7 @@ def generate_local_accounts_report(app_instance: Any, helpers: Any, browser_pref
             html_body += "<tr><td colspan='4'>Could not read /etc/passwd.</td></tr>"
         html_body += "</table>"
 
-    elif sys.platform == "darwin":
+    elif helpers.platform == "darwin":
         app_instance.log_output("Gathering macOS local accounts and details...")
         users_list_output = helpers.run_command("dscl . -list /Users", check_shell=True, app_instance=app_instance)
         standard_users, system_users = [], []
@@ -1,16 +1,145 @@
-import sys
+import collections
+import csv
+import datetime
+import html
+import io
+import os
+import shutil
+import tempfile
 from typing import Any
 
 # Import necessary components from helpers.py using relative path
 from ...helpers import MockAppInstance, Helpers
+from ...collectors.cache import CollectorCache
+from ...collectors.journal import (JOURNALCTL_ENV, RESET_ENV, JournalError, JournalStats, journal_lines, load_cursor,
+                                   parse_entries, read_machine_id, recorded_program, save_cursor)
+from ...evidence import KIND_REPORT
+from ...log_pipeline import WARNING
+
+MAX_EVENTS = 500                # most recent logon events shown; every event is in the CSV
+TOP_SOURCES = 25
+FAILURES = ("ssh failed login", "ssh invalid user")
+
+
+def _fmt_time(timestamp: float) -> str:
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _journal_section(app_instance: Any, helpers: Any) -> str:
+    """Logon events from the systemd journal, read after the cursor the previous live run saved."""
+    html_body = "<h3>systemd Journal Logon Events</h3>"
+    archive = helpers.archive
+    replay = helpers.host_path("/") is None
+    live = not replay and not helpers.use_mock
+    if live and not (os.environ.get(JOURNALCTL_ENV) or shutil.which("journalctl")):
+        return html_body + "<p>journalctl was not found; this host has no systemd journal to read.</p>"
+
+    # Only live runs keep a checkpoint: the mock host is rebuilt every run
+    cache = CollectorCache() if live else None
+    machine_id = read_machine_id(helpers.host_path) if live else ""
+    stats = JournalStats(after_cursor=load_cursor(cache, machine_id) if cache is not None else None)
+    program = None
+    if replay:
+        # The same journalctl command line the recorded run streamed, answered from the archive
+        program = recorded_program((record.command for record in archive.records), stats)
+        if program is None:
+            return html_body + "<p>The command archive being replayed holds no journalctl output.</p>"
+    run = None if live else (lambda command: helpers.run_command(command, check_shell=True, app_instance=app_instance))
+    record = None
+    if live and archive is not None:
+        # Streamed output bypasses run_command, so it is stored in the archive once journalctl finishes
+        record = lambda command, stdout, started, duration: archive.record_stream(command, True, 0, stdout, "", started,
+                                                                                 duration)
+    app_instance.log_output("Reading sshd, sudo, useradd, su and systemd-logind entries from the journal"
+                            + (" after the saved cursor..." if stats.after_cursor else "..."))
+
+    # Events are spooled and the CSV artifact is written once journalctl has finished: with --record, running
+    # the command writes its output into the package too, and must not interleave with an open member
+    rows = tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+    writer = csv.writer(rows)
+    writer.writerow(["time_utc", "program", "pid", "kind", "user", "source", "detail", "message"])
+
+    counts = collections.Counter()
+    failures = collections.Counter()
+    recent = collections.deque(maxlen=MAX_EVENTS)
+    error = ""
+    with rows:
+        try:
+            for event in parse_entries(journal_lines(stats, run, program, record), stats):
+                counts[event.kind] += 1
+                if event.kind in FAILURES:
+                    failures[event.source] += 1
+                else:
+                    recent.append(event)
+                writer.writerow([_fmt_time(event.timestamp), event.program, event.pid, event.kind, event.user,
+                                 event.source, event.detail, event.message])
+        except JournalError as e:
+            error = str(e)
+            app_instance.log_output(f"Could not read the journal: {e}", level=WARNING)
+
+        evidence = getattr(app_instance, "evidence", None)
+        if evidence is not None:
+            rows.seek(0)
+            raw = evidence.open_artifact(os.path.join(app_instance.report_output_directory, "Logon_Journal_Events.csv"))
+            text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+            try:
+                shutil.copyfileobj(rows, text)
+            finally:
+                text.flush()
+                text.detach()
+                evidence.close_artifact(raw, KIND_REPORT, source="journalctl")
+    if cache is not None and stats.cursor:
+        save_cursor(cache, machine_id, stats.cursor)
+
+    if error:
+        html_body += f"<p>⚠️ journalctl failed: {html.escape(error)}</p>"
+    if stats.discarded_cursor:
+        app_instance.log_output("journalctl rejected the saved cursor; read the whole journal instead", level=WARNING)
+        html_body += ("<p>⚠️ journalctl rejected the checkpoint saved by the previous run (the journal was rotated or "
+                      "vacuumed past it, or this is a different disk with the same machine ID). The checkpoint was "
+                      "discarded and the whole journal was read.</p>")
+    if stats.after_cursor:
+        html_body += (f"<p>{stats.entries} entries since the checkpoint saved by the previous run "
+                      f"(set {RESET_ENV} to read the whole journal).</p>")
+    else:
+        html_body += f"<p>{stats.entries} entries read from the whole journal.</p>"
+    if cache is not None and stats.cursor:
+        html_body += f"<p>Checkpoint saved; the next run starts after cursor <code>{html.escape(stats.cursor)}</code>.</p>"
+    if stats.truncated:
+        html_body += "<p>⚠️ The time budget ran out while reading; the next run continues from the last entry read.</p>"
+    if stats.malformed:
+        html_body += f"<p>⚠️ {stats.malformed} lines of journalctl output were not JSON entries and were skipped.</p>"
+    if not stats.fields_supported:
+        html_body += "<p>This journalctl does not support --output-fields; whole entries were read.</p>"
+    if not counts:
+        return html_body + "<p>No logon, sudo, su or account creation events found in the journal.</p>"
+
+    html_body += "<table><tr><th>Event</th><th>Count</th></tr>"
+    html_body += "".join(f"<tr><td>{html.escape(kind)}</td><td>{n}</td></tr>" for kind, n in counts.most_common()) + "</table>"
+    if failures:
+        html_body += f"<h4>Failed SSH Logins by Source (top {TOP_SOURCES})</h4><table><tr><th>Source</th><th>Failures</th></tr>"
+        html_body += "".join(f"<tr><td>{html.escape(source)}</td><td>{n}</td></tr>"
+                             for source, n in failures.most_common(TOP_SOURCES)) + "</table>"
+    if recent:
+        html_body += (f"<h4>Logons, Sessions, sudo, su and Account Changes (most recent {MAX_EVENTS})</h4>"
+                      "<table><tr><th>Time (UTC)</th><th>Event</th><th>User</th><th>Source</th><th>Detail</th></tr>")
+        html_body += "".join(f"<tr><td>{_fmt_time(e.timestamp)}</td><td>{html.escape(e.kind)}</td><td>{html.escape(e.user)}</td>"
+                             f"<td>{html.escape(e.source)}</td><td>{html.escape(e.detail)}</td></tr>" for e in reversed(recent))
+        html_body += "</table>"
+    if evidence is not None:
+        html_body += "<p>Every event is listed in Logon_Journal_Events.csv.</p>"
+    return html_body
+
 
 def generate_logon_report(app_instance: Any, helpers: Any, browser_preference: str = "System Default"):
     """Generates a report on logon activity and user creation events."""
     app_instance.log_output("\n--- Generating Logon Report ---")
-    
+
     html_body = "<h2>Logon & User Creation Report</h2>"
 
-    if sys.platform.startswith("linux"):
+    if helpers.platform.startswith("linux"):
+        html_body += _journal_section(app_instance, helpers)
+
         app_instance.log_output("Searching for user creation and SSH login events in /var/log/auth.log...")
         # Grep for useradd events and successful/failed SSH logins
         logon_events = helpers.run_command(
@@ -22,7 +151,7 @@ def generate_logon_report(app_instance: Any, helpers: Any, browser_preference: s
         html_body += "<h3>Linux User Creation & SSH Login Events</h3>"
         if logon_events:
             html_body += "<p>The following are relevant raw events from <code>/var/log/auth.log</code>. Review for unauthorized user creation or suspicious login patterns.</p>"
-            html_body += f"<pre>{logon_events}</pre>"
+            html_body += f"<pre>{html.escape(logon_events)}</pre>"
         else:
             html_body += "<p>No recent user creation or SSH login events found in <code>/var/log/auth.log</code>.</p>"
 
@@ -30,10 +159,10 @@ def generate_logon_report(app_instance: Any, helpers: Any, browser_preference: s
         html_body += "<p>Logon activity reporting for this OS is not yet fully implemented. This would typically involve parsing security event logs (Windows) or unified logs (macOS) for login/logout events.</p>"
 
     helpers.generate_report_html(
-        app_instance, 
-        app_instance.suspect_computer_name, 
-        "Logon_Report.html", 
-        "Logon Report", 
+        app_instance,
+        app_instance.suspect_computer_name,
+        "Logon_Report.html",
+        "Logon Report",
         html_body,
         browser_preference=browser_preference
-    )
\ No newline at end of file
+    )
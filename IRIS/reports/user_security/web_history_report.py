@@ -1,21 +1,133 @@
-from typing import Any # ADDED: Import typing hints
+import collections
+import csv
+import datetime
+import heapq
+import html
+import io
+import os
+import re
+import sqlite3
+import time
+from typing import Any
+from urllib.parse import urlsplit
 
 # Import necessary components from helpers.py using relative path
 from ...helpers import MockAppInstance, Helpers
+from ...collectors.browser_history import discover_profiles, has_pending_wal, home_directories, iter_visits
+from ...evidence import KIND_REPORT
+from ...log_pipeline import WARNING
+
+HISTORY_WINDOW_DAYS = 90
+RECENT_VISITS = 200
+TOP_DOMAINS = 25
+MAX_SUSPICIOUS = 500
+# Direct script/binary downloads, paste sites and tunnelling services
+SUSPICIOUS_URL = re.compile(r"\.(sh|py|pl|ps1|exe|bat|vbs|hta|scr|elf)(\?|$)|pastebin\.com/raw|raw\.githubusercontent\.com"
+                            r"|transfer\.sh|ngrok\.io|search\?q=.*(disable|bypass|clear).*(log|audit|defender|antivirus)", re.I)
+
+
+def _fmt_time(timestamp: float) -> str:
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _visit_row(profile, visit) -> str:
+    return (f"<tr><td>{_fmt_time(visit.timestamp)}</td><td>{html.escape(profile.user)}</td><td>{profile.browser}</td>"
+            f"<td>{html.escape(visit.title or '')}</td><td>{html.escape(visit.url)}</td></tr>")
+
 
 def generate_web_history_report(app_instance: Any, helpers: Any, browser_preference: str = "System Default"):
-    """Generates a placeholder report for web browsing history."""
-    app_instance.log_output("\n--- Generating Web History Report (Placeholder) ---")
-    
+    """Collects browser history for every user from Chromium-family and Firefox profiles."""
+    app_instance.log_output("\n--- Generating Web History Report ---")
+
     html_body = "<h2>Web History</h2>"
-    html_body += "<p>Web browsing history collection is not yet implemented. This would involve parsing browser-specific history databases (e.g., SQLite files for Chrome/Firefox).</p>"
+    if helpers.host_path("/") is None:
+        html_body += "<p>Browser history is read from the host's files and is not part of a command archive replay.</p>"
+        helpers.generate_report_html(app_instance, app_instance.suspect_computer_name, "Web_History_Report.html",
+                                     "Web History Report", html_body, browser_preference=browser_preference)
+        return
+
+    profiles = discover_profiles(home_directories(helpers.platform, helpers.host_path), helpers.platform)
+    app_instance.log_output(f"Found {len(profiles)} browser profile(s).")
+    since = time.time() - HISTORY_WINDOW_DAYS * 86400
+
+    # Every visit in the window is streamed to a CSV artifact; the HTML keeps summaries only.
+    evidence = getattr(app_instance, "evidence", None)
+    csv_path = os.path.join(app_instance.report_output_directory, "Web_History_Visits.csv")
+    raw = evidence.open_artifact(csv_path) if evidence is not None else None
+    text = io.TextIOWrapper(raw, encoding="utf-8", newline="") if raw is not None else None
+    writer = csv.writer(text) if text is not None else None
+    if writer:
+        writer.writerow(["visit_time_utc", "user", "browser", "profile", "title", "url", "duration_s"])
+
+    summary_rows, notes = [], []
+    domains = collections.Counter()
+    recent = []                 # min-heap of (timestamp, order, profile, visit): the newest visits across every profile
+    suspicious = []
+    total = 0
+    try:
+        for profile in profiles:
+            count, first, last = 0, None, None
+            try:
+                for visit in iter_visits(profile, since=since):
+                    count += 1
+                    first = first if first is not None else visit.timestamp
+                    last = visit.timestamp
+                    domains[urlsplit(visit.url).hostname or visit.url[:64]] += 1
+                    entry = (visit.timestamp, total + count, profile, visit)
+                    if len(recent) < RECENT_VISITS:
+                        heapq.heappush(recent, entry)
+                    else:
+                        heapq.heappushpop(recent, entry)
+                    if len(suspicious) < MAX_SUSPICIOUS and SUSPICIOUS_URL.search(visit.url):
+                        suspicious.append((profile, visit))
+                    if writer:
+                        writer.writerow([_fmt_time(visit.timestamp), profile.user, profile.browser, profile.profile,
+                                         visit.title or "", visit.url, visit.duration_s if visit.duration_s is not None else ""])
+            except sqlite3.DatabaseError as e:
+                app_instance.log_output(f"Warning: could not read {profile.history_path}: {e}", level=WARNING)
+                notes.append(f"{html.escape(profile.user)} / {profile.browser} / {html.escape(profile.profile)}: unreadable ({html.escape(str(e))})")
+                continue
+            if has_pending_wal(profile.history_path):
+                notes.append(f"{html.escape(profile.user)} / {profile.browser} / {html.escape(profile.profile)}: "
+                             "browser was running; visits not yet checkpointed from the -wal file are not included")
+            total += count
+            summary_rows.append(f"<tr><td>{html.escape(profile.user)}</td><td>{profile.browser}</td><td>{html.escape(profile.profile)}</td>"
+                                f"<td>{count}</td><td>{_fmt_time(first) if first else 'N/A'}</td><td>{_fmt_time(last) if last else 'N/A'}</td></tr>")
+    finally:
+        if text is not None:
+            text.flush()
+            text.detach()
+            evidence.close_artifact(raw, KIND_REPORT)
+
+    html_body += f"<p>{total} visits in the last {HISTORY_WINDOW_DAYS} days across {len(profiles)} profile(s).</p>"
+    if not profiles:
+        html_body += "<p>No Chrome, Chromium, Brave, Edge or Firefox profiles were found in any home directory.</p>"
+    else:
+        html_body += "<h3>Profiles</h3><table><tr><th>User</th><th>Browser</th><th>Profile</th><th>Visits</th><th>First Visit (UTC)</th><th>Last Visit (UTC)</th></tr>"
+        html_body += "".join(summary_rows) + "</table>"
+        for note in notes:
+            html_body += f"<p>⚠️ {note}</p>"
+
+        html_body += "<h3>Potentially Suspicious Visits</h3>"
+        if suspicious:
+            html_body += "<table><tr><th>Time (UTC)</th><th>User</th><th>Browser</th><th>Title</th><th>URL</th></tr>"
+            html_body += "".join(_visit_row(p, v) for p, v in suspicious) + "</table>"
+        else:
+            html_body += "<p>No visits to script downloads, paste sites or tunnelling services.</p>"
+
+        html_body += f"<h3>Top {TOP_DOMAINS} Domains</h3><table><tr><th>Domain</th><th>Visits</th></tr>"
+        html_body += "".join(f"<tr><td>{html.escape(d)}</td><td>{n}</td></tr>" for d, n in domains.most_common(TOP_DOMAINS)) + "</table>"
+
+        html_body += f"<h3>Most Recent {RECENT_VISITS} Visits</h3><table><tr><th>Time (UTC)</th><th>User</th><th>Browser</th><th>Title</th><th>URL</th></tr>"
+        html_body += "".join(_visit_row(p, v) for _, _, p, v in sorted(recent, key=lambda entry: entry[:2], reverse=True)) + "</table>"
+        if writer:
+            html_body += "<p>Every visit in the window is listed in Web_History_Visits.csv.</p>"
 
     helpers.generate_report_html(
-        app_instance, 
-        app_instance.suspect_computer_name, 
-        "Web_History_Report.html", 
-        "Web History Report", 
+        app_instance,
+        app_instance.suspect_computer_name,
+        "Web_History_Report.html",
+        "Web History Report",
         html_body,
         browser_preference=browser_preference
     )
-
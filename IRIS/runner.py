@@ -0,0 +1,156 @@
+import concurrent.futures
+import contextvars
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+from .budget import CancellationToken, budget_context
+from .log_pipeline import report_context
+from .reports.registry import COST_ORDER, VOLATILITY_ORDER, ReportSpec
+
+# --- Report runner ---
+# Plans, orders and executes reports from the registry metadata. Inapplicable
+# reports (wrong platform, missing Python modules) are skipped before they are
+# imported or fork anything. Each report runs under a time budget (see
+# budget.py); one that ignores its token past GRACE_S is abandoned so it
+# cannot hold up the rest of the run.
+
+STATUS_OK = "ok"
+STATUS_SKIPPED = "skipped"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"   # not started because the run deadline had passed, or abandoned past its budget
+STATUS_TRUNCATED = "truncated"  # ran out of time and rendered a partial report
+
+ORDER_REGISTRY = "registry"      # registry order (most expensive first when parallel)
+ORDER_VOLATILITY = "volatility"  # most volatile evidence first, cheapest first within a class
+
+GRACE_S = 5.0   # time a report gets past its budget to render what it has before it is abandoned
+
+
+@dataclass
+class ReportResult:
+    id: str
+    title: str
+    status: str
+    duration_s: float = 0.0
+    detail: str = ""
+
+
+def has_admin_privileges() -> bool:
+    """True when running as root (POSIX) or as an elevated administrator (Windows)."""
+    if hasattr(os, "geteuid"):
+        return os.geteuid() == 0
+    try:
+        import ctypes
+        return bool(ctypes.windll.shell32.IsUserAnAdmin())
+    except Exception:
+        return False
+
+
+def plan_reports(specs: List[ReportSpec], platform: str) -> Tuple[List[ReportSpec], List[ReportResult]]:
+    """Splits specs into those that can run on this platform and skip results for the rest."""
+    runnable, skipped = [], []
+    for spec in specs:
+        reason = spec.skip_reason(platform)
+        if reason:
+            skipped.append(ReportResult(spec.id, spec.title, STATUS_SKIPPED, detail=reason))
+        else:
+            runnable.append(spec)
+    return runnable, skipped
+
+
+def order_reports(specs: List[ReportSpec], jobs: int = 1, order: str = ORDER_REGISTRY) -> List[ReportSpec]:
+    """
+    Sequential runs keep registry order. Parallel runs start the most expensive
+    reports first so the long ones overlap with the many cheap ones. Order of
+    volatility starts with what disappears soonest (sockets, processes,
+    sessions) and leaves stable inventory (software, hardware) for last; within
+    a class the cheapest go first, so an interrupted triage holds the most.
+    """
+    if order == ORDER_VOLATILITY:
+        return sorted(specs, key=lambda spec: (VOLATILITY_ORDER.get(spec.volatility, len(VOLATILITY_ORDER)),
+                                               COST_ORDER.get(spec.cost, 0)))
+    if jobs <= 1:
+        return list(specs)
+    return sorted(specs, key=lambda spec: -COST_ORDER.get(spec.cost, 0))
+
+
+def run_report(spec: ReportSpec, app_instance: Any, helpers: Any, browser_preference: str = "System Default",
+               deadline: Optional[float] = None, budget_s: Optional[float] = None) -> ReportResult:
+    """
+    Runs one report, converting any exception into an error result instead of aborting the run.
+    `deadline` is a time.monotonic() timestamp; reports are not started once it has passed, and
+    running ones are cut short at it. `budget_s` overrides the report's own budget (0 for none).
+    """
+    now = time.monotonic()
+    if deadline is not None and now >= deadline:
+        app_instance.log_output(f"⏱ Not starting {spec.title}: run deadline reached")
+        return ReportResult(spec.id, spec.title, STATUS_TIMEOUT, detail="not started: run deadline reached")
+    budget = spec.time_budget if budget_s is None else budget_s
+    ends = [end for end in (now + budget if budget else None, deadline) if end is not None]
+    token = CancellationToken(min(ends) if ends else None, budget or None)
+    error: List[Exception] = []
+
+    def target():
+        with report_context(spec.id), budget_context(token):
+            try:
+                spec.load()(app_instance, helpers, browser_preference)
+            except Exception as e:
+                error.append(e)
+
+    start = time.perf_counter()
+    # A daemon thread, so a report stuck in an uninterruptible call cannot keep the run (or the process) alive
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(target,), name=f"report-{spec.id}", daemon=True)
+    thread.start()
+    thread.join(None if token.deadline is None else token.deadline - time.monotonic() + GRACE_S)
+    duration = time.perf_counter() - start
+    if thread.is_alive():
+        token.cancel()
+        app_instance.log_output(f"⏱ Abandoned {spec.title}: still running {GRACE_S:.0f} s past its time budget")
+        return ReportResult(spec.id, spec.title, STATUS_TIMEOUT, duration,
+                            f"abandoned after {duration:.0f} s; its report may be missing")
+    if error:
+        app_instance.log_output(f"❌ Error in {spec.title}: {error[0]}")
+        return ReportResult(spec.id, spec.title, STATUS_ERROR, duration, str(error[0]))
+    if token.truncated:
+        app_instance.log_output(f"⏱ {spec.title}: {token.marker()}")
+        return ReportResult(spec.id, spec.title, STATUS_TRUNCATED, duration, token.marker())
+    return ReportResult(spec.id, spec.title, STATUS_OK, duration)
+
+
+def run_reports(specs: List[ReportSpec], app_instance: Any, helpers: Any,
+                browser_preference: str = "System Default", jobs: int = 1,
+                deadline: Optional[float] = None, budget_s: Optional[float] = None, order: str = ORDER_REGISTRY,
+                on_result: Optional[Callable[[ReportResult], None]] = None) -> List[ReportResult]:
+    """
+    Runs every applicable report, up to `jobs` at a time, and returns results in
+    registry order. `on_result` is called with each result as soon as its
+    report finishes (from the runner's thread, one at a time).
+    """
+    runnable, skipped = plan_reports(specs, helpers.platform)
+    for result in skipped:
+        app_instance.log_output(f"Skipping {result.title}: {result.detail}")
+    if any(spec.privileged for spec in runnable) and not has_admin_privileges():
+        names = ", ".join(spec.title for spec in runnable if spec.privileged)
+        app_instance.log_output(f"Note: not running with admin privileges; results may be incomplete for: {names}")
+
+    ordered = order_reports(runnable, jobs, order)
+    results = []
+    if jobs <= 1:
+        for spec in ordered:
+            results.append(run_report(spec, app_instance, helpers, browser_preference, deadline, budget_s))
+            if on_result:
+                on_result(results[-1])
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(run_report, spec, app_instance, helpers, browser_preference, deadline, budget_s)
+                       for spec in ordered]
+            for future in concurrent.futures.as_completed(futures):
+                results.append(future.result())
+                if on_result:
+                    on_result(results[-1])
+
+    position = {spec.id: i for i, spec in enumerate(specs)}
+    return sorted(results + skipped, key=lambda r: position[r.id])
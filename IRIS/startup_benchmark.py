@@ -0,0 +1,89 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+# --- Startup benchmark ---
+# Measures wall time from process spawn to the first CLI output line (or first
+# GUI paint) and breaks import cost down with `python -X importtime`. The CLI is
+# `python -m IRIS --mock`, whose first lines are log output on stderr, so both
+# streams are read.
+#
+#   python -m IRIS.startup_benchmark            # CLI, 5 runs
+#   python -m IRIS.startup_benchmark --gui      # GUI first paint (needs a display)
+
+TARGET_MS = 150.0
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI_MODULE = "IRIS.cli"
+CLI_ARGS = ["-m", "IRIS", "--mock", "--no-browser"]
+GUI_SCRIPT = os.path.join(REPO_ROOT, "iris_gui.py")
+GUI_MARKER = "IRIS_FIRST_PAINT"
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    env["IRIS_STARTUP_PROBE"] = "1"
+    return env
+
+
+def time_to_first_line(argv: List[str], marker: Optional[str] = None) -> Optional[float]:
+    """Spawns argv and returns milliseconds until it prints its first line (or the marker line) on stdout or stderr."""
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        proc = subprocess.Popen(argv, cwd=workdir, env=_env(), stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True)
+        try:
+            for line in proc.stdout:
+                if marker is None or marker in line:
+                    return (time.perf_counter() - start) * 1000
+            return None
+        finally:
+            proc.kill()
+            proc.wait()
+
+
+def import_breakdown(module: str, top: int = 10) -> List[Tuple[int, str]]:
+    """Returns the `top` imports by cumulative microseconds for importing `module`."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            env=_env(), capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark IRIS cold start time.")
+    parser.add_argument("--gui", action="store_true", help="measure time to first GUI paint instead of first CLI output")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=TARGET_MS)
+    args = parser.parse_args(argv)
+
+    if args.gui:
+        command, marker, module = [sys.executable, GUI_SCRIPT], GUI_MARKER, "iris_gui"
+    else:
+        command, marker, module = [sys.executable] + CLI_ARGS, None, CLI_MODULE
+
+    samples = [t for t in (time_to_first_line(command, marker) for _ in range(args.runs)) if t is not None]
+    if not samples:
+        print("Could not measure startup: no output was produced (is a display available for --gui?).")
+        return 2
+
+    best, median = min(samples), sorted(samples)[len(samples) // 2]
+    print(f"{'GUI first paint' if args.gui else 'CLI first output'}: best {best:.1f} ms, median {median:.1f} ms "
+          f"over {len(samples)} runs (target < {args.target_ms:.0f} ms)")
+    print("\nSlowest imports (cumulative, -X importtime):")
+    for cumulative, name in import_breakdown(module):
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    return 0 if median < args.target_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
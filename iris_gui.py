@@ -6,6 +6,7 @@ from tkinter import ttk, messagebox, scrolledtext
 import socket
 import os
 import sys
+import queue
 
 # Ensure IRIS package is discoverable
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -13,23 +14,13 @@ if script_dir not in sys.path:
     sys.path.insert(0, script_dir)
 
 from IRIS.helpers import MockAppInstance, Helpers
+from IRIS.log_pipeline import LogPipeline, CallbackSink, FileSink, report_context
 
-# Report generation functions grouped for clarity
-from IRIS.reports.system_info import system_hardware_info, usb_camera_bluetooth_report
-from IRIS.reports.user_security import (
-    local_accounts_report, logon_report,
-    antivirus_status_report, web_history_report
-)
-from IRIS.reports.network import (
-    tcp_connections_report, network_config_report, firewall_rules_report
-)
-from IRIS.reports.process_software import (
-    running_processes_report, installed_software_report
-)
-from IRIS.reports.persistence_malware import (
-    scheduled_tasks_report, startup_items_report,
-    script_check_report, process_persistence_report
-)
+# Report modules are imported lazily through the registry on first run
+from IRIS.reports.registry import REPORTS, default_reports
+from IRIS.runner import plan_reports
+
+LOG_POLL_MS = 100
 
 class IRISGUI(tk.Tk):
     def __init__(self):
@@ -39,7 +30,13 @@ class IRISGUI(tk.Tk):
         self.resizable(False, False)
         self.suspect_hostname = socket.gethostname()
 
-        self.app_instance = MockAppInstance()
+        # Report and GUI log lines go through the batched pipeline; the console drains them on the UI thread
+        self._log_batches = queue.SimpleQueue()
+        os.makedirs("reports", exist_ok=True)
+        self.app_instance = MockAppInstance(log_pipeline=LogPipeline([
+            CallbackSink(self._log_batches.put),
+            FileSink(os.path.join("reports", "iris_run.log")),
+        ]))
         #self.helpers = Helpers(use_mock=True)
         self.helpers = Helpers(use_mock=False)
         self.app_instance.set_hostname(self.suspect_hostname)
@@ -72,24 +69,10 @@ class IRISGUI(tk.Tk):
         left = tk.LabelFrame(self, text="Diagnostic Reports", padx=5, pady=5)
         left.place(x=10, y=70, width=200, height=580)
 
-        self.report_map = [
-            ("Run All Reports", self.run_all_reports),
-            ("System Information", self.run_system_info),
-            ("USB, Camera & Bluetooth", self.run_usb_camera_bluetooth_report),
-            ("Local Accounts", self.run_local_accounts_report),
-            ("Logon Report", self.run_logon_report),
-            ("Antivirus Status", self.run_antivirus_status_report),
-            ("Web History", self.run_web_history_report),
-            ("TCP Connections", self.run_tcp_connections_report),
-            ("Network Configuration", self.run_network_config_report),
-            ("Firewall Rules", self.run_firewall_rules_report),
-            ("Running Processes", self.run_running_processes_report),
-            ("Installed Software", self.run_installed_software_report),
-            ("Scheduled Tasks", self.run_scheduled_tasks_report),
-            ("Startup Items", self.run_startup_items_report),
-            ("Script Check", self.run_script_check_report),
-            ("Process Persistence", self.run_process_persistence_report),
-        ]
+        # Buttons are generated from the report registry
+        self.report_map = [("Run All Reports", self.run_all_reports)]
+        self.report_map += [(spec.title, lambda browser_pref=None, spec=spec: self._run_wrapper(spec, browser_pref))
+                            for spec in REPORTS]
 
         for label, cmd in self.report_map:
             tk.Button(left, text=label, width=24, anchor="w", command=cmd).pack(pady=2)
@@ -131,10 +114,27 @@ class IRISGUI(tk.Tk):
         self.console = scrolledtext.ScrolledText(console_frame, wrap=tk.WORD, font=("Courier", 10))
         self.console.pack(fill=tk.BOTH, expand=True)
         self.log(f"Using auto‑detected/default Suspect Computer: {self.suspect_hostname}")
+        self.after(LOG_POLL_MS, self._poll_log)
+
+    def log(self, msg, level=None):
+        self.app_instance.log_output(msg, level=level)
 
-    def log(self, msg):
-        self.console.insert(tk.END, msg + "\n")
-        self.console.see(tk.END)
+    def _drain_log(self):
+        """Inserts every pending log batch with a single insert and scroll."""
+        chunks = []
+        while not self._log_batches.empty():
+            chunks.append(self._log_batches.get_nowait())
+        if chunks:
+            self.console.insert(tk.END, "\n".join(chunks) + "\n")
+            self.console.see(tk.END)
+
+    def _poll_log(self):
+        self._drain_log()
+        self.after(LOG_POLL_MS, self._poll_log)
+
+    def _flush_log(self):
+        self.app_instance.log_pipeline.flush()
+        self._drain_log()
 
     def set_suspect_computer(self):
         name = self.suspect_var.get()
@@ -145,81 +145,41 @@ class IRISGUI(tk.Tk):
     def run_all_reports(self):
         self.log("▶ Running all reports...")
         pref = self.browser_var.get()
-        for _, cmd in self.report_map[1:]:  # skip "Run All"
-            cmd(pref)
+        runnable, skipped = plan_reports(default_reports(), self.helpers.platform)
+        for result in skipped:
+            self.log(f"⏭ Skipping {result.title}: {result.detail}")
+        for spec in runnable:
+            self._run_wrapper(spec, pref)
         self.log("✅ All reports completed.")
-
-    def _run_wrapper(self, func, label, browser_pref=None):
-        self.log(f"▶ Running {label}...")
-        try:
-            func(self.app_instance, self.helpers, browser_pref)
-            self.log(f"✅ {label} generated.")
-        except Exception as e:
-            self.log(f"❌ Error in {label}: {e}")
-
-    # Individual report methods mapped to wrappers
-    def run_system_info(self, browser_pref=None):
-        return self._run_wrapper(system_hardware_info.generate_system_hardware_report,
-                                 "System Information Report", browser_pref)
-
-    def run_usb_camera_bluetooth_report(self, browser_pref=None):
-        return self._run_wrapper(usb_camera_bluetooth_report.generate_usb_camera_bluetooth_report,
-                                 "USB/Camera/Bluetooth Report", browser_pref)
-
-    def run_local_accounts_report(self, browser_pref=None):
-        return self._run_wrapper(local_accounts_report.generate_local_accounts_report,
-                                 "Local Accounts Report", browser_pref)
-
-    def run_logon_report(self, browser_pref=None):
-        return self._run_wrapper(logon_report.generate_logon_report,
-                                 "Logon Report", browser_pref)
-
-    def run_antivirus_status_report(self, browser_pref=None):
-        return self._run_wrapper(antivirus_status_report.generate_antivirus_status_report,
-                                 "Antivirus Status Report", browser_pref)
-
-    def run_web_history_report(self, browser_pref=None):
-        return self._run_wrapper(web_history_report.generate_web_history_report,
-                                 "Web History Report", browser_pref)
-
-    def run_tcp_connections_report(self, browser_pref=None):
-        return self._run_wrapper(tcp_connections_report.generate_tcp_connections_report,
-                                 "TCP Connections Report", browser_pref)
-
-    def run_network_config_report(self, browser_pref=None):
-        return self._run_wrapper(network_config_report.generate_network_config_report,
-                                 "Network Configuration Report", browser_pref)
-
-    def run_firewall_rules_report(self, browser_pref=None):
-        return self._run_wrapper(firewall_rules_report.generate_firewall_rules_report,
-                                 "Firewall Rules Report", browser_pref)
-
-    def run_running_processes_report(self, browser_pref=None):
-        return self._run_wrapper(running_processes_report.generate_running_processes_report,
-                                 "Running Processes Report", browser_pref)
-
-    def run_installed_software_report(self, browser_pref=None):
-        return self._run_wrapper(installed_software_report.generate_installed_software_report,
-                                 "Installed Software Report", browser_pref)
-
-    def run_scheduled_tasks_report(self, browser_pref=None):
-        return self._run_wrapper(scheduled_tasks_report.generate_scheduled_tasks_report,
-                                 "Scheduled Tasks Report", browser_pref)
-
-    def run_startup_items_report(self, browser_pref=None):
-        return self._run_wrapper(startup_items_report.generate_startup_items_report,
-                                 "Startup Items Report", browser_pref)
-
-    def run_script_check_report(self, browser_pref=None):
-        return self._run_wrapper(script_check_report.generate_script_check_report,
-                                 "Script Check Report", browser_pref)
-
-    def run_process_persistence_report(self, browser_pref=None):
-        return self._run_wrapper(process_persistence_report.generate_process_persistence_report,
-                                 "Process Persistence Report", browser_pref)
+        self._flush_log()
+
+    def _run_wrapper(self, spec, browser_pref=None):
+        self.log(f"▶ Running {spec.title}...")
+        reason = spec.skip_reason(self.helpers.platform)
+        if reason:
+            self.log(f"⏭ {spec.title} skipped: {reason}")
+            return
+        with report_context(spec.id):
+            try:
+                func = spec.load()
+                func(self.app_instance, self.helpers, browser_pref)
+                self.log(f"✅ {spec.title} generated.")
+            except Exception as e:
+                self.log(f"❌ Error in {spec.title}: {e}")
+        # Keep the chain-of-custody manifest current after every report
+        self.app_instance.evidence.write_manifest()
+        self._flush_log()
 
     def show_version_info(self):
         messagebox.showinfo("Version Info", "IRIS Incident Response Toolkit\nVersion: v3.2\n\nBuilt for rapid forensic triage.\n– SHIFTY")
 
 if __name__ == "__main__":
-    IRISGUI().mainloop()
+    app = IRISGUI()
+    if os.environ.get("IRIS_STARTUP_PROBE"):
+        # Used by IRIS.startup_benchmark: signal first paint, then exit
+        def _probe_first_paint():
+            app.update()
+            print("IRIS_FIRST_PAINT", flush=True)
+            app.destroy()
+        app.after_idle(_probe_first_paint)
+    app.mainloop()